@@ -41,6 +41,17 @@ if ($_SERVER['REQUEST_METHOD'] === 'GET' && isset($_GET['trajectories']) && $_GE
     // Try split trajectory file first (new format)
     $traj_path = $base_path . '/tmi_compliance_trajectories_' . $plan_id . '.json';
     if (file_exists($traj_path)) {
+        // Pre-compressed copy written by run.py --trajectory_compress gzip
+        $gz_path = $traj_path . '.gz';
+        $accepts_gzip = strpos($_SERVER['HTTP_ACCEPT_ENCODING'] ?? '', 'gzip') !== false;
+        if ($accepts_gzip && file_exists($gz_path) && filemtime($gz_path) >= filemtime($traj_path)) {
+            header('Content-Encoding: gzip');
+            header('Vary: Accept-Encoding');
+            header('Content-Length: ' . filesize($gz_path));
+            header('Cache-Control: private, max-age=300');
+            readfile($gz_path);
+            exit;
+        }
         header('Content-Length: ' . filesize($traj_path));
         header('Cache-Control: private, max-age=300');
         readfile($traj_path);
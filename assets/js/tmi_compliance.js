@@ -214,6 +214,9 @@ const TMICompliance = {
         this._trajectoryPromise = fetch(url)
             .then(resp => resp.ok ? resp.json() : null)
             .then(trajData => {
+                if (trajData && trajData.format === 'polyline3') {
+                    trajData = this.decodeCompactTrajectories(trajData);
+                }
                 if (trajData) {
                     this._rawTrajectories = trajData;
                     console.log(`Loaded trajectory data: ${Object.keys(trajData).length} MIT entries`);
@@ -227,6 +230,44 @@ const TMICompliance = {
         return this._trajectoryPromise;
     },
 
+    /**
+     * Expand a compact trajectory file (run.py --trajectory_format compact) into
+     * the regular {mitKey: {callsign: {type, coordinates, properties}}} layout.
+     * Each flight is a polyline of interleaved lat/lon/time deltas.
+     */
+    decodeCompactTrajectories: function(doc) {
+        const scale = Math.pow(10, doc.precision || 4);
+        const decoded = {};
+        Object.entries(doc.trajectories || {}).forEach(([key, flights]) => {
+            decoded[key] = {};
+            Object.entries(flights).forEach(([cs, flight]) => {
+                const line = flight.line || '';
+                const values = [];
+                let value = 0, factor = 1;
+                for (let i = 0; i < line.length; i++) {
+                    const b = line.charCodeAt(i) - 63;
+                    value += (b & 0x1f) * factor;
+                    factor *= 32;
+                    if (b < 0x20) {
+                        values.push(value % 2 ? -(value + 1) / 2 : value / 2);
+                        value = 0;
+                        factor = 1;
+                    }
+                }
+                const coords = [];
+                let lat = 0, lon = 0, t = flight.t0;
+                for (let i = 0; i + 2 < values.length; i += 3) {
+                    lat += values[i];
+                    lon += values[i + 1];
+                    t += values[i + 2];
+                    coords.push([lon / scale, lat / scale, t]);
+                }
+                decoded[key][cs] = { type: 'LineString', coordinates: coords, properties: flight.properties || {} };
+            });
+        });
+        return decoded;
+    },
+
     analysisInProgress: false,
 
     runAnalysis: function() {
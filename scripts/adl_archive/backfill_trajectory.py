@@ -16,20 +16,25 @@ Date: 2026-02-02
 """
 
 import argparse
-import io
 import logging
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Generator, Optional
 
 import pyarrow as pa
-import pyarrow.parquet as pq
 import pyodbc
 from azure.storage.blob import BlobServiceClient
 from tqdm import tqdm
 
+from columnar_fetch import FetchStats, fetch_record_batches, peak_rss_mb
+from flight_index import FlightIndexBuilder, FlightIndexStore
+from parquet_stream import (
+    MAX_FILE_ROWS, PARQUET_OPTIONS, PARQUET_ROW_GROUP_SIZE, DayParquetWriter, layout_options,
+)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -74,17 +79,8 @@ TRAJECTORY_SCHEMA = pa.schema([
     ('vertical_rate_fpm', pa.int32()),
 ])
 
-# Parquet write options for optimal compression
-PARQUET_OPTIONS = {
-    'compression': 'zstd',
-    'compression_level': 9,
-    'use_dictionary': True,
-    'write_statistics': True,
-}
-
 # Batch sizes
 QUERY_BATCH_SIZE = 100_000  # Rows per DB fetch
-PARQUET_ROW_GROUP_SIZE = 100_000  # Rows per Parquet row group
 
 
 def get_db_connection() -> pyodbc.Connection:
@@ -128,12 +124,15 @@ def stream_trajectory_data(
     conn: pyodbc.Connection,
     start_date: datetime.date,
     end_date: datetime.date,
-    batch_size: int = QUERY_BATCH_SIZE
-) -> Generator[list[dict], None, None]:
+    batch_size: int = QUERY_BATCH_SIZE,
+    stats: Optional[FetchStats] = None
+) -> Generator[pa.RecordBatch, None, None]:
     """
     Stream trajectory data with denormalized flight info.
 
-    Yields batches of rows as dictionaries.
+    Yields RecordBatches (TRAJECTORY_SCHEMA) of up to batch_size rows,
+    fetched column-wise (see columnar_fetch), ordered by callsign,
+    flight_uid, timestamp (the archive layout, see parquet_stream).
     """
     cursor = conn.cursor()
 
@@ -146,8 +145,8 @@ def stream_trajectory_data(
             COALESCE(p.fp_dept_icao, '') as dept_icao,
             COALESCE(p.fp_dest_icao, '') as dest_icao,
             t.timestamp_utc,
-            t.lat,
-            t.lon,
+            CAST(t.lat AS FLOAT) as lat,
+            CAST(t.lon AS FLOAT) as lon,
             t.altitude_ft,
             t.groundspeed_kts,
             COALESCE(t.heading_deg, 0) as heading_deg,
@@ -156,111 +155,59 @@ def stream_trajectory_data(
         LEFT JOIN adl_flight_core c ON t.flight_uid = c.flight_uid
         LEFT JOIN adl_flight_plan p ON t.flight_uid = p.flight_uid
         WHERE t.timestamp_utc >= ? AND t.timestamp_utc < ?
-        ORDER BY t.timestamp_utc
+        ORDER BY COALESCE(c.callsign, '') COLLATE Latin1_General_BIN2, t.flight_uid, t.timestamp_utc
     """
 
     cursor.execute(query, (start_date, end_date))
 
-    columns = [
-        'flight_uid', 'callsign', 'dept_icao', 'dest_icao',
-        'timestamp_utc', 'lat', 'lon', 'altitude_ft',
-        'groundspeed_kts', 'heading_deg', 'vertical_rate_fpm'
-    ]
-
-    batch = []
-    for row in cursor:
-        record = dict(zip(columns, row))
-        # Convert Decimal to float for lat/lon (SQL Server returns Decimal)
-        if record['lat'] is not None:
-            record['lat'] = float(record['lat'])
-        if record['lon'] is not None:
-            record['lon'] = float(record['lon'])
-        batch.append(record)
+    yield from fetch_record_batches(cursor, TRAJECTORY_SCHEMA, batch_size, stats)
 
-        if len(batch) >= batch_size:
-            yield batch
-            batch = []
 
-    if batch:
-        yield batch
-
-
-def write_parquet_to_blob(
-    blob_service: BlobServiceClient,
-    data: list[dict],
-    date: datetime.date,
-    part_num: int
-) -> str:
-    """Write data batch to Parquet file in Azure Blob Storage."""
-    # Create PyArrow table
-    table = pa.Table.from_pylist(data, schema=TRAJECTORY_SCHEMA)
-
-    # Write to in-memory buffer
-    buffer = io.BytesIO()
-    pq.write_table(
-        table,
-        buffer,
-        compression='zstd',
-        compression_level=9,
-        use_dictionary=True,
-        write_statistics=True,
-        row_group_size=PARQUET_ROW_GROUP_SIZE,
-    )
-
-    # Generate blob path
-    blob_path = (
-        f"trajectory/year={date.year}/month={date.month:02d}/"
-        f"day={date.day:02d}/part-{part_num:05d}.parquet"
-    )
-
-    # Upload to blob
-    buffer.seek(0)
-    container = blob_service.get_container_client(CONTAINER_NAME)
-    blob = container.get_blob_client(blob_path)
-    blob.upload_blob(buffer.getvalue(), overwrite=True)
-
-    return blob_path
+def get_destination(
+    blob_service: Optional[BlobServiceClient],
+    output_dir: Optional[Path]
+) -> dict:
+    """Output destination keyword (container or output_dir) for the writers."""
+    if blob_service:
+        return {'container': blob_service.get_container_client(CONTAINER_NAME)}
+    return {'output_dir': output_dir}
 
 
-def write_parquet_local(
-    output_dir: Path,
-    data: list[dict],
+def open_day_writer(
     date: datetime.date,
-    part_num: int
-) -> str:
-    """Write data batch to local Parquet file (for testing)."""
-    # Create PyArrow table
-    table = pa.Table.from_pylist(data, schema=TRAJECTORY_SCHEMA)
-
-    # Create directory structure
-    dir_path = output_dir / f"trajectory/year={date.year}/month={date.month:02d}/day={date.day:02d}"
-    dir_path.mkdir(parents=True, exist_ok=True)
-
-    # Write Parquet file
-    file_path = dir_path / f"part-{part_num:05d}.parquet"
-    pq.write_table(
-        table,
-        str(file_path),
-        compression='zstd',
-        compression_level=9,
-        use_dictionary=True,
-        write_statistics=True,
+    blob_service: Optional[BlobServiceClient],
+    output_dir: Optional[Path],
+    max_file_rows: int = MAX_FILE_ROWS,
+    bloom_filters: bool = False,
+    index: Optional[FlightIndexBuilder] = None
+) -> DayParquetWriter:
+    """Streaming Parquet writer for one date (Azure Blob or local directory)."""
+    return DayParquetWriter(
+        date,
+        TRAJECTORY_SCHEMA,
+        max_file_rows=max_file_rows,
         row_group_size=PARQUET_ROW_GROUP_SIZE,
+        index=index,
+        **get_destination(blob_service, output_dir),
+        **PARQUET_OPTIONS,
+        **layout_options(TRAJECTORY_SCHEMA, bloom_filters)
     )
 
-    return str(file_path)
-
 
 def backfill_date(
     conn: pyodbc.Connection,
     date: datetime.date,
     blob_service: Optional[BlobServiceClient],
     output_dir: Optional[Path],
-    dry_run: bool = False
+    dry_run: bool = False,
+    stats: Optional[FetchStats] = None,
+    max_file_rows: int = MAX_FILE_ROWS,
+    bloom_filters: bool = False
 ) -> tuple[int, int]:
     """
     Backfill trajectory data for a single date.
 
+    Fetch rows and time are also added to stats (run totals).
     Returns (rows_processed, files_written).
     """
     row_count = get_row_count_for_date(conn, date)
@@ -273,28 +220,47 @@ def backfill_date(
         logger.info(f"[DRY RUN] Would backfill {date}: {row_count:,} rows")
         return row_count, 0
 
+    if not blob_service and not output_dir:
+        logger.warning("No output destination configured")
+        return 0, 0
+
     logger.info(f"Backfilling {date}: {row_count:,} rows")
 
     start_date = datetime.combine(date, datetime.min.time())
     end_date = start_date + timedelta(days=1)
 
-    total_rows = 0
-    part_num = 0
-
-    for batch in stream_trajectory_data(conn, start_date, end_date):
-        if blob_service:
-            path = write_parquet_to_blob(blob_service, batch, date, part_num)
-        elif output_dir:
-            path = write_parquet_local(output_dir, batch, date, part_num)
-        else:
-            logger.warning("No output destination configured")
-            return 0, 0
-
-        total_rows += len(batch)
-        part_num += 1
-        logger.debug(f"  Wrote {path}: {len(batch):,} rows")
+    date_stats = FetchStats()
+    started = time.perf_counter()
+    index_store = FlightIndexStore(**get_destination(blob_service, output_dir))
+    index_store.remove_day(date)
+    index = FlightIndexBuilder(date)
+    writer = open_day_writer(date, blob_service, output_dir, max_file_rows, bloom_filters, index)
 
-    logger.info(f"  Completed {date}: {total_rows:,} rows in {part_num} files")
+    # Stream batches into the day's Parquet file(s) as they are fetched
+    try:
+        for batch in stream_trajectory_data(conn, start_date, end_date, stats=date_stats):
+            writer.write_batch(batch)
+        part_num = len(writer.close())
+    except BaseException:
+        writer.abort()
+        raise
+
+    # A failed index update leaves the day to the flight_index.py catch-up
+    try:
+        index_store.write_day(date, index.table())
+    except Exception as e:
+        logger.error(f"  Error indexing {date}: {e}")
+
+    total_rows = writer.rows
+    elapsed = time.perf_counter() - started
+    if stats is not None:
+        stats.rows += date_stats.rows
+        stats.batches += date_stats.batches
+        stats.fetch_sec += date_stats.fetch_sec
+    logger.info(
+        f"  Completed {date}: {total_rows:,} rows in {part_num} files "
+        f"({total_rows / elapsed if elapsed > 0 else 0:,.0f} rows/s; fetch: {date_stats.summary()})"
+    )
     return total_rows, part_num
 
 
@@ -338,6 +304,19 @@ def main():
         help='Write to local directory instead of Azure Blob'
     )
 
+    parser.add_argument(
+        '--max-file-rows',
+        type=int,
+        default=MAX_FILE_ROWS,
+        help=f'Rows per Parquet file before starting a new part (default: {MAX_FILE_ROWS:,})'
+    )
+
+    parser.add_argument(
+        '--bloom-filters',
+        action='store_true',
+        help='Also write Parquet bloom filters on callsign/dept_icao/dest_icao'
+    )
+
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -397,6 +376,8 @@ def main():
         # Process each date
         total_rows = 0
         total_files = 0
+        stats = FetchStats()
+        started = time.perf_counter()
 
         current_date = start_date
         with tqdm(total=total_days, desc="Backfilling", unit="day") as pbar:
@@ -406,7 +387,10 @@ def main():
                     current_date,
                     blob_service,
                     output_dir,
-                    args.dry_run
+                    args.dry_run,
+                    stats,
+                    args.max_file_rows,
+                    args.bloom_filters
                 )
                 total_rows += rows
                 total_files += files
@@ -424,6 +408,13 @@ def main():
         logger.info(f"Files:        {total_files}")
 
         if not args.dry_run:
+            elapsed = time.perf_counter() - started
+            rss = peak_rss_mb()
+            logger.info(f"Rows/s:       {total_rows / elapsed if elapsed > 0 else 0:,.0f} "
+                        f"(fetch {stats.rows_per_sec:,.0f})")
+            if rss is not None:
+                logger.info(f"Peak RSS:     {rss:,.0f} MB")
+
             # Estimate storage size (approximate)
             compressed_size_gb = (total_rows * 25) / (1024 ** 3)  # ~25 bytes/row compressed
             logger.info(f"Est. size:    {compressed_size_gb:.2f} GB")
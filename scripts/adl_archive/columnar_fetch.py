@@ -0,0 +1,90 @@
+"""
+ADL Raw Data Lake - Columnar Fetch
+
+Turns a pyodbc result set into Arrow RecordBatches without per-row dicts.
+Used by daily_archive.py and backfill_trajectory.py.
+
+Each fetchmany() block of row tuples is transposed into one sequence per
+column (zip(*rows), in C) and every column is converted by Arrow's typed
+builders straight to the schema type, so a batch costs one Python object
+per value (the ones pyodbc returns) instead of a dict per row plus a second
+conversion pass in pa.Table.from_pylist.
+
+The query must return the schema's columns in schema order with values
+Arrow can convert to the schema types directly (e.g. CAST DECIMAL lat/lon
+AS FLOAT in SQL; Arrow does not convert Decimal to float64).
+"""
+
+import logging
+import sys
+import time
+from typing import Iterator, Optional
+
+import pyarrow as pa
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class FetchStats:
+    """Rows fetched and time spent fetching/converting, for rows-per-second reports."""
+
+    def __init__(self):
+        self.rows = 0
+        self.batches = 0
+        self.fetch_sec = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.fetch_sec if self.fetch_sec > 0 else 0.0
+
+    def summary(self) -> str:
+        rss = peak_rss_mb()
+        return (
+            f"{self.rows:,} rows in {self.batches} batches, "
+            f"{self.rows_per_sec:,.0f} rows/s fetched"
+            + (f", peak RSS {rss:,.0f} MB" if rss is not None else "")
+        )
+
+
+def fetch_record_batches(
+    cursor,
+    schema: pa.Schema,
+    batch_size: int,
+    stats: Optional[FetchStats] = None
+) -> Iterator[pa.RecordBatch]:
+    """
+    Yield the executed cursor's rows as RecordBatches of up to batch_size rows.
+
+    Time spent in fetchmany() and the column conversion is added to stats.
+    """
+    cursor.arraysize = batch_size
+    while True:
+        started = time.perf_counter()
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        columns = zip(*rows)
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+            schema=schema
+        )
+        del rows, columns  # Free the row tuples before the consumer writes the batch
+        if stats is not None:
+            stats.fetch_sec += time.perf_counter() - started
+            stats.rows += batch.num_rows
+            stats.batches += 1
+        yield batch
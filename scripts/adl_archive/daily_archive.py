@@ -17,19 +17,24 @@ Author: Claude (AI-assisted implementation)
 Date: 2026-02-02
 """
 
-import io
 import logging
 import os
 import sys
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 import pyarrow as pa
-import pyarrow.parquet as pq
 import pyodbc
 from azure.storage.blob import BlobServiceClient
 
+from columnar_fetch import FetchStats, fetch_record_batches, peak_rss_mb
+from flight_index import FlightIndexBuilder, FlightIndexStore, flight_count
+from parquet_stream import (
+    MAX_FILE_ROWS, PARQUET_OPTIONS, PARQUET_ROW_GROUP_SIZE, DayParquetWriter, layout_options,
+)
+
 # Configure logging for Azure Functions compatibility
 logger = logging.getLogger(__name__)
 
@@ -65,7 +70,6 @@ TRAJECTORY_SCHEMA = pa.schema([
 
 # Batch sizes
 QUERY_BATCH_SIZE = 100_000
-PARQUET_ROW_GROUP_SIZE = 100_000
 
 
 class DailyArchiver:
@@ -75,11 +79,15 @@ class DailyArchiver:
         self,
         db_conn_string: str = ADL_CONNECTION_STRING,
         storage_conn_string: str = None,
-        local_output_dir: Optional[Path] = None
+        local_output_dir: Optional[Path] = None,
+        max_file_rows: int = MAX_FILE_ROWS,
+        bloom_filters: bool = False
     ):
         self.db_conn_string = db_conn_string
         self.storage_conn_string = storage_conn_string or STORAGE_CONN_STRING
         self.local_output_dir = local_output_dir
+        self.max_file_rows = max_file_rows  # Rows per Parquet file (one streaming writer per file)
+        self.bloom_filters = bloom_filters  # Parquet bloom filters on callsign/dept/dest
         self.conn: Optional[pyodbc.Connection] = None
         self.blob_service: Optional[BlobServiceClient] = None
 
@@ -136,8 +144,18 @@ class DailyArchiver:
 
         return False
 
-    def stream_trajectory_data(self, date: datetime.date):
-        """Stream trajectory data for a single date with denormalized fields."""
+    def stream_trajectory_data(
+        self,
+        date: datetime.date,
+        stats: Optional[FetchStats] = None
+    ) -> Iterator[pa.RecordBatch]:
+        """
+        Stream trajectory data for a single date with denormalized fields.
+
+        Yields RecordBatches (TRAJECTORY_SCHEMA) of up to QUERY_BATCH_SIZE rows,
+        fetched column-wise (see columnar_fetch), ordered by callsign,
+        flight_uid, timestamp (the archive layout, see parquet_stream).
+        """
         cursor = self.conn.cursor()
 
         start_date = datetime.combine(date, datetime.min.time())
@@ -151,8 +169,8 @@ class DailyArchiver:
                 COALESCE(p.fp_dept_icao, '') as dept_icao,
                 COALESCE(p.fp_dest_icao, '') as dest_icao,
                 t.timestamp_utc,
-                t.lat,
-                t.lon,
+                CAST(t.lat AS FLOAT) as lat,
+                CAST(t.lon AS FLOAT) as lon,
                 t.altitude_ft,
                 t.groundspeed_kts,
                 COALESCE(t.heading_deg, 0) as heading_deg,
@@ -161,96 +179,53 @@ class DailyArchiver:
             LEFT JOIN adl_flight_core c ON t.flight_uid = c.flight_uid
             LEFT JOIN adl_flight_plan p ON t.flight_uid = p.flight_uid
             WHERE t.timestamp_utc >= ? AND t.timestamp_utc < ?
-            ORDER BY t.timestamp_utc
+            ORDER BY COALESCE(c.callsign, '') COLLATE Latin1_General_BIN2, t.flight_uid, t.timestamp_utc
         """
 
         cursor.execute(query, (start_date, end_date))
 
-        columns = [
-            'flight_uid', 'callsign', 'dept_icao', 'dest_icao',
-            'timestamp_utc', 'lat', 'lon', 'altitude_ft',
-            'groundspeed_kts', 'heading_deg', 'vertical_rate_fpm'
-        ]
-
-        batch = []
-        for row in cursor:
-            record = dict(zip(columns, row))
-            # Convert Decimal to float for lat/lon (SQL Server returns Decimal)
-            if record['lat'] is not None:
-                record['lat'] = float(record['lat'])
-            if record['lon'] is not None:
-                record['lon'] = float(record['lon'])
-            batch.append(record)
-
-            if len(batch) >= QUERY_BATCH_SIZE:
-                yield batch
-                batch = []
-
-        if batch:
-            yield batch
-
-    def write_parquet_blob(self, data: list[dict], date: datetime.date, part_num: int) -> str:
-        """Write data batch to Parquet file in Azure Blob Storage."""
-        table = pa.Table.from_pylist(data, schema=TRAJECTORY_SCHEMA)
-
-        buffer = io.BytesIO()
-        pq.write_table(
-            table,
-            buffer,
-            compression='zstd',
-            compression_level=9,
-            use_dictionary=True,
-            write_statistics=True,
-            row_group_size=PARQUET_ROW_GROUP_SIZE,
-        )
-
-        blob_path = (
-            f"trajectory/year={date.year}/month={date.month:02d}/"
-            f"day={date.day:02d}/part-{part_num:05d}.parquet"
-        )
-
-        buffer.seek(0)
-        container = self.blob_service.get_container_client(CONTAINER_NAME)
-        blob = container.get_blob_client(blob_path)
-        blob.upload_blob(buffer.getvalue(), overwrite=True)
+        yield from fetch_record_batches(cursor, TRAJECTORY_SCHEMA, QUERY_BATCH_SIZE, stats)
 
-        return blob_path
-
-    def write_parquet_local(self, data: list[dict], date: datetime.date, part_num: int) -> str:
-        """Write data batch to local Parquet file."""
-        table = pa.Table.from_pylist(data, schema=TRAJECTORY_SCHEMA)
+    def destination(self) -> dict:
+        """Output destination keyword (container or output_dir) for the writers."""
+        if self.blob_service:
+            return {'container': self.blob_service.get_container_client(CONTAINER_NAME)}
+        return {'output_dir': self.local_output_dir}
 
-        dir_path = (
-            self.local_output_dir /
-            f"trajectory/year={date.year}/month={date.month:02d}/day={date.day:02d}"
-        )
-        dir_path.mkdir(parents=True, exist_ok=True)
-
-        file_path = dir_path / f"part-{part_num:05d}.parquet"
-        pq.write_table(
-            table,
-            str(file_path),
-            compression='zstd',
-            compression_level=9,
-            use_dictionary=True,
-            write_statistics=True,
+    def open_day_writer(
+        self,
+        date: datetime.date,
+        index: Optional[FlightIndexBuilder] = None
+    ) -> DayParquetWriter:
+        """Streaming Parquet writer for one date (local directory or Azure Blob)."""
+        return DayParquetWriter(
+            date,
+            TRAJECTORY_SCHEMA,
+            max_file_rows=self.max_file_rows,
             row_group_size=PARQUET_ROW_GROUP_SIZE,
+            index=index,
+            **self.destination(),
+            **PARQUET_OPTIONS,
+            **layout_options(TRAJECTORY_SCHEMA, self.bloom_filters)
         )
 
-        return str(file_path)
-
     def archive_date(self, date: datetime.date, force: bool = False) -> dict:
         """
         Archive a single date's trajectory data.
 
-        Returns dict with keys: date, rows, files, skipped, error
+        Returns dict with keys: date, rows, files, flights, skipped, error,
+        rows_per_sec (end to end), fetch_rows_per_sec, peak_rss_mb
         """
         result = {
             'date': date.isoformat(),
             'rows': 0,
             'files': 0,
+            'flights': 0,
             'skipped': False,
-            'error': None
+            'error': None,
+            'rows_per_sec': None,
+            'fetch_rows_per_sec': None,
+            'peak_rss_mb': None
         }
 
         try:
@@ -268,23 +243,44 @@ class DailyArchiver:
 
             logger.info(f"Archiving {date}: {row_count:,} rows")
 
-            # Stream and write data
-            total_rows = 0
-            part_num = 0
-
-            for batch in self.stream_trajectory_data(date):
-                if self.blob_service:
-                    path = self.write_parquet_blob(batch, date, part_num)
-                else:
-                    path = self.write_parquet_local(batch, date, part_num)
-
-                total_rows += len(batch)
-                part_num += 1
-                logger.debug(f"  Wrote {path}: {len(batch):,} rows")
-
+            # Stream batches into the day's Parquet file(s) as they are fetched
+            stats = FetchStats()
+            started = time.perf_counter()
+            index_store = FlightIndexStore(**self.destination())
+            index_store.remove_day(date)
+            index = FlightIndexBuilder(date)
+            writer = self.open_day_writer(date, index)
+
+            try:
+                for batch in self.stream_trajectory_data(date, stats):
+                    writer.write_batch(batch)
+                paths = writer.close()
+            except BaseException:
+                writer.abort()
+                raise
+
+            # The data is complete; a failed index update is logged and left
+            # to the flight_index.py catch-up (the day is found by listing)
+            flights = index.table()
+            result['flights'] = flight_count(flights)
+            try:
+                index_store.write_day(date, flights)
+            except Exception as e:
+                logger.error(f"Error indexing {date}: {e}")
+
+            total_rows = writer.rows
+            part_num = len(paths)
+            elapsed = time.perf_counter() - started
             result['rows'] = total_rows
             result['files'] = part_num
-            logger.info(f"Completed {date}: {total_rows:,} rows in {part_num} files")
+            result['rows_per_sec'] = round(total_rows / elapsed) if elapsed > 0 else None
+            result['fetch_rows_per_sec'] = round(stats.rows_per_sec)
+            rss = peak_rss_mb()
+            result['peak_rss_mb'] = round(rss, 1) if rss is not None else None
+            logger.info(
+                f"Completed {date}: {total_rows:,} rows in {part_num} files "
+                f"({total_rows / elapsed if elapsed > 0 else 0:,.0f} rows/s; fetch: {stats.summary()})"
+            )
 
         except Exception as e:
             logger.error(f"Error archiving {date}: {e}")
@@ -339,6 +335,19 @@ def main():
         help='Force archive even if data already exists'
     )
 
+    parser.add_argument(
+        '--max-file-rows',
+        type=int,
+        default=MAX_FILE_ROWS,
+        help=f'Rows per Parquet file before starting a new part (default: {MAX_FILE_ROWS:,})'
+    )
+
+    parser.add_argument(
+        '--bloom-filters',
+        action='store_true',
+        help='Also write Parquet bloom filters on callsign/dept_icao/dest_icao'
+    )
+
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -363,7 +372,9 @@ def main():
 
     # Create archiver
     archiver = DailyArchiver(
-        local_output_dir=Path(args.local) if args.local else None
+        local_output_dir=Path(args.local) if args.local else None,
+        max_file_rows=args.max_file_rows,
+        bloom_filters=args.bloom_filters
     )
 
     try:
@@ -373,7 +384,13 @@ def main():
         print(f"\nArchive Result for {date}:")
         print(f"  Rows:    {result['rows']:,}")
         print(f"  Files:   {result['files']}")
+        print(f"  Flights: {result['flights']:,}")
         print(f"  Skipped: {result['skipped']}")
+        if result['rows_per_sec'] is not None:
+            print(f"  Rows/s:  {result['rows_per_sec']:,} "
+                  f"(fetch {result['fetch_rows_per_sec']:,})")
+        if result['peak_rss_mb'] is not None:
+            print(f"  RSS:     {result['peak_rss_mb']:,} MB (peak)")
 
         if result['error']:
             print(f"  Error:   {result['error']}")
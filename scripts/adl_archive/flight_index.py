@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+ADL Raw Data Lake - Flight Index
+
+Flight-level index of the trajectory archive, so that lookups by callsign
+or flight_uid ("all days on which DAL123 flew", "which file holds flight
+N") go straight to the right days, files and row groups instead of listing
+and scanning every daily partition.
+
+One index row per flight and data file (INDEX_SCHEMA): callsign, dept/dest,
+first/last timestamp, the file (path relative to the archive root) and the
+range of row groups holding the flight's rows. The archive jobs build it
+while writing (FlightIndexBuilder is passed to DayParquetWriter) and store
+it twice:
+
+- Day sidecar: index/trajectory/year=YYYY/month=MM/day=DD/flights.parquet
+- Global index: index/flights/YYYY-MM.parquet, one compact file per month
+  sorted by callsign, flight_uid (row group statistics make callsign and
+  flight_uid lookups read only a few row groups). Each day is merged into
+  its month file as it is archived.
+
+The month merge is a read-modify-write. In the container it is guarded by
+the blob ETag: if another job (the daily archive during a backfill, two
+backfills) replaced the month file in between, the merge is redone on the
+new contents (MERGE_ATTEMPTS). A local archive only checks the file's
+modification time before replacing it, which narrows but does not close
+the window: run one writer per local archive at a time.
+
+The global file is written before the sidecar (and the sidecar is removed
+before a day is re-archived), so a day with a sidecar is always in the
+global index with its current files; days without one (archived before the index
+existed, or whose merge failed) are found by listing as before, and
+rebuilt with this script's CLI. index/ is outside the lifecycle policy's
+prefixes, so the index stays readable when the data is in Archive tier.
+
+Usage:
+    # Index days archived before the index existed (reads only the
+    # index columns of each file)
+    python flight_index.py --start 2025-01-01 --end 2025-12-31
+
+    # Local archive
+    python flight_index.py --local ./archive_output --start 2026-01-01
+"""
+
+import argparse
+import bisect
+import io
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from parquet_stream import day_prefix
+
+logger = logging.getLogger(__name__)
+
+STORAGE_CONN_STRING = os.environ.get('ADL_ARCHIVE_STORAGE_CONN', '')
+CONTAINER_NAME = 'adl-raw-archive'
+
+GLOBAL_INDEX_DIR = 'index/flights'
+
+INDEX_SCHEMA = pa.schema([
+    ('flight_uid', pa.int64()),
+    ('callsign', pa.string()),
+    ('dept_icao', pa.string()),
+    ('dest_icao', pa.string()),
+    ('date', pa.date32()),
+    ('first_seen', pa.timestamp('ms', tz='UTC')),
+    ('last_seen', pa.timestamp('ms', tz='UTC')),
+    ('file', pa.string()),
+    ('first_row_group', pa.int32()),
+    ('last_row_group', pa.int32()),
+    ('rows', pa.int64()),
+])
+
+# Trajectory columns the index is built from
+SOURCE_COLUMNS = ['flight_uid', 'callsign', 'dept_icao', 'dest_icao', 'timestamp_utc']
+
+INDEX_SORT = [('callsign', 'ascending'), ('flight_uid', 'ascending'), ('file', 'ascending')]
+
+# Rows per row group of the global index files
+INDEX_ROW_GROUP_SIZE = 20_000
+
+# Month merges redone after a concurrent writer replaced the month file
+MERGE_ATTEMPTS = 5
+
+
+class IndexWriteConflict(Exception):
+    """An index file changed between reading and replacing it"""
+
+
+def day_index_path(date) -> str:
+    """Path of a date's index sidecar, relative to the archive root."""
+    return f"index/{day_prefix(date)}/flights.parquet"
+
+
+def month_index_path(year: int, month: int) -> str:
+    """Path of a month's global index file, relative to the archive root."""
+    return f"{GLOBAL_INDEX_DIR}/{year:04d}-{month:02d}.parquet"
+
+
+def flight_count(table: pa.Table) -> int:
+    """Distinct flights in index rows (a flight spanning part files has a row per file)."""
+    return pc.count_distinct(table['flight_uid']).as_py() if table.num_rows else 0
+
+
+def months_in_range(start_date, end_date) -> list[tuple[int, int]]:
+    """(year, month) of every month overlapping the date range."""
+    months = []
+    month = start_date.replace(day=1)
+    while month <= end_date:
+        months.append((month.year, month.month))
+        month = (month + timedelta(days=32)).replace(day=1)
+    return months
+
+
+class FlightIndexBuilder:
+    """
+    Collects the index rows of one archived day as its batches are written.
+
+    DayParquetWriter calls add_batch() for every batch (with the row offset
+    in the current file) and finish_file() with the file's Parquet metadata
+    when the file is complete, which maps row offsets to row groups.
+    """
+
+    def __init__(self, date):
+        self.date = date
+        self._partials: list[pa.Table] = []
+        self._files: list[pa.Table] = []
+
+    def add_batch(self, batch, file_row_offset: int):
+        """Aggregate a batch per flight (rows from file_row_offset on)."""
+        table = pa.Table.from_batches([batch]).select(SOURCE_COLUMNS)
+        rows = pa.array(range(file_row_offset, file_row_offset + table.num_rows), pa.int64())
+        self._partials.append(
+            table.append_column('row', rows).group_by('flight_uid').aggregate([
+                ('callsign', 'max'),
+                ('dept_icao', 'max'),
+                ('dest_icao', 'max'),
+                ('timestamp_utc', 'min'),
+                ('timestamp_utc', 'max'),
+                ('row', 'min'),
+                ('row', 'max'),
+                ('row', 'count'),
+            ])
+        )
+
+    def finish_file(self, path: str, metadata: pq.FileMetaData):
+        """Close the current file's rows (path relative to the archive root)."""
+        if not self._partials:
+            return
+        # Flights spanning batches: combine their partial aggregates
+        flights = pa.concat_tables(self._partials).group_by('flight_uid').aggregate([
+            ('callsign_max', 'max'),
+            ('dept_icao_max', 'max'),
+            ('dest_icao_max', 'max'),
+            ('timestamp_utc_min', 'min'),
+            ('timestamp_utc_max', 'max'),
+            ('row_min', 'min'),
+            ('row_max', 'max'),
+            ('row_count', 'sum'),
+        ])
+        self._partials = []
+
+        # Row offset where each row group starts
+        starts = []
+        offset = 0
+        for i in range(metadata.num_row_groups):
+            starts.append(offset)
+            offset += metadata.row_group(i).num_rows
+
+        def row_groups(rows):
+            return pa.array(
+                [bisect.bisect_right(starts, row) - 1 for row in rows.to_pylist()],
+                pa.int32()
+            )
+
+        self._files.append(pa.table([
+            flights['flight_uid'],
+            flights['callsign_max_max'],
+            flights['dept_icao_max_max'],
+            flights['dest_icao_max_max'],
+            pa.array([self.date] * flights.num_rows, pa.date32()),
+            flights['timestamp_utc_min_min'],
+            flights['timestamp_utc_max_max'],
+            pa.array([path] * flights.num_rows, pa.string()),
+            row_groups(flights['row_min_min']),
+            row_groups(flights['row_max_max']),
+            flights['row_count_sum'],
+        ], schema=INDEX_SCHEMA))
+
+    def table(self) -> pa.Table:
+        """The day's index rows, sorted by callsign, flight_uid."""
+        if not self._files:
+            return INDEX_SCHEMA.empty_table()
+        return pa.concat_tables(self._files).sort_by(INDEX_SORT)
+
+
+class FlightIndexStore:
+    """
+    Reads and writes the index files in a local archive directory or the
+    Azure container (exactly one of output_dir and container, as for
+    DayParquetWriter).
+    """
+
+    def __init__(self, output_dir: Optional[Path] = None, container=None):
+        if (output_dir is None) == (container is None):
+            raise ValueError("FlightIndexStore needs exactly one of output_dir and container")
+        self.output_dir = Path(output_dir) if output_dir is not None else None
+        self.container = container
+
+    def read(self, path: str, filters=None) -> Optional[pa.Table]:
+        """Read an index file (None if it does not exist)."""
+        return self.read_versioned(path, filters)[0]
+
+    def read_versioned(self, path: str, filters=None) -> tuple[Optional[pa.Table], object]:
+        """
+        Read an index file and the version it was read at (blob ETag or file
+        modification time; None if it does not exist), for write(version=...).
+        """
+        if self.container is not None:
+            blob = self.container.get_blob_client(path)
+            if not blob.exists():
+                return None, None
+            download = blob.download_blob()
+            source = io.BytesIO(download.readall())
+            version = download.properties.etag
+        else:
+            source = self.output_dir / path
+            try:
+                version = source.stat().st_mtime_ns
+            except FileNotFoundError:
+                return None, None
+        return pq.read_table(source, schema=INDEX_SCHEMA, filters=filters), version
+
+    def write(self, path: str, table: pa.Table, version=False):
+        """
+        Replace an index file.
+
+        With a version from read_versioned() the file is only replaced if it
+        is still at that version (None: if it still does not exist), else
+        IndexWriteConflict is raised.
+        """
+        options = {'compression': 'zstd', 'row_group_size': INDEX_ROW_GROUP_SIZE}
+        if self.container is not None:
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer, **options)
+            blob = self.container.get_blob_client(path)
+            if version is False:
+                blob.upload_blob(buffer.getvalue(), overwrite=True)
+                return
+            from azure.core import MatchConditions
+            from azure.core.exceptions import ResourceExistsError, ResourceModifiedError
+            try:
+                if version is None:
+                    blob.upload_blob(buffer.getvalue(), overwrite=False)
+                else:
+                    blob.upload_blob(buffer.getvalue(), overwrite=True, etag=version,
+                                     match_condition=MatchConditions.IfNotModified)
+            except (ResourceExistsError, ResourceModifiedError) as e:
+                raise IndexWriteConflict(f"{path} was modified concurrently") from e
+        else:
+            target = self.output_dir / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(table, str(target) + '.tmp', **options)
+            if version is not False:
+                try:
+                    current = target.stat().st_mtime_ns
+                except FileNotFoundError:
+                    current = None
+                if current != version:
+                    os.remove(str(target) + '.tmp')
+                    raise IndexWriteConflict(f"{path} was modified concurrently")
+            os.replace(str(target) + '.tmp', target)
+
+    def write_day(self, date, table: pa.Table):
+        """Merge a day's index rows into its month's global index, then write the sidecar."""
+        path = month_index_path(date.year, date.month)
+        for attempt in range(1, MERGE_ATTEMPTS + 1):
+            existing, version = self.read_versioned(path)
+            if existing is not None:
+                existing = existing.filter(pc.field('date') != pa.scalar(date, pa.date32()))
+                merged = pa.concat_tables([existing, table])
+            else:
+                merged = table
+            try:
+                self.write(path, merged.sort_by(INDEX_SORT), version=version)
+                break
+            except IndexWriteConflict:
+                if attempt == MERGE_ATTEMPTS:
+                    raise
+                logger.info(f"  {path} changed while merging {date}, merging again")
+        self.write(day_index_path(date), table)
+        logger.info(
+            f"  Indexed {flight_count(table):,} flights ({table.num_rows:,} index rows) "
+            f"for {date} ({path}: {merged.num_rows:,} rows)"
+        )
+
+    def remove_day(self, date):
+        """
+        Drop a date's sidecar before its data is rewritten, so that readers
+        fall back to listing the day until write_day() indexes the new files.
+        """
+        path = day_index_path(date)
+        if self.container is not None:
+            blob = self.container.get_blob_client(path)
+            if blob.exists():
+                blob.delete_blob()
+        else:
+            try:
+                os.remove(self.output_dir / path)
+            except FileNotFoundError:
+                pass
+
+    def indexed_dates(self, start_date, end_date) -> list:
+        """Dates in the range that have an index sidecar (one listing per month)."""
+        dates = []
+        for year, month in months_in_range(start_date, end_date):
+            prefix = day_index_path(datetime(year, month, 1)).rsplit('/', 2)[0]
+            if self.container is not None:
+                names = [
+                    blob.name for blob in self.container.list_blobs(name_starts_with=prefix + '/')
+                    if blob.name.endswith('/flights.parquet')
+                ]
+            else:
+                names = [
+                    path.as_posix()
+                    for path in (self.output_dir / prefix).glob('day=*/flights.parquet')
+                ]
+            for name in names:
+                day = name.rsplit('/', 2)[-2]
+                date = datetime(year, month, int(day[4:])).date()
+                if start_date <= date <= end_date:
+                    dates.append(date)
+        return sorted(dates)
+
+    def flights(
+        self,
+        start_date,
+        end_date,
+        callsign: Optional[str] = None,
+        flight_uid: Optional[int] = None
+    ) -> pa.Table:
+        """Global index rows of the date range, optionally for one callsign/flight."""
+        filters = [('date', '>=', start_date), ('date', '<=', end_date)]
+        if callsign:
+            filters.append(('callsign', '=', callsign.upper()))
+        if flight_uid:
+            filters.append(('flight_uid', '=', flight_uid))
+        tables = [
+            table for table in (
+                self.read(month_index_path(year, month), filters=filters)
+                for year, month in months_in_range(start_date, end_date)
+            )
+            if table is not None
+        ]
+        return pa.concat_tables(tables) if tables else INDEX_SCHEMA.empty_table()
+
+
+def index_day(query, store: FlightIndexStore, date) -> int:
+    """
+    Build and store the index of an already archived day from its files
+    (only the index columns are read). Returns the number of flights.
+    """
+    builder = FlightIndexBuilder(date)
+    for path in query.get_parquet_files(date):
+        with query.filesystem.open_input_file(path) as source:
+            parquet_file = pq.ParquetFile(source)
+            offset = 0
+            for batch in parquet_file.iter_batches(columns=SOURCE_COLUMNS):
+                builder.add_batch(batch, offset)
+                offset += batch.num_rows
+            relative = path[len(query.root) + 1:]
+            builder.finish_file(relative, parquet_file.metadata)
+    table = builder.table()
+    if table.num_rows:
+        store.write_day(date, table)
+    return flight_count(table)
+
+
+def main():
+    from query_archive import ArchiveQuery
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(
+        description='Build the flight index of archived trajectory days'
+    )
+    parser.add_argument('--start', type=str, required=True, help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end', type=str, help='End date (YYYY-MM-DD, default: same as start)')
+    parser.add_argument('--local', type=str, help='Path to local archive directory')
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Re-index days that already have an index sidecar'
+    )
+    args = parser.parse_args()
+
+    start_date = datetime.strptime(args.start, '%Y-%m-%d').date()
+    end_date = datetime.strptime(args.end, '%Y-%m-%d').date() if args.end else start_date
+
+    query = ArchiveQuery(local_path=Path(args.local) if args.local else None)
+    try:
+        query.connect()
+    except Exception as e:
+        logger.error(f"Failed to connect: {e}")
+        return 1
+
+    if args.local:
+        store = FlightIndexStore(output_dir=Path(args.local))
+    else:
+        from azure.storage.blob import BlobServiceClient
+        blob_service = BlobServiceClient.from_connection_string(STORAGE_CONN_STRING)
+        store = FlightIndexStore(container=blob_service.get_container_client(CONTAINER_NAME))
+
+    indexed = set() if args.force else set(query.indexed_dates(start_date, end_date))
+    errors = 0
+    for date in query.list_dates_in_range(start_date, end_date):
+        if date in indexed:
+            logger.debug(f"{date} already indexed, skipping")
+            continue
+        try:
+            index_day(query, store, date)
+        except Exception as e:
+            errors += 1
+            logger.error(f"Error indexing {date}: {e}")
+
+    return 0 if errors == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -62,7 +62,7 @@ def archive_trajectory_daily(timer: func.TimerRequest) -> None:
         else:
             logging.info(
                 f"Archive complete: {result['rows']:,} rows "
-                f"in {result['files']} files"
+                f"in {result['files']} files, {result['flights']:,} flights indexed"
             )
 
     except Exception as e:
@@ -0,0 +1,280 @@
+"""
+ADL Raw Data Lake - Streaming Parquet Writer
+
+Writes one day of trajectory batches as a few large Parquet files instead of
+one small file per fetch batch. Used by daily_archive.py and
+backfill_trajectory.py.
+
+DayParquetWriter keeps a single pq.ParquetWriter open and appends a row
+group per batch as it arrives, so a day shares one footer and one set of
+column dictionaries per file. A new part file is started only when the
+current one would exceed max_file_rows.
+
+Output goes to either destination:
+
+- Local directory: written to part-NNNNN.parquet.tmp and renamed when the
+  file is complete, so readers and check_already_archived (which glob
+  *.parquet) never see a partial file.
+- Azure Blob: streamed through BlockBlobWriter, which stages a block every
+  BLOCK_SIZE bytes and commits the block list when the file is closed. Only
+  one block is held in memory, and the blob does not exist until it is
+  committed (uncommitted blocks are discarded by Azure after a week).
+
+When a day is written completely, older *.parquet files under its prefix
+that this run did not write are removed (e.g. part files left over from the
+one-file-per-batch layout after a --force re-archive).
+
+Layout for queries: the archive queries return each day ordered by
+SORT_COLUMNS (callsign, flight_uid, timestamp_utc; binary collation, so the
+order matches Parquet's byte-wise string statistics). Every row group then
+covers a narrow callsign range, its min/max statistics let pyarrow.dataset
+filters (query_archive.py) skip the others, and the sort order is recorded
+in the row group metadata (flight_index.py records which row groups hold
+each flight). layout_options(bloom_filters=True) adds Parquet
+bloom filters on BLOOM_FILTER_COLUMNS for readers that use them (Synapse,
+DuckDB, Spark) where the writer supports it (pyarrow with
+bloom_filter_options).
+"""
+
+import base64
+import inspect
+import io
+import logging
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Bytes per staged block (Azure allows 50,000 blocks per blob)
+BLOCK_SIZE = 8 * 1024 * 1024
+
+# Parquet write options shared by every archive writer
+PARQUET_OPTIONS = {
+    'compression': 'zstd',
+    'compression_level': 9,
+    'use_dictionary': True,
+    'write_statistics': True,
+}
+
+# Rows per Parquet row group
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+# Rows per Parquet file before a new part file is started
+MAX_FILE_ROWS = 20_000_000
+
+# Order of the rows within a day (see the archive queries' ORDER BY)
+SORT_COLUMNS = ('callsign', 'flight_uid', 'timestamp_utc')
+
+# Bloom filters: columns, distinct values per row group and false-positive rate
+BLOOM_FILTER_COLUMNS = ('callsign', 'dept_icao', 'dest_icao')
+BLOOM_FILTER_NDV = 4096
+BLOOM_FILTER_FPP = 0.01
+
+HAS_BLOOM_FILTERS = 'bloom_filter_options' in inspect.signature(pq.ParquetWriter.__init__).parameters
+
+
+def day_prefix(date) -> str:
+    """Hive-style partition path of a date: trajectory/year=YYYY/month=MM/day=DD"""
+    return f"trajectory/year={date.year}/month={date.month:02d}/day={date.day:02d}"
+
+
+def layout_options(schema: pa.Schema, bloom_filters: bool = False) -> dict:
+    """
+    ParquetWriter options describing the archive layout: the SORT_COLUMNS
+    sort order and, if requested and supported, bloom filters.
+    """
+    options = {
+        'sorting_columns': [pq.SortingColumn(schema.get_field_index(name)) for name in SORT_COLUMNS]
+    }
+    if bloom_filters:
+        if HAS_BLOOM_FILTERS:
+            options['bloom_filter_options'] = {
+                name: {'ndv': BLOOM_FILTER_NDV, 'fpp': BLOOM_FILTER_FPP}
+                for name in BLOOM_FILTER_COLUMNS
+            }
+        else:
+            logger.warning(
+                f"pyarrow {pa.__version__} cannot write bloom filters; "
+                "writing row group statistics only"
+            )
+    return options
+
+
+class BlockBlobWriter(io.RawIOBase):
+    """Write-only file object that uploads to a block blob in staged blocks."""
+
+    def __init__(self, blob_client, block_size: int = BLOCK_SIZE):
+        self.blob_client = blob_client
+        self.block_size = block_size
+        self._buffer = bytearray()
+        self._block_ids: List[str] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed BlockBlobWriter")
+        self._buffer += data
+        self._position += len(data)
+        while len(self._buffer) >= self.block_size:
+            self._stage(bytes(self._buffer[:self.block_size]))
+            del self._buffer[:self.block_size]
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def _stage(self, block: bytes):
+        block_id = base64.b64encode(f"{len(self._block_ids):08d}".encode()).decode()
+        self.blob_client.stage_block(block_id=block_id, data=block)
+        self._block_ids.append(block_id)
+
+    def close(self):
+        """Stage the remaining bytes and commit the blob."""
+        if self.closed:
+            return
+        if self._buffer or not self._block_ids:
+            self._stage(bytes(self._buffer))
+            self._buffer = bytearray()
+        self.blob_client.commit_block_list(self._block_ids)
+        super().close()
+
+    def abort(self):
+        """Drop the staged blocks (nothing is committed)."""
+        self._buffer = bytearray()
+        self._block_ids = []
+        super().close()
+
+
+class DayParquetWriter:
+    """
+    Streams one day's RecordBatches into size-bounded Parquet part files.
+
+    Exactly one of output_dir (local root) and container (Azure
+    ContainerClient) is used. Call close() when every batch is written (or
+    abort() on failure); close() returns the written paths.
+
+    index (a flight_index.FlightIndexBuilder) is fed every batch and every
+    completed file.
+    """
+
+    def __init__(
+        self,
+        date,
+        schema: pa.Schema,
+        output_dir: Optional[Path] = None,
+        container=None,
+        max_file_rows: int = MAX_FILE_ROWS,
+        row_group_size: Optional[int] = None,
+        index=None,
+        **parquet_options
+    ):
+        if (output_dir is None) == (container is None):
+            raise ValueError("DayParquetWriter needs exactly one of output_dir and container")
+        self.prefix = day_prefix(date)
+        self.schema = schema
+        self.output_dir = Path(output_dir) if output_dir is not None else None
+        self.container = container
+        self.max_file_rows = max_file_rows
+        self.row_group_size = row_group_size
+        self.parquet_options = parquet_options
+        self.index = index
+        self.paths: List[str] = []
+        self.rows = 0
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._sink = None
+        self._sink_path = None
+        self._file_name = None
+        self._file_rows = 0
+
+    @property
+    def files(self) -> int:
+        return len(self.paths) + (1 if self._writer else 0)
+
+    def _open(self):
+        name = f"part-{len(self.paths):05d}.parquet"
+        self._file_name = f"{self.prefix}/{name}"
+        if self.container is not None:
+            self._sink_path = f"{self.prefix}/{name}"
+            self._sink = BlockBlobWriter(self.container.get_blob_client(self._sink_path))
+        else:
+            dir_path = self.output_dir / self.prefix
+            dir_path.mkdir(parents=True, exist_ok=True)
+            self._sink_path = str(dir_path / name)
+            self._sink = open(self._sink_path + '.tmp', 'wb')
+        self._writer = pq.ParquetWriter(self._sink, self.schema, **self.parquet_options)
+        self._file_rows = 0
+
+    def _finish(self):
+        self._writer.close()
+        self._sink.close()
+        if self.container is None:
+            os.replace(self._sink_path + '.tmp', self._sink_path)
+        if self.index is not None:
+            self.index.finish_file(self._file_name, self._writer.writer.metadata)
+        logger.debug(f"  Wrote {self._sink_path}: {self._file_rows:,} rows")
+        self.paths.append(self._sink_path)
+        self._writer = self._sink = self._sink_path = None
+
+    def write_batch(self, batch: pa.RecordBatch):
+        """Append batch as a row group (starting a new file past max_file_rows)."""
+        if self._writer and self._file_rows + batch.num_rows > self.max_file_rows:
+            self._finish()
+        if self._writer is None:
+            self._open()
+        if self.index is not None:
+            self.index.add_batch(batch, self._file_rows)
+        self._writer.write_batch(batch, row_group_size=self.row_group_size)
+        self._file_rows += batch.num_rows
+        self.rows += batch.num_rows
+
+    def close(self) -> List[str]:
+        """Complete the current file, remove stale files of the day; returns the written paths."""
+        if self._writer:
+            self._finish()
+        if self.paths:
+            self._remove_stale()
+        return self.paths
+
+    def abort(self):
+        """Discard the file being written (completed part files are kept)."""
+        if self._writer is None:
+            return
+        if self.container is not None:
+            self._sink.abort()  # Before the writer's close, which would commit the blob
+        try:
+            self._writer.close()
+        except Exception:
+            pass
+        if self.container is None:
+            self._sink.close()
+            try:
+                os.remove(self._sink_path + '.tmp')
+            except OSError:
+                pass
+        self._writer = self._sink = self._sink_path = None
+
+    def _remove_stale(self):
+        written = set(self.paths)
+        if self.container is not None:
+            stale = [
+                blob.name for blob in self.container.list_blobs(name_starts_with=self.prefix + '/')
+                if blob.name.endswith('.parquet') and blob.name not in written
+            ]
+            for name in stale:
+                self.container.delete_blob(name)
+        else:
+            stale = [
+                str(path) for path in (self.output_dir / self.prefix).glob('*.parquet')
+                if str(path) not in written
+            ]
+            for name in stale:
+                os.remove(name)
+        if stale:
+            logger.info(f"  Removed {len(stale)} stale files under {self.prefix}")
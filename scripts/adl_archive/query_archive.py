@@ -11,6 +11,24 @@ For Cool-tier data (< 365 days old):
 For Archive-tier data (> 365 days old):
     Must rehydrate first using rehydrate.py
 
+Queries run on pyarrow.dataset over a pyarrow filesystem: the local archive
+directory, or the blob container through fsspec (adlfs). A query over any
+date range is one scan:
+
+- Filters are pushed down: only the row groups whose statistics can match
+  are read (days archived sorted by callsign, flight_uid, timestamp keep a
+  flight in one or two row groups).
+- --columns limits the column chunks read.
+- The needed byte ranges are fetched with ranged reads, coalesced and
+  prefetched, FRAGMENT_READAHEAD files at a time (--io-threads sets the
+  number of concurrent reads).
+- -o streams the result batch by batch to CSV or Parquet, so exports of
+  any size run in bounded memory.
+- Callsign and flight UID queries look the flight up in the flight index
+  (flight_index.py) first and read only the files and row groups it lists
+  for the indexed days; days without an index are scanned as above.
+  --find lists the indexed flights (days, files) without reading any data.
+
 Usage:
     # Test connectivity
     python query_archive.py --test
@@ -27,6 +45,13 @@ Usage:
     # Export to CSV
     python query_archive.py --callsign UAL456 --date 2025-01-15 -o flight.csv
 
+    # Days and files a callsign appears in (flight index only)
+    python query_archive.py --find --callsign DAL123
+
+    # Export selected columns of a month (streamed)
+    python query_archive.py --dest KLAX --start 2025-01-01 --end 2025-01-31 \\
+        --columns callsign,timestamp_utc,lat,lon,altitude_ft -o klax.parquet
+
 Author: Claude (AI-assisted implementation)
 Date: 2026-02-02
 """
@@ -37,10 +62,24 @@ import os
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
 import pyarrow.parquet as pq
-from azure.storage.blob import BlobServiceClient
+
+from flight_index import (
+    GLOBAL_INDEX_DIR, FlightIndexStore, flight_count, month_index_path, months_in_range,
+)
+from parquet_stream import day_prefix
+
+try:
+    import adlfs
+    from azure.storage.blob import BlobServiceClient
+except ImportError:  # Only needed for blob storage
+    adlfs = None
 
 # Configure logging
 logging.basicConfig(
@@ -53,6 +92,78 @@ logger = logging.getLogger(__name__)
 STORAGE_CONN_STRING = os.environ.get('ADL_ARCHIVE_STORAGE_CONN', '')
 CONTAINER_NAME = 'adl-raw-archive'
 
+# Files a scan reads ahead (their row group reads run concurrently)
+FRAGMENT_READAHEAD = 8
+
+# Coalesce the byte ranges of the needed column chunks and fetch them ahead
+PARQUET_FORMAT = ds.ParquetFileFormat(
+    default_fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=True)
+)
+
+# Rows per row group of Parquet exports (filtered batches can be tiny)
+EXPORT_ROW_GROUP_ROWS = 100_000
+
+
+def build_filter(
+    callsign: Optional[str] = None,
+    dept_icao: Optional[str] = None,
+    dest_icao: Optional[str] = None,
+    flight_uid: Optional[int] = None
+) -> Optional[ds.Expression]:
+    """Dataset filter expression for the query options (None = all rows)."""
+    conditions = []
+    if callsign:
+        conditions.append(ds.field('callsign') == callsign.upper())
+    if dept_icao:
+        conditions.append(ds.field('dept_icao') == dept_icao.upper())
+    if dest_icao:
+        conditions.append(ds.field('dest_icao') == dest_icao.upper())
+    if flight_uid:
+        conditions.append(ds.field('flight_uid') == flight_uid)
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def export_batches(
+    batches: Iterable[pa.RecordBatch],
+    schema: pa.Schema,
+    output_path: Path
+) -> int:
+    """
+    Stream record batches to a CSV or Parquet file (by extension).
+
+    Only one row group's worth of batches is held at a time. Returns the
+    number of rows written.
+    """
+    suffix = output_path.suffix.lower()
+    if suffix == '.csv':
+        writer = pacsv.CSVWriter(str(output_path), schema)
+    elif suffix == '.parquet':
+        writer = pq.ParquetWriter(str(output_path), schema, compression='zstd')
+    else:
+        raise ValueError(f"Unknown output format: {output_path.suffix}")
+
+    rows = 0
+    pending = []
+    pending_rows = 0
+    with writer:
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= EXPORT_ROW_GROUP_ROWS:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema))
+                rows += pending_rows
+                pending, pending_rows = [], 0
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema=schema))
+            rows += pending_rows
+    return rows
+
 
 class ArchiveQuery:
     """Query interface for archived Parquet data."""
@@ -64,17 +175,29 @@ class ArchiveQuery:
     ):
         self.storage_conn_string = storage_conn_string or STORAGE_CONN_STRING
         self.local_path = local_path
-        self.blob_service: Optional[BlobServiceClient] = None
+        self.filesystem: Optional[pafs.FileSystem] = None
+        self.root: Optional[str] = None
+        self.index_store: Optional[FlightIndexStore] = None
 
     def connect(self):
         """Establish connection to storage."""
         if self.local_path:
             if not self.local_path.exists():
                 raise FileNotFoundError(f"Local path not found: {self.local_path}")
+            self.filesystem = pafs.LocalFileSystem()
+            self.root = self.local_path.resolve().as_posix()
+            self.index_store = FlightIndexStore(output_dir=self.local_path)
             logger.info(f"Using local archive: {self.local_path}")
         elif self.storage_conn_string:
-            self.blob_service = BlobServiceClient.from_connection_string(
-                self.storage_conn_string
+            if adlfs is None:
+                raise ImportError("Blob storage queries need adlfs (pip install adlfs)")
+            blob_fs = adlfs.AzureBlobFileSystem(connection_string=self.storage_conn_string)
+            self.filesystem = pafs.PyFileSystem(pafs.FSSpecHandler(blob_fs))
+            self.root = CONTAINER_NAME
+            self.index_store = FlightIndexStore(
+                container=BlobServiceClient.from_connection_string(
+                    self.storage_conn_string
+                ).get_container_client(CONTAINER_NAME)
             )
             logger.info(f"Connected to Azure Blob: {CONTAINER_NAME}")
         else:
@@ -82,46 +205,32 @@ class ArchiveQuery:
                 "No storage connection. Set ADL_ARCHIVE_STORAGE_CONN or use --local"
             )
 
+    def _list(self, prefix: str, recursive: bool = False) -> list[pafs.FileInfo]:
+        """Entries under a path relative to the archive root ([] if it does not exist)."""
+        selector = pafs.FileSelector(
+            f"{self.root}/{prefix}", allow_not_found=True, recursive=recursive
+        )
+        return self.filesystem.get_file_info(selector)
+
     def test_connection(self) -> bool:
         """Test connectivity and list available date ranges."""
         try:
-            if self.local_path:
-                trajectory_dir = self.local_path / "trajectory"
-                if not trajectory_dir.exists():
-                    logger.warning("No trajectory data found locally")
-                    return False
-
-                years = list(trajectory_dir.glob("year=*"))
-                if years:
-                    logger.info(f"Found {len(years)} years of data")
-                    for year_dir in sorted(years):
-                        year = year_dir.name.replace("year=", "")
-                        months = list(year_dir.glob("month=*"))
-                        logger.info(f"  {year}: {len(months)} months")
-                    return True
+            years = sorted(
+                info.base_name for info in self._list("trajectory")
+                if info.type == pafs.FileType.Directory and info.base_name.startswith("year=")
+            )
+            if not years:
+                logger.warning("No trajectory data found")
                 return False
 
-            elif self.blob_service:
-                container = self.blob_service.get_container_client(CONTAINER_NAME)
-
-                # List top-level prefixes
-                blobs = list(container.walk_blobs(name_starts_with="trajectory/year="))
-
-                if not blobs:
-                    logger.warning("No trajectory data found in blob storage")
-                    return False
-
-                # Parse available years
-                years = set()
-                for blob in blobs:
-                    parts = blob.name.split("/")
-                    if len(parts) >= 2:
-                        year_part = parts[1]
-                        if year_part.startswith("year="):
-                            years.add(year_part.replace("year=", ""))
-
-                logger.info(f"Found data for years: {sorted(years)}")
-                return True
+            logger.info(f"Found {len(years)} years of data")
+            for year in years:
+                months = [
+                    info for info in self._list(f"trajectory/{year}")
+                    if info.base_name.startswith("month=")
+                ]
+                logger.info(f"  {year.replace('year=', '')}: {len(months)} months")
+            return True
 
         except Exception as e:
             logger.error(f"Connection test failed: {e}")
@@ -133,113 +242,218 @@ class ArchiveQuery:
         end_date: datetime.date
     ) -> list[datetime.date]:
         """List dates with available data in the given range."""
-        dates = []
-        current = start_date
-
-        while current <= end_date:
-            prefix = (
-                f"trajectory/year={current.year}/"
-                f"month={current.month:02d}/day={current.day:02d}/"
-            )
-
-            if self.local_path:
-                dir_path = self.local_path / prefix.rstrip("/")
-                if dir_path.exists() and any(dir_path.glob("*.parquet")):
-                    dates.append(current)
-            elif self.blob_service:
-                container = self.blob_service.get_container_client(CONTAINER_NAME)
-                blobs = list(container.list_blobs(name_starts_with=prefix))
-                if blobs:
-                    dates.append(current)
-
-            current += timedelta(days=1)
-
-        return dates
+        return sorted(self.get_parquet_files_in_range(start_date, end_date))
 
     def get_parquet_files(self, date: datetime.date) -> list[str]:
         """Get list of Parquet files for a specific date."""
-        prefix = (
-            f"trajectory/year={date.year}/"
-            f"month={date.month:02d}/day={date.day:02d}/"
+        return sorted(
+            info.path for info in self._list(day_prefix(date))
+            if info.type == pafs.FileType.File and info.path.endswith('.parquet')
         )
 
-        if self.local_path:
-            dir_path = self.local_path / prefix.rstrip("/")
-            return [str(f) for f in dir_path.glob("*.parquet")]
-        elif self.blob_service:
-            container = self.blob_service.get_container_client(CONTAINER_NAME)
-            return [blob.name for blob in container.list_blobs(name_starts_with=prefix)]
-
-        return []
-
-    def read_parquet_file(self, file_path: str):
-        """Read a Parquet file and return as PyArrow Table."""
-        if self.local_path:
-            return pq.read_table(file_path)
-        elif self.blob_service:
-            # Download to memory and read
-            import io
-            container = self.blob_service.get_container_client(CONTAINER_NAME)
-            blob = container.get_blob_client(file_path)
-            data = blob.download_blob().readall()
-            return pq.read_table(io.BytesIO(data))
+    def get_parquet_files_in_range(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date
+    ) -> dict[datetime.date, list[str]]:
+        """Parquet files of every date in the range that has data (one listing per month)."""
+        files = {}
+        month = start_date.replace(day=1)
+        while month <= end_date:
+            for info in self._list(day_prefix(month).rsplit('/', 1)[0], recursive=True):
+                if info.type != pafs.FileType.File or not info.path.endswith('.parquet'):
+                    continue
+                day = info.path.rsplit('/', 2)[-2]
+                if not day.startswith('day='):
+                    continue
+                date = month.replace(day=int(day[4:]))
+                if start_date <= date <= end_date:
+                    files.setdefault(date, []).append(info.path)
+            month = (month + timedelta(days=32)).replace(day=1)
+        return {date: sorted(paths) for date, paths in sorted(files.items())}
+
+    def indexed_dates(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date
+    ) -> list[datetime.date]:
+        """Dates in the range that have a flight index sidecar (see FlightIndexStore)."""
+        return self.index_store.indexed_dates(start_date, end_date)
 
-    def query_date(
+    def find_flights(
         self,
-        date: datetime.date,
+        start_date: Optional[datetime.date] = None,
+        end_date: Optional[datetime.date] = None,
         callsign: Optional[str] = None,
         dept_icao: Optional[str] = None,
         dest_icao: Optional[str] = None,
         flight_uid: Optional[int] = None
     ):
         """
-        Query trajectory data for a specific date with optional filters.
+        Look flights up in the global flight index (without a date range:
+        every indexed month).
 
-        Returns PyArrow Table with matching rows.
+        Returns PyArrow Table of index rows (date, flight, file and row
+        groups), None if there is no index for the range.
         """
-        import pyarrow as pa
-        import pyarrow.compute as pc
-
-        files = self.get_parquet_files(date)
-        if not files:
-            logger.warning(f"No data found for {date}")
+        if start_date:
+            end_date = end_date or start_date
+            paths = [
+                f"{self.root}/{month_index_path(year, month)}"
+                for year, month in months_in_range(start_date, end_date)
+            ]
+            paths = [
+                info.path for info in self.filesystem.get_file_info(paths)
+                if info.type == pafs.FileType.File
+            ]
+        else:
+            paths = sorted(
+                info.path for info in self._list(GLOBAL_INDEX_DIR)
+                if info.type == pafs.FileType.File and info.path.endswith('.parquet')
+            )
+        if not paths:
             return None
 
-        logger.info(f"Reading {len(files)} file(s) for {date}")
+        expression = build_filter(callsign, dept_icao, dest_icao, flight_uid)
+        if start_date:
+            in_range = (ds.field('date') >= start_date) & (ds.field('date') <= end_date)
+            expression = in_range if expression is None else expression & in_range
+
+        dataset = ds.dataset(paths, filesystem=self.filesystem, format='parquet')
+        return dataset.to_table(filter=expression)
 
-        tables = []
-        for file_path in files:
-            table = self.read_parquet_file(file_path)
+    def _indexed_fragments(
+        self,
+        files: dict[datetime.date, list[str]],
+        callsign: Optional[str],
+        flight_uid: Optional[int]
+    ) -> Optional[list[ds.Fragment]]:
+        """
+        Fragments for a callsign/flight query: the indexed row groups on
+        indexed days, every file on the others (None if nothing is indexed).
+        """
+        start_date, end_date = min(files), max(files)
+        indexed = set(self.indexed_dates(start_date, end_date)) & set(files)
+        if not indexed:
+            return None
+        flights = self.find_flights(start_date, end_date, callsign=callsign, flight_uid=flight_uid)
+        if flights is None:
+            return None
 
-            # Apply filters
-            mask = None
+        row_groups = {}
+        for row in flights.to_pylist():
+            if row['date'] in indexed:
+                row_groups.setdefault(f"{self.root}/{row['file']}", set()).update(
+                    range(row['first_row_group'], row['last_row_group'] + 1)
+                )
+        fragments = [
+            PARQUET_FORMAT.make_fragment(path, self.filesystem, row_groups=sorted(groups))
+            for path, groups in sorted(row_groups.items())
+        ]
+        unindexed = sorted(set(files) - indexed)
+        for date in unindexed:
+            fragments.extend(
+                PARQUET_FORMAT.make_fragment(path, self.filesystem) for path in files[date]
+            )
+        logger.info(
+            f"Flight index: {len(row_groups)} file(s) on {len(indexed)} indexed day(s), "
+            f"{len(unindexed)} day(s) without index"
+        )
+        return fragments
 
-            if callsign:
-                callsign_mask = pc.equal(table['callsign'], callsign.upper())
-                mask = callsign_mask if mask is None else pc.and_(mask, callsign_mask)
+    def scan(
+        self,
+        start_date: datetime.date,
+        end_date: Optional[datetime.date] = None,
+        callsign: Optional[str] = None,
+        dept_icao: Optional[str] = None,
+        dest_icao: Optional[str] = None,
+        flight_uid: Optional[int] = None,
+        columns: Optional[list[str]] = None,
+        filter_expression: Optional[ds.Expression] = None,
+        use_index: bool = True
+    ) -> Optional[ds.Scanner]:
+        """
+        Scanner over the trajectory rows of a date range (end_date defaults
+        to start_date).
 
-            if dept_icao:
-                dept_mask = pc.equal(table['dept_icao'], dept_icao.upper())
-                mask = dept_mask if mask is None else pc.and_(mask, dept_mask)
+        The query options and filter_expression (any further dataset
+        expression) are pushed down to the row groups; columns (default:
+        all) limits the columns read. Iterate scanner.to_batches() to stream
+        the result, or call to_table()/head()/count_rows().
 
-            if dest_icao:
-                dest_mask = pc.equal(table['dest_icao'], dest_icao.upper())
-                mask = dest_mask if mask is None else pc.and_(mask, dest_mask)
+        With use_index, callsign and flight_uid queries read only the files
+        and row groups the flight index lists for them.
 
-            if flight_uid:
-                uid_mask = pc.equal(table['flight_uid'], flight_uid)
-                mask = uid_mask if mask is None else pc.and_(mask, uid_mask)
+        Returns None if nothing is archived in the range (or, per the
+        index, nothing matches).
+        """
+        end_date = end_date or start_date
+        files_by_date = self.get_parquet_files_in_range(start_date, end_date)
+        files = [path for paths in files_by_date.values() for path in paths]
+        if not files:
+            logger.warning(f"No data found for {start_date} to {end_date}")
+            return None
 
-            if mask is not None:
-                table = table.filter(mask)
+        fragments = None
+        if use_index and (callsign or flight_uid):
+            fragments = self._indexed_fragments(files_by_date, callsign, flight_uid)
+        if fragments is not None:
+            if not fragments:
+                return None
+            dataset = ds.FileSystemDataset(
+                fragments, fragments[0].physical_schema, PARQUET_FORMAT, self.filesystem
+            )
+        else:
+            dataset = ds.dataset(files, filesystem=self.filesystem, format=PARQUET_FORMAT)
+        if columns:
+            unknown = [name for name in columns if name not in dataset.schema.names]
+            if unknown:
+                raise ValueError(
+                    f"Unknown columns: {', '.join(unknown)} "
+                    f"(available: {', '.join(dataset.schema.names)})"
+                )
+
+        expression = build_filter(callsign, dept_icao, dest_icao, flight_uid)
+        if filter_expression is not None:
+            expression = (
+                filter_expression if expression is None else expression & filter_expression
+            )
 
-            if table.num_rows > 0:
-                tables.append(table)
+        logger.info(
+            f"Scanning {len(dataset.files)} of {len(files)} file(s) for {start_date} to {end_date}"
+        )
+        return dataset.scanner(
+            columns=columns,
+            filter=expression,
+            fragment_readahead=FRAGMENT_READAHEAD
+        )
 
-        if not tables:
-            return None
+    def query_date(
+        self,
+        date: datetime.date,
+        callsign: Optional[str] = None,
+        dept_icao: Optional[str] = None,
+        dest_icao: Optional[str] = None,
+        flight_uid: Optional[int] = None,
+        columns: Optional[list[str]] = None,
+        use_index: bool = True
+    ):
+        """
+        Query trajectory data for a specific date with optional filters.
 
-        return pa.concat_tables(tables)
+        Returns PyArrow Table with matching rows.
+        """
+        return self.query_range(
+            date,
+            date,
+            callsign=callsign,
+            dept_icao=dept_icao,
+            dest_icao=dest_icao,
+            flight_uid=flight_uid,
+            columns=columns,
+            use_index=use_index
+        )
 
     def query_range(
         self,
@@ -247,29 +461,30 @@ class ArchiveQuery:
         end_date: datetime.date,
         callsign: Optional[str] = None,
         dept_icao: Optional[str] = None,
-        dest_icao: Optional[str] = None
+        dest_icao: Optional[str] = None,
+        flight_uid: Optional[int] = None,
+        columns: Optional[list[str]] = None,
+        use_index: bool = True
     ):
-        """Query trajectory data across a date range."""
-        import pyarrow as pa
-
-        tables = []
-        current = start_date
-
-        while current <= end_date:
-            result = self.query_date(
-                current,
-                callsign=callsign,
-                dept_icao=dept_icao,
-                dest_icao=dest_icao
-            )
-            if result is not None:
-                tables.append(result)
-            current += timedelta(days=1)
+        """Query trajectory data across a date range (one scan over all days)."""
+        scanner = self.scan(
+            start_date,
+            end_date,
+            callsign=callsign,
+            dept_icao=dept_icao,
+            dest_icao=dest_icao,
+            flight_uid=flight_uid,
+            columns=columns,
+            use_index=use_index
+        )
+        if scanner is None:
+            return None
 
-        if not tables:
+        table = scanner.to_table()
+        if table.num_rows == 0:
             return None
 
-        return pa.concat_tables(tables)
+        return table
 
 
 def main():
@@ -291,6 +506,12 @@ def main():
         help='Test connection and show available data'
     )
 
+    parser.add_argument(
+        '--find',
+        action='store_true',
+        help='List matching flights from the flight index (days, files) without reading data'
+    )
+
     # Query filters
     parser.add_argument(
         '--date',
@@ -334,11 +555,17 @@ def main():
         help='Filter by flight UID'
     )
 
+    parser.add_argument(
+        '--columns',
+        type=str,
+        help='Comma-separated columns to read (default: all)'
+    )
+
     # Output options
     parser.add_argument(
         '-o', '--output',
         type=str,
-        help='Output file (CSV or Parquet based on extension)'
+        help='Output file (CSV or Parquet based on extension), written as the rows are read'
     )
 
     parser.add_argument(
@@ -348,6 +575,18 @@ def main():
         help='Limit rows displayed (default: 100, 0 = no limit)'
     )
 
+    parser.add_argument(
+        '--no-index',
+        action='store_true',
+        help='Do not use the flight index for callsign/flight UID queries'
+    )
+
+    parser.add_argument(
+        '--io-threads',
+        type=int,
+        help='Concurrent reads (default: PyArrow I/O pool size, 8)'
+    )
+
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -359,6 +598,10 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
+    if args.output and Path(args.output).suffix.lower() not in ('.csv', '.parquet'):
+        logger.error(f"Unknown output format: {Path(args.output).suffix}")
+        return 1
+
     # Create query interface
     query = ArchiveQuery(
         local_path=Path(args.local) if args.local else None
@@ -385,60 +628,93 @@ def main():
             datetime.strptime(args.end, '%Y-%m-%d').date()
             if args.end else start_date
         )
+    elif args.find:
+        start_date = end_date = None
     else:
         logger.error("Specify --date or --start/--end for queries")
         return 1
 
-    # Execute query
-    logger.info(f"Querying {start_date} to {end_date}")
-
-    if start_date == end_date:
-        result = query.query_date(
+    # Flight index lookup
+    if args.find:
+        flights = query.find_flights(
             start_date,
+            end_date,
             callsign=args.callsign,
             dept_icao=args.dept,
             dest_icao=args.dest,
             flight_uid=args.flight_uid
         )
-    else:
-        result = query.query_range(
+        if flights is None:
+            print("No flight index found")
+            return 1
+        if flights.num_rows == 0:
+            print("No matching flights found")
+            return 0
+
+        flights = flights.sort_by([('date', 'ascending'), ('first_seen', 'ascending')])
+        days = len(flights['date'].unique())
+        print(f"\nFound {flight_count(flights):,} flights on {days} days")
+        if args.output:
+            rows = export_batches(flights.to_batches(), flights.schema, Path(args.output))
+            print(f"Wrote {rows:,} index rows to {args.output}")
+        else:
+            shown = flights.slice(0, args.limit) if args.limit > 0 else flights
+            print(f"\n{shown.to_pandas().to_string()}")
+            if flights.num_rows > shown.num_rows:
+                print(f"\n... showing {shown.num_rows} of {flights.num_rows:,} flights")
+        return 0
+
+    columns = [name.strip() for name in args.columns.split(',') if name.strip()] if args.columns else None
+
+    if args.io_threads:
+        pa.set_io_thread_count(args.io_threads)
+
+    # Execute query
+    logger.info(f"Querying {start_date} to {end_date}")
+
+    try:
+        scanner = query.scan(
             start_date,
             end_date,
             callsign=args.callsign,
             dept_icao=args.dept,
-            dest_icao=args.dest
+            dest_icao=args.dest,
+            flight_uid=args.flight_uid,
+            columns=columns,
+            use_index=not args.no_index
         )
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
 
-    if result is None or result.num_rows == 0:
+    if scanner is None:
         print("No matching rows found")
         return 0
 
-    print(f"\nFound {result.num_rows:,} rows")
-
     # Output results
     if args.output:
         output_path = Path(args.output)
-        if output_path.suffix.lower() == '.csv':
-            result.to_pandas().to_csv(output_path, index=False)
-        elif output_path.suffix.lower() == '.parquet':
-            pq.write_table(result, str(output_path))
-        else:
-            logger.error(f"Unknown output format: {output_path.suffix}")
-            return 1
-
-        print(f"Wrote {result.num_rows:,} rows to {output_path}")
+        rows = export_batches(scanner.to_batches(), scanner.projected_schema, output_path)
+        if rows == 0:
+            print("No matching rows found")
+        print(f"Wrote {rows:,} rows to {output_path}")
 
     else:
-        # Display sample
-        df = result.to_pandas()
+        # Display sample (only the first rows are read, plus a count if there are more)
+        result = scanner.head(args.limit) if args.limit > 0 else scanner.to_table()
+        if result.num_rows == 0:
+            print("No matching rows found")
+            return 0
 
-        if args.limit > 0:
-            df = df.head(args.limit)
+        total = result.num_rows
+        if args.limit > 0 and result.num_rows == args.limit:
+            total = scanner.count_rows()
 
-        print(f"\n{df.to_string()}")
+        print(f"\nFound {total:,} rows")
+        print(f"\n{result.to_pandas().to_string()}")
 
-        if result.num_rows > args.limit:
-            print(f"\n... showing {args.limit} of {result.num_rows:,} rows")
+        if total > result.num_rows:
+            print(f"\n... showing {result.num_rows} of {total:,} rows")
             print("Use -o file.csv to export all data")
 
     return 0
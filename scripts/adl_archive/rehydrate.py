@@ -19,8 +19,13 @@ Usage:
     # High priority rehydration (faster, more expensive)
     python rehydrate.py --start 2024-01-01 --end 2024-01-07 --high-priority
 
-    # Rehydrate specific callsign's data (must know dates)
-    python rehydrate.py --start 2024-01-01 --end 2024-01-31 --prefix trajectory/
+    # Rehydrate only the files holding a callsign's flights (flight index)
+    python rehydrate.py --start 2024-01-01 --end 2024-12-31 --callsign DAL123
+
+The flight index (flight_index.py, index/ prefix) is never tiered to
+Archive, so --callsign/--flight-uid can look up the exact trajectory files
+of a flight before anything is rehydrated. Days without an index are
+rehydrated whole.
 
 Author: Claude (AI-assisted implementation)
 Date: 2026-02-02
@@ -36,6 +41,8 @@ from typing import Optional
 
 from azure.storage.blob import BlobServiceClient, RehydratePriority
 
+from flight_index import FlightIndexStore
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -113,6 +120,66 @@ class BlobRehydrator:
 
         return blobs
 
+    def get_blobs_for_flights(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        callsign: Optional[str] = None,
+        flight_uid: Optional[int] = None
+    ) -> list[dict]:
+        """
+        List the trajectory blobs holding a callsign's (or flight's) data in
+        the date range, from the flight index. Days without an index sidecar
+        are listed whole, as by get_blobs_for_date_range.
+
+        Returns list of dicts with: name, tier, size, rehydrate_status
+        """
+        container = self.blob_service.get_container_client(CONTAINER_NAME)
+        store = FlightIndexStore(container=container)
+
+        indexed = set(store.indexed_dates(start_date, end_date))
+        flights = store.flights(start_date, end_date, callsign=callsign, flight_uid=flight_uid)
+        names = sorted({
+            row['file'] for row in flights.select(['date', 'file']).to_pylist()
+            if row['date'] in indexed
+        })
+        logger.info(
+            f"Flight index: {callsign or flight_uid} in {len(names)} blob(s) "
+            f"on {len(indexed)} indexed day(s)"
+        )
+
+        blobs = []
+        for name in names:
+            properties = container.get_blob_client(name).get_blob_properties()
+            blobs.append({
+                'name': name,
+                'tier': properties.blob_tier,
+                'size': properties.size,
+                'rehydrate_status': properties.archive_status,
+                'last_modified': properties.last_modified
+            })
+
+        current = start_date
+        while current <= end_date:
+            if current not in indexed:
+                blobs.extend(self.get_blobs_for_date_range(current, current))
+            current += timedelta(days=1)
+
+        return blobs
+
+    def get_blobs(
+        self,
+        start_date: datetime.date,
+        end_date: datetime.date,
+        prefix: str = "trajectory/",
+        callsign: Optional[str] = None,
+        flight_uid: Optional[int] = None
+    ) -> list[dict]:
+        """Blobs to rehydrate: a callsign's/flight's blobs, else everything under prefix."""
+        if callsign or flight_uid:
+            return self.get_blobs_for_flights(start_date, end_date, callsign, flight_uid)
+        return self.get_blobs_for_date_range(start_date, end_date, prefix)
+
     def get_tier_summary(self, blobs: list[dict]) -> dict:
         """Summarize blobs by access tier."""
         summary = {
@@ -179,14 +246,17 @@ class BlobRehydrator:
         target_tier: AccessTier = AccessTier.COOL,
         priority: RehydratePriority = RehydratePriority.STANDARD,
         prefix: str = "trajectory/",
-        dry_run: bool = False
+        dry_run: bool = False,
+        callsign: Optional[str] = None,
+        flight_uid: Optional[int] = None
     ) -> dict:
         """
-        Rehydrate all Archive-tier blobs in a date range.
+        Rehydrate all Archive-tier blobs in a date range (only those of a
+        callsign or flight, if given).
 
         Returns dict with: total, archive, started, skipped, errors
         """
-        blobs = self.get_blobs_for_date_range(start_date, end_date, prefix)
+        blobs = self.get_blobs(start_date, end_date, prefix, callsign, flight_uid)
 
         result = {
             'total': len(blobs),
@@ -283,6 +353,18 @@ def main():
         help='Blob prefix to filter (default: trajectory/)'
     )
 
+    parser.add_argument(
+        '--callsign',
+        type=str,
+        help='Only the trajectory blobs holding this callsign (flight index)'
+    )
+
+    parser.add_argument(
+        '--flight-uid',
+        type=int,
+        help='Only the trajectory blobs holding this flight (flight index)'
+    )
+
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -317,7 +399,13 @@ def main():
 
     # Get blobs
     logger.info(f"Scanning {start_date} to {end_date}...")
-    blobs = rehydrator.get_blobs_for_date_range(start_date, end_date, args.prefix)
+    blobs = rehydrator.get_blobs(
+        start_date,
+        end_date,
+        args.prefix,
+        callsign=args.callsign,
+        flight_uid=args.flight_uid
+    )
 
     if not blobs:
         print("No blobs found in date range")
@@ -366,7 +454,9 @@ def main():
         target_tier=target_tier,
         priority=priority,
         prefix=args.prefix,
-        dry_run=args.dry_run
+        dry_run=args.dry_run,
+        callsign=args.callsign,
+        flight_uid=args.flight_uid
     )
 
     print(f"\nRehydration Results:")
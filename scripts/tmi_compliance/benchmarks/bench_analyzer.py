@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+TMI Compliance Analyzer Benchmark
+=================================
+
+Runs TMIComplianceAnalyzer.analyze() end to end on a synthetic event
+(see synthetic_event.py) against in-memory ADL/GIS stand-ins, and times
+each phase:
+
+    inputs       fix/airport coordinates, featured flights
+    preload      trajectory load into the columnar store
+    crossings    boundary crossing precompute (GIS)
+    holding      event-wide holding detection + fix matching
+    spacing      MIT/MINIT analyses
+    ground_stop  GS program / GS TMI analyses
+    reroute      route expansion prefetch + reroute analyses
+    apreq        APREQ tracking
+    tmi_dispatch task dispatch/merge around the analyses
+    other        everything else in analyze() (summaries, reference loads)
+
+Phase times are exclusive (a nested phase is not counted in its parent).
+With --workers > 1 the analyses run in child processes and their time shows
+up under tmi_dispatch.
+
+Output is one JSON document (per-run phase times, min/median/max per phase,
+statement counts, result counts and a digest of the result JSON). With
+--baseline, medians are compared against an earlier output and the exit
+status is 1 if any phase regressed by more than --tolerance or the results
+changed.
+
+Usage:
+    python benchmarks/bench_analyzer.py
+    python benchmarks/bench_analyzer.py --flights 3000 --mit_fixes 6 --hold_pct 10 --repeat 5
+    python benchmarks/bench_analyzer.py --output before.json
+    python benchmarks/bench_analyzer.py --baseline before.json --tolerance 0.15
+    python benchmarks/bench_analyzer.py --latency_ms 2 --gis_batch_size 1
+    python benchmarks/bench_analyzer.py --boundary_engine local --baseline postgis.json
+    python benchmarks/bench_analyzer.py --stream_clustering local --verbose
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.analyzer import TMIComplianceAnalyzer
+from core.gis_crossings import DEFAULT_GIS_BATCH_SIZE, DEFAULT_GIS_WORKERS
+from core.input_cache import AnalyzerInputCache
+from core.parallel import DEFAULT_WORKERS
+
+from synthetic_event import SyntheticDatabase, SyntheticEventGenerator, stub_connections
+
+BENCHMARK_FORMAT_VERSION = 1
+
+# Analyzer method -> phase it is timed under
+PHASE_METHODS = {
+    '_load_event_inputs': 'inputs',
+    '_preload_trajectories': 'preload',
+    '_precompute_boundary_crossings': 'crossings',
+    '_detect_all_holding_patterns': 'holding',
+    '_run_tmi_analyses': 'tmi_dispatch',
+    '_analyze_mit_compliance': 'spacing',
+    '_cluster_mit_streams': 'stream_clustering',
+    '_analyze_gs_program': 'ground_stop',
+    '_analyze_gs_compliance': 'ground_stop',
+    '_prefetch_route_expansions': 'reroute',
+    '_analyze_reroute_program': 'reroute',
+    '_analyze_reroute_compliance': 'reroute',
+    '_track_apreq_flights': 'apreq',
+}
+PHASES = list(dict.fromkeys(PHASE_METHODS.values())) + ['other']
+
+
+class PhaseTimer:
+    """Exclusive wall-clock time per phase for instrumented analyzer methods"""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+        self.calls = Counter()
+        self._child_time = []   # stack: time spent in nested phases of each active call
+
+    def _wrap(self, phase: str, method):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            self._child_time.append(0.0)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.seconds[phase] += elapsed - self._child_time.pop()
+                self.calls[phase] += 1
+                if self._child_time:
+                    self._child_time[-1] += elapsed
+        return timed
+
+    def instrument(self, analyzer):
+        """Shadow the phase methods on this analyzer instance with timed wrappers"""
+        for name, phase in PHASE_METHODS.items():
+            setattr(analyzer, name, self._wrap(phase, getattr(analyzer, name)))
+
+
+def result_counts(results: dict) -> dict:
+    """Size of each result section, so behavior changes show up next to timings"""
+    mit = results.get('mit_results', {})
+    holding = results.get('holding', {})
+    return {
+        'mit_results': len(mit),
+        'mit_pairs': sum(len(r.get('all_pairs', [])) for r in mit.values() if isinstance(r, dict)),
+        'gs_results': len(results.get('gs_results', {})),
+        'reroute_results': len(results.get('reroute_results', {})),
+        'apreq_results': len(results.get('apreq_results', {})),
+        'holding_events': len(holding.get('events', [])),
+    }
+
+
+def result_digest(results: dict) -> str:
+    """SHA-256 of the result JSON (sorted keys) without run-specific fields"""
+    stable = {k: v for k, v in results.items() if k not in ('generated_utc', 'route_cache', 'trajectory_load', '_perf')}
+    return hashlib.sha256(json.dumps(stable, default=str, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def run_once(synthetic, args, input_cache) -> dict:
+    db = SyntheticDatabase(synthetic, latency_ms=args.latency_ms)
+    # analyze() mutates the event (user-defined TMI merge, program scopes)
+    analyzer = TMIComplianceAnalyzer(
+        copy.deepcopy(synthetic.event),
+        gis_batch_size=args.gis_batch_size, gis_workers=args.gis_workers,
+        input_cache=input_cache, workers=args.workers,
+        boundary_engine=args.boundary_engine, boundary_geojson=args.boundary_geojson,
+        stream_clustering=args.stream_clustering)
+    timer = PhaseTimer()
+    timer.instrument(analyzer)
+
+    with stub_connections(db, gis=not args.no_gis):
+        started = time.perf_counter()
+        results = analyzer.analyze()
+        total = time.perf_counter() - started
+    results.pop('_trajectories', None)
+
+    phases = {phase: timer.seconds.get(phase, 0.0) for phase in PHASES}
+    phases['other'] = max(0.0, total - sum(phases.values()))
+    run = {
+        'total_sec': round(total, 4),
+        'phases_sec': {phase: round(sec, 4) for phase, sec in phases.items()},
+        'phase_calls': dict(timer.calls),
+        'statements': dict(sorted(db.stats.items())),
+        'rows': dict(sorted(db.rows.items())),
+        'results': result_counts(results),
+        'result_digest': result_digest(results),
+    }
+    if 'route_cache' in results:
+        run['route_cache'] = results['route_cache']
+    if 'trajectory_load' in results:
+        run['trajectory_load'] = results['trajectory_load']
+    if input_cache:
+        run['input_cache'] = {'hits': input_cache.hits, 'misses': input_cache.misses}
+        input_cache.hits = input_cache.misses = 0
+    return run
+
+
+def summarize(runs: list) -> dict:
+    summary = {}
+    for key in ['total'] + PHASES:
+        values = [r['total_sec'] if key == 'total' else r['phases_sec'][key] for r in runs]
+        summary[key] = {'min': min(values), 'median': round(statistics.median(values), 4),
+                        'max': max(values)}
+    return summary
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_sec: float) -> list:
+    """Regressions of report vs baseline: [(what, baseline, current), ...]"""
+    regressions = []
+    for key, stats in report['summary'].items():
+        before = baseline.get('summary', {}).get(key, {}).get('median')
+        now = stats['median']
+        if before is None or now < min_sec:
+            continue
+        if now > before * (1 + tolerance):
+            regressions.append((f"{key} median sec", before, now))
+    before_digests = {r['result_digest'] for r in baseline.get('runs', [])}
+    now_digests = {r['result_digest'] for r in report['runs']}
+    # Local and PostGIS crossing fractions agree only to float precision, and
+    # local stream clustering groups flights differently from the segment DBSCAN
+    engines = ('boundary_engine', 'stream_clustering')
+    same_input = all(baseline.get('config', {}).get(k, 'postgis' if k in engines else None)
+                     == report['config'][k] for k in ('event', 'gis') + engines)
+    if same_input and before_digests and before_digests != now_digests:
+        regressions.append(('result digest', sorted(before_digests), sorted(now_digests)))
+    return regressions
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ''
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark TMIComplianceAnalyzer on a synthetic event')
+    event_args = parser.add_argument_group('synthetic event')
+    event_args.add_argument('--flights', type=int, default=600, help='Number of flights')
+    event_args.add_argument('--mit_fixes', type=int, default=4, help='MIT fixes per destination')
+    event_args.add_argument('--gs_programs', type=int, default=1, help='Ground stop programs')
+    event_args.add_argument('--reroute_programs', type=int, default=1, help='Required reroute programs')
+    event_args.add_argument('--hold_pct', type=float, default=5.0, help='Percent of flights that hold')
+    event_args.add_argument('--destinations', type=int, default=1, help='Hub airports (max 5)')
+    event_args.add_argument('--hours', type=float, default=4.0, help='Event length in hours')
+    event_args.add_argument('--sample_sec', type=int, default=30, help='Trajectory sample interval')
+    event_args.add_argument('--seed', type=int, default=1)
+
+    run_args = parser.add_argument_group('analyzer')
+    run_args.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                          help='Worker processes for TMI analyses')
+    run_args.add_argument('--gis_batch_size', type=int, default=DEFAULT_GIS_BATCH_SIZE,
+                          help='Flights per PostGIS crossing statement (1 = per-flight)')
+    run_args.add_argument('--gis_workers', type=int, default=DEFAULT_GIS_WORKERS,
+                          help='GIS connections for the crossing precompute')
+    run_args.add_argument('--no_gis', action='store_true', help='Run without a GIS connection')
+    run_args.add_argument('--boundary_engine', choices=('postgis', 'local'), default='postgis',
+                          help='Boundary crossings from the GIS stand-in or the local engine '
+                               '(over the synthetic ARTCC grid)')
+    run_args.add_argument('--stream_clustering', choices=('postgis', 'local'), default='postgis',
+                          help='MIT stream clustering through the GIS stand-in or in process')
+    run_args.add_argument('--latency_ms', type=float, default=0.0,
+                          help='Simulated round-trip latency per database statement')
+    run_args.add_argument('--input_cache', action='store_true',
+                          help='Use a fresh on-disk input cache (first run cold, later runs warm)')
+
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs (medians are reported)')
+    parser.add_argument('--output', default=None, help='Write the JSON report here (default: stdout)')
+    parser.add_argument('--baseline', default=None, help='Earlier JSON report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed median slowdown per phase vs the baseline (0.2 = 20%%)')
+    parser.add_argument('--min_sec', type=float, default=0.05,
+                        help='Ignore phases faster than this when comparing')
+    parser.add_argument('--verbose', action='store_true', help='Show analyzer logging')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        stream=sys.stderr)
+
+    generation_started = time.perf_counter()
+    synthetic = SyntheticEventGenerator(
+        flights=args.flights, mit_fixes=args.mit_fixes, gs_programs=args.gs_programs,
+        reroute_programs=args.reroute_programs, hold_pct=args.hold_pct,
+        destinations=args.destinations, hours=args.hours, sample_sec=args.sample_sec,
+        seed=args.seed).generate()
+    generation_sec = time.perf_counter() - generation_started
+
+    cache_dir = tempfile.mkdtemp(prefix='perti_bench_cache_') if args.input_cache else None
+    args.boundary_geojson = None
+    if args.boundary_engine == 'local':
+        args.boundary_geojson = tempfile.mkdtemp(prefix='perti_bench_grid_')
+        with open(os.path.join(args.boundary_geojson, 'artcc.json'), 'w') as f:
+            json.dump(synthetic.grid_geojson(), f)
+    try:
+        input_cache = AnalyzerInputCache(cache_dir) if cache_dir else None
+        runs = []
+        for i in range(max(1, args.repeat)):
+            runs.append(run_once(synthetic, args, input_cache))
+            print(f"run {i + 1}/{args.repeat}: {runs[-1]['total_sec']:.2f}s", file=sys.stderr)
+    finally:
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        if args.boundary_geojson:
+            shutil.rmtree(args.boundary_geojson, ignore_errors=True)
+
+    report = {
+        'benchmark': 'tmi_compliance_analyzer',
+        'format_version': BENCHMARK_FORMAT_VERSION,
+        'timestamp_utc': datetime.utcnow().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'event': synthetic.params,
+            'workers': args.workers,
+            'gis_batch_size': args.gis_batch_size,
+            'gis_workers': args.gis_workers,
+            'gis': not args.no_gis,
+            'boundary_engine': args.boundary_engine,
+            'stream_clustering': args.stream_clustering,
+            'latency_ms': args.latency_ms,
+            'input_cache': args.input_cache,
+        },
+        'dataset': {**synthetic.summary(), 'generation_sec': round(generation_sec, 3)},
+        'runs': runs,
+        'summary': summarize(runs),
+    }
+
+    text = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    for key, stats in report['summary'].items():
+        print(f"{key:>13}: median {stats['median']:.3f}s (min {stats['min']:.3f}s)", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('config', {}).get('event') != report['config']['event']:
+            print("WARNING: baseline was run on a different synthetic event - timings are not comparable",
+                  file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance, args.min_sec)
+        for what, before, now in regressions:
+            print(f"REGRESSION {what}: {before} -> {now}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Fix Crossing Engine Parity Benchmark
+====================================
+
+Checks the vectorized fix crossing detection (FixCrossingEngine, used
+whenever NumPy is installed) against the scalar segment scan it replaced,
+and times both:
+
+- a synthetic event (see synthetic_event.py) is analyzed once end to end
+  to load the trajectory cache and fix coordinates the way analyze() does
+- for every TMI fix with known coordinates, both detectors run over every
+  cached flight for the TMI window, each quarter of it and the whole event
+  window (so time-window edges are exercised)
+- the CrossingResult lists must match field by field (same flights, same
+  order, identical values); any mismatch is printed and the exit status
+  is 1
+
+Usage:
+    python benchmarks/bench_crossing_engine.py
+    python benchmarks/bench_crossing_engine.py --flights 3000 --mit_fixes 6 --hold_pct 10 --json
+"""
+
+import argparse
+import copy
+import dataclasses
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.analyzer import TMIComplianceAnalyzer
+from core.crossing_engine import HAS_NUMPY
+
+from synthetic_event import SyntheticDatabase, SyntheticEventGenerator, stub_connections
+
+# TMI windows are also checked in this many equal parts
+WINDOW_PARTS = 4
+
+
+def crossing_windows(event, tmi):
+    """(start, end) windows checked for a TMI: whole, its parts, the event"""
+    start, end = tmi.start_utc, tmi.get_effective_end()
+    step = (end - start) / WINDOW_PARTS
+    windows = [(start, end)]
+    windows += [(start + step * i, start + step * (i + 1)) for i in range(WINDOW_PARTS)]
+    windows.append((event.start_utc, event.end_utc))
+    return windows
+
+
+def diff_crossings(scalar: list, vectorized: list) -> list:
+    """Field-level differences between two CrossingResult lists"""
+    if [c.callsign for c in scalar] != [c.callsign for c in vectorized]:
+        only_scalar = sorted({c.callsign for c in scalar} - {c.callsign for c in vectorized})
+        only_vectorized = sorted({c.callsign for c in vectorized} - {c.callsign for c in scalar})
+        return [f"flights differ: scalar only {only_scalar}, vectorized only {only_vectorized}"]
+    diffs = []
+    for a, b in zip(scalar, vectorized):
+        for f in dataclasses.fields(a):
+            va, vb = getattr(a, f.name), getattr(b, f.name)
+            if va != vb:
+                diffs.append(f"{a.callsign}.{f.name}: scalar {va!r} != vectorized {vb!r}")
+    return diffs
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Check vectorized fix crossing detection against the scalar segment scan')
+    parser.add_argument('--flights', type=int, default=600, help='Number of flights')
+    parser.add_argument('--mit_fixes', type=int, default=4, help='MIT fixes per destination')
+    parser.add_argument('--hold_pct', type=float, default=5.0, help='Percent of flights that hold')
+    parser.add_argument('--destinations', type=int, default=1, help='Hub airports (max 5)')
+    parser.add_argument('--hours', type=float, default=4.0, help='Event length in hours')
+    parser.add_argument('--sample_sec', type=int, default=30, help='Trajectory sample interval')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--max_diffs', type=int, default=20, help='Mismatches printed')
+    parser.add_argument('--json', action='store_true', help='Print a machine-readable summary')
+    parser.add_argument('--verbose', action='store_true', help='Show analyzer logging')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        stream=sys.stderr)
+    if not HAS_NUMPY:
+        sys.exit('NumPy is required for the vectorized crossing engine')
+
+    synthetic = SyntheticEventGenerator(
+        flights=args.flights, mit_fixes=args.mit_fixes, hold_pct=args.hold_pct,
+        destinations=args.destinations, hours=args.hours, sample_sec=args.sample_sec,
+        seed=args.seed).generate()
+    event = copy.deepcopy(synthetic.event)
+    analyzer = TMIComplianceAnalyzer(event, workers=1)
+    with stub_connections(SyntheticDatabase(synthetic)):
+        analyzer.analyze()
+    if not analyzer._trajectory_cache_loaded:
+        sys.exit('Trajectory cache was not loaded')
+
+    callsigns = sorted(analyzer._trajectory_cache)
+    checks = 0
+    crossings = 0
+    scalar_sec = vectorized_sec = 0.0
+    diffs = []
+    for tmi in event.tmis:
+        coords = analyzer.fix_coords.get(tmi.fix) if tmi.fix else None
+        if not coords or not tmi.start_utc or not tmi.end_utc:
+            continue
+        for start, end in crossing_windows(event, tmi):
+            started = time.perf_counter()
+            scalar = analyzer._detect_crossings_interpolated(
+                tmi.fix, coords['lat'], coords['lon'], callsigns, start, end)
+            scalar_sec += time.perf_counter() - started
+            started = time.perf_counter()
+            vectorized = analyzer._detect_crossings_vectorized(
+                tmi.fix, coords['lat'], coords['lon'], callsigns, start, end)
+            vectorized_sec += time.perf_counter() - started
+            checks += 1
+            crossings += len(scalar)
+            diffs.extend(f"{tmi.fix} {start:%H:%M}-{end:%H:%M} {d}"
+                         for d in diff_crossings(scalar, vectorized))
+
+    if not checks:
+        sys.exit('No TMI fix with known coordinates in the synthetic event')
+
+    summary = {
+        'flights': len(callsigns),
+        'fix_windows': checks,
+        'crossings': crossings,
+        'mismatches': len(diffs),
+        'scalar_sec': round(scalar_sec, 4),
+        'vectorized_sec': round(vectorized_sec, 4),
+        'speedup': round(scalar_sec / vectorized_sec, 2) if vectorized_sec > 0 else None,
+    }
+    for diff in diffs[:args.max_diffs]:
+        print(f"MISMATCH {diff}", file=sys.stderr)
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        for key, value in summary.items():
+            print(f"{key:>15}: {value}")
+    sys.exit(1 if diffs else 0)
+
+
+if __name__ == '__main__':
+    main()
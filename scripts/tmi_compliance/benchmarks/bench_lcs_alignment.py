@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+LCS Route Alignment Microbenchmark
+==================================
+
+Times core.analyzer.lcs_alignment (bit-parallel) against the classic
+(m+1)x(n+1) DP it replaced, over filed-vs-flown route token pairs, and
+checks that both return identical results for every pair.
+
+Route pairs come from the repo's coded departure routes
+(assets/data/cdrs.csv): every pair of CDRs for the same city pair (a filed
+route vs the alternative actually flown), plus a seeded perturbation of
+each route (dropped/inserted/renamed fixes, mixed case) so city pairs with
+a single CDR are covered too. Pass --pairs to use exported routes instead
+(JSON lines with "filed" and "flown" route strings).
+
+Usage:
+    python benchmarks/bench_lcs_alignment.py
+    python benchmarks/bench_lcs_alignment.py --limit 2000 --repeat 5 --json
+    python benchmarks/bench_lcs_alignment.py --pairs routes.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.analyzer import lcs_alignment
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+DEFAULT_CDR_PATH = os.path.join(REPO_ROOT, 'assets', 'data', 'cdrs.csv')
+
+
+def lcs_alignment_dp(seq_a, seq_b):
+    """Reference: the classic full-table DP implementation (pre bit-parallel)"""
+    m, n = len(seq_a), len(seq_b)
+    if m == 0 and n == 0:
+        return {'lcs': [], 'a_only': [], 'b_only': [], 'alignment_pct': 100.0, 'tokens': []}
+    if m == 0:
+        return {'lcs': [], 'a_only': [], 'b_only': list(seq_b), 'alignment_pct': 0.0,
+                'tokens': [{'token': t, 'status': 'b_only'} for t in seq_b]}
+    if n == 0:
+        return {'lcs': [], 'a_only': list(seq_a), 'b_only': [], 'alignment_pct': 0.0,
+                'tokens': [{'token': t, 'status': 'a_only'} for t in seq_a]}
+
+    dp = [[0] * (n + 1) for _ in range(m + 1)]
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            if seq_a[i - 1].upper() == seq_b[j - 1].upper():
+                dp[i][j] = dp[i - 1][j - 1] + 1
+            else:
+                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+
+    lcs = []
+    i, j = m, n
+    while i > 0 and j > 0:
+        if seq_a[i - 1].upper() == seq_b[j - 1].upper():
+            lcs.append(seq_a[i - 1])
+            i -= 1
+            j -= 1
+        elif dp[i - 1][j] >= dp[i][j - 1]:
+            i -= 1
+        else:
+            j -= 1
+    lcs.reverse()
+
+    tokens, a_only, b_only = [], [], []
+    a_idx = b_idx = 0
+    for match in lcs:
+        target = match.upper()
+        while a_idx < m and seq_a[a_idx].upper() != target:
+            tokens.append({'token': seq_a[a_idx], 'status': 'a_only'})
+            a_only.append(seq_a[a_idx])
+            a_idx += 1
+        while b_idx < n and seq_b[b_idx].upper() != target:
+            tokens.append({'token': seq_b[b_idx], 'status': 'b_only'})
+            b_only.append(seq_b[b_idx])
+            b_idx += 1
+        tokens.append({'token': match, 'status': 'match'})
+        a_idx += 1
+        b_idx += 1
+    for t in seq_a[a_idx:]:
+        tokens.append({'token': t, 'status': 'a_only'})
+        a_only.append(t)
+    for t in seq_b[b_idx:]:
+        tokens.append({'token': t, 'status': 'b_only'})
+        b_only.append(t)
+
+    max_len = max(m, n)
+    return {'lcs': lcs, 'a_only': a_only, 'b_only': b_only,
+            'alignment_pct': round(len(lcs) / max_len * 100, 1) if max_len > 0 else 100.0,
+            'tokens': tokens}
+
+
+def perturb(tokens, rnd):
+    """A plausible flown variant of a filed route: skipped, added, renamed fixes"""
+    out = []
+    for t in tokens:
+        r = rnd.random()
+        if r < 0.12:
+            continue                                   # fix skipped (direct-to)
+        if r < 0.18:
+            out.append(t + rnd.choice('ABCDEFGHJKLMNPQRSTUVWXYZ'))  # different fix
+            continue
+        out.append(t.lower() if rnd.random() < 0.05 else t)
+        if rnd.random() < 0.08:
+            out.append(''.join(rnd.choice('ABCDEFGHJKLMNPQRSTUVWXYZ') for _ in range(5)))
+    return out
+
+
+def load_cdr_pairs(path, seed):
+    routes = defaultdict(list)
+    with open(path, newline='') as f:
+        for row in csv.reader(f):
+            if len(row) >= 2 and row[1].strip():
+                routes[row[0][:6]].append(row[1].split())
+
+    rnd = random.Random(seed)
+    pairs = []
+    for city_pair in sorted(routes):
+        alts = routes[city_pair]
+        for k in range(1, len(alts)):
+            pairs.append((alts[0], alts[k]))
+        for r in alts:
+            pairs.append((r, perturb(r, rnd)))
+    return pairs
+
+
+def load_jsonl_pairs(path):
+    pairs = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                pairs.append(((rec.get('filed') or '').split(), (rec.get('flown') or '').split()))
+    return pairs
+
+
+def time_fn(fn, pairs, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for a, b in pairs:
+            fn(a, b)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark lcs_alignment against the classic DP')
+    parser.add_argument('--cdrs', default=DEFAULT_CDR_PATH, help='CDR CSV (code,route)')
+    parser.add_argument('--pairs', default=None, help='JSON lines of {"filed": ..., "flown": ...}')
+    parser.add_argument('--limit', type=int, default=0, help='Use at most this many pairs (0 = all)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='Print a machine-readable summary')
+    args = parser.parse_args()
+
+    pairs = load_jsonl_pairs(args.pairs) if args.pairs else load_cdr_pairs(args.cdrs, args.seed)
+    if args.limit:
+        pairs = pairs[:args.limit]
+    if not pairs:
+        sys.exit('No route pairs loaded')
+
+    mismatches = sum(1 for a, b in pairs if lcs_alignment(a, b) != lcs_alignment_dp(a, b))
+    dp_sec = time_fn(lcs_alignment_dp, pairs, args.repeat)
+    bit_sec = time_fn(lcs_alignment, pairs, args.repeat)
+    tokens = [len(a) + len(b) for a, b in pairs]
+
+    summary = {
+        'pairs': len(pairs),
+        'mean_tokens_per_pair': round(sum(tokens) / len(tokens), 1),
+        'max_tokens_per_pair': max(tokens),
+        'mismatches': mismatches,
+        'dp_sec': round(dp_sec, 4),
+        'bit_parallel_sec': round(bit_sec, 4),
+        'speedup': round(dp_sec / bit_sec, 2) if bit_sec > 0 else None,
+    }
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        for key, value in summary.items():
+            print(f"{key:>22}: {value}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+NTML Parser Throughput Benchmark
+================================
+
+Reports lines per second of the NTML parser on a large log:
+
+- classify_line (one combined pattern) against the one-regex-per-type
+  classifier it replaced, checking both give every line the same type
+- parse_ntml_to_tmis, parse_ntml_full and extract_programs_from_ntml
+  end to end (Discord cleanup, classification and the sub-parsers)
+
+The default log is the captured Discord coordination threads in
+docs/discord-threads (usernames, chatter, NTML entries and ADVZY blocks),
+repeated until it has --min_lines lines. Pass --log to use another captured
+NTML log instead.
+
+The SHA-256 of the ParseResult/NTMLParseResult reprs is reported as
+parse_digest: it must not change between runs before and after a parser
+optimization.
+
+Usage:
+    python benchmarks/bench_ntml_parser.py
+    python benchmarks/bench_ntml_parser.py --min_lines 200000 --repeat 5 --json
+    python benchmarks/bench_ntml_parser.py --log ntml_export.txt --event_start 2026-01-30T23:59
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.ntml_parser import (
+    classify_line, clean_discord_text, extract_programs_from_ntml, parse_ntml_full,
+    parse_ntml_to_tmis
+)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+DEFAULT_LOG_DIR = os.path.join(REPO_ROOT, 'docs', 'discord-threads')
+
+# Event window of the captured threads (Northeast Corridor FNO)
+DEFAULT_EVENT_START = '2026-01-30T23:59'
+DEFAULT_EVENT_HOURS = 4
+DEFAULT_DESTINATIONS = ['BOS', 'JFK', 'LGA', 'EWR', 'PHL', 'DCA', 'IAD', 'BWI']
+
+
+def classify_line_sequential(line):
+    """Reference: the one-regex-per-type classifier (pre combined pattern)"""
+    line = line.strip()
+    if not line:
+        return ("empty", None)
+
+    if re.match(r'^\w+\s+ADVZY\s+\d+', line, re.IGNORECASE):
+        upper = line.upper()
+        if 'CDM GS CNX' in upper or 'GS CNX' in upper:
+            return ("advzy_gs_cnx", {"line": line})
+        if 'REROUTE CANCELLATION' in upper:
+            return ("advzy_reroute_cnx", {"line": line})
+        if 'GROUND STOP' in upper or 'CDM GROUND STOP' in upper:
+            return ("advzy_gs", {"line": line})
+        if re.search(r'\b(ROUTE|FEA|FCA|ICR)\s+(RQD|RMD|PLN|FYI)\b', upper):
+            return ("advzy_reroute", {"line": line})
+        return ("advzy_header", {"line": line})
+
+    if re.search(r'\b(VMC|IMC)\b.*\bARR:', line) or re.search(r'\bAAR:\d+\s+ADR:\d+', line):
+        return ("airport_config", {"line": line})
+    if re.search(r'\bE/D\b', line, re.IGNORECASE):
+        return ("ed_delay", {"line": line})
+    if re.search(r'\bA/D\b', line, re.IGNORECASE):
+        return ("ad_delay", {"line": line})
+    if re.search(r'\bD/D\b', line, re.IGNORECASE):
+        return ("dd_delay", {"line": line})
+    if re.search(r'\bCANCEL\b', line, re.IGNORECASE) or re.search(r'\bCNCL\b', line, re.IGNORECASE):
+        return ("cancel", {"line": line})
+    if re.search(r'\bvia\s+\S+\s+STOP\b', line, re.IGNORECASE):
+        return ("stop", {"line": line})
+    if re.search(r'\bCFR\b', line, re.IGNORECASE) and re.search(r'\bvia\b', line, re.IGNORECASE):
+        return ("cfr", {"line": line})
+    if re.search(r'\b\d+\s*MIT\b', line, re.IGNORECASE):
+        return ("mit", {"line": line})
+    if re.search(r'\b\d+\s*MINIT\b', line, re.IGNORECASE):
+        return ("minit", {"line": line})
+    if re.match(r'^TMI\s+ID:', line, re.IGNORECASE):
+        return ("tmi_id", {"line": line})
+    if re.match(r'^\d{6}\s*-\s*\d{6}$', line) or re.match(r'^\d{2}/\d{2}/\d{2}\s+\d{2}:\d{2}', line):
+        return ("timestamp", {"line": line})
+
+    advzy_fields = ['NAME:', 'CONSTRAINED AREA:', 'REASON:', 'INCLUDE TRAFFIC:',
+                    'FACILITIES INCLUDED:', 'FLIGHT STATUS:', 'VALID:',
+                    'PROBABILITY OF EXTENSION:', 'REMARKS:', 'ASSOCIATED RESTRICTIONS:',
+                    'MODIFICATIONS:', 'ROUTES:', 'EVENT TIME:', 'CTL ELEMENT:',
+                    'ELEMENT TYPE:', 'ADL TIME:', 'GROUND STOP PERIOD:',
+                    'DEP FACILITIES INCLUDED:', 'IMPACTING CONDITION:', 'COMMENTS:',
+                    'NEW TOTAL, MAXIMUM, AVERAGE DELAYS:']
+    for field in advzy_fields:
+        if line.upper().startswith(field):
+            return ("advzy_field", {"field": field, "line": line})
+
+    if re.match(r'^ORIG\s+DEST\s+ROUTE', line, re.IGNORECASE) or re.match(r'^-+\s+-+\s+-+', line):
+        return ("route_header", {"line": line})
+    if re.search(r'>\S+.*<', line):
+        return ("route_entry", {"line": line})
+    return ("unknown", {"line": line})
+
+
+def load_log(path, min_lines):
+    if path:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    else:
+        texts = []
+        for name in sorted(glob.glob(os.path.join(DEFAULT_LOG_DIR, '*.txt'))):
+            with open(name, encoding='utf-8', errors='replace') as f:
+                texts.append(f.read())
+        text = '\n'.join(texts)
+    if not text.strip():
+        return text
+    copies = max(1, -(-min_lines // max(1, text.count('\n') + 1)))
+    return '\n'.join([text] * copies)
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark NTML parser throughput')
+    parser.add_argument('--log', default=None, help='Captured NTML log (default: docs/discord-threads)')
+    parser.add_argument('--min_lines', type=int, default=50000,
+                        help='Repeat the log until it has at least this many lines')
+    parser.add_argument('--event_start', default=DEFAULT_EVENT_START, help='Event start (ISO, UTC)')
+    parser.add_argument('--event_hours', type=float, default=DEFAULT_EVENT_HOURS)
+    parser.add_argument('--destinations', default=','.join(DEFAULT_DESTINATIONS))
+    parser.add_argument('--repeat', type=int, default=3, help='Timing repetitions (best is reported)')
+    parser.add_argument('--json', action='store_true', help='Print a machine-readable summary')
+    args = parser.parse_args()
+
+    text = load_log(args.log, args.min_lines)
+    if not text.strip():
+        sys.exit('Empty NTML log')
+    event_start = datetime.fromisoformat(args.event_start)
+    event_end = event_start + timedelta(hours=args.event_hours)
+    destinations = [d.strip().upper() for d in args.destinations.split(',') if d.strip()]
+
+    raw_lines = text.split('\n')
+    lines = clean_discord_text(text).split('\n')
+    mismatches = sum(1 for line in lines if classify_line(line) != classify_line_sequential(line))
+
+    def classify_all(fn):
+        return lambda: [fn(line) for line in lines]
+
+    sequential_sec = best_of(classify_all(classify_line_sequential), args.repeat)
+    combined_sec = best_of(classify_all(classify_line), args.repeat)
+
+    results = {}
+
+    def timed_parse(name, fn):
+        def run():
+            results[name] = fn(text, event_start, event_end, destinations)
+        return best_of(run, args.repeat)
+
+    tmis_sec = timed_parse('tmis', parse_ntml_to_tmis)
+    full_sec = timed_parse('full', parse_ntml_full)
+    programs_sec = timed_parse('programs', extract_programs_from_ntml)
+
+    digest = hashlib.sha256()
+    for name in ('tmis', 'full', 'programs'):
+        digest.update(repr(results[name]).encode('utf-8'))
+    full = results['full']
+
+    def rate(seconds, count):
+        return round(count / seconds) if seconds > 0 else None
+
+    summary = {
+        'log_lines': len(raw_lines),
+        'cleaned_lines': len(lines),
+        'classify_mismatches': mismatches,
+        'classify_sequential_lines_per_sec': rate(sequential_sec, len(lines)),
+        'classify_combined_lines_per_sec': rate(combined_sec, len(lines)),
+        'classify_speedup': round(sequential_sec / combined_sec, 2) if combined_sec > 0 else None,
+        'parse_ntml_to_tmis_lines_per_sec': rate(tmis_sec, len(raw_lines)),
+        'parse_ntml_full_lines_per_sec': rate(full_sec, len(raw_lines)),
+        'extract_programs_lines_per_sec': rate(programs_sec, len(raw_lines)),
+        'tmis': len(full.tmis),
+        'delays': len(full.delays),
+        'airport_configs': len(full.airport_configs),
+        'cancellations': len(full.cancellations),
+        'skipped_lines': len(full.skipped_lines),
+        'gs_programs': len(full.gs_programs),
+        'reroute_programs': len(full.reroute_programs),
+        'parse_digest': digest.hexdigest(),
+    }
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        for key, value in summary.items():
+            print(f"{key:>34}: {value}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,966 @@
+"""
+Synthetic TMI Event Generator
+=============================
+
+Builds a realistic-looking event (arrival flows into one or more hubs with
+MIT fixes, a ground stop, a reroute, and holding traffic) together with an
+in-memory stand-in for the ADL and GIS databases that serves it, so
+TMIComplianceAnalyzer can run end to end without Azure SQL or PostGIS.
+
+Geography:
+- Airports are real (approximate coordinates). Each destination gets
+  `mit_fixes` arrival fixes 40 nm out, evenly spaced in bearing; traffic
+  from an origin uses the arrival fix closest to its inbound bearing.
+- Each origin/destination pair has a primary and an alternate (reroute)
+  corridor: departure fix -> airway -> mid fix -> arrival fix -> STAR.
+- ARTCC airspace is a synthetic grid of GRID_LAT_DEG x GRID_LON_DEG cells
+  named Z<row><col> (e.g. ZDH). The GIS stand-in computes boundary
+  crossings against that grid the way get_trajectory_all_crossings does
+  (planar line fractions, 6-decimal positions), so boundary-based MIT
+  measurement works; SyntheticEvent.grid_geojson() exports the same cells
+  for the local boundary engine.
+
+The database stand-ins answer the statements the analyzer issues by
+recognizing the tables/functions they reference. Statements they do not
+recognize return no rows (ADL) or raise (GIS, e.g. the temp-table DBSCAN
+clustering), which sends the analyzer down its documented fallbacks; both
+are counted in SyntheticDatabase.stats.
+"""
+
+import json
+import math
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from core import analyzer as analyzer_module
+from core import parallel as parallel_module
+from core import session as session_module
+from core.analyzer import calculate_bearing, haversine_nm
+from core.boundary_engine import ENTRY_LOOKAHEAD_FRACTION
+from core.database import ADLConnection
+from core.models import (
+    EventConfig, TMI, TMIType, GSProgram, GSAdvisory,
+    RerouteProgram, RerouteAdvisory, RouteEntry
+)
+
+# Approximate airport reference points (ICAO -> lat, lon)
+AIRPORTS = {
+    'KDFW': (32.897, -97.038), 'KATL': (33.637, -84.428), 'KORD': (41.979, -87.904),
+    'KDEN': (39.862, -104.673), 'KIAH': (29.984, -95.341), 'KLAX': (33.942, -118.408),
+    'KPHX': (33.434, -112.012), 'KMSP': (44.882, -93.222), 'KSTL': (38.749, -90.370),
+    'KMEM': (35.042, -89.977), 'KABQ': (35.040, -106.609), 'KOKC': (35.393, -97.601),
+    'KMCI': (39.298, -94.714), 'KSAT': (29.534, -98.470), 'KELP': (31.807, -106.378),
+    'KBNA': (36.124, -86.678), 'KLAS': (36.080, -115.152), 'KMSY': (29.993, -90.258),
+    'KCLT': (35.214, -80.943), 'KDTW': (42.212, -83.353), 'KSLC': (40.788, -111.978),
+    'KAUS': (30.194, -97.670), 'KTUL': (36.198, -95.888), 'KLIT': (34.729, -92.224),
+    'KOMA': (41.303, -95.894), 'KIND': (39.717, -86.294), 'KCVG': (39.049, -84.668),
+    'KMCO': (28.429, -81.309), 'KJFK': (40.640, -73.779), 'KBOS': (42.364, -71.005),
+}
+
+# Destinations are taken from the front of this list
+HUBS = ['KDFW', 'KATL', 'KORD', 'KDEN', 'KIAH']
+
+AIRLINES = [('AAL', 'American Airlines'), ('DAL', 'Delta Air Lines'), ('UAL', 'United Airlines'),
+            ('SWA', 'Southwest Airlines'), ('SKW', 'SkyWest Airlines'), ('ENY', 'Envoy Air'),
+            ('JBU', 'JetBlue Airways'), ('FFT', 'Frontier Airlines')]
+
+# Synthetic ARTCC grid
+GRID_LAT_DEG = 5.0
+GRID_LON_DEG = 6.0
+GRID_ORIGIN = (20.0, -130.0)
+
+ARRIVAL_FIX_NM = 40.0        # Arrival fix distance from the destination
+DEPARTURE_FIX_NM = 30.0      # Departure fix distance from the origin
+ALTERNATE_OFFSET_NM = 45.0   # Lateral offset of the alternate (reroute) corridor
+CRUISE_ALT_FT = (31000, 39000)
+
+# Holds are flown as right-hand racetracks sized to fit the detector's
+# containment radius (HOLD_MAX_RADIUS_NM)
+HOLD_SPEED_KTS = 170.0
+HOLD_LEG_NM = 2.0
+HOLD_ALT_FT = (11000, 17000)
+# The detector accumulates heading until a report gap (HOLD_GAP_RESET_SEC) or
+# the end of the track, so holds are bracketed by short position-report gaps
+HOLD_REPORT_GAP_SEC = 240
+
+
+def grid_cell(lat: float, lon: float) -> Tuple[int, int]:
+    return (math.floor((lat - GRID_ORIGIN[0]) / GRID_LAT_DEG),
+            math.floor((lon - GRID_ORIGIN[1]) / GRID_LON_DEG))
+
+
+def artcc_for_cell(cell: Tuple[int, int]) -> str:
+    row, col = cell
+    return f"Z{chr(ord('A') + row % 26)}{chr(ord('A') + col % 26)}"
+
+
+def artcc_at(lat: float, lon: float) -> str:
+    """Synthetic ARTCC containing a point"""
+    return artcc_for_cell(grid_cell(lat, lon))
+
+
+def destination_point(lat: float, lon: float, bearing_deg: float, dist_nm: float) -> Tuple[float, float]:
+    """Point dist_nm from (lat, lon) along bearing_deg (spherical earth)"""
+    d = dist_nm / 3440.065
+    b = math.radians(bearing_deg)
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2 = math.asin(math.sin(lat1) * math.cos(d) + math.cos(lat1) * math.sin(d) * math.cos(b))
+    lon2 = lon1 + math.atan2(math.sin(b) * math.sin(d) * math.cos(lat1),
+                             math.cos(d) - math.sin(lat1) * math.sin(lat2))
+    return math.degrees(lat2), math.degrees(lon2)
+
+
+def _angle_diff(a: float, b: float) -> float:
+    return abs((a - b + 180) % 360 - 180)
+
+
+@dataclass
+class SyntheticFlight:
+    """One generated flight: ADL flight/plan fields plus its trajectory"""
+    callsign: str
+    flight_uid: int
+    dept: str
+    dest: str
+    route: str                       # Filed route (fp_route)
+    waypoints: List[str]             # Named points of the flown route, in order
+    first_seen: datetime
+    out_utc: datetime
+    off_utc: datetime
+    last_seen: datetime
+    airline_icao: str
+    airline_name: str
+    route_dist_nm: float
+    gcd_nm: float
+    holds: int = 0                   # Holding laps flown at the arrival fix
+    # (timestamp, lat, lon, groundspeed_kts, altitude_ft)
+    points: List[Tuple[datetime, float, float, float, float]] = field(default_factory=list)
+
+
+@dataclass
+class SyntheticEvent:
+    """Generated event config plus the reference and flight data behind it"""
+    event: EventConfig
+    flights: List[SyntheticFlight]
+    fixes: Dict[str, Tuple[float, float]]         # nav_fixes
+    airports: Dict[str, Tuple[float, float]]
+    airways: Dict[str, List[str]]                 # airway -> fixes
+    stars: Dict[str, List[str]]                   # destination -> STAR fixes
+    params: Dict[str, object]
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            **self.params,
+            'flight_count': len(self.flights),
+            'trajectory_points': sum(len(f.points) for f in self.flights),
+            'holding_flights': sum(1 for f in self.flights if f.holds),
+            'tmis': len(self.event.tmis),
+            'gs_program_count': len(self.event.gs_programs),
+            'reroute_program_count': len(self.event.reroute_programs),
+        }
+
+    def grid_geojson(self) -> dict:
+        """ARTCC grid cells around all trajectories as an artcc.json FeatureCollection"""
+        cells = {grid_cell(lat, lon) for f in self.flights for _, lat, lon, _, _ in f.points}
+        rows = range(min(r for r, _ in cells) - 1, max(r for r, _ in cells) + 2)
+        cols = range(min(c for _, c in cells) - 1, max(c for _, c in cells) + 2)
+        features = []
+        for row in rows:
+            for col in cols:
+                lat0 = GRID_ORIGIN[0] + row * GRID_LAT_DEG
+                lon0 = GRID_ORIGIN[1] + col * GRID_LON_DEG
+                ring = [[lon0, lat0], [lon0 + GRID_LON_DEG, lat0], [lon0 + GRID_LON_DEG, lat0 + GRID_LAT_DEG],
+                        [lon0, lat0 + GRID_LAT_DEG], [lon0, lat0]]
+                features.append({
+                    'type': 'Feature',
+                    'properties': {'ICAOCODE': artcc_for_cell((row, col)), 'is_detection_level': True},
+                    'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+                })
+        return {'type': 'FeatureCollection', 'features': features}
+
+
+class SyntheticEventGenerator:
+    """
+    Seeded generator for SyntheticEvent.
+
+    Args:
+        flights: number of flights (all arrivals to the destinations)
+        mit_fixes: MIT fixes per destination (every arrival fix gets an MIT)
+        gs_programs: ground stops, spread over the destinations
+        reroute_programs: required reroutes, spread over the destinations
+        hold_pct: percentage of flights that hold at their arrival fix
+        destinations: number of hub airports (taken from HUBS)
+        hours: event length; flights arrive throughout the event
+        sample_sec: trajectory sample interval (TMI tier-0 resolution)
+    """
+
+    def __init__(self, flights: int = 600, mit_fixes: int = 4, gs_programs: int = 1,
+                 reroute_programs: int = 1, hold_pct: float = 5.0, destinations: int = 1,
+                 hours: float = 4.0, sample_sec: int = 30, seed: int = 1,
+                 start_utc: datetime = datetime(2026, 3, 1, 22, 0)):
+        self.flight_count = flights
+        self.mit_fixes = max(1, mit_fixes)
+        self.gs_programs = gs_programs
+        self.reroute_programs = reroute_programs
+        self.hold_pct = hold_pct
+        self.destinations = HUBS[:max(1, min(destinations, len(HUBS)))]
+        self.hours = hours
+        self.sample_sec = sample_sec
+        self.seed = seed
+        self.start_utc = start_utc
+        self.end_utc = start_utc + timedelta(hours=hours)
+        self.rnd = random.Random(seed)
+        self._names = set(AIRPORTS) | {a[1:] for a in AIRPORTS}
+
+    # --- Reference data ---
+
+    def _fix_name(self) -> str:
+        consonants, vowels = 'BCDFGHJKLMNPRSTVWZ', 'AEIOU'
+        while True:
+            name = ''.join(self.rnd.choice(consonants if i % 2 == 0 else vowels) for i in range(5))
+            if name not in self._names:
+                self._names.add(name)
+                return name
+
+    def _build_airspace(self):
+        self.fixes = {}
+        self.airways = {}
+        self.stars = {}
+        self.arrival_fixes = {}   # dest -> [(fix, bearing from dest)]
+        self.star_names = {}      # arrival fix -> STAR name
+        self.corridors = {}       # (orig, dest) -> {'primary': [...], 'alternate': [...], airways}
+
+        for dest in self.destinations:
+            dlat, dlon = AIRPORTS[dest]
+            offset = self.rnd.uniform(0, 360 / self.mit_fixes)
+            arrivals = []
+            for k in range(self.mit_fixes):
+                bearing = (offset + k * 360 / self.mit_fixes) % 360
+                name = self._fix_name()
+                self.fixes[name] = destination_point(dlat, dlon, bearing, ARRIVAL_FIX_NM)
+                self.star_names[name] = f"{name}{self.rnd.randint(1, 9)}"
+                arrivals.append((name, bearing))
+            self.arrival_fixes[dest] = arrivals
+
+            # STAR fixes: the arrival fixes plus a feeder fix 20 nm out on each
+            star_fixes = []
+            for name, bearing in arrivals:
+                feeder = self._fix_name()
+                self.fixes[feeder] = destination_point(dlat, dlon, bearing, ARRIVAL_FIX_NM - 20)
+                star_fixes.extend([name, feeder])
+            self.stars[dest] = star_fixes
+
+        airway_numbers = iter(self.rnd.sample(range(2, 1000), 998))
+        for dest in self.destinations:
+            dlat, dlon = AIRPORTS[dest]
+            for orig, (olat, olon) in AIRPORTS.items():
+                if orig in self.destinations:
+                    continue
+                inbound = calculate_bearing(dlat, dlon, olat, olon)
+                arr_fix = min(self.arrival_fixes[dest], key=lambda a: _angle_diff(a[1], inbound))[0]
+                alat, alon = self.fixes[arr_fix]
+
+                dep_fix = self._fix_name()
+                self.fixes[dep_fix] = destination_point(
+                    olat, olon, calculate_bearing(olat, olon, alat, alon), DEPARTURE_FIX_NM)
+                mid_lat = olat + 0.55 * (alat - olat)
+                mid_lon = olon + 0.55 * (alon - olon)
+                track = calculate_bearing(olat, olon, alat, alon)
+                primary_mid = self._fix_name()
+                self.fixes[primary_mid] = (mid_lat, mid_lon)
+                alternate_mid = self._fix_name()
+                self.fixes[alternate_mid] = destination_point(
+                    mid_lat, mid_lon, (track + self.rnd.choice([90, 270])) % 360, ALTERNATE_OFFSET_NM)
+
+                number = next(airway_numbers)
+                primary_awy, alternate_awy = f"J{number}", f"Q{number}"
+                self.airways[primary_awy] = [dep_fix, primary_mid]
+                self.airways[alternate_awy] = [dep_fix, alternate_mid]
+                self.corridors[(orig, dest)] = {
+                    'primary': (primary_awy, [dep_fix, primary_mid, arr_fix]),
+                    'alternate': (alternate_awy, [dep_fix, alternate_mid, arr_fix]),
+                }
+
+    def _route_string(self, orig: str, dest: str, corridor: str, marked: bool = False) -> str:
+        airway, (dep_fix, mid, arr_fix) = self.corridors[(orig, dest)][corridor]
+        mid_token = f">{mid}<" if marked else mid
+        return f"{dep_fix} {airway} {mid_token} {arr_fix} {self.star_names[arr_fix]}"
+
+    # --- Programs ---
+
+    def _build_programs(self) -> Tuple[List[GSProgram], List[RerouteProgram]]:
+        span = self.end_utc - self.start_utc
+        gs_programs = []
+        for i in range(self.gs_programs):
+            dest = self.destinations[i % len(self.destinations)]
+            start = self.start_utc + span * (0.2 + 0.5 * self.rnd.random())
+            end = start + timedelta(minutes=self.rnd.choice([30, 45, 60, 90]))
+            dlat, dlon = AIRPORTS[dest]
+            # 1st tier: ARTCCs of origins within 800 nm
+            tier = sorted({artcc_at(*AIRPORTS[o]) for o in AIRPORTS
+                           if o not in self.destinations and
+                           haversine_nm(dlat, dlon, *AIRPORTS[o]) <= 800})
+            advisory = GSAdvisory(
+                advzy_number=f"{10 + i:03d}", advisory_type='INITIAL',
+                adl_time=start - timedelta(minutes=10), gs_period_start=start, gs_period_end=end,
+                dep_facilities=tier, dep_facility_tier='1stTier',
+                impacting_condition='WEATHER / THUNDERSTORMS', raw_text='')
+            gs_programs.append(GSProgram(
+                airport=dest[1:], advisories=[advisory], dep_facilities=tier,
+                dep_facility_tier='1stTier', effective_start=start, effective_end=end,
+                ended_by='EXPIRATION', impacting_condition=advisory.impacting_condition))
+
+        reroute_programs = []
+        for i in range(self.reroute_programs):
+            dest = self.destinations[i % len(self.destinations)]
+            origins = [o for (o, d) in self.corridors if d == dest]
+            origins = sorted(self.rnd.sample(origins, min(3, len(origins))))
+            start = self.start_utc - timedelta(hours=1)
+            end = self.end_utc
+            routes = [RouteEntry(origins=[o], destination=dest,
+                                 route_string=self._route_string(o, dest, 'alternate', marked=True),
+                                 required_fixes=[self.corridors[(o, dest)]['alternate'][1][1]])
+                      for o in origins]
+            advisory = RerouteAdvisory(
+                advzy_number=f"{50 + i:03d}", advisory_type='INITIAL', route_type='ROUTE',
+                action='RQD', adl_time=start, valid_start=start, valid_end=end, time_type='ETD',
+                routes=routes, origins=origins, destinations=[dest])
+            reroute_programs.append(RerouteProgram(
+                name=f"BENCH_{dest[1:]}_RR{i + 1}", tmi_id=f"RR{i + 1:03d}", route_type='ROUTE',
+                action='RQD', advisories=[advisory], constrained_area=artcc_at(*AIRPORTS[dest]),
+                reason='WEATHER', effective_start=start, effective_end=end, ended_by='EXPIRATION',
+                current_routes=routes, origins=origins, destinations=[dest]))
+        return gs_programs, reroute_programs
+
+    def _build_tmis(self) -> List[TMI]:
+        tmis = []
+        for dest in self.destinations:
+            dlat, dlon = AIRPORTS[dest]
+            requestor = artcc_at(dlat, dlon)
+            for k, (fix, bearing) in enumerate(self.arrival_fixes[dest]):
+                upstream = artcc_at(*destination_point(dlat, dlon, bearing, 300))
+                minit = k % 4 == 3
+                tmis.append(TMI(
+                    tmi_id=f"{dest[1:]}_{fix}_{'MINIT' if minit else 'MIT'}",
+                    tmi_type=TMIType.MINIT if minit else TMIType.MIT,
+                    fix=fix, destinations=[dest[1:]],
+                    value=self.rnd.choice([5, 7, 10]) if minit else self.rnd.choice([15, 20, 25, 30]),
+                    unit='min' if minit else 'nm',
+                    requestor=requestor if upstream != requestor else '',
+                    provider=upstream if upstream != requestor else '',
+                    start_utc=self.start_utc, end_utc=self.end_utc,
+                    raw_text=f"{fix} via {dest[1:]} {'MINIT' if minit else 'MIT'}"))
+        return tmis
+
+    # --- Flights ---
+
+    def _fly(self, flight: SyntheticFlight, path: List[Tuple[float, float]], arr_index: int):
+        """Sample the trajectory of a flight along path (arr_index = arrival fix position)"""
+        rnd = self.rnd
+        legs = [haversine_nm(*path[i], *path[i + 1]) for i in range(len(path) - 1)]
+        cum = [0.0]
+        for leg in legs:
+            cum.append(cum[-1] + leg)
+        total = cum[-1]
+        arr_dist = cum[arr_index]
+        cruise_kts = rnd.uniform(420, 490)
+        cruise_alt = rnd.randrange(*CRUISE_ALT_FT, 1000)
+
+        def state(s: float) -> Tuple[float, float]:
+            to_go = total - s
+            if s < 40:
+                return 250 + 4 * s, min(cruise_alt, 1500 + s * 300)
+            if to_go < ARRIVAL_FIX_NM:
+                return 160 + 90 * to_go / ARRIVAL_FIX_NM, 1500 + 11000 * to_go / ARRIVAL_FIX_NM
+            if to_go < 150:
+                frac = (to_go - ARRIVAL_FIX_NM) / (150 - ARRIVAL_FIX_NM)
+                return 280 + (cruise_kts - 280) * frac, 12500 + (cruise_alt - 12500) * frac
+            return cruise_kts, cruise_alt
+
+        def position(s: float) -> Tuple[float, float]:
+            i = min(max(0, next((k for k in range(1, len(cum)) if cum[k] >= s), len(cum) - 1) - 1),
+                    len(legs) - 1)
+            f = (s - cum[i]) / legs[i] if legs[i] else 0.0
+            (lat1, lon1), (lat2, lon2) = path[i], path[i + 1]
+            return lat1 + (lat2 - lat1) * f, lon1 + (lon2 - lon1) * f
+
+        t = flight.off_utc
+        s = 0.0
+        dt = self.sample_sec
+        held = False
+        points = flight.points
+        while s < total:
+            gs, alt = state(s)
+            lat, lon = position(s)
+            points.append((t, lat + rnd.uniform(-0.01, 0.01), lon + rnd.uniform(-0.01, 0.01),
+                           round(gs + rnd.uniform(-8, 8)), round(alt, -2)))
+            if flight.holds and not held and s >= arr_dist:
+                t = self._hold(flight, path[arr_index], calculate_bearing(*path[arr_index - 1], *path[arr_index]), t)
+                held = True
+            s += gs * dt / 3600
+            t += timedelta(seconds=dt)
+        lat, lon = path[-1]
+        points.append((t, lat, lon, 140.0, 800.0))
+        flight.last_seen = t + timedelta(minutes=8)
+
+    def _hold(self, flight: SyntheticFlight, fix: Tuple[float, float], course: float,
+              t: datetime) -> datetime:
+        """Append a right-hand racetrack at fix (inbound course) and return the exit time"""
+        r = HOLD_SPEED_KTS / (20 * math.pi)      # standard-rate turn radius (nm)
+        perimeter = 2 * HOLD_LEG_NM + 2 * math.pi * r
+        alt = self.rnd.randrange(*HOLD_ALT_FT, 1000)
+        c = math.radians(course)
+        lat0, lon0 = fix
+        step = HOLD_SPEED_KTS * self.sample_sec / 3600
+        t += timedelta(seconds=HOLD_REPORT_GAP_SEC)
+        p = 0.0
+        while p < perimeter * flight.holds:
+            q = p % perimeter
+            if q < math.pi * r:
+                a = q / r
+                x, y = r * math.sin(a), r - r * math.cos(a)
+            elif q < math.pi * r + HOLD_LEG_NM:
+                x, y = -(q - math.pi * r), 2 * r
+            elif q < 2 * math.pi * r + HOLD_LEG_NM:
+                a = (q - math.pi * r - HOLD_LEG_NM) / r
+                x, y = -HOLD_LEG_NM - r * math.sin(a), r + r * math.cos(a)
+            else:
+                x, y = -HOLD_LEG_NM + (q - 2 * math.pi * r - HOLD_LEG_NM), 0.0
+            # x along the inbound course, y to its right
+            lat = lat0 + (x * math.cos(c) - y * math.sin(c)) / 60
+            lon = lon0 + (x * math.sin(c) + y * math.cos(c)) / (60 * math.cos(math.radians(lat0)))
+            t += timedelta(seconds=self.sample_sec)
+            flight.points.append((t, lat, lon, HOLD_SPEED_KTS + self.rnd.uniform(-5, 5), alt))
+            p += step
+        return t + timedelta(seconds=HOLD_REPORT_GAP_SEC)
+
+    def _build_flights(self, gs_programs: List[GSProgram],
+                       reroute_programs: List[RerouteProgram]) -> List[SyntheticFlight]:
+        rnd = self.rnd
+        rerouted = {(o, p.destinations[0]): p for p in reroute_programs for o in p.origins}
+        gs_by_dest = defaultdict(list)
+        for program in gs_programs:
+            gs_by_dest['K' + program.airport].append(program)
+
+        origins = [o for o in AIRPORTS if o not in self.destinations]
+        flights = []
+        used_callsigns = set()
+        span_sec = (self.end_utc - self.start_utc).total_seconds()
+        for n in range(self.flight_count):
+            dest = self.destinations[n % len(self.destinations)]
+            orig = rnd.choice(origins)
+            airline_icao, airline_name = rnd.choice(AIRLINES)
+            callsign = f"{airline_icao}{rnd.randint(100, 9999)}"
+            while callsign in used_callsigns:
+                callsign = f"{airline_icao}{rnd.randint(100, 9999)}"
+            used_callsigns.add(callsign)
+
+            # Reroute: 75% of the affected traffic files and flies the required route
+            program = rerouted.get((orig, dest))
+            corridor = 'alternate' if program and rnd.random() < 0.75 else 'primary'
+            airway, fixes = self.corridors[(orig, dest)][corridor]
+            path = [AIRPORTS[orig]] + [self.fixes[f] for f in fixes] + [AIRPORTS[dest]]
+            route_dist = sum(haversine_nm(*path[i], *path[i + 1]) for i in range(len(path) - 1))
+
+            # Arrival at the arrival fix spread over the event; departure backed out of it
+            arrive = self.start_utc + timedelta(seconds=rnd.uniform(0, span_sec))
+            enroute_min = (route_dist - ARRIVAL_FIX_NM) / 430 * 60
+            off = arrive - timedelta(minutes=enroute_min)
+
+            # Ground stop: 85% of the flights scoped by a GS wait until it ends
+            dept_artcc = artcc_at(*AIRPORTS[orig])
+            for gs in gs_by_dest.get(dest, []):
+                if dept_artcc in gs.dep_facilities and gs.effective_start <= off < gs.effective_end:
+                    if rnd.random() < 0.85:
+                        off = gs.effective_end + timedelta(minutes=rnd.uniform(1, 20))
+
+            out = off - timedelta(minutes=rnd.uniform(8, 25))
+            flight = SyntheticFlight(
+                callsign=callsign, flight_uid=100000 + n, dept=orig, dest=dest,
+                route=self._route_string(orig, dest, corridor),
+                waypoints=[orig] + fixes + [dest],
+                first_seen=out - timedelta(minutes=rnd.uniform(10, 40)),
+                out_utc=out, off_utc=off, last_seen=off,
+                airline_icao=airline_icao, airline_name=airline_name,
+                route_dist_nm=round(route_dist, 1),
+                gcd_nm=round(haversine_nm(*AIRPORTS[orig], *AIRPORTS[dest]), 1),
+                holds=rnd.randint(1, 3) if rnd.random() * 100 < self.hold_pct else 0)
+            self._fly(flight, path, arr_index=len(path) - 2)
+            flights.append(flight)
+        return flights
+
+    def generate(self) -> SyntheticEvent:
+        self._build_airspace()
+        gs_programs, reroute_programs = self._build_programs()
+        tmis = self._build_tmis()
+        flights = self._build_flights(gs_programs, reroute_programs)
+        event = EventConfig(
+            name=f"Synthetic benchmark ({self.flight_count} flights, seed {self.seed})",
+            start_utc=self.start_utc, end_utc=self.end_utc,
+            destinations=[d[1:] for d in self.destinations],
+            tmis=tmis, gs_programs=gs_programs, reroute_programs=reroute_programs)
+        params = {
+            'flights': self.flight_count, 'mit_fixes': self.mit_fixes,
+            'gs_programs': self.gs_programs, 'reroute_programs': self.reroute_programs,
+            'hold_pct': self.hold_pct, 'destinations': self.destinations,
+            'hours': self.hours, 'sample_sec': self.sample_sec, 'seed': self.seed,
+        }
+        return SyntheticEvent(event=event, flights=flights, fixes=self.fixes, airports=dict(AIRPORTS),
+                              airways=self.airways, stars=self.stars, params=params)
+
+
+# ---------------------------------------------------------------------------
+# Database stand-ins
+# ---------------------------------------------------------------------------
+
+_IN_LIST_RE = r"{}\s+IN\s+\(([^)]*)\)"
+_DATE_FMT = '%Y-%m-%d %H:%M:%S'
+
+
+def _in_list(sql: str, column: str) -> Optional[set]:
+    """Values of the first literal `column IN ('A','B')` list in sql"""
+    match = re.search(_IN_LIST_RE.format(re.escape(column)), sql)
+    if not match:
+        return None
+    return {v.strip().strip("'") for v in match.group(1).split(',')}
+
+
+def _parse_time(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.strptime(value, _DATE_FMT)
+
+
+class UnsupportedStatement(Exception):
+    """Raised by the GIS stand-in for statements it does not emulate"""
+
+
+class SyntheticDatabase:
+    """
+    In-memory ADL + GIS contents for a SyntheticEvent.
+
+    latency_ms adds a fixed delay to every statement, to approximate
+    network round trips. stats counts statements per handler.
+    """
+
+    def __init__(self, synthetic: SyntheticEvent, latency_ms: float = 0.0):
+        self.synthetic = synthetic
+        self.latency_sec = latency_ms / 1000.0
+        self.flights = {f.callsign: f for f in synthetic.flights}
+        self.flights_by_uid = {f.flight_uid: f for f in synthetic.flights}
+        self.stats = Counter()
+        self.rows = Counter()
+
+        self.temp_tables = {}  # session temp table -> set of staged keys
+
+        self._adl_handlers = [
+            ('ping', lambda s: s.strip() == 'SELECT 1', lambda sql, params: [(1,)]),
+            ('temp_table', lambda s: 'TABLE #' in s, self._temp_table_ddl),
+            ('temp_insert', lambda s: 'INSERT INTO #' in s, self._temp_insert),
+            ('watermarks', lambda s: 'COUNT_BIG' in s, self._watermarks),
+            ('trajectories', lambda s: 'source_table' in s and 'ROW_NUMBER' in s and 'BETWEEN' not in s,
+             self._trajectories),
+            ('featured_flights', lambda s: 'adl_flight_aircraft' in s, self._featured_flights),
+            ('flights_for_tmi', lambda s: 'FROM dbo.adl_flight_core c' in s and 'p.afix' in s,
+             self._flights_for_tmi),
+            ('flight_waypoints', lambda s: 'adl_flight_waypoints' in s, self._flight_waypoints),
+            ('plan_metadata', lambda s: 'artccs_traversed' in s, self._plan_metadata),
+            ('star_fixes', lambda s: 'nav_procedure_legs' in s, self._star_fixes),
+            ('nav_fixes', lambda s: 'dbo.nav_fixes' in s and 'fix_name IN' in s, self._nav_fixes),
+            ('nav_fixes_bbox', lambda s: 'dbo.nav_fixes' in s and 'BETWEEN' in s, self._nav_fixes_bbox),
+            ('airport_artcc', lambda s: 'RESP_ARTCC_ID' in s, self._airport_artcc),
+            ('airport_coords', lambda s: 'dbo.apts' in s and 'UNION' in s, self._airport_coords),
+            ('airport_centroid', lambda s: 'dbo.apts' in s, self._airport_centroid),
+            ('airways', lambda s: 'airway_segments' in s, self._airways),
+            ('taxi_reference', lambda s: 'airport_taxi_reference' in s, self._taxi_reference),
+            ('connect_reference', lambda s: 'airport_connect_reference' in s, self._connect_reference),
+        ]
+        self._gis_handlers = [
+            ('ping', lambda s: s.strip() == 'SELECT 1', lambda sql, params: [(1,)]),
+            ('crossings_batch', lambda s: 'jsonb_each' in s, self._crossings_batch),
+            ('crossings', lambda s: 'get_trajectory_' in s, self._crossings),
+            ('route_artccs', lambda s: 'expand_route_with_artccs' in s, self._route_artccs),
+            ('expand_route', lambda s: 'expand_route(' in s, self._expand_route),
+            # The grid ARTCCs never change, so their watermark is constant
+            ('boundary_watermarks', lambda s: 'MAX(updated_at)' in s,
+             lambda sql, params: [('ARTCC', 1, None), ('SECTOR', 0, None), ('TRACON', 0, None)]),
+            ('tracon_sub_codes', lambda s: 'tracon_boundaries' in s, lambda sql, params: []),
+            # Sub-branch DBSCAN has no fallback in the analyzer; finding no
+            # branches keeps every stream whole
+            ('branch_segs', lambda s: '_tmp_branch_segs' in s, lambda sql, params: []),
+        ]
+
+    # --- Dispatch ---
+
+    def execute(self, kind: str, sql: str, params) -> list:
+        if self.latency_sec:
+            time.sleep(self.latency_sec)
+        handlers = self._adl_handlers if kind == 'adl' else self._gis_handlers
+        for name, matches, handler in handlers:
+            if matches(sql):
+                rows = handler(sql, params)
+                self.stats[f"{kind}.{name}"] += 1
+                self.rows[f"{kind}.{name}"] += len(rows)
+                return rows
+        self.stats[f"{kind}.unsupported"] += 1
+        if kind == 'gis':
+            raise UnsupportedStatement(f"synthetic GIS does not emulate: {' '.join(sql.split())[:60]}")
+        return []
+
+    # --- ADL ---
+
+    def _flight_row(self, f: SyntheticFlight) -> tuple:
+        expanded = ' '.join(f.waypoints)
+        return (f.callsign, f.flight_uid, f.dept, f.dest, f.first_seen, f.last_seen,
+                f.route, expanded, f.waypoints[-2], f.off_utc, f.off_utc, f.out_utc,
+                artcc_at(*AIRPORTS[f.dept]), None, f.airline_icao, f.airline_name,
+                f.gcd_nm, f.route_dist_nm, int(f.route_dist_nm / 430 * 60))
+
+    def _active(self, f: SyntheticFlight, params) -> bool:
+        window_end, window_start = _parse_time(params[0]), _parse_time(params[1])
+        return f.first_seen <= window_end and f.last_seen >= window_start
+
+    def _watermarks(self, sql, params):
+        points = sum(len(f.points) for f in self.synthetic.flights)
+        last = max((f.last_seen for f in self.synthetic.flights), default=None)
+        return [('CORE', len(self.synthetic.flights), last), ('TMI', points, last),
+                ('LIVE', 0, None), ('ARCHIVE', 0, None)]
+
+    def _featured_flights(self, sql, params):
+        facilities = _in_list(sql, 'p.fp_dept_icao') or set()
+        return [self._flight_row(f) for f in self.synthetic.flights
+                if (f.dept in facilities or f.dest in facilities) and self._active(f, params)]
+
+    def _flights_for_tmi(self, sql, params):
+        dests = _in_list(sql, 'p.fp_dest_icao')
+        origs = _in_list(sql, 'p.fp_dept_icao')
+        afix = re.search(r"p\.afix = '([^']*)'", sql)
+        rows = []
+        for f in self.synthetic.flights:
+            if dests and f.dest not in dests or origs and f.dept not in origs:
+                continue
+            if afix and afix.group(1) not in f.waypoints:
+                continue
+            if self._active(f, params):
+                rows.append(self._flight_row(f)[:6] + (' '.join(f.waypoints), f.waypoints[-2]))
+        return rows
+
+    def _temp_table_ddl(self, sql, params):
+        name = re.search(r'TABLE (#\w+)', sql).group(1)
+        if 'CREATE TABLE' in sql:
+            self.temp_tables[name] = set()
+        else:
+            self.temp_tables.pop(name, None)
+        return []
+
+    def _temp_insert(self, sql, params):
+        name = re.search(r'INSERT INTO (#\w+)', sql).group(1)
+        self.temp_tables[name].update(params)
+        return []
+
+    def _callsign_filter(self, sql: str, column: str) -> set:
+        """Callsigns of a literal IN list on column, or of the joined temp table"""
+        joined = re.search(r'JOIN (#\w+)', sql)
+        if joined:
+            return set(self.temp_tables.get(joined.group(1), ()))
+        return _in_list(sql, column) or set()
+
+    def _trajectories(self, sql, params):
+        callsigns = self._callsign_filter(sql, 'c.callsign')
+        start, end = _parse_time(params[0]), _parse_time(params[1])
+        rows = []
+        for cs in sorted(callsigns):
+            f = self.flights.get(cs)
+            if not f:
+                continue
+            for ts, lat, lon, gs, alt in f.points:
+                if start <= ts <= end:
+                    rows.append((cs, f.flight_uid, ts, lat, lon, gs, alt, f.dept, f.dest, 0, 'TMI'))
+        return rows
+
+    def _flight_waypoints(self, sql, params):
+        full = 'cum_dist_nm' in sql
+        rows = []
+        for uid in params:
+            f = self.flights_by_uid.get(uid)
+            if not f:
+                continue
+            cum = 0.0
+            prev = None
+            for seq, name in enumerate(f.waypoints, 1):
+                coords = self.synthetic.fixes.get(name) or AIRPORTS.get(name)
+                seg = haversine_nm(*prev, *coords) if prev else 0.0
+                cum += seg
+                prev = coords
+                if full:
+                    fix_type = 'airport' if name in AIRPORTS else 'fix'
+                    rows.append((uid, name, coords[0], coords[1], seq, fix_type, 'route', cum, seg))
+                else:
+                    rows.append((uid, name, coords[0], coords[1], seq))
+        return rows
+
+    def _plan_metadata(self, sql, params):
+        rows = []
+        for uid in params:
+            f = self.flights_by_uid.get(uid)
+            if f:
+                path = [self.synthetic.fixes.get(n) or AIRPORTS[n] for n in f.waypoints]
+                rows.append((uid, ' '.join(self._artccs_along(path)), f.route_dist_nm, 'COMPLETE'))
+        return rows
+
+    def _star_fixes(self, sql, params):
+        dest = params[0]
+        return [(name, *self.synthetic.fixes[name]) for name in self.synthetic.stars.get(dest, [])]
+
+    def _nav_fixes(self, sql, params):
+        names = _in_list(sql, 'fix_name') or set()
+        return [(n, *self.synthetic.fixes[n]) for n in sorted(names) if n in self.synthetic.fixes]
+
+    def _nav_fixes_bbox(self, sql, params):
+        lat_min, lat_max, lon_min, lon_max = params
+        return [(n, lat, lon) for n, (lat, lon) in self.synthetic.fixes.items()
+                if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max]
+
+    def _airport_artcc(self, sql, params):
+        return [(icao, artcc_at(lat, lon)) for icao, (lat, lon) in AIRPORTS.items()]
+
+    def _airport_coords(self, sql, params):
+        codes = _in_list(sql, 'ICAO_ID') or set()
+        rows = []
+        for code in sorted(codes):
+            icao = code if code in AIRPORTS else f"K{code}"
+            if icao in AIRPORTS:
+                rows.append((code, *AIRPORTS[icao]))
+        return rows
+
+    def _airport_centroid(self, sql, params):
+        codes = _in_list(sql, 'ICAO_ID') or set()
+        return [AIRPORTS[c] for c in sorted(codes) if c in AIRPORTS]
+
+    def _airways(self, sql, params):
+        return [(name,) for name in self.synthetic.airways]
+
+    def _taxi_reference(self, sql, params):
+        return [(icao, 540 + (i * 37) % 300, 'HIGH') for i, icao in enumerate(AIRPORTS)]
+
+    def _connect_reference(self, sql, params):
+        return [(icao, 780 + (i * 53) % 420, 'HIGH') for i, icao in enumerate(AIRPORTS)]
+
+    # --- GIS ---
+
+    @staticmethod
+    def _grid_crossings(path: List[Tuple[float, float]], lookahead: Optional[float] = None) -> List[tuple]:
+        """
+        (code, lat, lon, fraction, type, EXIT/ENTRY) rows for grid boundaries crossed by path.
+
+        With lookahead, a row is an ENTRY when its cell contains the point
+        lookahead further along the path (get_trajectory_all_crossings); else
+        the cells just before/after the crossing are the EXIT/ENTRY.
+        """
+        # Planar lon/lat lengths, as ST_LineLocatePoint on the trajectory geometry
+        legs = [math.hypot(path[i + 1][0] - path[i][0], path[i + 1][1] - path[i][1])
+                for i in range(len(path) - 1)]
+        total = sum(legs)
+        if total <= 0:
+            return []
+        rows = []
+        done = 0.0
+        for i, leg in enumerate(legs):
+            (lat1, lon1), (lat2, lon2) = path[i], path[i + 1]
+            if grid_cell(lat1, lon1) != grid_cell(lat2, lon2):
+                ts = []
+                for v1, v2, origin, size in ((lat1, lat2, GRID_ORIGIN[0], GRID_LAT_DEG),
+                                             (lon1, lon2, GRID_ORIGIN[1], GRID_LON_DEG)):
+                    lo, hi = sorted((v1, v2))
+                    line = math.floor((lo - origin) / size) + 1
+                    while origin + line * size <= hi:
+                        ts.append((origin + line * size - v1) / (v2 - v1))
+                        line += 1
+                for t in sorted(ts):
+                    lat, lon = round(lat1 + (lat2 - lat1) * t, 6), round(lon1 + (lon2 - lon1) * t, 6)
+                    before = artcc_at(lat1 + (lat2 - lat1) * (t - 1e-6), lon1 + (lon2 - lon1) * (t - 1e-6))
+                    after = artcc_at(lat1 + (lat2 - lat1) * (t + 1e-6), lon1 + (lon2 - lon1) * (t + 1e-6))
+                    fraction = (done + leg * t) / total
+                    if lookahead is None:
+                        rows.append((before, lat, lon, fraction, 'ARTCC', 'EXIT'))
+                        rows.append((after, lat, lon, fraction, 'ARTCC', 'ENTRY'))
+                        continue
+                    ahead = artcc_at(*SyntheticDatabase._point_along(path, legs, min(fraction + lookahead, 1.0)))
+                    for code in (before, after):
+                        rows.append((code, lat, lon, fraction, 'ARTCC', 'ENTRY' if code == ahead else 'EXIT'))
+            done += leg
+        if lookahead is not None:
+            rows.sort(key=lambda r: (r[3], r[5] == 'ENTRY', r[0]))
+        return rows
+
+    @staticmethod
+    def _point_along(path: List[Tuple[float, float]], legs: List[float], fraction: float) -> Tuple[float, float]:
+        """(lat, lon) at a planar length fraction of path"""
+        remaining = fraction * sum(legs)
+        for i, leg in enumerate(legs):
+            if remaining <= leg and leg > 0:
+                t = remaining / leg
+                return (path[i][0] + (path[i + 1][0] - path[i][0]) * t,
+                        path[i][1] + (path[i + 1][1] - path[i][1]) * t)
+            remaining -= leg
+        return path[-1]
+
+    def _artccs_along(self, path: List[Tuple[float, float]]) -> List[str]:
+        artccs = [artcc_at(*path[0])] if path else []
+        artccs += [r[0] for r in self._grid_crossings(path) if r[5] == 'ENTRY']
+        return list(dict.fromkeys(artccs))
+
+    def _crossing_rows(self, waypoints, sql: str) -> List[tuple]:
+        rows = self._grid_crossings([(w['lat'], w['lon']) for w in waypoints],
+                                    lookahead=ENTRY_LOOKAHEAD_FRACTION)
+        if 'artcc_crossings' in sql:
+            return [r[:4] for r in rows]
+        return rows
+
+    def _crossings_batch(self, sql, params):
+        payload = json.loads(params[0])
+        rows = []
+        for callsign in sorted(payload):
+            rows.extend((callsign,) + r for r in self._crossing_rows(payload[callsign], sql))
+        return rows
+
+    def _crossings(self, sql, params):
+        return self._crossing_rows(json.loads(params[0]), sql)
+
+    def _expand(self, route: str) -> List[tuple]:
+        """(seq, id, lat, lon, type) for the resolvable tokens of a route string"""
+        waypoints = []
+        via = None
+        for token in route.replace('>', ' ').replace('<', ' ').upper().split():
+            if token in self.synthetic.airways:
+                via = token
+                continue
+            if token in AIRPORTS:
+                waypoints.append((token, *AIRPORTS[token], 'airport'))
+            elif token in self.synthetic.fixes:
+                waypoints.append((token, *self.synthetic.fixes[token], f"airway_{via}" if via else 'nav_fix'))
+            via = None
+        return [(seq, *wp) for seq, wp in enumerate(waypoints, 1)]
+
+    def _expand_route(self, sql, params):
+        if 'unnest' in sql:
+            return [(route,) + wp for route in params[0] for wp in self._expand(route)]
+        return self._expand(params[0])
+
+    def _route_artccs(self, sql, params):
+        def artccs(route):
+            path = [(wp[2], wp[3]) for wp in self._expand(route)]
+            return ' '.join(self._artccs_along(path)) or None
+        if 'unnest' in sql:
+            return [(route, artccs(route)) for route in params[0]]
+        return [(artccs(params[0]),)]
+
+
+class _SyntheticCursor:
+    def __init__(self, db: SyntheticDatabase, kind: str):
+        self._db = db
+        self._kind = kind
+        self._rows = []
+        self._pos = 0
+
+    def execute(self, sql, params=None):
+        self._rows = self._db.execute(self._kind, sql, params)
+        self._pos = 0
+
+    def fetchall(self):
+        return self.fetchmany(len(self._rows))
+
+    def fetchmany(self, size=1):
+        rows = self._rows[self._pos:self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        pass
+
+
+class _SyntheticConn:
+    def __init__(self, db: SyntheticDatabase, kind: str):
+        self._db = db
+        self._kind = kind
+        self.autocommit = True
+
+    def cursor(self):
+        return _SyntheticCursor(self._db, self._kind)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def connection_classes(db: SyntheticDatabase) -> tuple:
+    """(ADLConnection, GISConnection) replacements bound to db"""
+
+    class SyntheticADLConnection(ADLConnection):
+        def connect(self):
+            self.conn = _SyntheticConn(db, 'adl')
+            self.driver = 'pymssql'
+            return self.conn
+
+    class SyntheticGISConnection:
+        def __init__(self):
+            self.conn = None
+
+        def __enter__(self):
+            self.connect()
+            return self
+
+        def __exit__(self, exc_type, exc_val, exc_tb):
+            self.close()
+
+        def connect(self):
+            self.conn = _SyntheticConn(db, 'gis')
+            return self.conn
+
+        def cursor(self):
+            return self.conn.cursor()
+
+        def close(self):
+            pass
+
+    return SyntheticADLConnection, SyntheticGISConnection
+
+
+@contextmanager
+def stub_connections(db: SyntheticDatabase, gis: bool = True):
+    """
+    Route the analyzer's (and its worker processes') ADL/GIS connections to db.
+
+    With gis=False the GIS connection fails to open, as when PostGIS is
+    unavailable.
+    """
+    adl_cls, gis_cls = connection_classes(db)
+    if not gis:
+        class NoGISConnection(gis_cls):
+            def connect(self):
+                raise ConnectionError("GIS disabled for this benchmark run")
+        gis_cls = NoGISConnection
+
+    saved = [(module, name, getattr(module, name))
+             for module in (analyzer_module, parallel_module, session_module)
+             for name in ('ADLConnection', 'GISConnection')]
+    try:
+        for module in (analyzer_module, parallel_module, session_module):
+            module.ADLConnection = adl_cls
+            module.GISConnection = gis_cls
+        yield db
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
@@ -7,7 +7,10 @@ Core analysis logic for MIT, MINIT, and Ground Stop compliance.
 
 import math
 import re
+import sys
 import logging
+import time
+from contextlib import contextmanager, nullcontext
 from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from typing import Dict, List, Any, Optional
@@ -26,7 +29,28 @@ from .models import (
     HOLD_FIX_MATCH_RADIUS_NM,
     classify_route_token
 )
+from .boundary_engine import DEFAULT_GEOJSON_DIR, LocalBoundaryEngine
 from .database import ADLConnection, GISConnection
+from .crossing_engine import FixCrossingEngine, HAS_NUMPY
+from .gis_crossings import (
+    BoundaryCrossingBatcher, DEFAULT_GIS_BATCH_SIZE, DEFAULT_GIS_WORKERS,
+    query_flight_crossings, trajectory_waypoints
+)
+from .holding_engine import centers_within, screen_holding_segments
+from .input_cache import AnalyzerInputCache, REFERENCE_TTL_SEC
+from .parallel import AnalysisTaskRunner, DEFAULT_WORKERS
+from .profiler import AnalysisProfiler
+from .session import AnalysisSession
+from .spacing_engine import SpacingPairs, build_spacing_pairs, empty_distribution
+from .route_cache import RouteExpansionCache
+from .spatial_index import PointGridIndex
+from .stream_clustering import (
+    APPROACH_MIN_FLIGHTS, BRANCH_MIN_FLIGHTS, approach_clusters, position_clusters
+)
+from .trajectory_loader import CALLSIGN_TABLE, TrajectoryLoader
+from .trajectory_store import (
+    TrajectoryStore, TrajectoryStoreBuilder, as_trajectory_view, is_gs_valid
+)
 import json
 
 logger = logging.getLogger(__name__)
@@ -88,10 +112,35 @@ def calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> flo
     return (math.degrees(bearing) + 360) % 360
 
 
+def _lcs_row_bits(ids_a: List[int], ids_b: List[int]) -> List[int]:
+    """Bit-parallel LCS rows (Allison-Dix / Hyyro) over interned token ids.
+
+    Returns rows[i] for i in 0..m: bit j-1 is set iff dp[i][j] = dp[i][j-1] + 1
+    in the classic LCS table, so dp[i][j] = popcount(rows[i] & ((1 << j) - 1)).
+    Each row is one Python int of n bits: O(m * n / wordsize) time and memory.
+    """
+    n = len(ids_b)
+    full = (1 << n) - 1
+    match_masks = {}
+    for j, t in enumerate(ids_b):
+        match_masks[t] = match_masks.get(t, 0) | (1 << j)
+
+    rows = [0]
+    v = full  # complement of the increment bits
+    for t in ids_a:
+        u = v & match_masks.get(t, 0)
+        v = ((v + u) | (v - u)) & full
+        rows.append(~v & full)
+    return rows
+
+
 def lcs_alignment(seq_a: List[str], seq_b: List[str]) -> dict:
     """LCS-based alignment of two waypoint name sequences.
 
-    Standard DP LCS (O(m*n)), then backtrack + interleaved diff walk.
+    Case-insensitive tokens are interned to ids once; the LCS table is kept
+    as one bit-parallel row per seq_a token (see _lcs_row_bits) and the
+    backtrack reads the table cells it needs from those rows, following the
+    same tie-breaking as the classic O(m*n) DP. Then an interleaved diff walk.
 
     Returns:
         dict with keys:
@@ -113,27 +162,39 @@ def lcs_alignment(seq_a: List[str], seq_b: List[str]) -> dict:
                 'alignment_pct': 0.0,
                 'tokens': [{'token': t, 'status': 'a_only'} for t in seq_a]}
 
-    # Build DP table
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            if seq_a[i - 1].upper() == seq_b[j - 1].upper():
-                dp[i][j] = dp[i - 1][j - 1] + 1
-            else:
-                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+    # Intern uppercase tokens so every comparison is an int compare
+    upper_a = [t.upper() for t in seq_a]
+    upper_b = [t.upper() for t in seq_b]
+    intern = {}
+    ids_a = [intern.setdefault(t, len(intern)) for t in upper_a]
+    ids_b = [intern.setdefault(t, len(intern)) for t in upper_b]
+
+    rows = _lcs_row_bits(ids_a, ids_b)
 
-    # Backtrack to find LCS
+    # Backtrack to find LCS. Tracks dp[i][j] (here) and dp[i-1][j] (up):
+    # moving left drops one bit from each, moving up re-counts one row.
     lcs = []
     i, j = m, n
+    here = bin(rows[m]).count('1')
+    up = bin(rows[m - 1]).count('1')
     while i > 0 and j > 0:
-        if seq_a[i - 1].upper() == seq_b[j - 1].upper():
+        bit = 1 << (j - 1)
+        if ids_a[i - 1] == ids_b[j - 1]:
             lcs.append(seq_a[i - 1])
             i -= 1
             j -= 1
-        elif dp[i - 1][j] >= dp[i][j - 1]:
-            i -= 1
+            here = up - (1 if rows[i] & bit else 0)
+            up = bin(rows[i - 1] & (bit - 1)).count('1') if i > 0 else 0
         else:
-            j -= 1
+            left = here - (1 if rows[i] & bit else 0)
+            if up >= left:
+                i -= 1
+                here = up
+                up = bin(rows[i - 1] & ((bit << 1) - 1)).count('1') if i > 0 else 0
+            else:
+                here = left
+                up -= 1 if rows[i - 1] & bit else 0
+                j -= 1
     lcs.reverse()
 
     # Walk both sequences with 3 pointers to produce interleaved token list
@@ -145,12 +206,12 @@ def lcs_alignment(seq_a: List[str], seq_b: List[str]) -> dict:
     while lcs_idx < len(lcs):
         target = lcs[lcs_idx].upper()
         # Emit a_only until we hit the match
-        while a_idx < m and seq_a[a_idx].upper() != target:
+        while a_idx < m and upper_a[a_idx] != target:
             tokens.append({'token': seq_a[a_idx], 'status': 'a_only'})
             a_only.append(seq_a[a_idx])
             a_idx += 1
         # Emit b_only until we hit the match
-        while b_idx < n and seq_b[b_idx].upper() != target:
+        while b_idx < n and upper_b[b_idx] != target:
             tokens.append({'token': seq_b[b_idx], 'status': 'b_only'})
             b_only.append(seq_b[b_idx])
             b_idx += 1
@@ -272,7 +333,7 @@ def compute_approach_bearing(trajectory: List[dict], crossing_lat: float, crossi
     destination, so 75nm still captures partially-converged traffic.
 
     Args:
-        trajectory: Full flight trajectory (time-ordered list with lat, lon keys)
+        trajectory: Full flight trajectory (TrajectoryView or time-ordered point dicts)
         crossing_lat: Latitude of the crossing point
         crossing_lon: Longitude of the crossing point
         crossing_seg_idx: Index into trajectory near the crossing (scan starts here)
@@ -281,20 +342,21 @@ def compute_approach_bearing(trajectory: List[dict], crossing_lat: float, crossi
     Returns:
         Bearing in degrees (0-360) or None if insufficient upstream trajectory
     """
+    traj = as_trajectory_view(trajectory)
+    lats, lons = traj.lat, traj.lon
+
     # Scan backward from crossing segment to find a point ~approach_dist_nm upstream
-    for i in range(min(crossing_seg_idx, len(trajectory) - 1), -1, -1):
-        pt = trajectory[i]
-        dist = haversine_nm(pt['lat'], pt['lon'], crossing_lat, crossing_lon)
+    for i in range(min(crossing_seg_idx, len(traj) - 1), -1, -1):
+        dist = haversine_nm(lats[i], lons[i], crossing_lat, crossing_lon)
         if dist >= approach_dist_nm:
-            return calculate_bearing(pt['lat'], pt['lon'], crossing_lat, crossing_lon)
+            return calculate_bearing(lats[i], lons[i], crossing_lat, crossing_lon)
 
     # Didn't reach target distance. Use earliest trajectory point if at least
     # 30nm away (otherwise too close for meaningful corridor identification).
-    if trajectory:
-        first = trajectory[0]
-        dist = haversine_nm(first['lat'], first['lon'], crossing_lat, crossing_lon)
+    if traj:
+        dist = haversine_nm(lats[0], lons[0], crossing_lat, crossing_lon)
         if dist >= 30.0:
-            return calculate_bearing(first['lat'], first['lon'], crossing_lat, crossing_lon)
+            return calculate_bearing(lats[0], lons[0], crossing_lat, crossing_lon)
 
     return None
 
@@ -505,9 +567,10 @@ def cluster_crossings_by_bearing(crossings: List, gap_threshold_deg: float = 30.
 
 def cluster_crossings_by_position(crossings: List, gis_conn=None,
                                    eps_nm: float = 15.0,
-                                   min_points: int = 2) -> Dict[int, List]:
+                                   min_points: int = 2,
+                                   engine: str = 'postgis') -> Dict[int, List]:
     """
-    Cluster crossings by their geographic crossing position using PostGIS DBSCAN.
+    Cluster crossings by their geographic crossing position using DBSCAN.
 
     For boundary-based measurement, crossings at different points along the
     facility boundary represent distinct geographic crossing areas (e.g., the
@@ -519,6 +582,8 @@ def cluster_crossings_by_position(crossings: List, gis_conn=None,
         gis_conn: PostGIS connection for ST_ClusterDBSCAN
         eps_nm: DBSCAN epsilon in nautical miles (default 15nm)
         min_points: Minimum points to form a cluster (default 2)
+        engine: 'postgis' (ST_ClusterDBSCAN) or 'local' (stream_clustering,
+                no GIS connection needed)
 
     Returns:
         Dict mapping cluster_id to list of CrossingResult.
@@ -534,6 +599,9 @@ def cluster_crossings_by_position(crossings: List, gis_conn=None,
     if len(valid) < min_points:
         return {0: crossings}
 
+    if engine == 'local':
+        return position_clusters(crossings, eps_nm, min_points)
+
     if not gis_conn:
         # No PostGIS — single cluster fallback
         return {0: crossings}
@@ -606,7 +674,8 @@ def cluster_crossings_by_trajectory(crossings: List, trajectory_cache: dict,
                                      min_dist_nm: float = 5.0,
                                      max_dist_nm: float = 250.0,
                                      eps_nm: float = 3.0,
-                                     min_points: int = 5) -> Dict[int, List]:
+                                     min_points: int = 5,
+                                     engine: str = 'postgis') -> Dict[int, List]:
     """
     Cluster crossings into traffic streams using PostGIS ST_ClusterDBSCAN.
 
@@ -618,7 +687,19 @@ def cluster_crossings_by_trajectory(crossings: List, trajectory_cache: dict,
 
     This approach is proven to correctly separate converging corridors because
     PostGIS operates on true geographic coordinates with proper distance metrics.
+
+    engine='local' clusters in process instead (stream_clustering): each
+    flight's approach path is sampled at fixed distance rings within the
+    same band and the flights are clustered directly, APPROACH_MIN_FLIGHTS
+    of them forming a stream (min_points counts PostGIS segments). Both
+    results go through the same unassigned-flight placement and bearing
+    coherence validation.
     """
+    if engine == 'local':
+        assignment = approach_clusters(crossings, trajectory_cache, fix_lat, fix_lon,
+                                       min_dist_nm, max_dist_nm, eps_nm, APPROACH_MIN_FLIGHTS)
+        return _validate_stream_coherence(crossings, _streams_from_assignment(crossings, assignment))
+
     if not gis_conn:
         logger.warning("  No GIS connection — falling back to bearing-based clustering")
         return cluster_crossings_by_bearing(crossings, gap_threshold_deg=30.0)
@@ -630,7 +711,7 @@ def cluster_crossings_by_trajectory(crossings: List, trajectory_cache: dict,
         logger.warning(f"  PostGIS clustering failed ({e}) — falling back to bearing-based")
         return cluster_crossings_by_bearing(crossings, gap_threshold_deg=30.0)
 
-    # Validate bearing coherence of PostGIS clusters
+    # Validate bearing coherence of the spatial clusters
     # If streams have high bearing variance, spatial clustering created
     # non-directional groups (common at convergence fixes like DADES)
     return _validate_stream_coherence(crossings, postgis_result)
@@ -638,7 +719,8 @@ def cluster_crossings_by_trajectory(crossings: List, trajectory_cache: dict,
 
 def _validate_stream_coherence(crossings, postgis_result, max_spread_deg=55.0):
     """
-    Validate that PostGIS-produced streams have directionally coherent bearings.
+    Validate that spatially clustered streams (PostGIS or local) have
+    directionally coherent bearings.
 
     At junction fixes (SEEVR), PostGIS correctly separates corridors because
     flights from different directions occupy distinct geographic space upstream.
@@ -677,11 +759,11 @@ def _validate_stream_coherence(crossings, postgis_result, max_spread_deg=55.0):
     incoherent_pct = (incoherent_flights / total_flights * 100) if total_flights > 0 else 0
 
     if incoherent_pct > 40:
-        logger.info(f"    PostGIS clustering incoherent: {incoherent_pct:.0f}% of flights in "
+        logger.info(f"    Spatial clustering incoherent: {incoherent_pct:.0f}% of flights in "
                    f"high-spread streams — falling back to bearing-based clustering")
         return cluster_crossings_by_bearing(crossings, gap_threshold_deg=30.0)
 
-    logger.info(f"    PostGIS clustering validated: {incoherent_pct:.0f}% incoherent (threshold 40%)")
+    logger.info(f"    Spatial clustering validated: {incoherent_pct:.0f}% incoherent (threshold 40%)")
     return postgis_result
 
 
@@ -778,11 +860,24 @@ def _cluster_via_postgis(crossings, trajectory_cache, fix_lat, fix_lon,
         best_cluster = max(clusters, key=clusters.get)
         flight_assignment[cs] = best_cluster
 
+    # Cleanup temp table
+    cursor.execute("DROP TABLE IF EXISTS _tmp_stream_segs")
+    gis_conn.commit()
+
+    return _streams_from_assignment(crossings, flight_assignment)
+
+
+def _streams_from_assignment(crossings, flight_assignment):
+    """
+    Streams {0..n-1: [crossings]} from a callsign -> cluster assignment
+    (PostGIS majority vote or local clustering); clusters are renumbered in
+    sorted order and flights without a cluster join the nearest one.
+    """
     # Renumber cluster IDs to 0-based sequential
     unique_clusters = sorted(set(flight_assignment.values()))
     cluster_remap = {old: new for new, old in enumerate(unique_clusters)}
 
-    # Phase 5: Build result dict, assign unassigned flights to nearest cluster
+    # Build result dict, assign unassigned flights to nearest cluster
     result = {}
     unassigned = []
     for crossing in crossings:
@@ -795,8 +890,8 @@ def _cluster_via_postgis(crossings, trajectory_cache, fix_lat, fix_lon,
         else:
             unassigned.append(crossing)
 
-    # Phase 6: Assign unassigned flights to nearest cluster by crossing position
-    # Flights without segments in the distance band are matched to the nearest
+    # Assign unassigned flights to nearest cluster by crossing position
+    # Flights without a cluster in the distance band are matched to the nearest
     # cluster based on where they crossed (geographic proximity of crossing point)
     if unassigned and result:
         # Compute centroid crossing position per cluster
@@ -821,10 +916,6 @@ def _cluster_via_postgis(crossings, trajectory_cache, fix_lat, fix_lon,
     elif unassigned:
         result[0] = unassigned
 
-    # Cleanup temp table
-    cursor.execute("DROP TABLE IF EXISTS _tmp_stream_segs")
-    gis_conn.commit()
-
     # Log
     for sid in sorted(result.keys()):
         logger.info(f"    Stream {sid}: {len(result[sid])} flights")
@@ -835,7 +926,8 @@ def _cluster_via_postgis(crossings, trajectory_cache, fix_lat, fix_lon,
 def _split_stream_into_branches(stream_crossings, trajectory_cache,
                                 fix_lat, fix_lon, gis_conn,
                                 eps_nm=3.0, min_points=3,
-                                min_dist_nm=100.0, max_dist_nm=250.0):
+                                min_dist_nm=100.0, max_dist_nm=250.0,
+                                engine='postgis'):
     """
     Split a single stream into sub-branches using tighter DBSCAN.
 
@@ -844,10 +936,88 @@ def _split_stream_into_branches(stream_crossings, trajectory_cache,
     the same fix). This function detects those sub-branches by running a
     tighter spatial clustering on trajectory segments farther upstream
     (100-250nm from fix) where branches are still geographically separated.
+    engine='local' clusters the approach paths in process instead, with
+    BRANCH_MIN_FLIGHTS flights per branch (see cluster_crossings_by_trajectory).
 
     Returns sub-branch dict {branch_id: [crossings]} if >1 branch found with
     >=2 flights each, otherwise returns None (keep original stream).
     """
+    if engine == 'local':
+        if len({c.callsign for c in stream_crossings}) < 4:
+            return None
+        flight_assignment = approach_clusters(stream_crossings, trajectory_cache, fix_lat, fix_lon,
+                                              min_dist_nm, max_dist_nm, eps_nm, BRANCH_MIN_FLIGHTS)
+    else:
+        flight_assignment = _branch_assignment_via_postgis(
+            stream_crossings, trajectory_cache, fix_lat, fix_lon, gis_conn,
+            eps_nm, min_points, min_dist_nm, max_dist_nm)
+        if flight_assignment is None:
+            return None
+
+    # Check if we actually found multiple branches
+    unique_clusters = set(flight_assignment.values())
+    if len(unique_clusters) < 2:
+        return None
+
+    # Renumber clusters to 0-based
+    cluster_remap = {old: new for new, old in enumerate(sorted(unique_clusters))}
+
+    # Build result dict
+    result = {}
+    unassigned = []
+    for crossing in stream_crossings:
+        cs = crossing.callsign
+        if cs in flight_assignment:
+            bid = cluster_remap[flight_assignment[cs]]
+            if bid not in result:
+                result[bid] = []
+            result[bid].append(crossing)
+        else:
+            unassigned.append(crossing)
+
+    # Assign unassigned flights to nearest branch by crossing position
+    if unassigned and result:
+        branch_centroids = {}
+        for bid, cx_list in result.items():
+            lats = [c.lat for c in cx_list if c.lat]
+            lons = [c.lon for c in cx_list if c.lon]
+            if lats and lons:
+                branch_centroids[bid] = (sum(lats) / len(lats), sum(lons) / len(lons))
+
+        for crossing in unassigned:
+            if crossing.lat and crossing.lon and branch_centroids:
+                best_bid = min(branch_centroids,
+                              key=lambda b: haversine_nm(
+                                  crossing.lat, crossing.lon,
+                                  branch_centroids[b][0], branch_centroids[b][1]))
+            else:
+                best_bid = max(result, key=lambda b: len(result[b]))
+            result[best_bid].append(crossing)
+
+    # Only return if we have >1 branch with >=2 flights each
+    viable = {bid: cx for bid, cx in result.items() if len(cx) >= 2}
+    if len(viable) < 2:
+        return None
+
+    # Re-merge non-viable (single-flight) branches into nearest viable branch
+    for bid, cx_list in result.items():
+        if bid not in viable:
+            # Find nearest viable branch
+            if viable:
+                for crossing in cx_list:
+                    best = min(viable, key=lambda b: haversine_nm(
+                        crossing.lat, crossing.lon,
+                        sum(c.lat for c in viable[b]) / len(viable[b]),
+                        sum(c.lon for c in viable[b]) / len(viable[b])
+                    ) if crossing.lat and crossing.lon else len(viable[b]))
+                    viable[best].append(crossing)
+
+    return viable
+
+
+def _branch_assignment_via_postgis(stream_crossings, trajectory_cache, fix_lat, fix_lon,
+                                   gis_conn, eps_nm, min_points, min_dist_nm, max_dist_nm):
+    """Internal: PostGIS branch DBSCAN, callsign -> cluster (None = too few flights)."""
     cursor = gis_conn.cursor()
     eps_deg = eps_nm / 60.0
     min_dist_m = min_dist_nm * 1852
@@ -934,65 +1104,7 @@ def _split_stream_into_branches(stream_crossings, trajectory_cache,
     cursor.execute("DROP TABLE IF EXISTS _tmp_branch_segs")
     gis_conn.commit()
 
-    # Check if we actually found multiple branches
-    unique_clusters = set(flight_assignment.values())
-    if len(unique_clusters) < 2:
-        return None
-
-    # Renumber clusters to 0-based
-    cluster_remap = {old: new for new, old in enumerate(sorted(unique_clusters))}
-
-    # Build result dict
-    result = {}
-    unassigned = []
-    for crossing in stream_crossings:
-        cs = crossing.callsign
-        if cs in flight_assignment:
-            bid = cluster_remap[flight_assignment[cs]]
-            if bid not in result:
-                result[bid] = []
-            result[bid].append(crossing)
-        else:
-            unassigned.append(crossing)
-
-    # Assign unassigned flights to nearest branch by crossing position
-    if unassigned and result:
-        branch_centroids = {}
-        for bid, cx_list in result.items():
-            lats = [c.lat for c in cx_list if c.lat]
-            lons = [c.lon for c in cx_list if c.lon]
-            if lats and lons:
-                branch_centroids[bid] = (sum(lats) / len(lats), sum(lons) / len(lons))
-
-        for crossing in unassigned:
-            if crossing.lat and crossing.lon and branch_centroids:
-                best_bid = min(branch_centroids,
-                              key=lambda b: haversine_nm(
-                                  crossing.lat, crossing.lon,
-                                  branch_centroids[b][0], branch_centroids[b][1]))
-            else:
-                best_bid = max(result, key=lambda b: len(result[b]))
-            result[best_bid].append(crossing)
-
-    # Only return if we have >1 branch with >=2 flights each
-    viable = {bid: cx for bid, cx in result.items() if len(cx) >= 2}
-    if len(viable) < 2:
-        return None
-
-    # Re-merge non-viable (single-flight) branches into nearest viable branch
-    for bid, cx_list in result.items():
-        if bid not in viable:
-            # Find nearest viable branch
-            if viable:
-                for crossing in cx_list:
-                    best = min(viable, key=lambda b: haversine_nm(
-                        crossing.lat, crossing.lon,
-                        sum(c.lat for c in viable[b]) / len(viable[b]),
-                        sum(c.lon for c in viable[b]) / len(viable[b])
-                    ) if crossing.lat and crossing.lon else len(viable[b]))
-                    viable[best].append(crossing)
-
-    return viable
+    return flight_assignment
 
 
 def compute_stream_metadata(stream_crossings: List) -> dict:
@@ -1082,8 +1194,9 @@ def _heading_delta(h1: float, h2: float) -> float:
     return d
 
 
-def detect_flight_holding(trajectory: List[Dict[str, Any]],
-                          dest_lat: float, dest_lon: float) -> List[Dict[str, Any]]:
+def detect_flight_holding(trajectory,
+                          dest_lat: float, dest_lon: float,
+                          segments: Optional[List[tuple]] = None) -> List[Dict[str, Any]]:
     """
     Detect holding patterns in a single flight's trajectory.
 
@@ -1091,11 +1204,14 @@ def detect_flight_holding(trajectory: List[Dict[str, Any]],
     exceeding one orbit) and groups consecutive orbits into hold events.
 
     Args:
-        trajectory: List of dicts with keys:
+        trajectory: TrajectoryView, or list of dicts with keys:
             timestamp (datetime), lat (float), lon (float),
             gs (float), gs_valid (bool), alt (float)
         dest_lat: Destination airport latitude (for circling approach filter)
         dest_lon: Destination airport longitude (for circling approach filter)
+        segments: Reset segments to scan, as (first, last) bearing indices
+            (see holding_segments). Defaults to all of them; the vectorized
+            holding screen passes only the segments that can contain an orbit.
 
     Returns:
         List of hold event dicts (see _finalize_hold for structure).
@@ -1103,49 +1219,64 @@ def detect_flight_holding(trajectory: List[Dict[str, Any]],
     if len(trajectory) < 4:
         return []
 
+    traj = as_trajectory_view(trajectory)
+    lats, lons = traj.lat, traj.lon
+
     # Step 1: Build bearing series from consecutive trajectory points
     # Each entry is the bearing from point[i] to point[i+1]
     bearings = []
-    for i in range(len(trajectory) - 1):
-        p1 = trajectory[i]
-        p2 = trajectory[i + 1]
-        brg = calculate_bearing(p1['lat'], p1['lon'], p2['lat'], p2['lon'])
+    for i in range(len(traj) - 1):
+        brg = calculate_bearing(lats[i], lons[i], lats[i + 1], lons[i + 1])
         bearings.append(brg)
 
     if len(bearings) < 2:
         return []
 
-    # Step 2: Scan bearing deltas to find orbits
+    # Step 2: Scan bearing deltas between data gaps to find orbits
     holding_events = []
+    if segments is None:
+        segments = holding_segments(traj.epoch)
+    for first, last in segments:
+        _scan_holding_segment(traj, bearings, first, last, holding_events,
+                              dest_lat, dest_lon)
+
+    return holding_events
+
+
+def holding_segments(epochs) -> List[tuple]:
+    """
+    Split a flight's bearing series into reset segments.
+
+    A large time gap in the trajectory segments contributing to bearings[i-1]
+    and bearings[i] means data dropout; the heading accumulator restarts at
+    bearing i to avoid false detections across the gap.
+
+    Returns:
+        [(first, last), ...] inclusive bearing-index ranges in order.
+    """
+    n_bearings = len(epochs) - 1
+    segments = []
+    first = 0
+    for i in range(1, n_bearings):
+        gap_sec = max(epochs[i] - epochs[i - 1], epochs[i + 1] - epochs[i])
+        if gap_sec > HOLD_GAP_RESET_SEC:
+            segments.append((first, i - 1))
+            first = i
+    segments.append((first, n_bearings - 1))
+    return segments
+
+
+def _scan_holding_segment(traj, bearings: List[float], first: int, last: int,
+                          holding_events: List[Dict[str, Any]],
+                          dest_lat: float, dest_lon: float) -> None:
+    """Count orbits over bearings[first..last] and finalize the candidate hold, if any"""
     cumulative_heading = 0.0
     orbit_count = 0
     turn_sign_sum = 0.0
-    hold_start_idx = 0      # Index into bearings where current candidate began
+    hold_start_idx = first  # Index into bearings where current candidate began
     in_candidate = False
 
-    for i in range(1, len(bearings)):
-        # Check for time gaps in the trajectory segments contributing to
-        # bearings[i-1] and bearings[i].  A large gap means data dropout;
-        # reset the accumulator to avoid false detections across the gap.
-        gap_sec = (trajectory[i]['timestamp'] - trajectory[i - 1]['timestamp']).total_seconds()
-        if (i + 1) < len(trajectory):
-            gap_sec = max(gap_sec,
-                          (trajectory[i + 1]['timestamp'] - trajectory[i]['timestamp']).total_seconds())
-
-        if gap_sec > HOLD_GAP_RESET_SEC:
-            # Finalize any pending hold before resetting
-            if in_candidate and orbit_count >= 1:
-                _finalize_hold(trajectory, bearings, hold_start_idx, i - 1,
-                               orbit_count, turn_sign_sum, holding_events,
-                               dest_lat, dest_lon)
-            # Reset accumulator
-            cumulative_heading = 0.0
-            orbit_count = 0
-            turn_sign_sum = 0.0
-            in_candidate = False
-            hold_start_idx = i
-            continue
-
+    for i in range(first + 1, last + 1):
         # Compute heading delta between consecutive bearings
         delta = _heading_delta(bearings[i - 1], bearings[i])
         cumulative_heading += delta
@@ -1170,16 +1301,14 @@ def detect_flight_holding(trajectory: List[Dict[str, Any]],
             else:
                 cumulative_heading += 360.0
 
-    # Finalize any remaining candidate at trajectory end
+    # Finalize the candidate at the end of the segment (gap or trajectory end)
     if in_candidate and orbit_count >= 1:
-        _finalize_hold(trajectory, bearings, hold_start_idx, len(bearings) - 1,
+        _finalize_hold(traj, bearings, hold_start_idx, last,
                        orbit_count, turn_sign_sum, holding_events,
                        dest_lat, dest_lon)
 
-    return holding_events
-
 
-def _finalize_hold(trajectory: List[Dict[str, Any]],
+def _finalize_hold(traj,
                    bearings: List[float],
                    start_idx: int, end_idx: int,
                    orbit_count: int, turn_sign_sum: float,
@@ -1193,7 +1322,7 @@ def _finalize_hold(trajectory: List[Dict[str, Any]],
     a validated event dict to holding_events.
 
     Args:
-        trajectory: Full trajectory point list
+        traj: Full trajectory (TrajectoryView)
         bearings: Bearing series (one per consecutive trajectory pair)
         start_idx: Start index in bearings array
         end_idx: End index in bearings array
@@ -1207,30 +1336,29 @@ def _finalize_hold(trajectory: List[Dict[str, Any]],
     # bearings[i] is derived from trajectory[i] -> trajectory[i+1],
     # so the trajectory span is [start_idx, end_idx + 1].
     traj_start = start_idx
-    traj_end = min(end_idx + 1, len(trajectory) - 1)
+    traj_end = min(end_idx + 1, len(traj) - 1)
 
     if traj_start >= traj_end:
         return
 
     # 1. Duration check
-    t_start = trajectory[traj_start]['timestamp']
-    t_end = trajectory[traj_end]['timestamp']
-    duration_sec = int((t_end - t_start).total_seconds())
+    duration_sec = int(traj.epoch[traj_end] - traj.epoch[traj_start])
 
     if duration_sec < HOLD_MIN_DURATION_SEC:
         return
 
     # 2. Spatial containment: compute centroid and check radius
-    hold_points = trajectory[traj_start:traj_end + 1]
-    n_pts = len(hold_points)
+    hold_lats = traj.lat[traj_start:traj_end + 1]
+    hold_lons = traj.lon[traj_start:traj_end + 1]
+    n_pts = len(hold_lats)
 
-    center_lat = sum(p['lat'] for p in hold_points) / n_pts
-    center_lon = sum(p['lon'] for p in hold_points) / n_pts
+    center_lat = sum(hold_lats) / n_pts
+    center_lon = sum(hold_lons) / n_pts
 
     max_dist = 0.0
     dist_sum = 0.0
-    for p in hold_points:
-        d = haversine_nm(center_lat, center_lon, p['lat'], p['lon'])
+    for lat, lon in zip(hold_lats, hold_lons):
+        d = haversine_nm(center_lat, center_lon, lat, lon)
         dist_sum += d
         if d > max_dist:
             max_dist = d
@@ -1239,7 +1367,7 @@ def _finalize_hold(trajectory: List[Dict[str, Any]],
         return
 
     avg_radius = dist_sum / n_pts if n_pts > 0 else 0.0
-    avg_alt = sum(p['alt'] for p in hold_points) / n_pts if n_pts > 0 else 0.0
+    avg_alt = sum(traj.alt[traj_start:traj_end + 1]) / n_pts if n_pts > 0 else 0.0
 
     # 3. Circling approach filter: skip if close to destination and low altitude
     if dest_lat is not None and dest_lon is not None:
@@ -1249,7 +1377,7 @@ def _finalize_hold(trajectory: List[Dict[str, Any]],
             return
 
     # 4. Compute metrics
-    gs_values = [p['gs'] for p in hold_points if p.get('gs_valid', True) and p['gs'] > 0]
+    gs_values = [gs for gs in traj.gs[traj_start:traj_end + 1] if is_gs_valid(gs) and gs > 0]
     avg_gs = sum(gs_values) / len(gs_values) if gs_values else 0.0
 
     # Groundspeed filter: exclude ground operations (taxi, pushback, parking)
@@ -1279,8 +1407,8 @@ def _finalize_hold(trajectory: List[Dict[str, Any]],
 
     # 7. Append validated event
     holding_events.append({
-        'hold_start_utc': t_start,
-        'hold_end_utc': t_end,
+        'hold_start_utc': traj.timestamp(traj_start),
+        'hold_end_utc': traj.timestamp(traj_end),
         'duration_sec': duration_sec,
         'orbit_count': orbit_count,
         'center_lat': round(center_lat, 6),
@@ -1298,31 +1426,73 @@ def _finalize_hold(trajectory: List[Dict[str, Any]],
 class TMIComplianceAnalyzer:
     """Main analyzer class for TMI compliance"""
 
-    def __init__(self, event: EventConfig):
+    def __init__(self, event: EventConfig, gis_batch_size: int = DEFAULT_GIS_BATCH_SIZE,
+                 gis_workers: int = DEFAULT_GIS_WORKERS,
+                 input_cache: Optional[AnalyzerInputCache] = None,
+                 workers: int = DEFAULT_WORKERS,
+                 trajectory_source=None,
+                 boundary_engine: str = 'postgis',
+                 boundary_geojson: Optional[str] = None,
+                 use_gis: bool = True,
+                 profiler: Optional[AnalysisProfiler] = None,
+                 session: Optional[AnalysisSession] = None,
+                 stream_clustering: str = 'postgis'):
         self.event = event
+        self.workers = workers                # Worker processes for TMI analyses (1 = sequential)
+        self.gis_batch_size = gis_batch_size  # Flights per PostGIS crossing statement (1 = per-flight)
+        self.gis_workers = gis_workers        # GIS connections used for the crossing precompute
+        self.input_cache = input_cache        # On-disk cache of DB inputs (None = always query)
+        self.trajectory_source = trajectory_source  # e.g. ParquetTrajectorySource (None = ADL SQL)
+        self.boundary_engine_mode = boundary_engine  # 'postgis' (GIS functions) or 'local' (LocalBoundaryEngine)
+        self.boundary_geojson = boundary_geojson    # GeoJSON dir for the local engine (None = GIS polygons)
+        self.use_gis = use_gis                # False = never open a GIS connection
+        self.profiler = profiler              # AnalysisProfiler for results['_perf'] (None = off)
+        if profiler and not profiler.cache_counters:
+            profiler.cache_counters = self._perf_cache_counters
+        self.session = session                # AnalysisSession shared across plans (run_batch.py)
+        if stream_clustering == 'local' and not HAS_NUMPY:
+            logger.warning("Local stream clustering needs NumPy — using PostGIS clustering")
+            stream_clustering = 'postgis'
+        self.stream_clustering_mode = stream_clustering  # 'postgis' (ST_ClusterDBSCAN) or 'local' (stream_clustering)
+        self._source_watermarks = None        # ADL source watermarks for input cache keys
+        self._boundary_watermarks = None      # PostGIS boundary table watermarks ([] = unavailable)
+        self._trajectory_cache_key = None     # Input cache key of the loaded trajectories
+        self._trajectory_load_stats = None    # TrajectoryLoader.stats() of the ADL trajectory load
         self.adl = None          # ADLConnection wrapper (for format_query)
         self.adl_conn = None     # Raw database connection
         self.gis_conn = None
+        self.boundary_engine = None  # LocalBoundaryEngine when boundary_engine_mode == 'local'
         self.fix_coords = {}
         self.flight_data = {}
         # Trajectory caching for performance - computed once, reused across all TMIs
-        self._trajectory_cache = {}      # callsign -> list of trajectory points
+        self._trajectory_cache = TrajectoryStore.empty()  # callsign -> TrajectoryView (columnar)
         self._trajectory_metadata = {}   # callsign -> {flight_uid, dept, dest}
-        self._crossing_cache = {}        # callsign -> list of PostGIS boundary crossings
+        self._crossing_cache = {}        # callsign -> list of boundary crossings (PostGIS or local)
         self._tracon_sub_codes = {}      # parent_code -> [sub_codes] from GIS sector_code
         self._trajectory_cache_loaded = False
+        self._crossing_engine = None     # FixCrossingEngine over the trajectory cache (built lazily)
         self._low_quality_flights = set()  # Flights with insufficient trajectory data
         self._mit_trajectories = {}  # key -> {callsign -> trajectory} for split output
         self._taxi_references = {}  # airport_icao -> unimpeded_taxi_sec
         self._holding_events = []           # List of holding event dicts
         self._flight_waypoints_cache = {}   # {flight_uid: [waypoints]}
         self._star_fixes_cache = {}         # {dest_icao: [fixes]}
+        self._nav_fix_index = None          # PointGridIndex of nav_fixes around detected holds
+        self.route_cache = None             # RouteExpansionCache (created with the GIS connection)
 
     # Trajectory quality thresholds
     MIN_ENROUTE_POINTS = 5       # Minimum points with gs > 50 (enroute, not ground)
     MIN_UNIQUE_POSITIONS = 3    # Minimum unique lat/lon positions (~1nm precision)
     MIN_IMPLIED_SPEED_KTS = 100 # Minimum implied speed when checking gaps (catches SFO->LAS jumps)
 
+    # Largest hold region (lat x lon degrees) loaded into the nav fix index at once
+    NAV_FIX_INDEX_MAX_AREA_DEG2 = 400
+
+    # Crossing separation thresholds for stream validation
+    # FIX-based: Flights should cross at the same point (~15nm tolerance)
+    # BOUNDARY-based: Flights can cross anywhere along the boundary (no limit)
+    MAX_CROSSING_SEPARATION_NM_FIX = 15.0
+
     def _get_widest_time_window(self) -> tuple:
         """
         Calculate the widest time window from all TMIs, GS programs,
@@ -1357,6 +1527,111 @@ class TMIComplianceAnalyzer:
 
         return earliest, latest
 
+    def _get_trajectory_window(self) -> tuple:
+        """Widest time window plus the 1h trajectory buffer on each side"""
+        earliest, latest = self._get_widest_time_window()
+        return earliest - timedelta(hours=1), latest + timedelta(hours=1)
+
+    def _get_source_watermarks(self) -> list:
+        """
+        Row count and latest timestamp of each ADL flight/trajectory source
+        inside the trajectory window.
+
+        Part of the input cache key for event data: any row added to, purged
+        from, or moved between sources changes the watermarks and invalidates
+        the cached flights/trajectories/crossings.
+        """
+        if self._source_watermarks is not None:
+            return self._source_watermarks
+
+        query_start, query_end = self._get_trajectory_window()
+        window = (query_start.strftime('%Y-%m-%d %H:%M:%S'), query_end.strftime('%Y-%m-%d %H:%M:%S'))
+        cursor = self.adl_conn.cursor()
+        query = self.adl.format_query("""
+            SELECT 'CORE', COUNT_BIG(*), MAX(last_seen_utc) FROM dbo.adl_flight_core
+            WHERE first_seen_utc <= %s AND last_seen_utc >= %s
+            UNION ALL
+            SELECT 'TMI', COUNT_BIG(*), MAX(timestamp_utc) FROM dbo.adl_tmi_trajectory
+            WHERE timestamp_utc >= %s AND timestamp_utc <= %s
+            UNION ALL
+            SELECT 'LIVE', COUNT_BIG(*), MAX(recorded_utc) FROM dbo.adl_flight_trajectory
+            WHERE recorded_utc >= %s AND recorded_utc <= %s
+            UNION ALL
+            SELECT 'ARCHIVE', COUNT_BIG(*), MAX(timestamp_utc) FROM dbo.adl_trajectory_archive
+            WHERE timestamp_utc >= %s AND timestamp_utc <= %s
+        """)
+        cursor.execute(query, (window[1], window[0]) + window * 3)
+        self._source_watermarks = [[row[0], int(row[1] or 0), str(row[2])] for row in cursor.fetchall()]
+        cursor.close()
+        logger.info(f"  ADL source watermarks: {self._source_watermarks}")
+        return self._source_watermarks
+
+    def _get_boundary_watermarks(self) -> list:
+        """
+        Row count and latest updated_at of each PostGIS boundary table read by
+        the crossing functions.
+
+        Part of the input cache key for PostGIS crossings, so a boundary
+        re-import invalidates them. [] if the tables cannot be read (crossings
+        are then cached for REFERENCE_TTL_SEC only).
+        """
+        if self._boundary_watermarks is not None:
+            return self._boundary_watermarks
+
+        cursor = self.gis_conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT 'ARTCC', COUNT(*), MAX(updated_at) FROM artcc_boundaries
+                UNION ALL
+                SELECT 'SECTOR', COUNT(*), MAX(updated_at) FROM sector_boundaries
+                UNION ALL
+                SELECT 'TRACON', COUNT(*), MAX(updated_at) FROM tracon_boundaries
+            """)
+            self._boundary_watermarks = [[row[0], int(row[1] or 0), str(row[2])] for row in cursor.fetchall()]
+            logger.info(f"  GIS boundary watermarks: {self._boundary_watermarks}")
+        except Exception as e:
+            logger.warning(f"  GIS boundary watermarks unavailable ({e}), "
+                           f"caching crossings for {REFERENCE_TTL_SEC // 3600}h")
+            self._boundary_watermarks = []
+            try:
+                self.gis_conn.rollback()
+            except Exception:
+                pass
+        finally:
+            cursor.close()
+        return self._boundary_watermarks
+
+    def _cached_fetchall(self, cursor, kind: str, query: str, params: tuple = None,
+                         reference: bool = False) -> list:
+        """
+        cursor.execute() + fetchall(), served from the input cache when possible.
+
+        Event data is keyed by the ADL source watermarks; reference data
+        (reference=True) is keyed by the query alone and refreshed after
+        REFERENCE_TTL_SEC.
+        """
+        if not (self.input_cache and self.input_cache.enabled):
+            if params is None:
+                cursor.execute(query)
+            else:
+                cursor.execute(query, params)
+            return cursor.fetchall()
+
+        key = self.input_cache.key(
+            kind, query=query, params=params,
+            watermarks=None if reference else self._get_source_watermarks()
+        )
+        ttl = REFERENCE_TTL_SEC if reference else None
+        rows = self.input_cache.load_rows(kind, key, ttl=ttl)
+        if rows is None:
+            if params is None:
+                cursor.execute(query)
+            else:
+                cursor.execute(query, params)
+            rows = cursor.fetchall()
+            self.input_cache.save_rows(kind, key, rows)
+        return rows
+
     def _get_all_featured_flights(self) -> Dict[str, Any]:
         """
         Get ALL flights departing from or arriving at featured facilities.
@@ -1423,12 +1698,12 @@ class TMIComplianceAnalyzer:
               AND c.last_seen_utc >= %s
               AND (p.fp_dept_icao IN ({facility_in}) OR p.fp_dest_icao IN ({facility_in}))
         """)
-        cursor.execute(query, (
+        rows = self._cached_fetchall(cursor, 'flights', query, (
             latest.strftime('%Y-%m-%d %H:%M:%S'),
             earliest.strftime('%Y-%m-%d %H:%M:%S')
         ))
 
-        for row in cursor.fetchall():
+        for row in rows:
             callsign = row[0]
             flight_uid = row[1]
             flights[flight_uid] = {
@@ -1474,8 +1749,7 @@ class TMIComplianceAnalyzer:
             "SELECT airport_icao, unimpeded_taxi_sec, confidence FROM dbo.airport_taxi_reference"
         )
         try:
-            cursor.execute(query)
-            for row in cursor.fetchall():
+            for row in self._cached_fetchall(cursor, 'taxi_reference', query, reference=True):
                 self._taxi_references[row[0]] = row[1]
             logger.info(f"Loaded {len(self._taxi_references)} airport taxi references")
         except Exception as e:
@@ -1506,8 +1780,7 @@ class TMIComplianceAnalyzer:
             "SELECT airport_icao, unimpeded_connect_sec, confidence FROM dbo.airport_connect_reference"
         )
         try:
-            cursor.execute(query)
-            for row in cursor.fetchall():
+            for row in self._cached_fetchall(cursor, 'connect_reference', query, reference=True):
                 self._connect_references[row[0]] = row[1]
             logger.info(f"Loaded {len(self._connect_references)} airport connect references")
         except Exception as e:
@@ -1535,8 +1808,7 @@ class TMIComplianceAnalyzer:
             "SELECT ICAO_ID, RESP_ARTCC_ID FROM dbo.apts WHERE ICAO_ID IS NOT NULL AND RESP_ARTCC_ID IS NOT NULL"
         )
         try:
-            cursor.execute(query)
-            for row in cursor.fetchall():
+            for row in self._cached_fetchall(cursor, 'airport_artcc', query, reference=True):
                 self._airport_artcc[row[0]] = row[1].upper()
             logger.info(f"Loaded {len(self._airport_artcc)} airport→ARTCC mappings")
         except Exception as e:
@@ -1548,7 +1820,7 @@ class TMIComplianceAnalyzer:
         """Get responsible ARTCC for an airport (e.g., KJFK → ZNY). Returns '' if unknown."""
         return self._airport_artcc.get(airport_icao, '')
 
-    def _validate_trajectory_quality(self, callsign: str, trajectory: List[dict]) -> tuple:
+    def _validate_trajectory_quality(self, callsign: str, trajectory) -> tuple:
         """
         Validate trajectory data quality for reliable boundary crossing detection.
 
@@ -1566,33 +1838,29 @@ class TMIComplianceAnalyzer:
         if not trajectory or len(trajectory) < 2:
             return False, "insufficient_points"
 
+        traj = as_trajectory_view(trajectory)
+        lats, lons, epochs = traj.lat, traj.lon, traj.epoch
+
         # Count points with meaningful groundspeed (enroute, not on ground)
         # This is the PRIMARY check - flights with only ground positions are invalid
-        # Use gs_valid flag if available (new format), otherwise check raw gs value
-        enroute_points = [p for p in trajectory if p.get('gs_valid', p.get('gs', 0) > 50)]
-        if len(enroute_points) < self.MIN_ENROUTE_POINTS:
-            return False, f"only_{len(enroute_points)}_enroute_points"
+        enroute_count = sum(1 for gs in traj.gs if is_gs_valid(gs))
+        if enroute_count < self.MIN_ENROUTE_POINTS:
+            return False, f"only_{enroute_count}_enroute_points"
 
         # Check for unique positions (not just sitting at airport)
-        unique_positions = set()
-        for p in trajectory:
-            # Round to ~1nm precision to identify truly different positions
-            pos_key = (round(p['lat'], 2), round(p['lon'], 2))
-            unique_positions.add(pos_key)
+        # Round to ~1nm precision to identify truly different positions
+        unique_positions = {(round(lat, 2), round(lon, 2)) for lat, lon in zip(lats, lons)}
 
         if len(unique_positions) < self.MIN_UNIQUE_POSITIONS:
             return False, f"only_{len(unique_positions)}_unique_positions"
 
         # Check for suspicious position jumps (e.g., SFO->LAS direct with no intermediate data)
         # This catches flights that have some gs>0 points at arrival but no enroute tracking
-        sorted_traj = sorted(trajectory, key=lambda p: p['timestamp'])
-        for i in range(1, len(sorted_traj)):
-            prev = sorted_traj[i - 1]
-            curr = sorted_traj[i]
-
-            time_diff_hr = (curr['timestamp'] - prev['timestamp']).total_seconds() / 3600
+        order = sorted(range(len(traj)), key=epochs.__getitem__)
+        for prev, curr in zip(order, order[1:]):
+            time_diff_hr = (epochs[curr] - epochs[prev]) / 3600
             if time_diff_hr > 0.05:  # Only check gaps > 3 minutes
-                dist_nm = haversine_nm(prev['lat'], prev['lon'], curr['lat'], curr['lon'])
+                dist_nm = haversine_nm(lats[prev], lons[prev], lats[curr], lons[curr])
                 if dist_nm > 50:  # Only check significant position changes
                     implied_speed = dist_nm / time_diff_hr
                     # SFO->LAS is ~350nm in ~150min = ~140 kts - but this would mean NO intermediate data
@@ -1606,13 +1874,14 @@ class TMIComplianceAnalyzer:
     def analyze(self) -> Dict:
         """Run full compliance analysis"""
         logger.info(f"Starting analysis for: {self.event.name}")
+        if self.profiler:
+            self.profiler.start()
+
+        if self.session:
+            self.session.analyses += 1
 
         # Merge user-defined TMIs with auto-parsed TMIs
-        if self.event.user_defined_tmis:
-            for user_def in self.event.user_defined_tmis:
-                user_tmi = user_def.to_tmi(self.event.start_utc, self.event.end_utc)
-                self.event.tmis.append(user_tmi)
-            logger.info(f"Merged {len(self.event.user_defined_tmis)} user-defined TMIs")
+        self._merge_user_defined_tmis()
 
         results = {
             'event': self.event.name,
@@ -1632,127 +1901,31 @@ class TMIComplianceAnalyzer:
 
         # Connect to databases
         try:
-            # GIS connection is optional - only ADL is required for trajectory analysis
-            with ADLConnection() as adl:
-                self.adl = adl                # Keep wrapper for format_query
-                self.adl_conn = adl.conn      # Raw connection for cursor
-                logger.info(f"ADL driver: {adl.driver}, param style: {adl.param_style}")
+            with self._database_connections():
+                self._load_boundary_engine()
 
-                # Try to connect to GIS (optional, for future spatial queries)
-                try:
-                    gis = GISConnection()
-                    gis.connect()
-                    self.gis_conn = gis.conn
-                    logger.info("GIS connection established (optional)")
-                except Exception as gis_err:
-                    logger.warning(f"GIS connection unavailable (not required): {gis_err}")
-                    self.gis_conn = None
+                # Fix/airport coordinates, featured flights, trajectories
+                with self._perf_phase('inputs'):
+                    self._load_event_inputs()
 
-                # Load fix coordinates for all TMIs (fixes + destination airports)
-                all_fixes = set()
-                dest_airports = set()
-                for tmi in self.event.tmis:
-                    if tmi.fix:
-                        all_fixes.add(tmi.fix)
-                    all_fixes.update(tmi.fixes)
-                    # Collect destination airports for upstream direction filtering
-                    for dest in (tmi.destinations or []):
-                        dest_airports.add(dest)
-                        dest_airports.add(f'K{dest}')  # ICAO variant
-
-                all_fixes.update(dest_airports)
-                if all_fixes:
-                    self._load_fix_coordinates(list(all_fixes))
-
-                # Load airport coordinates for destinations not found in nav_fixes
-                missing_dests = [d for d in dest_airports if d not in self.fix_coords]
-                if missing_dests:
-                    self._load_airport_coordinates(missing_dests)
-
-                # Pre-load ALL flights to/from featured facilities
-                # This is the comprehensive approach - gather all flights that could
-                # potentially be affected by TMIs, then let trajectory analysis
-                # determine actual crossings
-                self.flight_data = self._get_all_featured_flights()
-
-                if self.flight_data:
-                    self._preload_trajectories([f['callsign'] for f in self.flight_data.values()])
-
-                # Load airport taxi references for GS delay calculation
-                self._load_airport_taxi_references()
-
-                # Load airport connect-to-push references for GS hold time adjustment
-                self._load_airport_connect_references()
-
-                # Load airport→ARTCC mapping for GS facility scope filtering
-                self._load_airport_facility_map()
+                with self._perf_phase('references'):
+                    self._load_reference_data()
 
                 # Holding pattern detection (event-wide)
-                self._holding_events = self._detect_all_holding_patterns()
-
-                # Analyze by TMI type
-                mit_tmis = [t for t in self.event.tmis if t.tmi_type in (TMIType.MIT, TMIType.MINIT)]
-                gs_tmis = [t for t in self.event.tmis if t.tmi_type == TMIType.GS]
-                reroute_tmis = [t for t in self.event.tmis if t.tmi_type == TMIType.REROUTE]
-                apreq_tmis = [t for t in self.event.tmis if t.tmi_type in (TMIType.APREQ, TMIType.CFR)]
-
-                # MIT/MINIT Analysis
-                for tmi in mit_tmis:
-                    result = self._analyze_mit_compliance(tmi)
-                    if result:
-                        # Use unique key: type_fix_starttime_value to differentiate multiple TMIs per fix
-                        # Include provider/requestor for multi-facility splits so each boundary gets its own result
-                        time_key = tmi.start_utc.strftime('%H%M') if tmi.start_utc else 'notime'
-                        fac_key = f"_{tmi.requestor}_{tmi.provider}" if (tmi.group_id and tmi.provider) else ''
-                        key = f"{tmi.tmi_type.value}_{tmi.fix}_{time_key}_{tmi.value}{fac_key}"
-                        # Extract trajectories for separate file output
-                        self._mit_trajectories[key] = result.pop('_trajectories', {})
-                        results['mit_results'][key] = result
-
-                # Ground Stop Analysis - prefer programs, fall back to individual TMIs
-                gs_programs = getattr(self.event, 'gs_programs', [])
-                if gs_programs:
-                    for program in gs_programs:
-                        result = self._analyze_gs_program(program)
-                        if result:
-                            key = f"GS_{program.airport}"
-                            results['gs_results'][key] = result
-                        else:
-                            logger.warning(f"GS program {program.airport} returned no results (no matching flights?)")
-
-                # Fall back to individual GS TMIs if programs produced nothing
-                if not results['gs_results'] and gs_tmis:
-                    logger.info("GS programs produced no results, falling back to individual TMI approach")
-                    for tmi in gs_tmis:
-                        result = self._analyze_gs_compliance(tmi)
-                        if result:
-                            key = f"GS_{tmi.provider}_{','.join(tmi.destinations)}_ALL"
-                            results['gs_results'][key] = result
-
-                # Reroute Analysis - prefer programs, fall back to individual TMIs
-                reroute_programs = getattr(self.event, 'reroute_programs', [])
-                if reroute_programs:
-                    for program in reroute_programs:
-                        result = self._analyze_reroute_program(program)
-                        if result:
-                            key = program.name or f"REROUTE_{program.route_type}_{program.action}"
-                            results['reroute_results'][key] = result
-
-                # Fall back to individual reroute TMIs if programs produced nothing
-                if not results['reroute_results'] and reroute_tmis:
-                    logger.info("Reroute programs produced no results, falling back to individual TMI approach")
-                    for tmi in reroute_tmis:
-                        result = self._analyze_reroute_compliance(tmi)
-                        if result:
-                            key = tmi.reroute_name or f"REROUTE_{','.join(tmi.origins[:2])}_{','.join(tmi.destinations[:2])}"
-                            results['reroute_results'][key] = result
-
-                # APREQ Tracking (just count flights, no compliance assessment)
-                for tmi in apreq_tmis:
-                    result = self._track_apreq_flights(tmi)
-                    if result:
-                        key = f"{tmi.tmi_type.value}_{tmi.fix or 'ALL'}"
-                        results['apreq_results'][key] = result
+                with self._perf_phase('holding'):
+                    self._holding_events = self._detect_all_holding_patterns()
+
+                # Analyze by TMI type (independent TMIs run in parallel with workers > 1)
+                with self._perf_phase('tmi_analyses'):
+                    self._run_tmi_analyses(results)
+                if self._trajectory_load_stats:
+                    results['trajectory_load'] = self._trajectory_load_stats
+                if self.route_cache:
+                    results['route_cache'] = self.route_cache.stats()
+                    logger.info(f"Route expansion cache: {results['route_cache']['hits']} hits, "
+                                f"{results['route_cache']['disk_hits']} disk hits, "
+                                f"{results['route_cache']['misses']} misses "
+                                f"({results['route_cache']['prefetched']} prefetched)")
 
                 # Delay Tracking - include parsed delay entries from NTML
                 if self.event.delays:
@@ -1761,20 +1934,23 @@ class TMIComplianceAnalyzer:
 
         except Exception as e:
             logger.exception("Analysis failed")
+            if self.profiler:
+                self.profiler.stop()
             raise
 
-        # NTML correlation for holding events
-        if self.event.delays:
-            self._correlate_ntml_holding(self._holding_events, self.event.delays)
+        with self._perf_phase('summary'):
+            # NTML correlation for holding events
+            if self.event.delays:
+                self._correlate_ntml_holding(self._holding_events, self.event.delays)
 
-        # TMI delay attribution
-        self._attribute_holding_to_tmi(self._holding_events, self.event)
+            # TMI delay attribution
+            self._attribute_holding_to_tmi(self._holding_events, self.event)
 
-        # Build holding results
-        results['holding'] = self._build_holding_summary(self._holding_events)
+            # Build holding results
+            results['holding'] = self._build_holding_summary(self._holding_events)
 
-        # Calculate summary
-        results['summary'] = self._calculate_summary(results)
+            # Calculate summary
+            results['summary'] = self._calculate_summary(results)
 
         # Include skipped lines for user to potentially define
         if self.event.skipped_lines:
@@ -1807,34 +1983,343 @@ class TMIComplianceAnalyzer:
         # Attach trajectory data for split file output (popped by run.py)
         results['_trajectories'] = self._mit_trajectories
 
-        return results
+        if self.profiler:
+            self.profiler.stop()
+            results['_perf'] = self.profiler.report()
 
-    def _load_fix_coordinates(self, fixes: List[str]):
-        """Load fix coordinates from database, disambiguating by geographic context."""
-        cursor = self.adl_conn.cursor()
-        fix_in = "'" + "','".join(fixes) + "'"
+        return results
 
-        cursor.execute(f"""
-            SELECT fix_name, lat, lon FROM dbo.nav_fixes
-            WHERE fix_name IN ({fix_in})
-        """)
+    @contextmanager
+    def _database_connections(self):
+        """
+        Set adl/adl_conn/gis_conn for the body of an analysis.
 
-        # Group all candidates by fix name
-        candidates = {}
-        for row in cursor.fetchall():
-            name = row[0]
-            if name not in candidates:
-                candidates[name] = []
-            candidates[name].append((float(row[1]), float(row[2])))
-        cursor.close()
+        Standalone runs open ADL (required) and GIS (optional) and close ADL
+        afterwards; with a session its connections are reused and left open.
+        """
+        if self.session:
+            self.session.connect()
+            self.adl = self.session.adl
+            self.adl_conn = self._profiled_connection(self.adl.conn, 'adl')
+            self.gis_conn = self._profiled_connection(self.session.gis_conn, 'gis')
+            logger.info(f"Reusing session connections "
+                        f"(GIS {'connected' if self.gis_conn else 'unavailable'})")
+            yield
+            return
 
-        # Compute geographic centroid from already-loaded coordinates
-        # (airports, previously loaded fixes) for disambiguation
-        centroid_lat, centroid_lon = self._get_context_centroid()
+        # GIS connection is optional - only ADL is required for trajectory analysis
+        with ADLConnection() as adl:
+            self.adl = adl                # Keep wrapper for format_query
+            self.adl_conn = self._profiled_connection(adl.conn, 'adl')  # Raw connection for cursor
+            logger.info(f"ADL driver: {adl.driver}, param style: {adl.param_style}")
 
-        for name, coords_list in candidates.items():
-            if len(coords_list) == 1:
-                lat, lon = coords_list[0]
+            # Try to connect to GIS (optional, for future spatial queries)
+            if self.use_gis:
+                try:
+                    gis = GISConnection()
+                    gis.connect()
+                    self.gis_conn = self._profiled_connection(gis.conn, 'gis')
+                    logger.info("GIS connection established (optional)")
+                except Exception as gis_err:
+                    logger.warning(f"GIS connection unavailable (not required): {gis_err}")
+                    self.gis_conn = None
+            else:
+                logger.info("GIS connection disabled")
+            yield
+
+    def prepare_session(self):
+        """
+        Load everything a session shares (connections, reference data,
+        known airways, local boundary engine) without analyzing the event,
+        e.g. before forking plan workers.
+        """
+        with self._database_connections():
+            self._load_boundary_engine()
+            self._load_reference_data()
+            self._load_known_airways()
+
+    def _load_reference_data(self):
+        """Airport taxi/connect references and airport->ARTCC map (from the session if loaded)"""
+        shared = self.session.references if self.session else None
+        if shared and 'taxi' in shared:
+            self._taxi_references = shared['taxi']
+            self._connect_references = shared['connect']
+            self._airport_artcc = shared['airport_artcc']
+            logger.info("Using session reference data (taxi, connect, airport→ARTCC)")
+            return
+
+        # Load airport taxi references for GS delay calculation
+        self._load_airport_taxi_references()
+
+        # Load airport connect-to-push references for GS hold time adjustment
+        self._load_airport_connect_references()
+
+        # Load airport→ARTCC mapping for GS facility scope filtering
+        self._load_airport_facility_map()
+
+        if shared is not None:
+            shared.update(taxi=self._taxi_references, connect=self._connect_references,
+                          airport_artcc=self._airport_artcc)
+
+    def _perf_phase(self, name: str):
+        """Profiler phase context for name (no-op unless profiling)"""
+        return self.profiler.phase(name) if self.profiler else nullcontext()
+
+    def _profiled_connection(self, conn, db: str):
+        """conn wrapped for round-trip/row counting when profiling"""
+        return self.profiler.wrap_connection(conn, db) if self.profiler else conn
+
+    def _perf_cache_counters(self) -> Dict[str, int]:
+        """Cache counters sampled by the profiler at every phase boundary"""
+        counters = {}
+        if self.input_cache:
+            counters['input_cache.hits'] = self.input_cache.hits
+            counters['input_cache.misses'] = self.input_cache.misses
+        if self.route_cache:
+            for name, value in self.route_cache.counters.items():
+                counters[f"route_cache.{name}"] = value
+        return counters
+
+    def _merge_user_defined_tmis(self):
+        """Append user-defined TMIs (parser overrides) to the event's TMI list"""
+        if self.event.user_defined_tmis:
+            for user_def in self.event.user_defined_tmis:
+                user_tmi = user_def.to_tmi(self.event.start_utc, self.event.end_utc)
+                self.event.tmis.append(user_tmi)
+            logger.info(f"Merged {len(self.event.user_defined_tmis)} user-defined TMIs")
+
+    def _load_event_inputs(self):
+        """
+        Load the inputs every TMI analysis reads: fix/airport coordinates,
+        the featured flight set, and the preloaded trajectories (+ crossings).
+
+        Requires open ADL (and optionally GIS) connections.
+        """
+        # Load fix coordinates for all TMIs (fixes + destination airports)
+        all_fixes = set()
+        dest_airports = set()
+        for tmi in self.event.tmis:
+            if tmi.fix:
+                all_fixes.add(tmi.fix)
+            all_fixes.update(tmi.fixes)
+            # Collect destination airports for upstream direction filtering
+            for dest in (tmi.destinations or []):
+                dest_airports.add(dest)
+                dest_airports.add(f'K{dest}')  # ICAO variant
+
+        all_fixes.update(dest_airports)
+        if all_fixes:
+            self._load_fix_coordinates(list(all_fixes))
+
+        # Load airport coordinates for destinations not found in nav_fixes
+        missing_dests = [d for d in dest_airports if d not in self.fix_coords]
+        if missing_dests:
+            self._load_airport_coordinates(missing_dests)
+
+        # Pre-load ALL flights to/from featured facilities
+        # This is the comprehensive approach - gather all flights that could
+        # potentially be affected by TMIs, then let trajectory analysis
+        # determine actual crossings
+        self.flight_data = self._get_all_featured_flights()
+
+        if self.flight_data:
+            with self._perf_phase('preload'):
+                self._preload_trajectories([f['callsign'] for f in self.flight_data.values()])
+
+    def _run_tmi_analyses(self, results: Dict):
+        """
+        Analyze every MIT/GS/reroute/APREQ TMI and merge into results.
+
+        Analyses only read the preloaded caches, so they are dispatched as
+        independent tasks (see AnalysisTaskRunner). Ordering dependencies of
+        the sequential flow are kept:
+        - reroute programs (and their fallback TMIs) run as one lane, because
+          each analysis adds PostGIS-expanded waypoints to fix_coords that
+          later reroutes see; APREQ tasks receive those additions
+        - GS/reroute fallback TMIs only run when their programs produced nothing
+        Results are merged in task order, so the output matches a sequential run.
+        """
+        mit_tmis = [t for t in self.event.tmis if t.tmi_type in (TMIType.MIT, TMIType.MINIT)]
+        gs_tmis = [t for t in self.event.tmis if t.tmi_type == TMIType.GS]
+        reroute_tmis = [t for t in self.event.tmis if t.tmi_type == TMIType.REROUTE]
+        apreq_tmis = [t for t in self.event.tmis if t.tmi_type in (TMIType.APREQ, TMIType.CFR)]
+        gs_programs = getattr(self.event, 'gs_programs', [])
+        reroute_programs = getattr(self.event, 'reroute_programs', [])
+
+        # Required routes are shared by many flights/programs: expand them once, batched
+        if reroute_programs or reroute_tmis:
+            with self._perf_phase('route_prefetch'):
+                self._prefetch_route_expansions(reroute_programs, reroute_tmis)
+
+        with AnalysisTaskRunner(self, self.workers) as runner:
+            phase1 = ([('mit', tmi) for tmi in mit_tmis] +
+                      [('gs_program', program) for program in gs_programs])
+            if reroute_programs or reroute_tmis:
+                phase1.append(('reroute_lane', (reroute_programs, reroute_tmis)))
+            outputs = iter(runner.map(phase1))
+
+            # MIT/MINIT Analysis
+            for tmi in mit_tmis:
+                result = next(outputs)
+                if result:
+                    key = self._mit_result_key(tmi)
+                    # Extract trajectories for separate file output
+                    self._mit_trajectories[key] = result.pop('_trajectories', {})
+                    results['mit_results'][key] = result
+
+            # Ground Stop Analysis - prefer programs, fall back to individual TMIs
+            for program in gs_programs:
+                result = next(outputs)
+                if result:
+                    key = f"GS_{program.airport}"
+                    results['gs_results'][key] = result
+                else:
+                    logger.warning(f"GS program {program.airport} returned no results (no matching flights?)")
+
+            # Reroute Analysis - programs first, individual TMIs as fallback (one lane)
+            fix_coords_added = {}
+            if reroute_programs or reroute_tmis:
+                reroute_entries, fix_coords_added, route_cache_state = next(outputs)
+                self.fix_coords.update(fix_coords_added)
+                if route_cache_state:
+                    self._get_route_cache().absorb_state(route_cache_state)
+                    self.route_cache.save()
+                for key, result in reroute_entries:
+                    results['reroute_results'][key] = result
+
+            # Fall back to individual GS TMIs if programs produced nothing
+            gs_fallback = []
+            if not results['gs_results'] and gs_tmis:
+                logger.info("GS programs produced no results, falling back to individual TMI approach")
+                gs_fallback = gs_tmis
+
+            phase2 = ([('gs', tmi) for tmi in gs_fallback] +
+                      [('apreq', (tmi, fix_coords_added)) for tmi in apreq_tmis])
+            outputs = iter(runner.map(phase2))
+
+            for tmi in gs_fallback:
+                result = next(outputs)
+                if result:
+                    key = f"GS_{tmi.provider}_{','.join(tmi.destinations)}_ALL"
+                    results['gs_results'][key] = result
+
+            # APREQ Tracking (just count flights, no compliance assessment)
+            for tmi in apreq_tmis:
+                result = next(outputs)
+                if result:
+                    key = f"{tmi.tmi_type.value}_{tmi.fix or 'ALL'}"
+                    results['apreq_results'][key] = result
+
+    @staticmethod
+    def _mit_result_key(tmi: TMI) -> str:
+        """mit_results key for a MIT/MINIT TMI"""
+        # Use unique key: type_fix_starttime_value to differentiate multiple TMIs per fix
+        # Include provider/requestor for multi-facility splits so each boundary gets its own result
+        time_key = tmi.start_utc.strftime('%H%M') if tmi.start_utc else 'notime'
+        fac_key = f"_{tmi.requestor}_{tmi.provider}" if (tmi.group_id and tmi.provider) else ''
+        return f"{tmi.tmi_type.value}_{tmi.fix}_{time_key}_{tmi.value}{fac_key}"
+
+    def _run_analysis_task(self, task: tuple):
+        """Execute one analysis task (in-process or inside a pool worker)"""
+        if self.profiler:
+            with self.profiler.phase(self._analysis_task_label(task)):
+                return self._dispatch_analysis_task(task)
+        return self._dispatch_analysis_task(task)
+
+    def _analysis_task_label(self, task: tuple) -> str:
+        """Profiler phase name of an analysis task"""
+        kind, item = task
+        if kind == 'mit':
+            return f"mit:{self._mit_result_key(item)}"
+        if kind == 'gs_program':
+            return f"gs_program:{item.airport}"
+        if kind == 'gs':
+            return f"gs:{item.provider}_{','.join(item.destinations)}"
+        if kind == 'apreq':
+            tmi = item[0]
+            return f"apreq:{tmi.tmi_type.value}_{tmi.fix or 'ALL'}"
+        return kind
+
+    def _dispatch_analysis_task(self, task: tuple):
+        """Run the analysis behind one (kind, item) task"""
+        kind, item = task
+        if kind == 'mit':
+            return self._analyze_mit_compliance(item)
+        if kind == 'gs_program':
+            return self._analyze_gs_program(item)
+        if kind == 'gs':
+            return self._analyze_gs_compliance(item)
+        if kind == 'reroute_lane':
+            return self._analyze_reroute_lane(*item)
+        if kind == 'apreq':
+            tmi, fix_coords_added = item
+            self.fix_coords.update(fix_coords_added)
+            return self._track_apreq_flights(tmi)
+        raise ValueError(f"Unknown analysis task: {kind}")
+
+    def _analyze_reroute_lane(self, programs: List[RerouteProgram], tmis: List[TMI]) -> tuple:
+        """
+        Reroute programs, falling back to individual reroute TMIs.
+
+        Returns ([(key, result), ...], fix_coords entries added by the analyses,
+        route cache state - counters and new expansions, see RouteExpansionCache).
+        """
+        fix_coords_before = dict(self.fix_coords)
+        entries = []
+
+        for program in programs:
+            with self._perf_phase(f"reroute_program:{program.name or program.route_type}"):
+                result = self._analyze_reroute_program(program)
+            if result:
+                key = program.name or f"REROUTE_{program.route_type}_{program.action}"
+                entries.append((key, result))
+
+        # Fall back to individual reroute TMIs if programs produced nothing
+        if not entries and tmis:
+            logger.info("Reroute programs produced no results, falling back to individual TMI approach")
+            for tmi in tmis:
+                with self._perf_phase(f"reroute:{tmi.reroute_name or ','.join(tmi.destinations[:2])}"):
+                    result = self._analyze_reroute_compliance(tmi)
+                if result:
+                    key = tmi.reroute_name or f"REROUTE_{','.join(tmi.origins[:2])}_{','.join(tmi.destinations[:2])}"
+                    entries.append((key, result))
+
+        fix_coords_added = {name: coords for name, coords in self.fix_coords.items()
+                            if fix_coords_before.get(name) != coords}
+        route_cache_state = self.route_cache.export_state() if self.route_cache else None
+        return entries, fix_coords_added, route_cache_state
+
+    def _prepare_for_workers(self):
+        """Build lazily-initialized shared state so forked workers inherit it"""
+        if HAS_NUMPY and self._trajectory_cache_loaded and self._crossing_engine is None:
+            self._crossing_engine = FixCrossingEngine(self._trajectory_cache)
+
+    def _load_fix_coordinates(self, fixes: List[str]):
+        """Load fix coordinates from database, disambiguating by geographic context."""
+        cursor = self.adl_conn.cursor()
+        fix_in = "'" + "','".join(fixes) + "'"
+
+        rows = self._cached_fetchall(cursor, 'nav_fixes', f"""
+            SELECT fix_name, lat, lon FROM dbo.nav_fixes
+            WHERE fix_name IN ({fix_in})
+        """, reference=True)
+
+        # Group all candidates by fix name
+        candidates = {}
+        for row in rows:
+            name = row[0]
+            if name not in candidates:
+                candidates[name] = []
+            candidates[name].append((float(row[1]), float(row[2])))
+        cursor.close()
+
+        # Compute geographic centroid from already-loaded coordinates
+        # (airports, previously loaded fixes) for disambiguation
+        centroid_lat, centroid_lon = self._get_context_centroid()
+
+        for name, coords_list in candidates.items():
+            if len(coords_list) == 1:
+                lat, lon = coords_list[0]
             else:
                 # CONUS preference: if multiple candidates and some are in CONUS, prefer those
                 conus = [(la, lo) for la, lo in coords_list
@@ -1866,12 +2351,12 @@ class TMIComplianceAnalyzer:
             cursor = self.adl_conn.cursor()
             icao_codes = [f'K{a}' if len(a) == 3 else a for a in airports[:10]]
             code_in = "'" + "','".join(icao_codes + airports[:10]) + "'"
-            cursor.execute(f"""
+            rows = self._cached_fetchall(cursor, 'airport_centroid', f"""
                 SELECT LAT_DECIMAL, LONG_DECIMAL FROM dbo.apts
                 WHERE ICAO_ID IN ({code_in}) OR ARPT_ID IN ({code_in})
-            """)
+            """, reference=True)
             lats, lons = [], []
-            for row in cursor.fetchall():
+            for row in rows:
                 if row[0] is not None and row[1] is not None:
                     lats.append(float(row[0]))
                     lons.append(float(row[1]))
@@ -1888,14 +2373,14 @@ class TMIComplianceAnalyzer:
         """Load airport coordinates from apts table for codes not in nav_fixes."""
         cursor = self.adl_conn.cursor()
         code_in = "'" + "','".join(airport_codes) + "'"
-        cursor.execute(f"""
+        rows = self._cached_fetchall(cursor, 'airport_coords', f"""
             SELECT ICAO_ID, LAT_DECIMAL, LONG_DECIMAL FROM dbo.apts
             WHERE ICAO_ID IN ({code_in})
             UNION
             SELECT ARPT_ID, LAT_DECIMAL, LONG_DECIMAL FROM dbo.apts
             WHERE ARPT_ID IN ({code_in})
-        """)
-        for row in cursor.fetchall():
+        """, reference=True)
+        for row in rows:
             if row[0] and row[1] is not None and row[2] is not None:
                 self.fix_coords[row[0]] = {
                     'lat': float(row[1]),
@@ -1908,10 +2393,17 @@ class TMIComplianceAnalyzer:
         """Load all known airway names from DB for token classification."""
         if hasattr(self, '_known_airway_names'):
             return self._known_airway_names
+        if self.session and 'airways' in self.session.references:
+            self._known_airway_names = self.session.references['airways']
+            return self._known_airway_names
         cursor = self.adl_conn.cursor()
-        cursor.execute("SELECT DISTINCT airway_name FROM dbo.airway_segments")
-        self._known_airway_names = {row[0].upper() for row in cursor.fetchall()}
+        rows = self._cached_fetchall(cursor, 'airways',
+                                     "SELECT DISTINCT airway_name FROM dbo.airway_segments",
+                                     reference=True)
+        self._known_airway_names = {row[0].upper() for row in rows}
         cursor.close()
+        if self.session:
+            self.session.references['airways'] = self._known_airway_names
         logger.info(f"  Loaded {len(self._known_airway_names)} known airway names")
         return self._known_airway_names
 
@@ -1926,36 +2418,45 @@ class TMIComplianceAnalyzer:
         - Procedure notation stripping
         - Pseudo-fix filtering (UNKN, VARIOUS)
 
+        Memoized per normalized route string and AIRAC cycle (RouteExpansionCache).
+
         Returns list of dicts: [{seq, id, lat, lon, type}, ...]
         """
         if not self.gis_conn or not route_string:
             return []
-        try:
-            cursor = self.gis_conn.cursor()
-            cursor.execute(
-                "SELECT waypoint_seq, waypoint_id, lat, lon, waypoint_type "
-                "FROM expand_route(%s)",
-                (route_string,)
-            )
-            waypoints = []
-            for row in cursor.fetchall():
-                waypoints.append({
-                    'seq': row[0],
-                    'id': row[1],
-                    'lat': float(row[2]) if row[2] else None,
-                    'lon': float(row[3]) if row[3] else None,
-                    'type': row[4]  # e.g., 'nav_fix', 'airway_J79', 'airport', 'fbd'
-                })
-            cursor.close()
-            return waypoints
-        except Exception as e:
-            logger.warning(f"  PostGIS expand_route failed for '{route_string[:50]}': {e}")
-            if self.gis_conn:
-                try:
-                    self.gis_conn.rollback()
-                except Exception:
-                    pass
-            return []
+        return self._get_route_cache().expand_route(route_string)
+
+    def _get_route_cache(self) -> RouteExpansionCache:
+        """Memo layer for PostGIS route expansions (see core/route_cache.py)"""
+        if self.route_cache is None:
+            if self.session and self.session.route_cache:
+                self.route_cache = self.session.route_cache
+                self.route_cache.gis_conn = self.gis_conn
+                self.route_cache.reset_counters()
+            else:
+                self.route_cache = RouteExpansionCache(self.gis_conn, self.input_cache)
+                if self.session:
+                    self.session.route_cache = self.route_cache
+        return self.route_cache
+
+    @staticmethod
+    def _tmi_required_route_segments(tmi: TMI) -> List[str]:
+        """Required route segments of a reroute TMI (the > < marked parts, else whole routes)"""
+        segments = []
+        for route_spec in tmi.reroute_routes:
+            route_str = route_spec.get('route', '')
+            marked = re.findall(r'>([^<]+)<', route_str)
+            segments.extend(segment.strip() for segment in (marked if marked else [route_str]))
+        return segments
+
+    def _prefetch_route_expansions(self, programs: List[RerouteProgram], tmis: List[TMI]):
+        """Expand every distinct required route string up front, in batches"""
+        if not self.gis_conn:
+            return
+        routes = [route.route_string for program in programs for route in program.current_routes]
+        for tmi in tmis:
+            routes.append(' '.join(self._tmi_required_route_segments(tmi)))
+        self._get_route_cache().prefetch(routes)
 
     def _compare_routes(
         self,
@@ -2206,38 +2707,11 @@ class TMIComplianceAnalyzer:
     def _get_required_route_artccs(self, route_string: str) -> Optional[List[str]]:
         """Get ARTCC traversal for a required route via PostGIS expand_route_with_artccs().
 
-        Cached per route string. Returns list of ARTCC codes or None.
+        Memoized in the route cache. Returns list of ARTCC codes or None.
         """
         if not self.gis_conn or not route_string:
             return None
-
-        cache_key = route_string.strip()
-        if not hasattr(self, '_required_artcc_cache'):
-            self._required_artcc_cache = {}
-        if cache_key in self._required_artcc_cache:
-            return self._required_artcc_cache[cache_key]
-
-        try:
-            cursor = self.gis_conn.cursor()
-            cursor.execute(
-                "SELECT artccs_traversed FROM expand_route_with_artccs(%s)",
-                (route_string,)
-            )
-            row = cursor.fetchone()
-            cursor.close()
-            if row and row[0]:
-                artccs = list(row[0]) if isinstance(row[0], (list, tuple)) else row[0].split()
-                self._required_artcc_cache[cache_key] = artccs
-                return artccs
-        except Exception as e:
-            logger.warning(f"  PostGIS expand_route_with_artccs failed: {e}")
-            if self.gis_conn:
-                try:
-                    self.gis_conn.rollback()
-                except Exception:
-                    pass
-        self._required_artcc_cache[cache_key] = None
-        return None
+        return self._get_route_cache().route_artccs(route_string)
 
     def _preload_trajectories(self, callsigns: List[str]):
         """
@@ -2253,22 +2727,100 @@ class TMIComplianceAnalyzer:
             logger.info("No callsigns to preload trajectories for")
             return
 
-        cursor = self.adl_conn.cursor()
+        load_started = time.perf_counter()
 
         # Use widest time window from all TMIs + event times, plus buffer
-        earliest, latest = self._get_widest_time_window()
-        query_start = earliest - timedelta(hours=1)  # Buffer before
-        query_end = latest + timedelta(hours=1)      # Buffer after
-
-        callsign_in = "'" + "','".join(callsigns) + "'"
+        query_start, query_end = self._get_trajectory_window()
 
         logger.info(f"Pre-loading trajectories for {len(callsigns)} flights...")
         logger.info(f"  Trajectory window: {query_start.strftime('%Y-%m-%d %H:%MZ')} to {query_end.strftime('%Y-%m-%d %H:%MZ')}")
 
+        # Re-runs with the same callsign set, window, and ADL source watermarks
+        # are served from the on-disk input cache
+        cached = None
+        if self.input_cache and self.input_cache.enabled:
+            self._trajectory_cache_key = self.input_cache.key(
+                'trajectories',
+                callsigns=sorted(set(callsigns)),
+                window=[query_start, query_end],
+                watermarks=(self.trajectory_source.fingerprint(query_start, query_end)
+                            if self.trajectory_source else self._get_source_watermarks())
+            )
+            cached = self.input_cache.load_trajectories(self._trajectory_cache_key)
+
+        if cached:
+            self._trajectory_cache, self._trajectory_metadata = cached
+        else:
+            self._query_trajectories(callsigns, query_start, query_end)
+            if self._trajectory_cache_key:
+                self.input_cache.save_trajectories(
+                    self._trajectory_cache_key, self._trajectory_cache, self._trajectory_metadata)
+
+        self._log_trajectory_store_stats(time.perf_counter() - load_started)
+
+        # Source/tier distribution (metadata holds the first row seen per callsign)
+        tier_counts = Counter(m['tmi_tier'] for m in self._trajectory_metadata.values())
+        source_counts = Counter(m['source'] for m in self._trajectory_metadata.values())
+        total = len(self._trajectory_cache)
+        tmi_count = tier_counts.get(0, 0) + tier_counts.get(1, 0) + tier_counts.get(2, 0)
+        archive_count = tier_counts.get(None, 0)
+        logger.info(f"  Cached trajectories for {total} flights")
+        logger.info(f"  Sources: TMI={source_counts.get('TMI', 0)}, Live={source_counts.get('LIVE', 0)}, Archive={source_counts.get('ARCHIVE', 0)}")
+        logger.info(f"  TMI tiers: T-0={tier_counts.get(0, 0)}, T-1={tier_counts.get(1, 0)}, T-2={tier_counts.get(2, 0)}, non-TMI={archive_count}")
+        if total > 0:
+            logger.info(f"  Highest-res coverage: {tmi_count + source_counts.get('LIVE', 0)}/{total} flights ({(tmi_count + source_counts.get('LIVE', 0))/total*100:.0f}%)")
+
+        # Pre-compute boundary crossings for all flights (PostGIS or local engine)
+        if (self.gis_conn or self.boundary_engine) and self._trajectory_cache:
+            with self._perf_phase('boundary_crossings'):
+                self._precompute_boundary_crossings()
+
+        self._trajectory_cache_loaded = True
+
+    def _query_trajectories(self, callsigns: List[str], query_start: datetime, query_end: datetime):
+        """Load trajectories for the given callsigns into the columnar store"""
+        if self.trajectory_source:
+            logger.info(f"  Trajectory source: {self.trajectory_source.name} "
+                        f"({self.trajectory_source.trajectory_dir})")
+            loader = None
+            rows = self.trajectory_source.rows(callsigns, query_start, query_end)
+        else:
+            loader = TrajectoryLoader(self.adl, self.adl_conn)
+            rows = self._query_adl_trajectory_rows(loader, callsigns, query_start, query_end)
+
+        # Stream rows (grouped by callsign) straight into the columnar store
+        builder = TrajectoryStoreBuilder()
+        for row in rows:
+            cs, fuid, ts, lat, lon, gs, alt, dept, dest, tmi_tier, source_table = row
+
+            if cs not in self._trajectory_metadata:
+                self._trajectory_metadata[cs] = {
+                    'flight_uid': fuid,
+                    'dept': dept or 'UNK',
+                    'dest': dest or 'UNK',
+                    'tmi_tier': tmi_tier,
+                    'source': source_table
+                }
+
+            builder.append(cs, normalize_datetime(ts), float(lat), float(lon),
+                           float(gs) if gs else 0, float(alt) if alt else 0)
+
+        self._trajectory_cache = builder.build()
+        self._trajectory_load_stats = (self.trajectory_source.stats() if loader is None
+                                       else {'source': 'adl', **loader.stats()})
+        stats = self._trajectory_load_stats
+        timings = ', '.join(f"{k[:-4]} {v:.1f}s" for k, v in stats.items() if k.endswith('_sec'))
+        logger.info(f"  Trajectory rows: {stats['rows']} "
+                    f"({', '.join(f'{src}={n}' for src, n in stats['rows_by_source'].items()) or 'none'}) "
+                    f"for {stats['callsigns']} callsigns - {timings}")
+
+    def _query_adl_trajectory_rows(self, loader: TrajectoryLoader, callsigns: List[str],
+                                   query_start: datetime, query_end: datetime):
+        """Stream trajectory rows for the given callsigns from all ADL sources"""
         # Load from ALL trajectory sources with priority-based deduplication.
         # Priority: TMI (full resolution) > Live (not yet archived) > Archive (downsampled)
         # This ensures the analyzer always uses the highest resolution data available.
-        query = self.adl.format_query(f"""
+        query = f"""
             WITH all_trajectory AS (
                 SELECT c.callsign, t.flight_uid, t.timestamp_utc,
                        t.lat, t.lon, t.groundspeed_kts, t.altitude_ft,
@@ -2278,8 +2830,8 @@ class TMIComplianceAnalyzer:
                 FROM dbo.adl_tmi_trajectory t
                 JOIN dbo.adl_flight_core c ON t.flight_uid = c.flight_uid
                 JOIN dbo.adl_flight_plan p ON t.flight_uid = p.flight_uid
+                JOIN {CALLSIGN_TABLE} k ON k.callsign = c.callsign
                 WHERE t.timestamp_utc >= %s AND t.timestamp_utc <= %s
-                  AND c.callsign IN ({callsign_in})
                 UNION ALL
                 SELECT c.callsign, t.flight_uid, t.recorded_utc,
                        t.lat, t.lon, t.groundspeed_kts, t.altitude_ft,
@@ -2289,8 +2841,8 @@ class TMIComplianceAnalyzer:
                 FROM dbo.adl_flight_trajectory t
                 JOIN dbo.adl_flight_core c ON t.flight_uid = c.flight_uid
                 JOIN dbo.adl_flight_plan p ON t.flight_uid = p.flight_uid
+                JOIN {CALLSIGN_TABLE} k ON k.callsign = c.callsign
                 WHERE t.recorded_utc >= %s AND t.recorded_utc <= %s
-                  AND c.callsign IN ({callsign_in})
                 UNION ALL
                 SELECT a.callsign, a.flight_uid, a.timestamp_utc,
                        a.lat, a.lon, a.groundspeed_kts, a.altitude_ft,
@@ -2299,8 +2851,8 @@ class TMIComplianceAnalyzer:
                        3 AS source_priority
                 FROM dbo.adl_trajectory_archive a
                 JOIN dbo.adl_flight_plan p ON a.flight_uid = p.flight_uid
+                JOIN {CALLSIGN_TABLE} k ON k.callsign = a.callsign
                 WHERE a.timestamp_utc >= %s AND a.timestamp_utc <= %s
-                  AND a.callsign IN ({callsign_in})
             ),
             ranked AS (
                 SELECT *, ROW_NUMBER() OVER (
@@ -2316,80 +2868,111 @@ class TMIComplianceAnalyzer:
             FROM ranked
             WHERE rn = 1
             ORDER BY callsign, timestamp_utc
-        """)
-        cursor.execute(query, (
+        """
+        params = (
             query_start.strftime('%Y-%m-%d %H:%M:%S'),
             query_end.strftime('%Y-%m-%d %H:%M:%S'),
             query_start.strftime('%Y-%m-%d %H:%M:%S'),
             query_end.strftime('%Y-%m-%d %H:%M:%S'),
             query_start.strftime('%Y-%m-%d %H:%M:%S'),
             query_end.strftime('%Y-%m-%d %H:%M:%S')
-        ))
-
-        # Group by callsign and track source/tier distribution
-        tier_counts = {0: 0, 1: 0, 2: 0, None: 0}
-        source_counts = {'TMI': 0, 'LIVE': 0, 'ARCHIVE': 0}
-        for row in cursor.fetchall():
-            cs, fuid, ts, lat, lon, gs, alt, dept, dest, tmi_tier, source_table = row
-
-            if cs not in self._trajectory_cache:
-                self._trajectory_cache[cs] = []
-                self._trajectory_metadata[cs] = {
-                    'flight_uid': fuid,
-                    'dept': dept or 'UNK',
-                    'dest': dest or 'UNK',
-                    'tmi_tier': tmi_tier,
-                    'source': source_table
-                }
-                tier_counts[tmi_tier] = tier_counts.get(tmi_tier, 0) + 1
-                source_counts[source_table] = source_counts.get(source_table, 0) + 1
-
-            self._trajectory_cache[cs].append({
-                'timestamp': normalize_datetime(ts),
-                'lat': float(lat),
-                'lon': float(lon),
-                'gs': float(gs) if gs else 0,
-                'gs_valid': bool(gs and 100 < gs < 600),
-                'alt': float(alt) if alt else 0
-            })
+        )
 
-        cursor.close()
-        total = len(self._trajectory_cache)
-        tmi_count = tier_counts.get(0, 0) + tier_counts.get(1, 0) + tier_counts.get(2, 0)
-        archive_count = tier_counts.get(None, 0)
-        logger.info(f"  Cached trajectories for {total} flights")
-        logger.info(f"  Sources: TMI={source_counts.get('TMI', 0)}, Live={source_counts.get('LIVE', 0)}, Archive={source_counts.get('ARCHIVE', 0)}")
-        logger.info(f"  TMI tiers: T-0={tier_counts.get(0, 0)}, T-1={tier_counts.get(1, 0)}, T-2={tier_counts.get(2, 0)}, non-TMI={archive_count}")
-        if total > 0:
-            logger.info(f"  Highest-res coverage: {tmi_count + source_counts.get('LIVE', 0)}/{total} flights ({(tmi_count + source_counts.get('LIVE', 0))/total*100:.0f}%)")
+        return loader.rows(query, params, callsigns, source_index=10)
 
-        # Pre-compute PostGIS boundary crossings for all flights with GIS
-        if self.gis_conn and self._trajectory_cache:
-            self._precompute_boundary_crossings()
+    def _log_trajectory_store_stats(self, load_sec: float):
+        """Log trajectory store size, load time, and process peak RSS"""
+        store = self._trajectory_cache
+        logger.info(f"  Trajectory store: {store.point_count} points for {len(store)} flights, "
+                    f"{store.nbytes / 1048576:.1f} MB columnar, loaded in {load_sec:.1f}s")
+        try:
+            import resource
+            peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # ru_maxrss is KB on Linux, bytes on macOS
+            peak_mb = peak_kb / (1048576 if sys.platform == 'darwin' else 1024)
+            logger.info(f"  Peak RSS after trajectory load: {peak_mb:.0f} MB")
+        except ImportError:
+            pass  # resource module is unavailable on Windows
+
+    def _load_boundary_engine(self):
+        """
+        Build the local boundary engine when boundary_engine_mode is 'local'.
 
-        self._trajectory_cache_loaded = True
+        Polygons come from boundary_geojson if set, else from the GIS
+        connection, else from the repo's GeoJSON files. On failure the
+        analyzer keeps using the PostGIS crossing functions (if connected).
+        """
+        if self.boundary_engine_mode != 'local' or self.boundary_engine:
+            return
+        if self.session and self.session.boundary_engine:
+            self.boundary_engine = self.session.boundary_engine
+            return
+        try:
+            if self.boundary_geojson or not self.gis_conn:
+                self.boundary_engine = LocalBoundaryEngine.from_geojson(
+                    self.boundary_geojson or DEFAULT_GEOJSON_DIR)
+            else:
+                self.boundary_engine = LocalBoundaryEngine.from_postgis(self.gis_conn)
+        except Exception as e:
+            logger.warning(f"Local boundary engine unavailable ({e}), "
+                           f"{'using PostGIS crossings' if self.gis_conn else 'no boundary crossings'}")
+            self.boundary_engine = None
+            if self.gis_conn:
+                try:
+                    self.gis_conn.rollback()
+                except Exception:
+                    pass
+        if self.session:
+            self.session.boundary_engine = self.boundary_engine
 
     def _precompute_boundary_crossings(self):
         """
-        Pre-compute PostGIS boundary crossings for all cached trajectories.
+        Pre-compute boundary crossings for all cached trajectories.
 
         This is the expensive operation - calling PostGIS for each flight.
         By doing it once upfront, we avoid re-computing for each TMI.
+        Trajectories are sent in batches of gis_batch_size flights per
+        statement, spread over gis_workers GIS connections (see
+        BoundaryCrossingBatcher); gis_batch_size=1 is the per-flight path.
+        With a local boundary engine the crossings are computed in process
+        instead (see LocalBoundaryEngine), with the same result format.
 
         Flights with low-quality trajectory data (sparse, missing enroute positions)
         are flagged and excluded from boundary crossing analysis to prevent
         unreliable interpolated results.
         """
-        if not self.gis_conn:
+        if not self.gis_conn and not self.boundary_engine:
             return
 
-        gis_cursor = self.gis_conn.cursor()
-        processed = 0
+        # Crossings depend only on the trajectories and the boundaries: the local
+        # engine's polygon digest, or the PostGIS boundary table watermarks
+        # (refreshed after REFERENCE_TTL_SEC when those cannot be read)
+        crossings_key = None
+        crossings_ttl = None
+        if self._trajectory_cache_key:
+            if self.boundary_engine:
+                boundaries = self.boundary_engine.fingerprint()
+            else:
+                boundaries = self._get_boundary_watermarks()
+                if not boundaries:
+                    crossings_ttl = REFERENCE_TTL_SEC
+            crossings_key = self.input_cache.key('crossings', trajectories=self._trajectory_cache_key,
+                                                 boundaries=boundaries)
+            cached = self.input_cache.load_crossings(crossings_key, ttl=crossings_ttl)
+            if cached:
+                crossing_cache, low_quality = cached
+                self._crossing_cache.update(crossing_cache)
+                self._low_quality_flights.update(low_quality)
+                logger.info(f"  Cached boundary crossings for {len(self._crossing_cache)} flights "
+                            f"({len(low_quality)} low-quality flights skipped)")
+                return
+
         skipped_quality = 0
         total = len(self._trajectory_cache)
 
         logger.info(f"Pre-computing boundary crossings for {total} flights...")
 
+        eligible = {}
         for callsign, trajectory in self._trajectory_cache.items():
             if len(trajectory) < 2:
                 continue
@@ -2402,64 +2985,27 @@ class TMIComplianceAnalyzer:
                 logger.debug(f"  Skipping {callsign}: low quality trajectory ({reason})")
                 continue
 
-            # Build waypoints JSON for PostGIS
-            waypoints = [
-                {'lat': pt['lat'], 'lon': pt['lon'], 'sequence_num': i}
-                for i, pt in enumerate(trajectory)
-            ]
-            waypoints_json = json.dumps(waypoints)
-
-            try:
-                # Try get_trajectory_all_crossings (handles ARTCC + TRACON)
-                try:
-                    gis_cursor.execute('''
-                        SELECT boundary_code, crossing_lat, crossing_lon, crossing_fraction,
-                               boundary_type, crossing_type
-                        FROM get_trajectory_all_crossings(%s::jsonb)
-                        ORDER BY crossing_fraction,
-                                 CASE crossing_type WHEN 'EXIT' THEN 0 ELSE 1 END
-                    ''', (waypoints_json,))
-                    rows = gis_cursor.fetchall()
-                    self._crossing_cache[callsign] = [
-                        {
-                            'facility_code': r[0],
-                            'lat': float(r[1]),
-                            'lon': float(r[2]),
-                            'fraction': float(r[3]),
-                            'facility_type': r[4] if len(r) > 4 else 'ARTCC',
-                            'crossing_type': r[5] if len(r) > 5 else 'UNKNOWN'
-                        }
-                        for r in rows
-                    ]
-                except Exception:
-                    # Fall back to ARTCC-only function
-                    gis_cursor.execute('''
-                        SELECT artcc_code, crossing_lat, crossing_lon, crossing_fraction
-                        FROM get_trajectory_artcc_crossings(%s::jsonb)
-                        ORDER BY crossing_fraction
-                    ''', (waypoints_json,))
-                    rows = gis_cursor.fetchall()
-                    self._crossing_cache[callsign] = [
-                        {
-                            'facility_code': r[0],
-                            'lat': float(r[1]),
-                            'lon': float(r[2]),
-                            'fraction': float(r[3]),
-                            'facility_type': 'ARTCC',
-                            'crossing_type': 'UNKNOWN'
-                        }
-                        for r in rows
-                    ]
-
-                processed += 1
-                if processed % 50 == 0:
-                    logger.info(f"  Processed {processed}/{total} flights...")
+            eligible[callsign] = trajectory
 
-            except Exception as e:
-                logger.debug(f"Error computing crossings for {callsign}: {e}")
-                self._crossing_cache[callsign] = []
+        if self.boundary_engine:
+            self._crossing_cache.update(self.boundary_engine.run(eligible))
+        else:
+            batcher = BoundaryCrossingBatcher(
+                self.gis_conn,
+                batch_size=self.gis_batch_size,
+                workers=self.gis_workers,
+                connect_fn=lambda: self._profiled_connection(GISConnection().connect(), 'gis')
+            )
+            self._crossing_cache.update(batcher.run(eligible))
+            if crossings_key and batcher.stats['failed_flights']:
+                # Failed flights come back as [] (no crossings); caching that
+                # would turn a transient GIS error into a permanent result
+                logger.warning(f"  {batcher.stats['failed_flights']} GIS crossing queries failed, "
+                               f"not caching boundary crossings")
+                crossings_key = None
+        if crossings_key:
+            self.input_cache.save_crossings(crossings_key, self._crossing_cache, self._low_quality_flights)
 
-        gis_cursor.close()
         logger.info(f"  Cached boundary crossings for {len(self._crossing_cache)} flights")
         if skipped_quality > 0:
             logger.warning(f"  Skipped {skipped_quality} flights with low-quality trajectory data")
@@ -2620,6 +3166,9 @@ class TMIComplianceAnalyzer:
         This handles the common case of Tier 4 cruise (5-min intervals, ~33nm gaps)
         where flights cross a fix but have no trajectory point within the bbox.
 
+        Uses the vectorized crossing engine when NumPy is available, otherwise
+        the scalar segment scan. Both produce the same CrossingResult list.
+
         Falls back to bbox-filtered SQL queries when cache is not loaded.
         """
         callsigns = [cs for cs in callsigns if cs not in self._low_quality_flights]
@@ -2628,6 +3177,10 @@ class TMIComplianceAnalyzer:
         tmi_end = tmi.get_effective_end()
 
         if self._trajectory_cache_loaded:
+            if HAS_NUMPY:
+                return self._detect_crossings_vectorized(
+                    fix_name, fix_lat, fix_lon, callsigns, tmi_start, tmi_end
+                )
             return self._detect_crossings_interpolated(
                 fix_name, fix_lat, fix_lon, callsigns, tmi_start, tmi_end
             )
@@ -2689,20 +3242,9 @@ class TMIComplianceAnalyzer:
 
                 best_dist = min_dist
                 best_seg_idx = i
-                gs1 = p1['gs'] if p1['gs_valid'] else 250
-                gs2 = p2['gs'] if p2['gs_valid'] else 250
-
-                best_result = CrossingResult(
-                    callsign=callsign,
-                    flight_uid=metadata.get('flight_uid', 0),
-                    crossing_time=interp_time,
-                    distance_nm=min_dist,
-                    lat=interp_lat,
-                    lon=interp_lon,
-                    groundspeed=gs1 + frac * (gs2 - gs1),
-                    altitude=p1['alt'] + frac * (p2['alt'] - p1['alt']),
-                    dept=metadata.get('dept', 'UNK'),
-                    dest=metadata.get('dest', 'UNK')
+                best_result = self._crossing_from_segment(
+                    callsign, metadata, p1, p2,
+                    min_dist, frac, interp_lat, interp_lon, interp_time
                 )
 
             if best_result and best_dist <= CROSSING_RADIUS_NM:
@@ -2715,16 +3257,80 @@ class TMIComplianceAnalyzer:
                      f"(segment interpolation, {len(callsigns)} candidates)")
         return crossings
 
+    def _detect_crossings_vectorized(self, fix_name: str, fix_lat: float, fix_lon: float,
+                                     callsigns: List[str], tmi_start, tmi_end) -> List[CrossingResult]:
+        """
+        Detect crossings with the vectorized FixCrossingEngine.
+
+        The engine picks each flight's closest-approach segment for all
+        candidates in one batched pass; the winning segment is then rebuilt
+        with closest_approach_on_segment() so results match the scalar path.
+        """
+        if self._crossing_engine is None:
+            self._crossing_engine = FixCrossingEngine(self._trajectory_cache)
+
+        best_segments = self._crossing_engine.best_segments(
+            fix_lat, fix_lon, callsigns, tmi_start, tmi_end, CROSSING_RADIUS_NM
+        )
+
+        crossings = []
+        for callsign in callsigns:
+            seg_idx = best_segments.get(callsign)
+            if seg_idx is None:
+                continue
+
+            trajectory = self._trajectory_cache[callsign]
+            p1 = trajectory[seg_idx]
+            p2 = trajectory[seg_idx + 1]
+            min_dist, frac, interp_lat, interp_lon = closest_approach_on_segment(
+                p1['lat'], p1['lon'], p2['lat'], p2['lon'], fix_lat, fix_lon
+            )
+            if min_dist > CROSSING_RADIUS_NM:
+                continue
+
+            dt = (p2['timestamp'] - p1['timestamp']).total_seconds()
+            interp_time = p1['timestamp'] + timedelta(seconds=dt * frac)
+            result = self._crossing_from_segment(
+                callsign, self._trajectory_metadata.get(callsign, {}), p1, p2,
+                min_dist, frac, interp_lat, interp_lon, interp_time
+            )
+            result.bearing = compute_approach_bearing(
+                trajectory, result.lat, result.lon, seg_idx
+            )
+            crossings.append(result)
+
+        logger.info(f"  Fix crossings ({fix_name}): {len(crossings)} detected "
+                     f"(vectorized segment interpolation, {len(callsigns)} candidates)")
+        return crossings
+
+    def _crossing_from_segment(self, callsign: str, metadata: dict, p1: dict, p2: dict,
+                               min_dist: float, frac: float, interp_lat: float,
+                               interp_lon: float, interp_time) -> CrossingResult:
+        """Build a CrossingResult at fraction frac along trajectory segment p1->p2"""
+        gs1 = p1['gs'] if p1['gs_valid'] else 250
+        gs2 = p2['gs'] if p2['gs_valid'] else 250
+        return CrossingResult(
+            callsign=callsign,
+            flight_uid=metadata.get('flight_uid', 0),
+            crossing_time=interp_time,
+            distance_nm=min_dist,
+            lat=interp_lat,
+            lon=interp_lon,
+            groundspeed=gs1 + frac * (gs2 - gs1),
+            altitude=p1['alt'] + frac * (p2['alt'] - p1['alt']),
+            dept=metadata.get('dept', 'UNK'),
+            dest=metadata.get('dest', 'UNK')
+        )
+
     def _detect_crossings_bbox(self, fix_name: str, fix_lat: float, fix_lon: float,
                                 callsigns: List[str], tmi_start, tmi_end) -> List[CrossingResult]:
         """Fallback: detect crossings using bbox-filtered SQL queries (no cache)."""
         crossings = []
-        cursor = self.adl_conn.cursor()
+        loader = TrajectoryLoader(self.adl, self.adl_conn)
         lat_margin = 0.18
         lon_margin = 0.24
-        callsign_in = "'" + "','".join(callsigns) + "'"
 
-        query = self.adl.format_query(f"""
+        query = f"""
             WITH trajectory_points AS (
                 SELECT c.callsign, t.flight_uid, t.timestamp_utc,
                        t.lat, t.lon, t.groundspeed_kts, t.altitude_ft,
@@ -2732,8 +3338,8 @@ class TMIComplianceAnalyzer:
                 FROM dbo.adl_tmi_trajectory t
                 JOIN dbo.adl_flight_core c ON t.flight_uid = c.flight_uid
                 JOIN dbo.adl_flight_plan p ON t.flight_uid = p.flight_uid
+                JOIN {CALLSIGN_TABLE} k ON k.callsign = c.callsign
                 WHERE t.timestamp_utc >= %s AND t.timestamp_utc <= %s
-                  AND c.callsign IN ({callsign_in})
                   AND t.lat BETWEEN %s AND %s AND t.lon BETWEEN %s AND %s
                 UNION ALL
                 SELECT c.callsign, t.flight_uid, t.recorded_utc,
@@ -2742,8 +3348,8 @@ class TMIComplianceAnalyzer:
                 FROM dbo.adl_flight_trajectory t
                 JOIN dbo.adl_flight_core c ON t.flight_uid = c.flight_uid
                 JOIN dbo.adl_flight_plan p ON t.flight_uid = p.flight_uid
+                JOIN {CALLSIGN_TABLE} k ON k.callsign = c.callsign
                 WHERE t.recorded_utc >= %s AND t.recorded_utc <= %s
-                  AND c.callsign IN ({callsign_in})
                   AND t.lat BETWEEN %s AND %s AND t.lon BETWEEN %s AND %s
                 UNION ALL
                 SELECT t.callsign, t.flight_uid, t.timestamp_utc,
@@ -2751,8 +3357,8 @@ class TMIComplianceAnalyzer:
                        p.fp_dept_icao, p.fp_dest_icao, 3 AS source_priority
                 FROM dbo.adl_trajectory_archive t
                 JOIN dbo.adl_flight_plan p ON t.flight_uid = p.flight_uid
+                JOIN {CALLSIGN_TABLE} k ON k.callsign = t.callsign
                 WHERE t.timestamp_utc >= %s AND t.timestamp_utc <= %s
-                  AND t.callsign IN ({callsign_in})
                   AND t.lat BETWEEN %s AND %s AND t.lon BETWEEN %s AND %s
             ),
             ranked AS (
@@ -2764,41 +3370,35 @@ class TMIComplianceAnalyzer:
                    groundspeed_kts, altitude_ft, fp_dept_icao, fp_dest_icao
             FROM ranked WHERE rn = 1
             ORDER BY callsign, timestamp_utc
-        """)
-        cursor.execute(query, (
+        """
+        params = (
             tmi_start.strftime('%Y-%m-%d %H:%M:%S'), tmi_end.strftime('%Y-%m-%d %H:%M:%S'),
             fix_lat - lat_margin, fix_lat + lat_margin, fix_lon - lon_margin, fix_lon + lon_margin,
             tmi_start.strftime('%Y-%m-%d %H:%M:%S'), tmi_end.strftime('%Y-%m-%d %H:%M:%S'),
             fix_lat - lat_margin, fix_lat + lat_margin, fix_lon - lon_margin, fix_lon + lon_margin,
             tmi_start.strftime('%Y-%m-%d %H:%M:%S'), tmi_end.strftime('%Y-%m-%d %H:%M:%S'),
             fix_lat - lat_margin, fix_lat + lat_margin, fix_lon - lon_margin, fix_lon + lon_margin
-        ))
-        positions = cursor.fetchall()
-        cursor.close()
-        logger.info(f"  Found {len(positions)} trajectory points near {fix_name} (bbox fallback)")
-
-        flight_positions = defaultdict(list)
-        for pos in positions:
-            flight_positions[pos[0]].append(pos)
-
-        for callsign, pos_list in flight_positions.items():
-            closest_dist = float('inf')
-            closest_pos = None
-            for pos in pos_list:
-                cs, fuid, ts, lat, lon, gs, alt, dept, dest = pos
-                lat, lon = float(lat), float(lon)
-                dist = haversine_nm(lat, lon, fix_lat, fix_lon)
-                if dist < closest_dist:
-                    closest_dist = dist
-                    closest_pos = CrossingResult(
-                        callsign=callsign, flight_uid=fuid,
-                        crossing_time=normalize_datetime(ts), distance_nm=dist,
-                        lat=lat, lon=lon,
-                        groundspeed=float(gs) if gs and 100 < gs < 600 else 250,
-                        altitude=float(alt) if alt else 0,
-                        dept=dept or 'UNK', dest=dest or 'UNK'
-                    )
-            if closest_pos and closest_dist <= CROSSING_RADIUS_NM:
+        )
+
+        # Closest position per flight, kept while the rows stream in
+        closest = {}  # callsign -> (distance, CrossingResult)
+        for pos in loader.rows(query, params, callsigns):
+            cs, fuid, ts, lat, lon, gs, alt, dept, dest = pos
+            lat, lon = float(lat), float(lon)
+            dist = haversine_nm(lat, lon, fix_lat, fix_lon)
+            if dist < closest.get(cs, (float('inf'),))[0]:
+                closest[cs] = (dist, CrossingResult(
+                    callsign=cs, flight_uid=fuid,
+                    crossing_time=normalize_datetime(ts), distance_nm=dist,
+                    lat=lat, lon=lon,
+                    groundspeed=float(gs) if gs and 100 < gs < 600 else 250,
+                    altitude=float(alt) if alt else 0,
+                    dept=dept or 'UNK', dest=dest or 'UNK'
+                ))
+        logger.info(f"  Found {loader.stats()['rows']} trajectory points near {fix_name} (bbox fallback)")
+
+        for closest_dist, closest_pos in closest.values():
+            if closest_dist <= CROSSING_RADIUS_NM:
                 # bbox fallback has no upstream trajectory data — leave bearing None
                 # (approach bearing requires full trajectory, only available in cache path)
                 crossings.append(closest_pos)
@@ -2822,7 +3422,7 @@ class TMIComplianceAnalyzer:
         Returns:
             List of BoundaryCrossing objects for flights crossing the provider->requestor boundary
         """
-        if not self.gis_conn and not self._crossing_cache:
+        if not self.gis_conn and not self.boundary_engine and not self._crossing_cache:
             logger.warning("GIS connection not available for boundary crossing detection")
             return []
 
@@ -2940,7 +3540,7 @@ class TMIComplianceAnalyzer:
             # Get cached boundary crossings or compute on-demand
             if callsign in self._crossing_cache:
                 boundary_crossings_data = self._crossing_cache[callsign]
-            elif self.gis_conn:
+            elif self.gis_conn or self.boundary_engine:
                 boundary_crossings_data = self._compute_boundary_crossings_for_flight(callsign, trajectory)
             else:
                 continue
@@ -3049,55 +3649,20 @@ class TMIComplianceAnalyzer:
 
     def _compute_boundary_crossings_for_flight(self, callsign: str, trajectory: List[dict]) -> List[dict]:
         """Compute boundary crossings on-demand for a single flight (fallback when cache miss)"""
-        if not self.gis_conn or len(trajectory) < 2:
+        if len(trajectory) < 2:
+            return []
+        if self.boundary_engine:
+            result = self.boundary_engine.run({callsign: trajectory})[callsign]
+            self._crossing_cache[callsign] = result
+            return result
+        if not self.gis_conn:
             return []
 
         gis_cursor = self.gis_conn.cursor()
-        waypoints = [
-            {'lat': pt['lat'], 'lon': pt['lon'], 'sequence_num': i}
-            for i, pt in enumerate(trajectory)
-        ]
-        waypoints_json = json.dumps(waypoints)
+        waypoints_json = json.dumps(trajectory_waypoints(trajectory))
 
         try:
-            try:
-                gis_cursor.execute('''
-                    SELECT boundary_code, crossing_lat, crossing_lon, crossing_fraction,
-                           boundary_type, crossing_type
-                    FROM get_trajectory_all_crossings(%s::jsonb)
-                    ORDER BY crossing_fraction,
-                             CASE crossing_type WHEN 'EXIT' THEN 0 ELSE 1 END
-                ''', (waypoints_json,))
-                rows = gis_cursor.fetchall()
-                result = [
-                    {
-                        'facility_code': r[0],
-                        'lat': float(r[1]),
-                        'lon': float(r[2]),
-                        'fraction': float(r[3]),
-                        'facility_type': r[4] if len(r) > 4 else 'ARTCC',
-                        'crossing_type': r[5] if len(r) > 5 else 'UNKNOWN'
-                    }
-                    for r in rows
-                ]
-            except Exception:
-                gis_cursor.execute('''
-                    SELECT artcc_code, crossing_lat, crossing_lon, crossing_fraction
-                    FROM get_trajectory_artcc_crossings(%s::jsonb)
-                    ORDER BY crossing_fraction
-                ''', (waypoints_json,))
-                rows = gis_cursor.fetchall()
-                result = [
-                    {
-                        'facility_code': r[0],
-                        'lat': float(r[1]),
-                        'lon': float(r[2]),
-                        'fraction': float(r[3]),
-                        'facility_type': 'ARTCC',
-                        'crossing_type': 'UNKNOWN'
-                    }
-                    for r in rows
-                ]
+            result = query_flight_crossings(gis_cursor, waypoints_json)
 
             # Cache for future use
             self._crossing_cache[callsign] = result
@@ -3156,6 +3721,13 @@ class TMIComplianceAnalyzer:
         if parent_code in self._tracon_sub_codes:
             return self._tracon_sub_codes[parent_code]
 
+        if self.boundary_engine:
+            sub_codes = self.boundary_engine.tracon_sub_codes(parent_code)
+            self._tracon_sub_codes[parent_code] = sub_codes
+            if sub_codes:
+                logger.info(f"  TRACON {parent_code} resolved to sub-codes: {sub_codes}")
+            return sub_codes
+
         if not self.gis_conn:
             self._tracon_sub_codes[parent_code] = []
             return []
@@ -3182,12 +3754,12 @@ class TMIComplianceAnalyzer:
         """Legacy alias for _normalize_facility_code"""
         return self._normalize_facility_code(code)
 
-    def _interpolate_crossing_time(self, trajectory: List[dict], fraction: float) -> tuple:
+    def _interpolate_crossing_time(self, trajectory, fraction: float) -> tuple:
         """
         Interpolate the crossing time from trajectory based on fraction along route.
 
         Args:
-            trajectory: List of trajectory points with timestamp, lat, lon, gs, alt
+            trajectory: TrajectoryView (or list of points with timestamp, lat, lon, gs, alt)
             fraction: Position along route (0.0 to 1.0)
 
         Returns:
@@ -3196,12 +3768,13 @@ class TMIComplianceAnalyzer:
         if not trajectory or len(trajectory) < 2:
             return None, 0, 0, None
 
+        traj = as_trajectory_view(trajectory)
+        lats, lons, alts, gss = traj.lat, traj.lon, traj.alt, traj.gs
+
         # Calculate cumulative distances
         cumulative_dist = [0.0]
-        for i in range(1, len(trajectory)):
-            prev = trajectory[i - 1]
-            curr = trajectory[i]
-            dist = haversine_nm(prev['lat'], prev['lon'], curr['lat'], curr['lon'])
+        for i in range(1, len(traj)):
+            dist = haversine_nm(lats[i - 1], lons[i - 1], lats[i], lons[i])
             cumulative_dist.append(cumulative_dist[-1] + dist)
 
         total_dist = cumulative_dist[-1]
@@ -3215,8 +3788,6 @@ class TMIComplianceAnalyzer:
         for i in range(1, len(cumulative_dist)):
             if cumulative_dist[i] >= target_dist:
                 # Interpolate between points i-1 and i
-                prev = trajectory[i - 1]
-                curr = trajectory[i]
                 seg_start = cumulative_dist[i - 1]
                 seg_len = cumulative_dist[i] - seg_start
 
@@ -3226,30 +3797,27 @@ class TMIComplianceAnalyzer:
                     seg_frac = 0
 
                 # Interpolate time
-                prev_time = prev['timestamp']
-                curr_time = curr['timestamp']
-                time_diff = (curr_time - prev_time).total_seconds()
-                crossing_time = prev_time + timedelta(seconds=time_diff * seg_frac)
+                time_diff = traj.epoch[i] - traj.epoch[i - 1]
+                crossing_time = traj.timestamp(i - 1) + timedelta(seconds=time_diff * seg_frac)
 
                 # Interpolate GS and altitude
-                prev_gs = prev['gs'] if prev['gs_valid'] else 250
-                curr_gs = curr['gs'] if curr['gs_valid'] else 250
+                prev_gs = gss[i - 1] if is_gs_valid(gss[i - 1]) else 250
+                curr_gs = gss[i] if is_gs_valid(gss[i]) else 250
                 crossing_gs = prev_gs + (curr_gs - prev_gs) * seg_frac
-                crossing_alt = prev['alt'] + (curr['alt'] - prev['alt']) * seg_frac
+                crossing_alt = alts[i - 1] + (alts[i] - alts[i - 1]) * seg_frac
 
                 # Compute approach bearing (from ~75nm upstream, not segment heading)
-                crossing_lat = prev['lat'] + seg_frac * (curr['lat'] - prev['lat'])
-                crossing_lon = prev['lon'] + seg_frac * (curr['lon'] - prev['lon'])
+                crossing_lat = lats[i - 1] + seg_frac * (lats[i] - lats[i - 1])
+                crossing_lon = lons[i - 1] + seg_frac * (lons[i] - lons[i - 1])
                 bearing = compute_approach_bearing(
-                    trajectory, crossing_lat, crossing_lon, i - 1
+                    traj, crossing_lat, crossing_lon, i - 1
                 )
 
                 return crossing_time, crossing_gs, crossing_alt, bearing
 
         # Default to last point
-        last = trajectory[-1]
-        last_gs = last['gs'] if last['gs_valid'] else 250
-        return last['timestamp'], last_gs, last['alt'], None
+        last_gs = gss[-1] if is_gs_valid(gss[-1]) else 250
+        return traj.timestamp(-1), last_gs, alts[-1], None
 
     def _estimate_route_length(self, trajectory: List[dict]) -> float:
         """Estimate total route length in nm from trajectory points"""
@@ -3373,9 +3941,55 @@ class TMIComplianceAnalyzer:
         event['fix_on_route'] = (best_source == 'route')
         return event
 
+    def _build_nav_fix_index(self, centers: List[tuple], radius_nm: float):
+        """
+        Load nav_fixes covering radius_nm around every center into a PointGridIndex.
+
+        One bounding-box query over all centers replaces a query per lookup in
+        _query_nearby_fixes(); lookups outside the covered box still go to the
+        database.
+        """
+        self._nav_fix_index = None
+        if not centers:
+            return
+
+        deg_offset = radius_nm / 60.0
+        coverage = (
+            min(c[0] for c in centers) - deg_offset, max(c[0] for c in centers) + deg_offset,
+            min(c[1] for c in centers) - deg_offset, max(c[1] for c in centers) + deg_offset,
+        )
+        area = (coverage[1] - coverage[0]) * (coverage[3] - coverage[2])
+        if area > self.NAV_FIX_INDEX_MAX_AREA_DEG2:
+            logger.info(f"  Holds span {area:.0f} sq deg - nearby fixes queried per hold")
+            return
+        query = self.adl.format_query(
+            """SELECT fix_name, lat, lon FROM dbo.nav_fixes
+               WHERE lat BETWEEN %s AND %s AND lon BETWEEN %s AND %s"""
+        )
+        cursor = self.adl_conn.cursor()
+        try:
+            rows = self._cached_fetchall(cursor, 'nav_fixes_region', query, coverage, reference=True)
+        except Exception as e:
+            logger.warning(f"Could not build nav fix index: {e}")
+            return
+        finally:
+            cursor.close()
+
+        self._nav_fix_index = PointGridIndex(
+            ({'fix_name': r[0], 'lat': float(r[1]), 'lon': float(r[2])} for r in rows),
+            coverage
+        )
+        logger.info(f"  Nav fix index: {self._nav_fix_index.size} fixes around {len(centers)} holds")
+
     def _query_nearby_fixes(self, lat: float, lon: float, radius_nm: float) -> list:
         """Query nav_fixes within a bounding box around a point."""
         deg_offset = radius_nm / 60.0
+        if self._nav_fix_index is not None:
+            nearby = self._nav_fix_index.within_bbox(lat - deg_offset, lat + deg_offset,
+                                                     lon - deg_offset, lon + deg_offset)
+            if nearby is not None:
+                return nearby
+
         query = self.adl.format_query(
             """SELECT fix_name, lat, lon FROM dbo.nav_fixes
                WHERE lat BETWEEN %s AND %s AND lon BETWEEN %s AND %s"""
@@ -3454,7 +4068,7 @@ class TMIComplianceAnalyzer:
         Only includes holds within geographic scope of the event's featured facilities.
         """
         all_events = []
-        flights_with_holds = 0
+        flights_with_holds = set()
         out_of_scope = 0
 
         # Build geographic scope from featured facilities for hold filtering
@@ -3484,12 +4098,23 @@ class TMIComplianceAnalyzer:
                        if meta.get('flight_uid')]
         self._flight_waypoints_cache = self._load_flight_waypoints(flight_uids)
 
+        # Vectorized pre-pass: only flights with a reset segment that turns
+        # through an orbit are scanned
+        screened = screen_holding_segments(self._trajectory_cache) if HAS_NUMPY else None
+
+        candidates = []  # (callsign, meta, hold event)
         for callsign, trajectory in self._trajectory_cache.items():
             if callsign in self._low_quality_flights:
                 continue
             if len(trajectory) < 4:
                 continue
 
+            segments = None
+            if screened is not None:
+                segments = screened.get(callsign)
+                if not segments:
+                    continue
+
             meta = self._trajectory_metadata.get(callsign, {})
             dest = meta.get('dest', '')
 
@@ -3499,51 +4124,65 @@ class TMIComplianceAnalyzer:
                 dest_lat = self.fix_coords[dest]['lat']
                 dest_lon = self.fix_coords[dest]['lon']
 
-            raw_events = detect_flight_holding(trajectory, dest_lat, dest_lon)
-
-            if raw_events:
-                flight_uid = meta.get('flight_uid', 0)
-                dept = meta.get('dept', '')
-                flight_has_hold = False
-
-                for evt in raw_events:
-                    # Geographic scope filter: skip holds far from featured facilities
-                    if scope_coords:
-                        hold_lat = evt.get('center_lat')
-                        hold_lon = evt.get('center_lon')
-                        if hold_lat is not None and hold_lon is not None:
-                            in_scope = any(
-                                haversine_nm(hold_lat, hold_lon, slat, slon) <= HOLD_SCOPE_RADIUS_NM
-                                for slat, slon in scope_coords
-                            )
-                            if not in_scope:
-                                out_of_scope += 1
-                                continue
-
-                    evt['callsign'] = callsign
-                    evt['flight_uid'] = flight_uid
-                    evt['dept'] = dept
-                    evt['dest'] = dest
-
-                    # Fix matching
-                    self._match_holding_fix(evt, flight_uid, dest,
-                                            self._flight_waypoints_cache,
-                                            self._star_fixes_cache)
-
-                    all_events.append(evt)
-                    flight_has_hold = True
-
-                if flight_has_hold:
-                    flights_with_holds += 1
+            for evt in detect_flight_holding(trajectory, dest_lat, dest_lon, segments):
+                candidates.append((callsign, meta, evt))
+
+        # Geographic scope filter: skip holds far from featured facilities
+        in_scope = self._holds_in_scope([evt for _, _, evt in candidates],
+                                        scope_coords, HOLD_SCOPE_RADIUS_NM)
+        for (callsign, meta, evt), keep in zip(candidates, in_scope):
+            if not keep:
+                out_of_scope += 1
+                continue
+
+            evt['callsign'] = callsign
+            evt['flight_uid'] = meta.get('flight_uid', 0)
+            evt['dept'] = meta.get('dept', '')
+            evt['dest'] = meta.get('dest', '')
+
+            all_events.append(evt)
+            flights_with_holds.add(callsign)
+
+        # Fix matching: nav_fixes around every hold are loaded once into a
+        # grid index so nearby-fix lookups do not query the database per hold
+        self._build_nav_fix_index(
+            [(evt['center_lat'], evt['center_lon']) for evt in all_events
+             if evt.get('center_lat') is not None and evt.get('center_lon') is not None],
+            HOLD_FIX_MATCH_RADIUS_NM
+        )
+        for evt in all_events:
+            self._match_holding_fix(evt, evt['flight_uid'], evt['dest'],
+                                    self._flight_waypoints_cache,
+                                    self._star_fixes_cache)
 
         logger.info(f"Holding detection: {len(all_events)} events across "
-                    f"{flights_with_holds} flights (scanned {len(self._trajectory_cache)})")
+                    f"{len(flights_with_holds)} flights (scanned {len(self._trajectory_cache)})")
         if out_of_scope > 0:
             logger.info(f"  Filtered {out_of_scope} holds outside event scope "
                        f"(>{HOLD_SCOPE_RADIUS_NM}nm from featured facilities)")
 
         return all_events
 
+    @staticmethod
+    def _holds_in_scope(events: list, scope_coords: list, radius_nm: float) -> List[bool]:
+        """Whether each hold center lies within radius_nm of any scope coordinate.
+        Everything is in scope when there are no scope coordinates; holds
+        without a center are kept."""
+        if not scope_coords or not events:
+            return [True] * len(events)
+        if HAS_NUMPY:
+            return centers_within(
+                [(evt.get('center_lat'), evt.get('center_lon')) for evt in events],
+                scope_coords, radius_nm)
+        in_scope = []
+        for evt in events:
+            hold_lat, hold_lon = evt.get('center_lat'), evt.get('center_lon')
+            in_scope.append(hold_lat is None or hold_lon is None or any(
+                haversine_nm(hold_lat, hold_lon, slat, slon) <= radius_nm
+                for slat, slon in scope_coords
+            ))
+        return in_scope
+
     def _build_holding_summary(self, events: list) -> dict:
         """Build aggregate holding summary grouped by fix."""
         from collections import defaultdict
@@ -3715,8 +4354,8 @@ class TMIComplianceAnalyzer:
                 fix_crossings_map[crossing.callsign] = crossing
             logger.info(f"  Fix crossings ({fix}): {len(fix_crossings_map)}")
 
-        # 2. Detect boundary crossings (if provider/requestor specified and GIS available)
-        if tmi.provider and tmi.requestor and self.gis_conn:
+        # 2. Detect boundary crossings (if provider/requestor specified and GIS/local boundaries available)
+        if tmi.provider and tmi.requestor and (self.gis_conn or self.boundary_engine):
             logger.info(f"  Attempting boundary detection: {tmi.provider} -> {tmi.requestor}")
             boundary_results = self._detect_boundary_crossings(
                 tmi.provider, tmi.requestor,
@@ -3891,94 +4530,7 @@ class TMIComplianceAnalyzer:
 
         logger.info(f"Valid crossings (in TMI window): {len(valid_crossings)}")
 
-        # Filter to upstream direction only — exclude flights heading AWAY from
-        # the destination (e.g., departures at arrival MIT fixes near airports).
-        # Only crossings heading roughly toward the destination are "upstream".
-        if tmi.destinations and fix and fix in self.fix_coords:
-            dest_icao = tmi.destinations[0]
-            # Try ICAO code directly, then with K prefix for US airports
-            dest_key = dest_icao if dest_icao in self.fix_coords else f'K{dest_icao}' if f'K{dest_icao}' in self.fix_coords else None
-            if dest_key and dest_key != fix:
-                dest_lat = self.fix_coords[dest_key]['lat']
-                dest_lon = self.fix_coords[dest_key]['lon']
-                fix_lat_f = self.fix_coords[fix]['lat']
-                fix_lon_f = self.fix_coords[fix]['lon']
-                expected_bearing = calculate_bearing(fix_lat_f, fix_lon_f, dest_lat, dest_lon)
-                upstream = []
-                downstream_count = 0
-                for c in valid_crossings:
-                    if c.bearing is not None:
-                        diff = abs(c.bearing - expected_bearing)
-                        if diff > 180:
-                            diff = 360 - diff
-                        if diff <= 90:
-                            upstream.append(c)
-                        else:
-                            downstream_count += 1
-                    else:
-                        upstream.append(c)  # No bearing data — keep conservatively
-                if downstream_count > 0:
-                    logger.info(f"  Filtered {downstream_count} downstream crossings "
-                               f"(heading away from {dest_icao}, expected bearing ~{expected_bearing:.0f})")
-                    valid_crossings = upstream
-
-        # Verify crossings match TMI scope — belt-and-suspenders check that each
-        # crossing's actual dept/dest matches the TMI's origin/destination constraint.
-        # The flight-level pre-filter already gates this, but crossing-level validation
-        # catches edge cases (ICAO normalization, mid-flight plan changes).
-        scope_mismatch = 0
-        if tmi.destinations or tmi.origins:
-            normalized_dests = set(normalize_icao_list(tmi.destinations)) if tmi.destinations else None
-            normalized_origs = set(normalize_icao_list(tmi.origins)) if tmi.origins else None
-            scope_ok = []
-            for c in valid_crossings:
-                dest_ok = (not normalized_dests or
-                           not c.dest or c.dest == 'UNK' or
-                           c.dest in normalized_dests)
-                dept_ok = (not normalized_origs or
-                           not c.dept or c.dept == 'UNK' or
-                           c.dept in normalized_origs)
-                if dest_ok and dept_ok:
-                    scope_ok.append(c)
-                else:
-                    scope_mismatch += 1
-            if scope_mismatch > 0:
-                logger.info(f"  Filtered {scope_mismatch} crossings: flight dept/dest "
-                           f"outside TMI scope (dest={tmi.destinations}, orig={tmi.origins})")
-                valid_crossings = scope_ok
-
-        # Filter departure overflights — flights departing from airports near
-        # the MIT fix heading to distant destinations. These are climb-out
-        # overflights, not part of the arrival/enroute flow being measured.
-        # Example: DAL1694 DFW->MEM overflying SEEVR area on departure.
-        if fix and fix in self.fix_coords:
-            fix_lat_c = self.fix_coords[fix]['lat']
-            fix_lon_c = self.fix_coords[fix]['lon']
-            departure_overfly = 0
-            kept = []
-            for c in valid_crossings:
-                dept_near = False
-                dest_far = False
-                if c.dept and c.dept in self.fix_coords:
-                    d = haversine_nm(self.fix_coords[c.dept]['lat'],
-                                    self.fix_coords[c.dept]['lon'],
-                                    fix_lat_c, fix_lon_c)
-                    dept_near = d <= 80.0
-                if c.dest and c.dest in self.fix_coords:
-                    d = haversine_nm(self.fix_coords[c.dest]['lat'],
-                                    self.fix_coords[c.dest]['lon'],
-                                    fix_lat_c, fix_lon_c)
-                    dest_far = d > 200.0
-                if dept_near and dest_far:
-                    departure_overfly += 1
-                    logger.debug(f"    Filtered departure overflight: {c.callsign} "
-                                f"({c.dept}->{c.dest})")
-                    continue
-                kept.append(c)
-            if departure_overfly > 0:
-                logger.info(f"  Filtered {departure_overfly} departure overflights "
-                           f"(dept <80nm from fix, dest >200nm)")
-                valid_crossings = kept
+        valid_crossings = self._filter_measurable_crossings(tmi, fix, valid_crossings)
 
         if len(valid_crossings) < 2:
             return {
@@ -4011,11 +4563,6 @@ class TMIComplianceAnalyzer:
         # Sort by crossing time
         sorted_crossings = sorted(valid_crossings, key=lambda c: c.crossing_time)
 
-        # Crossing separation thresholds for stream validation
-        # FIX-based: Flights should cross at the same point (~15nm tolerance)
-        # BOUNDARY-based: Flights can cross anywhere along the boundary (no limit)
-        MAX_CROSSING_SEPARATION_NM_FIX = 15.0
-
         # Determine if we're using boundary-based or fix-based measurement
         is_boundary_based = measurement_type in (MeasurementType.BOUNDARY, MeasurementType.BOUNDARY_FALLBACK_FIX)
 
@@ -4036,163 +4583,29 @@ class TMIComplianceAnalyzer:
                 stream_groups[dept].append(c)
             logger.info(f"  Stream grouping: PER_AIRPORT ({len(stream_groups)} groups)")
         else:
-            fix_lat = self.fix_coords[fix]['lat'] if fix and fix in self.fix_coords else None
-            fix_lon = self.fix_coords[fix]['lon'] if fix and fix in self.fix_coords else None
-
-            # For facility-pair MITs with boundary measurement, cluster by
-            # boundary crossing position — each distinct area where traffic
-            # crosses the boundary is a natural measurement cluster.
-            # E.g., ZME->ZFW boundary has ~3 geographic crossing areas.
-            use_boundary_clustering = (
-                has_facility_pair and
-                measurement_stats['boundary'] > measurement_stats['fix'] and
-                self.gis_conn
-            )
-
-            if use_boundary_clustering:
-                stream_groups = cluster_crossings_by_position(
-                    sorted_crossings, gis_conn=self.gis_conn,
-                    eps_nm=15.0, min_points=2
-                )
-                logger.info(f"  Stream grouping: boundary position DBSCAN ({len(stream_groups)} clusters)")
-                for sid, sc in stream_groups.items():
-                    meta = compute_stream_metadata(sc)
-                    logger.info(f"    Cluster {sid}: {len(sc)} crossings, "
-                               f"mean bearing={meta['mean_bearing']}, spread={meta['bearing_spread']}")
-            elif fix_lat is not None and self._trajectory_cache_loaded:
-                # Fix-based measurement: cluster by trajectory position upstream
-                stream_groups = cluster_crossings_by_trajectory(
-                    sorted_crossings, self._trajectory_cache,
-                    fix_lat, fix_lon,
-                    gis_conn=self.gis_conn,
-                    min_dist_nm=60.0,
-                    max_dist_nm=120.0,
-                    eps_nm=8.0
-                )
-                logger.info(f"  Stream grouping: PostGIS DBSCAN ({len(stream_groups)} streams)")
-                for sid, sc in stream_groups.items():
-                    meta = compute_stream_metadata(sc)
-                    logger.info(f"    Stream {sid}: {len(sc)} crossings, "
-                               f"mean bearing={meta['mean_bearing']}, spread={meta['bearing_spread']}")
-
-                # Sub-branch splitting: within each stream, detect route branches
-                # using tighter DBSCAN. At converging fixes like SEEVR, multiple
-                # airways merge from the same direction — flights on different
-                # branches shouldn't be paired.
-                if self.gis_conn and fix_lat is not None:
-                    refined = {}
-                    next_id = 0
-                    for sid, crossings_list in stream_groups.items():
-                        if sid == -1 or len(crossings_list) < 6:
-                            refined[next_id] = crossings_list
-                            next_id += 1
-                            continue
-                        sub = _split_stream_into_branches(
-                            crossings_list, self._trajectory_cache,
-                            fix_lat, fix_lon, self.gis_conn)
-                        if sub and len(sub) > 1:
-                            for sub_cx in sub.values():
-                                refined[next_id] = sub_cx
-                                next_id += 1
-                            logger.info(f"    Stream {sid} split into {len(sub)} sub-branches")
-                        else:
-                            refined[next_id] = crossings_list
-                            next_id += 1
-                    stream_groups = refined
-                    logger.info(f"  After sub-branch splitting: {len(stream_groups)} total streams")
-            else:
-                # Fallback to bearing-based when no trajectory cache or fix coords
-                stream_groups = cluster_crossings_by_bearing(sorted_crossings, gap_threshold_deg=30.0)
-                logger.info(f"  Stream grouping: bearing-based fallback ({len(stream_groups)} streams)")
+            with self._perf_phase(f"stream_clustering:{fix}"):
+                stream_groups = self._cluster_mit_streams(
+                    sorted_crossings, fix, has_facility_pair, measurement_stats)
 
         # Pair within each stream
         pairs = []
-        skipped_pairs = []
         per_stream_results = {}
         required = tmi.value
 
-        for stream_id, stream_crossings in stream_groups.items():
-            if stream_id == -1:
-                # Unassigned crossings (no bearing) — skip pairing
-                logger.info(f"  Stream -1: {len(stream_crossings)} unassigned crossings (no bearing data)")
-                continue
-
-            # Sort this stream by time
-            stream_sorted = sorted(stream_crossings, key=lambda c: c.crossing_time)
-            stream_pairs = []
-
-            for i in range(1, len(stream_sorted)):
-                prev = stream_sorted[i-1]
-                curr = stream_sorted[i]
-
-                time_diff_sec = (curr.crossing_time - prev.crossing_time).total_seconds()
-                time_diff_min = time_diff_sec / 60
-
-                if time_diff_sec <= 0:
-                    continue
-
-                # Crossing separation check (additional safeguard)
-                crossing_separation = haversine_nm(prev.lat, prev.lon, curr.lat, curr.lon)
-                if not is_boundary_based and crossing_separation > MAX_CROSSING_SEPARATION_NM_FIX:
-                    skipped_pairs.append({
-                        'prev': prev.callsign,
-                        'curr': curr.callsign,
-                        'reason': f'crossing separation {crossing_separation:.1f}nm > {MAX_CROSSING_SEPARATION_NM_FIX}nm'
-                    })
-                    continue
-
-                # Calculate spacing based on TMI type
-                if tmi.tmi_type == TMIType.MINIT:
-                    actual = time_diff_min
-                else:
-                    avg_gs = (prev.groundspeed + curr.groundspeed) / 2 if prev.groundspeed > 0 else curr.groundspeed
-                    actual = (time_diff_min * avg_gs) / 60
-
-                spacing_cat = categorize_spacing(actual, required)
-
-                # Physical separation safeguard: if the crossing points are
-                # physically farther apart than the MIT requirement, flights
-                # can't be violating it regardless of time-based spacing.
-                if crossing_separation > required and spacing_cat == SpacingCategory.UNDER:
-                    spacing_cat = SpacingCategory.OVER
+        if -1 in stream_groups:
+            # Unassigned crossings (no bearing) — skip pairing
+            logger.info(f"  Stream -1: {len(stream_groups[-1])} unassigned crossings (no bearing data)")
+        spacing = self._build_spacing_pairs(
+            tmi, [(sid, sc) for sid, sc in stream_groups.items() if sid != -1], is_boundary_based)
+        skipped_pairs = spacing.skipped
 
-                if spacing_cat == SpacingCategory.UNDER:
-                    compliance = Compliance.NON_COMPLIANT
-                    shortfall_pct = calculate_shortfall_pct(actual, required)
-                else:
-                    compliance = Compliance.COMPLIANT
-                    shortfall_pct = 0
-
-                margin_pct = ((actual - required) / required * 100) if required > 0 else 0
-
-                pair = {
-                    'prev_callsign': prev.callsign,
-                    'curr_callsign': curr.callsign,
-                    'prev_time': prev.crossing_time.strftime('%H:%M:%SZ'),
-                    'curr_time': curr.crossing_time.strftime('%H:%M:%SZ'),
-                    'time_min': round(time_diff_min, 1),
-                    'spacing': round(actual, 1),
-                    'required': required,
-                    'margin_pct': round(margin_pct, 1),
-                    'spacing_category': spacing_cat.value,
-                    'compliance': compliance.value,
-                    'shortfall_pct': shortfall_pct,
-                    'gs': curr.groundspeed,
-                    'prev_crossing_lat': round(prev.lat, 4),
-                    'prev_crossing_lon': round(prev.lon, 4),
-                    'curr_crossing_lat': round(curr.lat, 4),
-                    'curr_crossing_lon': round(curr.lon, 4),
-                    'crossing_separation_nm': round(crossing_separation, 1),
-                    'stream_id': stream_id,
-                    'prev_bearing': round(prev.bearing, 1) if prev.bearing is not None else None,
-                    'curr_bearing': round(curr.bearing, 1) if curr.bearing is not None else None,
-                }
-                stream_pairs.append(pair)
+        for stream_id, stream_pairs in spacing.by_stream.items():
+            stream_crossings = stream_groups[stream_id]
 
             # Per-stream stats
             stream_meta = compute_stream_metadata(stream_crossings)
             if stream_pairs:
-                stream_under = sum(1 for p in stream_pairs if p['spacing_category'] == SpacingCategory.UNDER.value)
+                stream_under = spacing.violations[stream_id]
                 stream_compliant = len(stream_pairs) - stream_under
                 per_stream_results[stream_id] = {
                     'crossings': len(stream_crossings),
@@ -4225,10 +4638,10 @@ class TMIComplianceAnalyzer:
         # Calculate aggregate statistics across all streams
         spacings = [p['spacing'] for p in pairs]
 
-        under_count = sum(1 for p in pairs if p['spacing_category'] == SpacingCategory.UNDER.value)
-        within_count = sum(1 for p in pairs if p['spacing_category'] == SpacingCategory.WITHIN.value)
-        over_count = sum(1 for p in pairs if p['spacing_category'] == SpacingCategory.OVER.value)
-        gap_count = sum(1 for p in pairs if p['spacing_category'] == SpacingCategory.GAP.value)
+        under_count = spacing.distribution['under']
+        within_count = spacing.distribution['within']
+        over_count = spacing.distribution['over']
+        gap_count = spacing.distribution['gap']
 
         violations_list = [p for p in pairs if p['shortfall_pct'] > 0]
         avg_shortfall = round(sum(p['shortfall_pct'] for p in violations_list) / len(violations_list), 1) if violations_list else 0
@@ -4360,6 +4773,302 @@ class TMIComplianceAnalyzer:
 
         return result
 
+    def _filter_measurable_crossings(self, tmi: TMI, fix: Optional[str],
+                                     valid_crossings: List[CrossingResult]) -> List[CrossingResult]:
+        """
+        Drop in-window crossings that are not part of the measured flow:
+        downstream (heading away from the destination), outside the TMI
+        origin/destination scope, or departure climb-out overflights.
+        """
+        # Filter to upstream direction only — exclude flights heading AWAY from
+        # the destination (e.g., departures at arrival MIT fixes near airports).
+        # Only crossings heading roughly toward the destination are "upstream".
+        if tmi.destinations and fix and fix in self.fix_coords:
+            dest_icao = tmi.destinations[0]
+            # Try ICAO code directly, then with K prefix for US airports
+            dest_key = dest_icao if dest_icao in self.fix_coords else f'K{dest_icao}' if f'K{dest_icao}' in self.fix_coords else None
+            if dest_key and dest_key != fix:
+                dest_lat = self.fix_coords[dest_key]['lat']
+                dest_lon = self.fix_coords[dest_key]['lon']
+                fix_lat_f = self.fix_coords[fix]['lat']
+                fix_lon_f = self.fix_coords[fix]['lon']
+                expected_bearing = calculate_bearing(fix_lat_f, fix_lon_f, dest_lat, dest_lon)
+                upstream = []
+                downstream_count = 0
+                for c in valid_crossings:
+                    if c.bearing is not None:
+                        diff = abs(c.bearing - expected_bearing)
+                        if diff > 180:
+                            diff = 360 - diff
+                        if diff <= 90:
+                            upstream.append(c)
+                        else:
+                            downstream_count += 1
+                    else:
+                        upstream.append(c)  # No bearing data — keep conservatively
+                if downstream_count > 0:
+                    logger.info(f"  Filtered {downstream_count} downstream crossings "
+                               f"(heading away from {dest_icao}, expected bearing ~{expected_bearing:.0f})")
+                    valid_crossings = upstream
+
+        # Verify crossings match TMI scope — belt-and-suspenders check that each
+        # crossing's actual dept/dest matches the TMI's origin/destination constraint.
+        # The flight-level pre-filter already gates this, but crossing-level validation
+        # catches edge cases (ICAO normalization, mid-flight plan changes).
+        scope_mismatch = 0
+        if tmi.destinations or tmi.origins:
+            normalized_dests = set(normalize_icao_list(tmi.destinations)) if tmi.destinations else None
+            normalized_origs = set(normalize_icao_list(tmi.origins)) if tmi.origins else None
+            scope_ok = []
+            for c in valid_crossings:
+                dest_ok = (not normalized_dests or
+                           not c.dest or c.dest == 'UNK' or
+                           c.dest in normalized_dests)
+                dept_ok = (not normalized_origs or
+                           not c.dept or c.dept == 'UNK' or
+                           c.dept in normalized_origs)
+                if dest_ok and dept_ok:
+                    scope_ok.append(c)
+                else:
+                    scope_mismatch += 1
+            if scope_mismatch > 0:
+                logger.info(f"  Filtered {scope_mismatch} crossings: flight dept/dest "
+                           f"outside TMI scope (dest={tmi.destinations}, orig={tmi.origins})")
+                valid_crossings = scope_ok
+
+        # Filter departure overflights — flights departing from airports near
+        # the MIT fix heading to distant destinations. These are climb-out
+        # overflights, not part of the arrival/enroute flow being measured.
+        # Example: DAL1694 DFW->MEM overflying SEEVR area on departure.
+        if fix and fix in self.fix_coords:
+            fix_lat_c = self.fix_coords[fix]['lat']
+            fix_lon_c = self.fix_coords[fix]['lon']
+            departure_overfly = 0
+            kept = []
+            for c in valid_crossings:
+                dept_near = False
+                dest_far = False
+                if c.dept and c.dept in self.fix_coords:
+                    d = haversine_nm(self.fix_coords[c.dept]['lat'],
+                                    self.fix_coords[c.dept]['lon'],
+                                    fix_lat_c, fix_lon_c)
+                    dept_near = d <= 80.0
+                if c.dest and c.dest in self.fix_coords:
+                    d = haversine_nm(self.fix_coords[c.dest]['lat'],
+                                    self.fix_coords[c.dest]['lon'],
+                                    fix_lat_c, fix_lon_c)
+                    dest_far = d > 200.0
+                if dept_near and dest_far:
+                    departure_overfly += 1
+                    logger.debug(f"    Filtered departure overflight: {c.callsign} "
+                                f"({c.dept}->{c.dest})")
+                    continue
+                kept.append(c)
+            if departure_overfly > 0:
+                logger.info(f"  Filtered {departure_overfly} departure overflights "
+                           f"(dept <80nm from fix, dest >200nm)")
+                valid_crossings = kept
+
+        return valid_crossings
+
+    def _cluster_mit_streams(self, sorted_crossings: list, fix: Optional[str],
+                             has_facility_pair: bool, measurement_stats: dict) -> Dict[Any, List]:
+        """
+        Traffic streams at an MIT fix: boundary position DBSCAN, trajectory
+        DBSCAN plus sub-branch splitting, or the bearing fallback. Spatial
+        clustering runs in PostGIS or in process (stream_clustering_mode);
+        the time spent is logged per fix.
+        """
+        started = time.perf_counter()
+        local = self.stream_clustering_mode == 'local'
+        engine_name = 'local' if local else 'PostGIS'
+        fix_lat = self.fix_coords[fix]['lat'] if fix and fix in self.fix_coords else None
+        fix_lon = self.fix_coords[fix]['lon'] if fix and fix in self.fix_coords else None
+
+        # For facility-pair MITs with boundary measurement, cluster by
+        # boundary crossing position — each distinct area where traffic
+        # crosses the boundary is a natural measurement cluster.
+        # E.g., ZME->ZFW boundary has ~3 geographic crossing areas.
+        use_boundary_clustering = (
+            has_facility_pair and
+            measurement_stats['boundary'] > measurement_stats['fix'] and
+            (self.gis_conn or local)
+        )
+
+        if use_boundary_clustering:
+            method = 'boundary position DBSCAN'
+            stream_groups = cluster_crossings_by_position(
+                sorted_crossings, gis_conn=self.gis_conn,
+                eps_nm=15.0, min_points=2, engine=self.stream_clustering_mode
+            )
+            logger.info(f"  Stream grouping: {engine_name} boundary position DBSCAN "
+                        f"({len(stream_groups)} clusters)")
+            for sid, sc in stream_groups.items():
+                meta = compute_stream_metadata(sc)
+                logger.info(f"    Cluster {sid}: {len(sc)} crossings, "
+                           f"mean bearing={meta['mean_bearing']}, spread={meta['bearing_spread']}")
+        elif fix_lat is not None and self._trajectory_cache_loaded:
+            method = 'trajectory DBSCAN'
+            # Fix-based measurement: cluster by trajectory position upstream
+            stream_groups = cluster_crossings_by_trajectory(
+                sorted_crossings, self._trajectory_cache,
+                fix_lat, fix_lon,
+                gis_conn=self.gis_conn,
+                min_dist_nm=60.0,
+                max_dist_nm=120.0,
+                eps_nm=8.0,
+                engine=self.stream_clustering_mode
+            )
+            logger.info(f"  Stream grouping: {engine_name} DBSCAN ({len(stream_groups)} streams)")
+            for sid, sc in stream_groups.items():
+                meta = compute_stream_metadata(sc)
+                logger.info(f"    Stream {sid}: {len(sc)} crossings, "
+                           f"mean bearing={meta['mean_bearing']}, spread={meta['bearing_spread']}")
+
+            # Sub-branch splitting: within each stream, detect route branches
+            # using tighter DBSCAN. At converging fixes like SEEVR, multiple
+            # airways merge from the same direction — flights on different
+            # branches shouldn't be paired.
+            if self.gis_conn or local:
+                refined = {}
+                next_id = 0
+                for sid, crossings_list in stream_groups.items():
+                    if sid == -1 or len(crossings_list) < 6:
+                        refined[next_id] = crossings_list
+                        next_id += 1
+                        continue
+                    sub = _split_stream_into_branches(
+                        crossings_list, self._trajectory_cache,
+                        fix_lat, fix_lon, self.gis_conn, engine=self.stream_clustering_mode)
+                    if sub and len(sub) > 1:
+                        for sub_cx in sub.values():
+                            refined[next_id] = sub_cx
+                            next_id += 1
+                        logger.info(f"    Stream {sid} split into {len(sub)} sub-branches")
+                    else:
+                        refined[next_id] = crossings_list
+                        next_id += 1
+                stream_groups = refined
+                logger.info(f"  After sub-branch splitting: {len(stream_groups)} total streams")
+        else:
+            method = 'bearing'
+            engine_name = 'in process'
+            # Fallback to bearing-based when no trajectory cache or fix coords
+            stream_groups = cluster_crossings_by_bearing(sorted_crossings, gap_threshold_deg=30.0)
+            logger.info(f"  Stream grouping: bearing-based fallback ({len(stream_groups)} streams)")
+
+        logger.info(f"  Stream clustering at {fix or 'boundary'}: {method} ({engine_name}), "
+                    f"{len(sorted_crossings)} crossings -> {len(stream_groups)} streams "
+                    f"in {time.perf_counter() - started:.3f}s")
+        return stream_groups
+
+    def _build_spacing_pairs(self, tmi: TMI, streams: list, is_boundary_based: bool) -> SpacingPairs:
+        """
+        Spacing pairs of every (stream_id, crossings) stream, in one vectorized
+        pass when NumPy is available (identical to the per-stream scalar path).
+        """
+        max_separation = None if is_boundary_based else self.MAX_CROSSING_SEPARATION_NM_FIX
+        if HAS_NUMPY:
+            return build_spacing_pairs(streams, tmi.value, tmi.tmi_type == TMIType.MINIT,
+                                       haversine_nm, max_separation_nm=max_separation)
+
+        spacing = SpacingPairs(by_stream={}, distribution=empty_distribution())
+        for stream_id, stream_crossings in streams:
+            stream_pairs = self._build_stream_pairs(
+                tmi, stream_id, stream_crossings, is_boundary_based, spacing.skipped)
+            spacing.by_stream[stream_id] = stream_pairs
+            spacing.violations[stream_id] = 0
+            for p in stream_pairs:
+                category = p['spacing_category']
+                spacing.distribution[category.lower()] += 1
+                if category == SpacingCategory.UNDER.value:
+                    spacing.violations[stream_id] += 1
+        return spacing
+
+    def _build_stream_pairs(self, tmi: TMI, stream_id, stream_crossings: List[CrossingResult],
+                            is_boundary_based: bool, skipped_pairs: list) -> List[dict]:
+        """
+        Consecutive-crossing spacing pairs within one traffic stream.
+
+        Pairs rejected by the crossing separation check are appended to
+        skipped_pairs.
+        """
+        required = tmi.value
+
+        # Sort this stream by time
+        stream_sorted = sorted(stream_crossings, key=lambda c: c.crossing_time)
+        stream_pairs = []
+
+        for i in range(1, len(stream_sorted)):
+            prev = stream_sorted[i-1]
+            curr = stream_sorted[i]
+
+            time_diff_sec = (curr.crossing_time - prev.crossing_time).total_seconds()
+            time_diff_min = time_diff_sec / 60
+
+            if time_diff_sec <= 0:
+                continue
+
+            # Crossing separation check (additional safeguard)
+            crossing_separation = haversine_nm(prev.lat, prev.lon, curr.lat, curr.lon)
+            if not is_boundary_based and crossing_separation > self.MAX_CROSSING_SEPARATION_NM_FIX:
+                skipped_pairs.append({
+                    'prev': prev.callsign,
+                    'curr': curr.callsign,
+                    'reason': f'crossing separation {crossing_separation:.1f}nm > {self.MAX_CROSSING_SEPARATION_NM_FIX}nm'
+                })
+                continue
+
+            # Calculate spacing based on TMI type
+            if tmi.tmi_type == TMIType.MINIT:
+                actual = time_diff_min
+            else:
+                avg_gs = (prev.groundspeed + curr.groundspeed) / 2 if prev.groundspeed > 0 else curr.groundspeed
+                actual = (time_diff_min * avg_gs) / 60
+
+            spacing_cat = categorize_spacing(actual, required)
+
+            # Physical separation safeguard: if the crossing points are
+            # physically farther apart than the MIT requirement, flights
+            # can't be violating it regardless of time-based spacing.
+            if crossing_separation > required and spacing_cat == SpacingCategory.UNDER:
+                spacing_cat = SpacingCategory.OVER
+
+            if spacing_cat == SpacingCategory.UNDER:
+                compliance = Compliance.NON_COMPLIANT
+                shortfall_pct = calculate_shortfall_pct(actual, required)
+            else:
+                compliance = Compliance.COMPLIANT
+                shortfall_pct = 0
+
+            margin_pct = ((actual - required) / required * 100) if required > 0 else 0
+
+            pair = {
+                'prev_callsign': prev.callsign,
+                'curr_callsign': curr.callsign,
+                'prev_time': prev.crossing_time.strftime('%H:%M:%SZ'),
+                'curr_time': curr.crossing_time.strftime('%H:%M:%SZ'),
+                'time_min': round(time_diff_min, 1),
+                'spacing': round(actual, 1),
+                'required': required,
+                'margin_pct': round(margin_pct, 1),
+                'spacing_category': spacing_cat.value,
+                'compliance': compliance.value,
+                'shortfall_pct': shortfall_pct,
+                'gs': curr.groundspeed,
+                'prev_crossing_lat': round(prev.lat, 4),
+                'prev_crossing_lon': round(prev.lon, 4),
+                'curr_crossing_lat': round(curr.lat, 4),
+                'curr_crossing_lon': round(curr.lon, 4),
+                'crossing_separation_nm': round(crossing_separation, 1),
+                'stream_id': stream_id,
+                'prev_bearing': round(prev.bearing, 1) if prev.bearing is not None else None,
+                'curr_bearing': round(curr.bearing, 1) if curr.bearing is not None else None,
+            }
+            stream_pairs.append(pair)
+
+        return stream_pairs
+
     def _analyze_gs_compliance(self, tmi: TMI) -> Optional[Dict]:
         """
         Analyze Ground Stop compliance (legacy single-advisory path).
@@ -4930,26 +5639,21 @@ class TMIComplianceAnalyzer:
         known_airways = self._load_known_airways()
         required_fixes = []
         required_airways = []
-        required_route_strings = []  # For PostGIS expansion
-        for route_spec in tmi.reroute_routes:
-            route_str = route_spec.get('route', '')
-            marked = re.findall(r'>([^<]+)<', route_str)
-            segments = marked if marked else [route_str]
-            for segment in segments:
-                required_route_strings.append(segment.strip())
-                for token in segment.split():
-                    t = token.strip().upper()
-                    if not t:
-                        continue
-                    ttype = classify_route_token(t, known_airways=known_airways)
-                    if ttype == 'airway':
-                        required_airways.append(t)
-                    elif ttype == 'procedure':
-                        base = re.match(r'^([A-Z]+)\d', t)
-                        if base:
-                            required_fixes.append(base.group(1))
-                    elif ttype == 'fix':
-                        required_fixes.append(t)
+        required_route_strings = self._tmi_required_route_segments(tmi)  # For PostGIS expansion
+        for segment in required_route_strings:
+            for token in segment.split():
+                t = token.strip().upper()
+                if not t:
+                    continue
+                ttype = classify_route_token(t, known_airways=known_airways)
+                if ttype == 'airway':
+                    required_airways.append(t)
+                elif ttype == 'procedure':
+                    base = re.match(r'^([A-Z]+)\d', t)
+                    if base:
+                        required_fixes.append(base.group(1))
+                elif ttype == 'fix':
+                    required_fixes.append(t)
 
         required_fixes = list(dict.fromkeys(required_fixes))  # Dedupe preserving order
         required_airways = list(dict.fromkeys(required_airways))
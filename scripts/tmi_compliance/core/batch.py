@@ -0,0 +1,148 @@
+"""
+TMI Compliance Analyzer - Multi-Plan Batch
+==========================================
+
+Runs the compliance analysis of many plans (season reports, backfills) in
+one process, sharing an AnalysisSession (connections, reference data, route
+expansion cache) between them, see run_batch.py.
+
+Plans run one after another, or in a pool of forked plan workers. Workers
+are forked after the session has been prepared, so they inherit the
+reference data copy-on-write; each opens its own ADL/GIS connections (the
+parent's are kept referenced, as in core/parallel.py). A plan that fails is
+recorded in its summary entry and does not stop the batch.
+
+The aggregate summary adds up the per-plan counts (MIT pairs/violations, GS
+flights, reroute flights, holding flights) and recomputes the compliance
+percentages from the totals.
+"""
+
+import logging
+import multiprocessing
+import time
+from typing import Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PLAN_WORKERS = 1
+
+# Set in the parent right before forking; read by the plan workers
+_worker_batch = None
+
+
+def _init_plan_worker():
+    _worker_batch.session.detach()
+
+
+def _run_plan(plan_id: int) -> dict:
+    return _worker_batch.run_plan(plan_id)
+
+
+class PlanBatch:
+    """
+    Analyzes plans with a shared session.
+
+    analyze_plan(plan_id, session) runs one plan (load, analyze, write its
+    result files) and returns its summary entry; exceptions it raises are
+    turned into error entries.
+    """
+
+    def __init__(self, analyze_plan: Callable[[int, object], dict], session,
+                 workers: int = DEFAULT_PLAN_WORKERS):
+        self.analyze_plan = analyze_plan
+        self.session = session
+        self.workers = max(1, workers or 1)
+
+    def run_plan(self, plan_id: int) -> dict:
+        started = time.perf_counter()
+        try:
+            entry = self.analyze_plan(plan_id, self.session)
+        except Exception as e:
+            logger.exception(f"Plan {plan_id} failed")
+            entry = {'plan_id': plan_id, 'status': 'error', 'error': str(e)}
+        entry['elapsed_sec'] = round(time.perf_counter() - started, 2)
+        return entry
+
+    def run(self, plan_ids: Iterable[int]) -> List[dict]:
+        """Summary entries of plan_ids, in plan_ids order"""
+        global _worker_batch
+        plan_ids = list(plan_ids)
+        workers = min(self.workers, len(plan_ids))
+        if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            if workers > 1:
+                logger.warning("Parallel plans need the fork start method - running sequentially")
+            return [self._logged(i, len(plan_ids), self.run_plan(plan_id))
+                    for i, plan_id in enumerate(plan_ids, 1)]
+
+        logger.info(f"Analyzing {len(plan_ids)} plans with {workers} plan workers")
+        _worker_batch = self
+        try:
+            with multiprocessing.get_context('fork').Pool(
+                    processes=workers, initializer=_init_plan_worker) as pool:
+                entries = []
+                for i, entry in enumerate(pool.imap(_run_plan, plan_ids, chunksize=1), 1):
+                    entries.append(self._logged(i, len(plan_ids), entry))
+                pool.close()
+                pool.join()
+        finally:
+            _worker_batch = None
+        return entries
+
+    @staticmethod
+    def _logged(i: int, total: int, entry: dict) -> dict:
+        status = entry.get('status')
+        detail = entry.get('error') if status == 'error' else entry.get('output_file')
+        logger.info(f"[{i}/{total}] plan {entry['plan_id']}: {status} "
+                    f"({entry.get('elapsed_sec', 0)}s) {detail or ''}")
+        return entry
+
+
+def plan_entry(plan_id: int, results: dict, output_file: str = None) -> dict:
+    """Summary entry of one analyzed plan"""
+    if 'error' in results:
+        return {'plan_id': plan_id, 'status': 'error', 'error': results['error']}
+    return {
+        'plan_id': plan_id,
+        'status': 'ok',
+        'event': results.get('event'),
+        'event_start': results.get('event_start'),
+        'event_end': results.get('event_end'),
+        'output_file': output_file,
+        'mit_count': len(results.get('mit_results', {})),
+        'gs_count': len(results.get('gs_results', {})),
+        'reroute_count': len(results.get('reroute_results', {})),
+        'summary': results.get('summary', {}),
+    }
+
+
+def _pct(total: int, bad: int):
+    return round(100 * (total - bad) / total, 1) if total > 0 else 100
+
+
+def aggregate_summary(entries: List[dict]) -> Dict:
+    """Totals over the per-plan summaries of the successful entries"""
+    ok = [e for e in entries if e.get('status') == 'ok']
+    totals = {
+        'plans': len(entries),
+        'analyzed': len(ok),
+        'failed': len(entries) - len(ok),
+        'mit': {'total_pairs': 0, 'total_violations': 0},
+        'gs': {'applicable_flights': 0, 'violations': 0},
+        'reroute': {'total_reroutes': 0, 'total_flights': 0, 'filed_non_compliant': 0,
+                    'flown_applicable': 0, 'flown_non_compliant': 0},
+        'holding': {'total_flights_holding': 0},
+    }
+    for entry in ok:
+        summary = entry.get('summary') or {}
+        for section, counters in totals.items():
+            if not isinstance(counters, dict):
+                continue
+            for name in counters:
+                counters[name] += summary.get(section, {}).get(name, 0) or 0
+
+    mit, gs, rr = totals['mit'], totals['gs'], totals['reroute']
+    mit['compliance_pct'] = _pct(mit['total_pairs'], mit['total_violations'])
+    gs['compliance_pct'] = _pct(gs['applicable_flights'], gs['violations'])
+    rr['filed_compliance_pct'] = _pct(rr['total_flights'], rr['filed_non_compliant'])
+    rr['flown_compliance_pct'] = _pct(rr['flown_applicable'], rr['flown_non_compliant'])
+    return totals
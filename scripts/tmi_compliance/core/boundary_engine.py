@@ -0,0 +1,373 @@
+"""
+TMI Compliance Analyzer - Local Boundary Crossing Engine
+========================================================
+
+In-process alternative to the PostGIS boundary crossing functions.
+
+LocalBoundaryEngine loads the ARTCC, sector and TRACON polygons once, either
+from VATSIM_GIS or from the repo's GeoJSON boundary files (applying the same
+code rules as scripts/postgis/import_boundaries.py), into an STRtree. run()
+then computes the crossings of many trajectories per vectorized shapely pass
+instead of one get_trajectory_all_crossings() round trip per flight or batch.
+
+The computation follows get_trajectory_all_crossings() step by step:
+- the trajectory is a planar lon/lat LineString (build_trajectory_line)
+- every polygon it intersects contributes the point components of
+  intersection(line, boundary(polygon)); line overlaps are dropped (ST_Dump
+  + ST_GeometryType = 'ST_Point')
+- fraction is the normalized line position of the point (ST_LineLocatePoint)
+- ENTRY when the first polygon with the same code contains the point
+  ENTRY_LOOKAHEAD_FRACTION further along the line, EXIT otherwise
+- rows are ordered by fraction, EXIT before ENTRY, with lat/lon rounded to
+  the function's DECIMAL(10,6)/(11,6)
+- a trajectory that crosses the antimeridian (crosses_antimeridian: a
+  longitude jump > 180 between consecutive positions) is shifted to
+  [0, 360] longitude (ST_ShiftLongitude) and tested against safe_shift_geom()
+  copies of the polygons (PostGIS migration 018); crossing longitudes are
+  mapped back with normalize_lon()
+
+so the result dicts are interchangeable with the PostGIS ones (both sides run
+the same GEOS operations). With polygons from GeoJSON the analyzer needs no
+GIS connection for boundary crossings at all.
+
+shapely 2 is optional: without it HAS_SHAPELY is False and constructing an
+engine raises ImportError.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    import shapely
+    from shapely import STRtree
+    HAS_SHAPELY = True
+except ImportError:
+    np = None
+    shapely = None
+    STRtree = None
+    HAS_SHAPELY = False
+
+from .gis_crossings import crossings_from_rows
+from .trajectory_store import TrajectoryView
+
+logger = logging.getLogger(__name__)
+
+# assets/geojson at the repository root
+DEFAULT_GEOJSON_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'assets', 'geojson'))
+
+# GeoJSON files per boundary table (see scripts/postgis/import_boundaries.py)
+GEOJSON_ARTCC_FILES = ('artcc.json', 'supercenter.json', 'artcc_area.json')
+GEOJSON_SECTOR_FILES = (('HIGH', 'high.json'), ('LOW', 'low.json'), ('SUPERHIGH', 'superhigh.json'))
+GEOJSON_TRACON_FILE = 'tracon.json'
+
+ARTCC_BOUNDARIES_SQL = '''
+    SELECT artcc_code, ST_AsBinary(geom)
+    FROM artcc_boundaries
+    WHERE NOT is_subsector
+    ORDER BY boundary_id
+'''
+
+SECTOR_BOUNDARIES_SQL = '''
+    SELECT sector_type, sector_code, ST_AsBinary(geom)
+    FROM sector_boundaries
+    ORDER BY sector_id
+'''
+
+TRACON_BOUNDARIES_SQL = '''
+    SELECT tracon_code, sector_code, ST_AsBinary(geom)
+    FROM tracon_boundaries
+    ORDER BY tracon_id
+'''
+
+# boundary_code is returned as VARCHAR(16)
+BOUNDARY_CODE_LEN = 16
+
+# Line fraction past a crossing tested for containment (entry vs exit)
+ENTRY_LOOKAHEAD_FRACTION = 0.001
+
+# Flights per vectorized pass (bounds the size of the intermediate arrays)
+DEFAULT_CHUNK_FLIGHTS = 2000
+
+# shapely type id of Point
+_POINT_TYPE_ID = 0
+
+
+class LocalBoundaryEngine:
+    """
+    Boundary crossings computed in process from an STRtree of polygons.
+
+    Usage:
+        engine = LocalBoundaryEngine.from_geojson()      # or .from_postgis(gis_conn)
+        crossings = engine.run({callsign: trajectory, ...})
+        engine.stats
+    """
+
+    name = 'local'
+
+    def __init__(self, chunk_flights: int = DEFAULT_CHUNK_FLIGHTS):
+        if not HAS_SHAPELY:
+            raise ImportError("shapely 2 is required for local boundary crossings")
+        self.chunk_flights = max(1, chunk_flights)
+        self.source = None          # 'geojson:<dir>' or 'postgis'
+        self._types = []            # boundary_type per polygon
+        self._codes = []            # boundary_code per polygon
+        self._geoms = []            # polygon per polygon index
+        self._tracon_parents = []   # (tracon_code, parent facility code)
+        self._digest = hashlib.sha1()
+        self._tree = None
+        self._shifted = None        # (polygons, outlines, STRtree) in [0, 360] longitude space
+        self.stats = {
+            'flights': 0,
+            'boundaries': 0,
+            'candidate_pairs': 0,
+            'crossings': 0,
+            'seconds': 0.0,
+        }
+
+    # --- Loading ---
+
+    @classmethod
+    def from_geojson(cls, geojson_dir: str = DEFAULT_GEOJSON_DIR, **kwargs) -> 'LocalBoundaryEngine':
+        """Engine over the GeoJSON boundary files in geojson_dir"""
+        engine = cls(**kwargs)
+        if not os.path.isdir(geojson_dir):
+            raise FileNotFoundError(f"GeoJSON boundary directory not found: {geojson_dir}")
+
+        for filename in GEOJSON_ARTCC_FILES:
+            for props, geom in _geojson_features(geojson_dir, filename):
+                code = props.get('ICAOCODE') or props.get('FIRname', '')
+                if 'is_detection_level' in props:
+                    is_subsector = not props['is_detection_level']
+                else:
+                    is_subsector = bool(props.get('is_sub_area')) or '-' in code
+                if not is_subsector:
+                    engine._add('ARTCC', code[:20] or 'UNK', geom)
+
+        for sector_type, filename in GEOJSON_SECTOR_FILES:
+            for props, geom in _geojson_features(geojson_dir, filename):
+                artcc = (props.get('artcc', props.get('ARTCC', '')) or '').upper()[:10]
+                sector = props.get('sector', props.get('SECTOR', ''))
+                code = f"{artcc}{sector}" if artcc and sector else sector or 'UNK'
+                engine._add(sector_type, str(code)[:50], geom)
+
+        for props, geom in _geojson_features(geojson_dir, GEOJSON_TRACON_FILE):
+            if 'tracon' in props:
+                # Enriched GeoJSON: area code is the spatial code, facility code its parent
+                code, parent = props.get('sector', ''), props.get('tracon', '')
+            else:
+                code, parent = (props.get('artcc', props.get('ARTCC', '')) or '').upper()[:4], props.get('sector', '')
+            engine._add('TRACON', code or 'UNK', geom, parent=parent or None)
+
+        engine.source = f"geojson:{geojson_dir}"
+        engine._build()
+        return engine
+
+    @classmethod
+    def from_postgis(cls, gis_conn, **kwargs) -> 'LocalBoundaryEngine':
+        """Engine over the boundary tables of a VATSIM_GIS connection"""
+        engine = cls(**kwargs)
+        cursor = gis_conn.cursor()
+        try:
+            cursor.execute(ARTCC_BOUNDARIES_SQL)
+            for code, wkb in cursor.fetchall():
+                engine._add('ARTCC', code, shapely.from_wkb(bytes(wkb)))
+            cursor.execute(SECTOR_BOUNDARIES_SQL)
+            for sector_type, code, wkb in cursor.fetchall():
+                engine._add(sector_type, code, shapely.from_wkb(bytes(wkb)))
+            cursor.execute(TRACON_BOUNDARIES_SQL)
+            for code, parent, wkb in cursor.fetchall():
+                engine._add('TRACON', code, shapely.from_wkb(bytes(wkb)), parent=parent)
+        finally:
+            cursor.close()
+
+        engine.source = 'postgis'
+        engine._build()
+        return engine
+
+    def _add(self, boundary_type: str, code: str, geometry, parent: Optional[str] = None):
+        if not isinstance(geometry, shapely.Geometry):
+            if not geometry:
+                return
+            geometry = shapely.geometry.shape(geometry)
+        if geometry.is_empty:
+            return
+        code = (code or '')[:BOUNDARY_CODE_LEN]
+        self._types.append(boundary_type[:BOUNDARY_CODE_LEN])
+        self._codes.append(code)
+        self._geoms.append(geometry)
+        if boundary_type == 'TRACON':
+            self._tracon_parents.append((code, parent))
+        self._digest.update(f"{boundary_type}|{code}|".encode())
+        self._digest.update(shapely.to_wkb(geometry))
+
+    def _build(self):
+        self._geoms = np.array(self._geoms, dtype=object)
+        self._outlines = shapely.boundary(self._geoms)
+
+        # Entry/exit is tested against the first polygon of the same code
+        # (the LIMIT 1 subqueries); sector codes are looked up across types
+        first_of = {}
+        containers = np.empty(len(self._geoms), dtype=np.int64)
+        for i, (boundary_type, code) in enumerate(zip(self._types, self._codes)):
+            group = boundary_type if boundary_type in ('ARTCC', 'TRACON') else 'SECTOR'
+            containers[i] = first_of.setdefault((group, code), i)
+        self._containers = containers
+
+        shapely.prepare(self._geoms)
+        self._tree = STRtree(self._geoms)
+        self.stats['boundaries'] = len(self._geoms)
+        logger.info(f"  Local boundary engine: {len(self._geoms)} boundaries from {self.source}")
+
+    # --- Queries ---
+
+    def fingerprint(self) -> str:
+        """Digest of every boundary code and polygon (input cache key part)"""
+        return self._digest.hexdigest()
+
+    def tracon_sub_codes(self, parent_code: str) -> List[str]:
+        """TRACON area codes whose parent facility is parent_code (see _resolve_tracon_sub_codes)"""
+        codes = []
+        for code, parent in self._tracon_parents:
+            if parent == parent_code and code != parent_code and code not in codes:
+                codes.append(code)
+        return codes
+
+    def run(self, trajectories: Dict[str, object]) -> Dict[str, List[dict]]:
+        """
+        Compute crossings for {callsign: trajectory}.
+
+        Returns a dict in input order, in the format of crossings_from_rows();
+        flights without a crossing (or with fewer than 2 positions) map to [].
+        """
+        started = time.perf_counter()
+        callsigns = list(trajectories)
+        results = {}
+        crossing_count = 0
+        for i in range(0, len(callsigns), self.chunk_flights):
+            chunk = callsigns[i:i + self.chunk_flights]
+            rows = self._chunk_rows([trajectories[cs] for cs in chunk])
+            for cs, flight_rows in zip(chunk, rows):
+                results[cs] = crossings_from_rows(flight_rows)
+                crossing_count += len(flight_rows)
+
+        elapsed = time.perf_counter() - started
+        self.stats['flights'] += len(callsigns)
+        self.stats['crossings'] += crossing_count
+        self.stats['seconds'] = round(self.stats['seconds'] + elapsed, 3)
+        if len(callsigns) > 1:
+            rate = len(callsigns) / elapsed if elapsed > 0 else 0.0
+            logger.info(f"  Local boundary crossings: {len(callsigns)} flights, {crossing_count} crossings "
+                        f"in {elapsed:.1f}s ({rate:.0f} flights/s)")
+        return results
+
+    def _chunk_rows(self, trajectories: List[object]) -> List[List[tuple]]:
+        """
+        (boundary_code, lat, lon, fraction, boundary_type, crossing_type)
+        rows per trajectory, ordered as get_trajectory_all_crossings returns them.
+        """
+        rows = [[] for _ in trajectories]
+        coords = []
+        owners = []
+        for k, trajectory in enumerate(trajectories):
+            xy = _line_coords(trajectory)
+            if len(xy) >= 2:
+                coords.append(xy)
+                owners.append(k)
+        if not coords:
+            return rows
+
+        lengths = np.array([len(xy) for xy in coords])
+        lines = shapely.linestrings(np.concatenate(coords), indices=np.repeat(np.arange(len(coords)), lengths))
+
+        # Antimeridian crossers are matched in shifted longitude space
+        shifted = np.array([bool((np.abs(np.diff(xy[:, 0])) > 180).any()) for xy in coords])
+        if shifted.any():
+            lines[shifted] = shapely.transform(lines[shifted], _shift_longitude)
+            geoms, outlines, tree = self._shifted_boundaries()
+            self._line_rows(lines[shifted], np.flatnonzero(shifted), rows, owners, geoms, outlines, tree)
+        if not shifted.all():
+            self._line_rows(lines[~shifted], np.flatnonzero(~shifted), rows, owners,
+                            self._geoms, self._outlines, self._tree)
+        return rows
+
+    def _shifted_boundaries(self) -> tuple:
+        """safe_shift_geom() copies of the polygons, built on first use"""
+        if self._shifted is None:
+            bounds = shapely.bounds(self._geoms)
+            xmin, xmax = bounds[:, 0], bounds[:, 2]
+            # Polygons straddling the prime meridian would wrap the long way round
+            keep = (xmin < 0) & (xmax >= 0) & (xmax - xmin < 180)
+            geoms = self._geoms.copy()
+            geoms[~keep] = shapely.transform(geoms[~keep], _shift_longitude)
+            geoms = shapely.make_valid(geoms)
+            shapely.prepare(geoms)
+            self._shifted = (geoms, shapely.boundary(geoms), STRtree(geoms))
+        return self._shifted
+
+    def _line_rows(self, lines, line_owners, rows: List[List[tuple]], owners: List[int],
+                   geoms, outlines, tree):
+        """Append the crossing rows of lines (positions line_owners in owners) to rows"""
+        line_idx, poly_idx = tree.query(lines, predicate='intersects')
+        self.stats['candidate_pairs'] += len(line_idx)
+        if not len(line_idx):
+            return
+
+        parts, pair_idx = shapely.get_parts(
+            shapely.intersection(lines[line_idx], outlines[poly_idx]), return_index=True)
+        is_point = (shapely.get_type_id(parts) == _POINT_TYPE_ID) & ~shapely.is_empty(parts)
+        points, pair_idx = parts[is_point], pair_idx[is_point]
+        if not len(points):
+            return
+        line_idx, poly_idx = line_idx[pair_idx], poly_idx[pair_idx]
+
+        crossing_lines = lines[line_idx]
+        fraction = shapely.line_locate_point(crossing_lines, points, normalized=True)
+        ahead = shapely.line_interpolate_point(
+            crossing_lines, np.minimum(fraction + ENTRY_LOOKAHEAD_FRACTION, 1.0), normalized=True)
+        entry = shapely.contains(geoms[self._containers[poly_idx]], ahead)
+        lat = np.round(shapely.get_y(points), 6)
+        lon = shapely.get_x(points)
+        lon = np.round(np.where(lon > 180, lon - 360.0, lon), 6)
+
+        order = np.lexsort((poly_idx, entry, fraction, line_idx))
+        for j in order.tolist():
+            p = int(poly_idx[j])
+            rows[owners[line_owners[line_idx[j]]]].append((
+                self._codes[p], float(lat[j]), float(lon[j]), float(fraction[j]),
+                self._types[p], 'ENTRY' if entry[j] else 'EXIT',
+            ))
+
+
+def _geojson_features(geojson_dir: str, filename: str):
+    """(properties, geometry) of each feature of one GeoJSON file (none if missing)"""
+    path = os.path.join(geojson_dir, filename)
+    if not os.path.exists(path):
+        logger.debug(f"  GeoJSON boundary file not found: {path}")
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    for feature in data.get('features', []):
+        yield feature.get('properties') or {}, feature.get('geometry')
+
+
+def _shift_longitude(xy):
+    """ST_ShiftLongitude for a shapely.transform coordinate array"""
+    x = xy[:, 0]
+    x = np.where(x < 0, x + 360.0, np.where(x > 180, x - 360.0, x))
+    return np.column_stack((x, xy[:, 1]))
+
+
+def _line_coords(trajectory):
+    """(n, 2) lon/lat array of a trajectory, skipping positions without coordinates"""
+    if isinstance(trajectory, TrajectoryView):
+        return np.column_stack((np.asarray(trajectory.lon, dtype=np.float64),
+                                np.asarray(trajectory.lat, dtype=np.float64)))
+    xy = [(pt['lon'], pt['lat']) for pt in trajectory
+          if pt.get('lat') is not None and pt.get('lon') is not None]
+    return np.asarray(xy, dtype=np.float64).reshape(-1, 2)
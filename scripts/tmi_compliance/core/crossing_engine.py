@@ -0,0 +1,192 @@
+"""
+TMI Compliance Analyzer - Vectorized Fix Crossing Engine
+========================================================
+
+Batched closest-approach search for fix crossing detection.
+
+The scalar path in TMIComplianceAnalyzer._detect_crossings_interpolated()
+walks every segment of every candidate flight in Python, once per MIT fix.
+This engine reads the columnar trajectory store as contiguous arrays, keeps
+a grid index over all segments (built once per analysis), and evaluates only
+the segments near a fix in a single NumPy pass. It only *selects* the best
+segment per flight; the analyzer then rebuilds the CrossingResult from that
+segment with the scalar helpers, so the output is identical to the scalar
+path.
+
+NumPy is optional: when it is not installed HAS_NUMPY is False and the
+analyzer keeps using the scalar path.
+"""
+
+import logging
+from datetime import datetime
+from typing import Dict, List
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from .spatial_index import SegmentGridIndex
+from .trajectory_store import TrajectoryStore, to_epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_NM = 3440.065
+
+
+def haversine_nm_array(lat1, lon1, lat2, lon2):
+    """Vectorized haversine distance in nautical miles (same formula as haversine_nm)"""
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_NM * 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class FixCrossingEngine:
+    """
+    Array-backed view of the trajectory store for batched crossing detection.
+
+    Every cached trajectory is a slice [start, end) of the store's shared
+    column buffers. Segment lengths and the segment grid are fix-independent
+    and are computed once at construction; per-fix work is a single
+    vectorized pass over the candidate segments near the fix.
+    """
+
+    def __init__(self, store: TrajectoryStore):
+        callsigns = list(store)
+        slices = [store.slice_of(cs) for cs in callsigns]
+        columns = store.numpy_columns()
+
+        self.callsigns = callsigns
+        self.index = {cs: i for i, cs in enumerate(callsigns)}
+        self.starts = np.asarray([s for s, _ in slices], dtype=np.int64)
+        self.ends = np.asarray([e for _, e in slices], dtype=np.int64)
+        # Widen the float32 store columns once; per-fix math runs in float64
+        self.lat = columns['lat'].astype(np.float64)
+        self.lon = columns['lon'].astype(np.float64)
+        self.t = columns['epoch'].astype(np.float64)
+
+        # Segment i runs from point i to point i+1; the last point of each
+        # flight starts no segment, so seg_len is left at +inf there.
+        self.seg_len = np.full(len(self.lat), np.inf)
+        if len(self.lat) > 1:
+            self.seg_len[:-1] = haversine_nm_array(
+                self.lat[:-1], self.lon[:-1], self.lat[1:], self.lon[1:])
+            self.seg_len[self.ends[self.ends > 0] - 1] = np.inf
+
+        # Every segment of every flight: global start point index + owning flight id
+        self.seg_start, self.seg_owner = self._segment_indices(
+            np.arange(len(callsigns), dtype=np.int64))
+        self.grid = (SegmentGridIndex(self.lat, self.lon, self.seg_start)
+                     if self.seg_start.size else None)
+
+        logger.info(f"  Crossing engine: {len(callsigns)} flights, "
+                    f"{len(self.lat)} points")
+
+    def _segment_indices(self, ids):
+        """Global segment start indices and owning-flight ids for the given flight ids."""
+        if ids.size == 0:
+            return ids, ids
+        starts = self.starts[ids]
+        counts = np.maximum(self.ends[ids] - starts - 1, 0)
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        owner = np.repeat(ids, counts)
+        # Offset of each segment within its own flight: 0..count-1
+        run_starts = np.repeat(np.cumsum(counts) - counts, counts)
+        local = np.arange(total, dtype=np.int64) - run_starts
+        return np.repeat(starts, counts) + local, owner
+
+    def _candidate_segments(self, fix_lat: float, fix_lon: float, callsigns: List[str],
+                            radius_nm: float):
+        """Segments of the given flights that the grid cannot rule out for this fix."""
+        if self.grid is None:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        wanted = np.zeros(len(self.callsigns), dtype=bool)
+        wanted[[self.index[cs] for cs in callsigns if cs in self.index]] = True
+
+        pos = self.grid.query(fix_lat, fix_lon, radius_nm)
+        pos = pos[wanted[self.seg_owner[pos]]]
+        return self.seg_start[pos], self.seg_owner[pos]
+
+    def best_segments(self, fix_lat: float, fix_lon: float, callsigns: List[str],
+                      window_start: datetime, window_end: datetime,
+                      radius_nm: float) -> Dict[str, int]:
+        """
+        Select the closest-approach segment per flight, matching the scalar scan.
+
+        Only segments returned by the segment grid are examined; the grid never
+        drops a segment that could pass within radius_nm, so pruning does not
+        change the winner of any flight whose final result is kept.
+
+        A segment is a candidate when it survives the geometry pre-filter
+        (min endpoint distance <= seg_len / 2 + radius) and its interpolated
+        crossing time falls inside [window_start, window_end]. The first
+        segment with the smallest closest-approach distance wins.
+
+        Returns:
+            Dict mapping callsign -> segment index within that flight's trajectory.
+            Flights without a candidate segment are omitted; the caller applies
+            the final radius check on the rebuilt (scalar) result.
+        """
+        seg, owner = self._candidate_segments(fix_lat, fix_lon, callsigns, radius_nm)
+        if seg.size == 0:
+            return {}
+
+        lat1, lon1 = self.lat[seg], self.lon[seg]
+        lat2, lon2 = self.lat[seg + 1], self.lon[seg + 1]
+        seg_len = self.seg_len[seg]
+
+        d1 = haversine_nm_array(lat1, lon1, fix_lat, fix_lon)
+        d2 = haversine_nm_array(lat2, lon2, fix_lat, fix_lon)
+        keep = np.minimum(d1, d2) <= seg_len / 2.0 + radius_nm
+        if not keep.any():
+            return {}
+
+        seg, owner = seg[keep], owner[keep]
+        lat1, lon1, lat2, lon2 = lat1[keep], lon1[keep], lat2[keep], lon2[keep]
+        d1, seg_len = d1[keep], seg_len[keep]
+
+        # Closest approach with cos(lat)-corrected linear interpolation,
+        # mirroring closest_approach_on_segment()
+        cos_lat = np.cos(np.radians((lat1 + lat2) / 2))
+        dlat = lat2 - lat1
+        dlon = (lon2 - lon1) * cos_lat
+        flat = fix_lat - lat1
+        flon = (fix_lon - lon1) * cos_lat
+        denom = dlat * dlat + dlon * dlon
+        degenerate = (seg_len < 0.1) | (denom < 1e-14)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.clip((flat * dlat + flon * dlon) / denom, 0.0, 1.0)
+        frac = np.where(degenerate, 0.0, frac)
+        interp_lat = lat1 + frac * (lat2 - lat1)
+        interp_lon = lon1 + frac * (lon2 - lon1)
+        dist = np.where(degenerate, d1,
+                        haversine_nm_array(interp_lat, interp_lon, fix_lat, fix_lon))
+
+        t1 = self.t[seg]
+        interp_t = t1 + (self.t[seg + 1] - t1) * frac
+        in_window = ((interp_t >= to_epoch_seconds(window_start)) &
+                     (interp_t <= to_epoch_seconds(window_end)))
+        if not in_window.any():
+            return {}
+
+        seg, owner, dist = seg[in_window], owner[in_window], dist[in_window]
+
+        # Per flight: smallest distance, earliest segment on ties
+        order = np.lexsort((seg, dist, owner))
+        owner_sorted = owner[order]
+        first = np.ones(order.size, dtype=bool)
+        first[1:] = owner_sorted[1:] != owner_sorted[:-1]
+        winners = order[first]
+
+        return {
+            self.callsigns[int(o)]: int(s - self.starts[o])
+            for o, s in zip(owner[winners], seg[winners])
+        }
@@ -0,0 +1,290 @@
+"""
+TMI Compliance Analyzer - Batched PostGIS Boundary Crossings
+============================================================
+
+Boundary crossing precompute against VATSIM_GIS.
+
+The per-flight path sends one get_trajectory_all_crossings(jsonb) round trip
+per trajectory. The batched path sends many trajectories in one statement as
+a jsonb object keyed by callsign and fans it out server-side with
+jsonb_each + LATERAL, so each flight still goes through the very same
+function call with the very same waypoints JSON. Batches can be spread over
+a small pool of GIS connections.
+
+Fallback rules keep the results identical to the per-flight path:
+- get_trajectory_all_crossings missing  -> batched ARTCC-only function
+- any other batch failure               -> per-flight path for that batch
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GIS_BATCH_SIZE = 100
+DEFAULT_GIS_WORKERS = 1
+
+# PostgreSQL SQLSTATE for "function does not exist"
+PG_UNDEFINED_FUNCTION = '42883'
+
+ALL_CROSSINGS_SQL = '''
+    SELECT boundary_code, crossing_lat, crossing_lon, crossing_fraction,
+           boundary_type, crossing_type
+    FROM get_trajectory_all_crossings(%s::jsonb)
+    ORDER BY crossing_fraction,
+             CASE crossing_type WHEN 'EXIT' THEN 0 ELSE 1 END
+'''
+
+ARTCC_CROSSINGS_SQL = '''
+    SELECT artcc_code, crossing_lat, crossing_lon, crossing_fraction
+    FROM get_trajectory_artcc_crossings(%s::jsonb)
+    ORDER BY crossing_fraction
+'''
+
+BATCH_ALL_CROSSINGS_SQL = '''
+    SELECT f.callsign, c.boundary_code, c.crossing_lat, c.crossing_lon,
+           c.crossing_fraction, c.boundary_type, c.crossing_type
+    FROM jsonb_each(%s::jsonb) AS f(callsign, waypoints)
+    CROSS JOIN LATERAL get_trajectory_all_crossings(f.waypoints) AS c
+    ORDER BY f.callsign, c.crossing_fraction,
+             CASE c.crossing_type WHEN 'EXIT' THEN 0 ELSE 1 END
+'''
+
+BATCH_ARTCC_CROSSINGS_SQL = '''
+    SELECT f.callsign, c.artcc_code, c.crossing_lat, c.crossing_lon,
+           c.crossing_fraction
+    FROM jsonb_each(%s::jsonb) AS f(callsign, waypoints)
+    CROSS JOIN LATERAL get_trajectory_artcc_crossings(f.waypoints) AS c
+    ORDER BY f.callsign, c.crossing_fraction
+'''
+
+
+def trajectory_waypoints(trajectory) -> List[dict]:
+    """Waypoint list in the shape the PostGIS crossing functions expect"""
+    return [
+        {'lat': pt['lat'], 'lon': pt['lon'], 'sequence_num': i}
+        for i, pt in enumerate(trajectory)
+    ]
+
+
+def crossings_from_rows(rows, artcc_only: bool = False) -> List[dict]:
+    """Convert crossing function rows to the cached crossing dict format"""
+    if artcc_only:
+        return [
+            {
+                'facility_code': r[0],
+                'lat': float(r[1]),
+                'lon': float(r[2]),
+                'fraction': float(r[3]),
+                'facility_type': 'ARTCC',
+                'crossing_type': 'UNKNOWN'
+            }
+            for r in rows
+        ]
+    return [
+        {
+            'facility_code': r[0],
+            'lat': float(r[1]),
+            'lon': float(r[2]),
+            'fraction': float(r[3]),
+            'facility_type': r[4] if len(r) > 4 else 'ARTCC',
+            'crossing_type': r[5] if len(r) > 5 else 'UNKNOWN'
+        }
+        for r in rows
+    ]
+
+
+def query_flight_crossings(cursor, waypoints_json: str) -> List[dict]:
+    """
+    Per-flight crossing query: ARTCC + TRACON, falling back to ARTCC-only.
+
+    Raises if the ARTCC-only fallback fails as well.
+    """
+    try:
+        cursor.execute(ALL_CROSSINGS_SQL, (waypoints_json,))
+        return crossings_from_rows(cursor.fetchall())
+    except Exception:
+        cursor.execute(ARTCC_CROSSINGS_SQL, (waypoints_json,))
+        return crossings_from_rows(cursor.fetchall(), artcc_only=True)
+
+
+class BoundaryCrossingBatcher:
+    """
+    Computes PostGIS boundary crossings for many trajectories.
+
+    batch_size <= 1 uses the per-flight path. workers > 1 opens additional
+    GIS connections (via connect_fn) and runs batches concurrently; psycopg2
+    releases the GIL while waiting on the server, so threads are sufficient.
+    """
+
+    PROGRESS_EVERY_SEC = 10
+
+    def __init__(self, gis_conn, batch_size: int = DEFAULT_GIS_BATCH_SIZE,
+                 workers: int = DEFAULT_GIS_WORKERS,
+                 connect_fn: Optional[Callable] = None):
+        self.gis_conn = gis_conn
+        self.batch_size = max(1, batch_size or 1)
+        self.workers = max(1, workers or 1)
+        self.connect_fn = connect_fn
+        self._all_crossings_available = True
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            'flights': 0,
+            'batches': 0,
+            'failed_flights': 0,
+            'per_flight_fallbacks': 0,
+            'workers': 1,
+            'seconds': 0.0,
+        }
+
+    # --- Single batch ---
+
+    def _run_batch(self, conn, batch: Dict[str, str]) -> Dict[str, Optional[List[dict]]]:
+        """
+        Crossings for one batch of {callsign: waypoints_json}.
+
+        A value of None marks a flight whose per-flight query failed (the
+        caller caches [] for it, as the per-flight path does).
+        """
+        cursor = conn.cursor()
+        try:
+            if self.batch_size == 1:
+                return self._run_per_flight(cursor, batch)
+
+            payload = '{' + ','.join(
+                f'{json.dumps(cs)}:{wp}' for cs, wp in batch.items()) + '}'
+
+            if self._all_crossings_available:
+                try:
+                    cursor.execute(BATCH_ALL_CROSSINGS_SQL, (payload,))
+                    return self._group_rows(batch, cursor.fetchall(), artcc_only=False)
+                except Exception as e:
+                    if getattr(e, 'pgcode', None) != PG_UNDEFINED_FUNCTION:
+                        logger.debug(f"Batched crossing query failed ({e}), "
+                                     f"falling back to per-flight for {len(batch)} flights")
+                        return self._run_per_flight(cursor, batch, fallback=True)
+                    logger.info("  get_trajectory_all_crossings unavailable, using ARTCC-only crossings")
+                    self._all_crossings_available = False
+
+            try:
+                cursor.execute(BATCH_ARTCC_CROSSINGS_SQL, (payload,))
+                return self._group_rows(batch, cursor.fetchall(), artcc_only=True)
+            except Exception as e:
+                logger.debug(f"Batched ARTCC crossing query failed ({e}), "
+                             f"falling back to per-flight for {len(batch)} flights")
+                return self._run_per_flight(cursor, batch, fallback=True)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _group_rows(batch: Dict[str, str], rows, artcc_only: bool) -> Dict[str, List[dict]]:
+        grouped = {cs: [] for cs in batch}
+        for r in rows:
+            grouped[r[0]].append(r[1:])
+        return {cs: crossings_from_rows(rs, artcc_only) for cs, rs in grouped.items()}
+
+    def _run_per_flight(self, cursor, batch: Dict[str, str],
+                        fallback: bool = False) -> Dict[str, Optional[List[dict]]]:
+        if fallback:
+            with self._stats_lock:
+                self.stats['per_flight_fallbacks'] += len(batch)
+        results = {}
+        for callsign, waypoints_json in batch.items():
+            try:
+                results[callsign] = query_flight_crossings(cursor, waypoints_json)
+            except Exception as e:
+                logger.debug(f"Error computing crossings for {callsign}: {e}")
+                results[callsign] = None
+        return results
+
+    # --- Connection pool ---
+
+    def _open_pool(self) -> tuple:
+        """Queue of GIS connections (shared one first) and the list of extras opened"""
+        pool = queue.Queue()
+        pool.put(self.gis_conn)
+        extras = []
+        for _ in range(self.workers - 1):
+            if not self.connect_fn:
+                break
+            try:
+                conn = self.connect_fn()
+                pool.put(conn)
+                extras.append(conn)
+            except Exception as e:
+                logger.warning(f"  Could not open extra GIS connection: {e}")
+                break
+        return pool, extras
+
+    def _run_pooled(self, pool: queue.Queue, batch: Dict[str, str]):
+        conn = pool.get()
+        try:
+            return self._run_batch(conn, batch)
+        finally:
+            pool.put(conn)
+
+    # --- Driver ---
+
+    def run(self, trajectories: Dict[str, object]) -> Dict[str, List[dict]]:
+        """
+        Compute crossings for {callsign: trajectory}.
+
+        Returns a dict in input order; flights whose query failed map to [].
+        """
+        started = time.perf_counter()
+        callsigns = list(trajectories)
+        total = len(callsigns)
+        batches = [
+            {cs: json.dumps(trajectory_waypoints(trajectories[cs]))
+             for cs in callsigns[i:i + self.batch_size]}
+            for i in range(0, total, self.batch_size)
+        ]
+
+        pool, extras = self._open_pool()
+        pool_size = 1 + len(extras)
+        self.stats['workers'] = pool_size
+        mode = 'per-flight' if self.batch_size == 1 else f'batches of {self.batch_size}'
+        logger.info(f"  GIS crossings: {total} flights, {mode}, {pool_size} connection(s)")
+
+        results = {}
+        done = 0
+        last_report = started
+        try:
+            with ThreadPoolExecutor(max_workers=pool_size) as executor:
+                futures = [executor.submit(self._run_pooled, pool, b) for b in batches]
+                for future in as_completed(futures):
+                    batch_results = future.result()
+                    results.update(batch_results)
+                    done += len(batch_results)
+                    self.stats['batches'] += 1
+
+                    now = time.perf_counter()
+                    if now - last_report >= self.PROGRESS_EVERY_SEC and done < total:
+                        last_report = now
+                        logger.info(f"  Processed {done}/{total} flights "
+                                    f"({done / (now - started):.0f} flights/s)...")
+        finally:
+            for conn in extras:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+
+        elapsed = time.perf_counter() - started
+        failed = [cs for cs, r in results.items() if r is None]
+        self.stats.update({
+            'flights': total,
+            'failed_flights': len(failed),
+            'seconds': round(elapsed, 3),
+        })
+        rate = total / elapsed if elapsed > 0 else 0.0
+        logger.info(f"  GIS crossings done: {total} flights in {elapsed:.1f}s "
+                    f"({rate:.0f} flights/s, {self.stats['batches']} batches, "
+                    f"{self.stats['per_flight_fallbacks']} per-flight fallbacks)")
+
+        return {cs: results.get(cs) or [] for cs in callsigns}
@@ -0,0 +1,155 @@
+"""
+TMI Compliance Analyzer - Vectorized Holding Screen
+===================================================
+
+All-flights pre-pass for holding pattern detection.
+
+detect_flight_holding() walks every bearing of every flight in Python even
+though almost no flight holds. This screen computes bearings, heading deltas
+and data-gap resets for the whole columnar trajectory store in one NumPy
+pass, and keeps only the reset segments (runs of bearings between gaps) whose
+cumulative heading change ever reaches one orbit. A segment that never turns
+through HOLD_MIN_HEADING_CHANGE_DEG cannot complete an orbit, so it can never
+produce a hold event.
+
+Like the crossing engine, the screen only *selects*: the analyzer runs the
+exact scalar orbit scan (and _finalize_hold) on the selected segments, so
+the hold events are identical to scanning every flight. A small margin on
+the orbit threshold absorbs float differences between the NumPy and math
+trigonometry.
+
+centers_within() is the matching vectorized form of the event-scope distance
+check applied to every hold.
+
+NumPy is optional: without it the analyzer scans every flight.
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from .crossing_engine import haversine_nm_array
+from .models import HOLD_GAP_RESET_SEC, HOLD_MIN_HEADING_CHANGE_DEG
+from .trajectory_store import TrajectoryStore
+
+logger = logging.getLogger(__name__)
+
+# Degrees below the orbit threshold a segment may peak at and still be scanned
+HOLD_SCREEN_MARGIN_DEG = 1.0
+
+# Flights with fewer points are never scanned (see detect_flight_holding)
+HOLD_MIN_POINTS = 4
+
+
+def bearing_array(lat1, lon1, lat2, lon2):
+    """Vectorized initial bearing in degrees 0-360 (same formula as calculate_bearing)"""
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    dlon = lon2 - lon1
+    x = np.sin(dlon) * np.cos(lat2)
+    y = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+    return (np.degrees(np.arctan2(x, y)) + 360) % 360
+
+
+def screen_holding_segments(store: TrajectoryStore) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Reset segments that may contain a holding orbit, for every flight in store.
+
+    Bearing i of a flight runs from point i to point i+1. A reset segment is
+    the bearing-index range [first, last] that detect_flight_holding() scans
+    without a gap reset: it starts at bearing 0 or at a bearing whose
+    neighbouring report interval exceeds HOLD_GAP_RESET_SEC.
+
+    Returns:
+        Dict mapping callsign -> [(first, last), ...] in trajectory order.
+        Flights without a qualifying segment are omitted.
+    """
+    callsigns = list(store)
+    if not callsigns or store.point_count < HOLD_MIN_POINTS:
+        return {}
+
+    slices = [store.slice_of(cs) for cs in callsigns]
+    starts = np.asarray([s for s, _ in slices], dtype=np.int64)
+    ends = np.asarray([e for _, e in slices], dtype=np.int64)
+    scanned = (ends - starts) >= HOLD_MIN_POINTS
+    if not scanned.any():
+        return {}
+    # Buffer order (merged stores append rewritten flights at the end)
+    flight_ids = np.flatnonzero(scanned)
+    flight_ids = flight_ids[np.argsort(starts[flight_ids], kind='stable')]
+    starts, ends = starts[flight_ids], ends[flight_ids]
+
+    columns = store.numpy_columns()
+    lat = columns['lat'].astype(np.float64)
+    lon = columns['lon'].astype(np.float64)
+    epoch = columns['epoch']
+    n_bearings = len(lat) - 1
+
+    # Bearing and heading-delta series over the whole buffer; entries that
+    # straddle two flights are masked out below
+    bearings = bearing_array(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    deltas = np.zeros(n_bearings)
+    deltas[1:] = (bearings[1:] - bearings[:-1]) % 360
+    deltas[deltas > 180] -= 360
+
+    # Bearings [start, end - 2] belong to their flight
+    edges = np.zeros(n_bearings + 1, dtype=np.int64)
+    np.add.at(edges, starts, 1)
+    np.add.at(edges, ends - 1, -1)
+    in_flight = np.cumsum(edges[:-1]) > 0
+
+    # Gap resets: the report interval before or after the bearing's start point
+    gaps = np.zeros(n_bearings, dtype=bool)
+    if n_bearings > 1:
+        dt = np.diff(epoch)
+        gaps[1:] = np.maximum(dt[:-1], dt[1:]) > HOLD_GAP_RESET_SEC
+    segment_start = in_flight & gaps
+    segment_start[starts] = True
+
+    # Heading change accumulated since the segment start (the start bearing
+    # contributes no delta, as in the scalar scan)
+    contrib = np.where(in_flight & ~segment_start, deltas, 0.0)
+    cum = np.cumsum(contrib)
+
+    pos = np.flatnonzero(in_flight)
+    first_pos = np.flatnonzero(segment_start[pos])
+    seg_first = pos[first_pos]
+    seg_last = np.append(pos[first_pos[1:] - 1], pos[-1])
+    seg_of_pos = np.cumsum(segment_start[pos]) - 1
+    turned = np.abs(cum[pos] - cum[seg_first][seg_of_pos])
+    peak = np.maximum.reduceat(turned, first_pos)
+
+    keep = peak >= HOLD_MIN_HEADING_CHANGE_DEG - HOLD_SCREEN_MARGIN_DEG
+    seg_first, seg_last = seg_first[keep], seg_last[keep]
+    owner = np.searchsorted(starts, seg_first, side='right') - 1
+
+    selected = {}
+    for k, first, last in zip(owner.tolist(), seg_first.tolist(), seg_last.tolist()):
+        base = int(starts[k])
+        selected.setdefault(callsigns[flight_ids[k]], []).append((first - base, last - base))
+
+    logger.debug(f"Holding screen: {len(selected)} of {len(flight_ids)} flights "
+                 f"({int(keep.sum())} of {keep.size} segments) turn through an orbit")
+    return selected
+
+
+def centers_within(centers: List[Tuple[Optional[float], Optional[float]]],
+                   coords: List[Tuple[float, float]], radius_nm: float) -> List[bool]:
+    """
+    Whether each (lat, lon) center lies within radius_nm of any of coords,
+    as one centers x coords distance matrix. Centers with a None coordinate
+    are reported as within.
+    """
+    if not centers:
+        return []
+    known = np.array([lat is not None and lon is not None for lat, lon in centers])
+    lat = np.array([lat if ok else 0.0 for (lat, _), ok in zip(centers, known)], dtype=np.float64)
+    lon = np.array([lon if ok else 0.0 for (_, lon), ok in zip(centers, known)], dtype=np.float64)
+    ref = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    dist = haversine_nm_array(lat[:, None], lon[:, None], ref[None, :, 0], ref[None, :, 1])
+    return ((dist <= radius_nm).any(axis=1) | ~known).tolist()
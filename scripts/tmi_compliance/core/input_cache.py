@@ -0,0 +1,258 @@
+"""
+TMI Compliance Analyzer - Persistent Input Cache
+================================================
+
+Content-addressed on-disk cache of analyzer inputs, so re-running an event
+after a config tweak does not reload everything from Azure SQL and PostGIS.
+
+Entries are Arrow IPC files under <cache_dir>/<kind>/<key>.arrow. The key is
+a SHA-256 over everything that determines the data:
+- query text and parameters (fix lists, callsign sets, time windows)
+- ADL source watermarks (row count + latest timestamp per trajectory source
+  inside the analysis window) for event data, so new or purged rows
+  invalidate the entry
+- for boundary crossings, the boundaries they were computed against: the
+  local engine's polygon digest, or the row count + latest updated_at of
+  each PostGIS boundary table, so a boundary re-import invalidates them
+  (if those tables cannot be read, PostGIS crossings are refreshed after
+  REFERENCE_TTL_SEC instead)
+- CACHE_FORMAT_VERSION
+
+Reference data (nav fixes, airports, airways, taxi/connect references) has no
+cheap watermark and is instead refreshed after REFERENCE_TTL_SEC.
+
+pyarrow is optional: without it the cache reports itself disabled and the
+analyzer reads from the databases as before.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+    HAS_PYARROW = True
+except ImportError:
+    pa = None
+    pa_ipc = None
+    HAS_PYARROW = False
+
+from .trajectory_store import COLUMN_TYPECODES, COLUMNS, TrajectoryStore
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of any cached entry changes
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'TMI_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'perti_tmi_cache'))
+
+REFERENCE_TTL_SEC = 24 * 3600        # nav_fixes / apts / airways / reference tables
+MAX_ENTRY_AGE_SEC = 14 * 24 * 3600   # entries not used for this long are pruned
+
+_ARROW_TYPES = {'f': 'float32', 'q': 'int64'}
+
+
+class AnalyzerInputCache:
+    """
+    On-disk cache of analyzer inputs.
+
+    All load_* methods return None on a miss (absent, stale, unreadable);
+    save_* failures are logged and ignored, the cache never fails a run.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.enabled = enabled and HAS_PYARROW
+        self.hits = 0
+        self.misses = 0
+
+        if enabled and not HAS_PYARROW:
+            logger.warning("pyarrow not installed - input cache disabled")
+        if self.enabled:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                self.prune()
+            except OSError as e:
+                logger.warning(f"Input cache directory unusable ({cache_dir}): {e} - cache disabled")
+                self.enabled = False
+
+    # --- Keys and files ---
+
+    @staticmethod
+    def key(kind: str, **parts) -> str:
+        """Content address for an entry: hash of kind + canonical JSON of parts"""
+        payload = json.dumps({'v': CACHE_FORMAT_VERSION, 'kind': kind, **parts},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, kind: str, key: str) -> str:
+        return os.path.join(self.cache_dir, kind, f"{key}.arrow")
+
+    def _read(self, kind: str, key: str, ttl: Optional[float] = None):
+        """(table, metadata dict) for an entry, or None on a miss"""
+        if not self.enabled:
+            return None
+        path = self._path(kind, key)
+        try:
+            if ttl is not None and time.time() - os.path.getmtime(path) > ttl:
+                logger.info(f"  Input cache stale: {kind} ({key[:12]})")
+                self.misses += 1
+                return None
+            with pa.memory_map(path, 'r') as source:
+                table = pa_ipc.open_file(source).read_all()
+            os.utime(path, (time.time(), os.path.getmtime(path)))  # last use, for prune()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"  Input cache entry unreadable ({kind}/{key[:12]}): {e}")
+            self.misses += 1
+            return None
+
+        raw_meta = (table.schema.metadata or {}).get(b'perti')
+        meta = json.loads(raw_meta) if raw_meta else {}
+        self.hits += 1
+        logger.info(f"  Input cache hit: {kind} ({key[:12]})")
+        return table, meta
+
+    def _write(self, kind: str, key: str, table, meta: Optional[dict] = None):
+        if not self.enabled:
+            return
+        path = self._path(kind, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if meta:
+                table = table.replace_schema_metadata({'perti': json.dumps(meta, default=str)})
+            # Atomic write: temp file + rename so concurrent runs never see partial files
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with pa.OSFile(tmp_path, 'wb') as sink:
+                with pa_ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+            logger.info(f"  Input cache stored: {kind} ({key[:12]}, {table.nbytes / 1048576:.1f} MB)")
+        except Exception as e:
+            logger.warning(f"  Could not write input cache entry {kind}: {e}")
+
+    # --- Raw query rows ---
+
+    def load_rows(self, kind: str, key: str, ttl: Optional[float] = None) -> Optional[List[tuple]]:
+        """Cached query result rows as tuples (same positional layout as fetchall())"""
+        entry = self._read(kind, key, ttl)
+        if entry is None:
+            return None
+        table, meta = entry
+        columns = [table.column(i).to_pylist() for i in range(table.num_columns)]
+        if not columns:
+            return [] if meta.get('rows', 0) == 0 else None
+        return list(zip(*columns))
+
+    def save_rows(self, kind: str, key: str, rows: List[tuple]):
+        """Store query result rows; columns are named c0..cN"""
+        if not self.enabled:
+            return
+        try:
+            width = len(rows[0]) if rows else 0
+            table = pa.table({f"c{i}": pa.array([r[i] for r in rows]) for i in range(width)})
+        except Exception as e:
+            logger.debug(f"Rows for {kind} not cacheable: {e}")
+            return
+        self._write(kind, key, table, {'rows': len(rows)})
+
+    # --- Trajectory store ---
+
+    def load_trajectories(self, key: str) -> Optional[Tuple[TrajectoryStore, Dict[str, dict]]]:
+        """Cached (TrajectoryStore, trajectory metadata) for a trajectory key"""
+        entry = self._read('trajectories', key)
+        if entry is None:
+            return None
+        table, meta = entry
+
+        columns = []
+        for name in COLUMNS:
+            chunk = table.column(name).combine_chunks()
+            buf = array(COLUMN_TYPECODES[name])
+            if len(chunk):
+                start = chunk.offset * buf.itemsize
+                buf.frombytes(memoryview(chunk.buffers()[1])[start:start + len(chunk) * buf.itemsize])
+            columns.append(buf)
+
+        slices = {cs: tuple(se) for cs, se in meta['slices'].items()}
+        return TrajectoryStore(*columns, slices), meta['metadata']
+
+    def save_trajectories(self, key: str, store: TrajectoryStore, metadata: Dict[str, dict]):
+        if not self.enabled:
+            return
+        arrays = store.column_arrays()
+        table = pa.table({
+            name: pa.Array.from_buffers(getattr(pa, _ARROW_TYPES[buf.typecode])(), len(buf),
+                                        [None, pa.py_buffer(buf)])
+            for name, buf in arrays.items()
+        })
+        self._write('trajectories', key, table, {'slices': store.slices, 'metadata': metadata})
+
+    # --- Boundary crossings ---
+
+    def load_crossings(self, key: str, ttl: Optional[float] = None
+                       ) -> Optional[Tuple[Dict[str, List[dict]], List[str]]]:
+        """Cached (crossing cache, low-quality callsigns) for a crossings key"""
+        entry = self._read('crossings', key, ttl)
+        if entry is None:
+            return None
+        table, meta = entry
+
+        crossing_cache = {cs: [] for cs in meta['callsigns']}
+        for row in table.to_pylist():
+            crossing_cache[row.pop('callsign')].append(row)
+        return crossing_cache, meta['low_quality']
+
+    def save_crossings(self, key: str, crossing_cache: Dict[str, List[dict]],
+                       low_quality: List[str]):
+        if not self.enabled:
+            return
+        rows = [{'callsign': cs, **c} for cs, crossings in crossing_cache.items() for c in crossings]
+        schema = pa.schema([
+            ('callsign', pa.string()), ('facility_code', pa.string()),
+            ('lat', pa.float64()), ('lon', pa.float64()), ('fraction', pa.float64()),
+            ('facility_type', pa.string()), ('crossing_type', pa.string()),
+        ])
+        table = pa.Table.from_pylist(rows, schema=schema)
+        self._write('crossings', key, table,
+                    {'callsigns': list(crossing_cache), 'low_quality': sorted(low_quality)})
+
+    # --- Maintenance ---
+
+    def prune(self, max_age_sec: float = MAX_ENTRY_AGE_SEC):
+        """Delete entries that have not been used for max_age_sec"""
+        cutoff = time.time() - max_age_sec
+        removed = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getatime(path) < cutoff:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        if removed:
+            logger.info(f"Input cache: pruned {removed} unused entries")
+
+    def clear(self):
+        """Explicit invalidation: remove every cached entry"""
+        if os.path.isdir(self.cache_dir):
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            logger.info(f"Input cache cleared: {self.cache_dir}")
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def summary(self) -> Dict[str, Any]:
+        return {'enabled': self.enabled, 'hits': self.hits, 'misses': self.misses,
+                'cache_dir': self.cache_dir}
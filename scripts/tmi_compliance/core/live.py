@@ -0,0 +1,399 @@
+"""
+TMI Compliance Analyzer - Live (Incremental) MIT Compliance
+===========================================================
+
+Long-running mode for rolling MIT/MINIT compliance during an event.
+
+After one full bootstrap load (fix coordinates, featured flights, trajectory
+store) the monitor keeps the analyzer's caches warm and, every cycle:
+
+1. pulls only adl_tmi_trajectory / adl_flight_trajectory rows newer than a
+   per-source watermark (minus a small overlap for late-committed rows) and
+   merges them into the columnar store; flights that newly appear in the
+   featured set are backfilled from the start of the trajectory window, and
+   flights that left it are dropped from the store (and their crossings
+   removed). The flights are staged in the loader's callsign temp table and the rows
+   streamed with fetchmany() (see trajectory_loader.py)
+2. re-detects fix crossings only for flights that received new points, per
+   MIT fix, with a crossing engine built over just those flights
+3. re-pairs the crossings of fixes whose crossings changed
+4. emits a delta (added/updated/removed crossings and spacing pairs, plus a
+   compliance summary per MIT) through the emit callback
+
+Live deltas are fix-based: boundary crossings (PostGIS) and the GIS stream
+clustering of the batch run are not recomputed per cycle, streams are split
+by approach bearing (or by the TMI modifier). The batch run.py invocation
+remains the authoritative post-event result.
+"""
+
+import json
+import logging
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .analyzer import TMIComplianceAnalyzer, cluster_crossings_by_bearing
+from .crossing_engine import FixCrossingEngine, HAS_NUMPY
+from .database import ADLConnection
+from .models import CrossingResult, MITModifier, SpacingCategory, TMIType, normalize_datetime
+from .trajectory_loader import CALLSIGN_TABLE, TrajectoryLoader
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIVE_INTERVAL_SEC = 60
+
+# Rows committed slightly out of timestamp order are picked up by re-reading
+# this much before the watermark; merged() drops the already-known points
+WATERMARK_OVERLAP_SEC = 120
+
+WATERMARK_SQL = """
+    SELECT 'TMI', MAX(timestamp_utc) FROM dbo.adl_tmi_trajectory
+    WHERE timestamp_utc >= %s AND timestamp_utc <= %s
+    UNION ALL
+    SELECT 'LIVE', MAX(recorded_utc) FROM dbo.adl_flight_trajectory
+    WHERE recorded_utc >= %s AND recorded_utc <= %s
+"""
+
+# New rows per source for the flights staged in CALLSIGN_TABLE; TMI rows win
+# over live rows at the same timestamp (same priority as the full trajectory load)
+NEW_ROWS_SQL = f"""
+    SELECT c.callsign, t.flight_uid, t.timestamp_utc,
+           t.lat, t.lon, t.groundspeed_kts, t.altitude_ft,
+           p.fp_dept_icao, p.fp_dest_icao,
+           t.tmi_tier, 'TMI' AS source_table
+    FROM dbo.adl_tmi_trajectory t
+    JOIN dbo.adl_flight_core c ON t.flight_uid = c.flight_uid
+    JOIN dbo.adl_flight_plan p ON t.flight_uid = p.flight_uid
+    JOIN {CALLSIGN_TABLE} k ON k.callsign = c.callsign
+    WHERE t.timestamp_utc > %s AND t.timestamp_utc <= %s
+    UNION ALL
+    SELECT c.callsign, t.flight_uid, t.recorded_utc,
+           t.lat, t.lon, t.groundspeed_kts, t.altitude_ft,
+           p.fp_dept_icao, p.fp_dest_icao,
+           NULL AS tmi_tier, 'LIVE' AS source_table
+    FROM dbo.adl_flight_trajectory t
+    JOIN dbo.adl_flight_core c ON t.flight_uid = c.flight_uid
+    JOIN dbo.adl_flight_plan p ON t.flight_uid = p.flight_uid
+    JOIN {CALLSIGN_TABLE} k ON k.callsign = c.callsign
+    WHERE t.recorded_utc > %s AND t.recorded_utc <= %s
+    ORDER BY source_table DESC
+"""
+
+SOURCES = ('TMI', 'LIVE')
+
+
+def _fmt(ts: datetime) -> str:
+    return ts.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def crossing_to_dict(c: CrossingResult) -> dict:
+    """JSON form of a live fix crossing"""
+    return {
+        'callsign': c.callsign,
+        'flight_uid': c.flight_uid,
+        'time': c.crossing_time.strftime('%H:%M:%SZ'),
+        'lat': round(c.lat, 4),
+        'lon': round(c.lon, 4),
+        'distance_nm': round(c.distance_nm, 1),
+        'gs': round(c.groundspeed),
+        'alt': round(c.altitude),
+        'bearing': round(c.bearing, 1) if c.bearing is not None else None,
+        'dept': c.dept,
+        'dest': c.dest,
+    }
+
+
+def _diff(old: Dict, new: Dict) -> dict:
+    """added / updated / removed between two {key: json-able value} maps"""
+    return {
+        'added': [v for k, v in new.items() if k not in old],
+        'updated': [v for k, v in new.items() if k in old and old[k] != v],
+        'removed': [k if isinstance(k, str) else list(k) for k in old if k not in new],
+    }
+
+
+class _LiveMIT:
+    """Incremental state of one MIT/MINIT TMI"""
+
+    def __init__(self, tmi, key: str, fix_lat: float, fix_lon: float):
+        self.tmi = tmi
+        self.key = key
+        self.fix_lat = fix_lat
+        self.fix_lon = fix_lon
+        self.crossings: Dict[str, CrossingResult] = {}
+        self.crossing_json: Dict[str, dict] = {}
+        self.pairs: Dict[tuple, dict] = {}
+
+
+class LiveComplianceMonitor:
+    """
+    Rolling MIT compliance over a warm TMIComplianceAnalyzer.
+
+    Args:
+        analyzer: analyzer for the event (not yet run)
+        interval_sec: seconds between cycle starts
+        emit: called with every snapshot/delta dict (default: JSON line on stdout)
+    """
+
+    def __init__(self, analyzer: TMIComplianceAnalyzer,
+                 interval_sec: float = DEFAULT_LIVE_INTERVAL_SEC,
+                 emit: Optional[Callable[[dict], None]] = None):
+        self.analyzer = analyzer
+        self.interval_sec = interval_sec
+        self.emit = emit or self._emit_stdout
+        self.watermarks: Dict[str, datetime] = {}
+        self.cycle = 0
+        self._mits: List[_LiveMIT] = []
+
+    @staticmethod
+    def _emit_stdout(delta: dict):
+        sys.stdout.write(json.dumps(delta, default=str) + '\n')
+        sys.stdout.flush()
+
+    # --- Driver ---
+
+    def run(self, max_cycles: int = 0):
+        """Bootstrap, then run incremental cycles (max_cycles=0: until interrupted)"""
+        a = self.analyzer
+        with ADLConnection() as adl:
+            a.adl = adl
+            a.adl_conn = adl.conn
+            # Fix-based only: no per-cycle PostGIS boundary work (see module docstring)
+            a.gis_conn = None
+
+            self.bootstrap()
+            try:
+                while not max_cycles or self.cycle < max_cycles:
+                    started = time.monotonic()
+                    self.run_cycle()
+                    remaining = self.interval_sec - (time.monotonic() - started)
+                    if remaining > 0 and (not max_cycles or self.cycle < max_cycles):
+                        time.sleep(remaining)
+            except KeyboardInterrupt:
+                logger.info("Live mode interrupted")
+
+    def bootstrap(self):
+        """Full load of the event inputs and the initial crossing/pair snapshot"""
+        a = self.analyzer
+        started = time.perf_counter()
+        a._merge_user_defined_tmis()
+
+        # Watermarks first: rows written during the full load are re-read by
+        # the first cycle and deduplicated by the store merge
+        self.watermarks = self._query_watermarks()
+        a._load_event_inputs()
+        a._trajectory_cache_loaded = True
+        # Cache keys are frozen at the bootstrap watermarks; live refreshes must hit ADL
+        a.input_cache = None
+
+        for tmi in a.event.tmis:
+            if tmi.tmi_type not in (TMIType.MIT, TMIType.MINIT):
+                continue
+            if not (tmi.fix and tmi.fix in a.fix_coords):
+                logger.info(f"Live mode: skipping {tmi.tmi_type.value} {tmi.fix or tmi.provider} "
+                            f"(no fix coordinates; boundary-only MITs need the batch run)")
+                continue
+            coords = a.fix_coords[tmi.fix]
+            self._mits.append(_LiveMIT(tmi, a._mit_result_key(tmi), coords['lat'], coords['lon']))
+
+        delta = self._update_mits(list(a._trajectory_cache))
+        delta.update({
+            'type': 'snapshot',
+            'flights': len(a._trajectory_cache),
+            'points': a._trajectory_cache.point_count,
+            'seconds': round(time.perf_counter() - started, 3),
+        })
+        logger.info(f"Live mode: bootstrap done, {len(self._mits)} MITs tracked, "
+                    f"{len(a._trajectory_cache)} flights")
+        self.emit(delta)
+
+    def run_cycle(self):
+        """Pull new trajectory rows and emit the resulting delta"""
+        a = self.analyzer
+        started = time.perf_counter()
+        self.cycle += 1
+        _, window_end = a._get_trajectory_window()
+
+        # Flights that entered the featured set since the last cycle get their
+        # full history; known flights only rows past the watermarks
+        known = {f['callsign'] for f in a.flight_data.values()}
+        a.flight_data = a._get_all_featured_flights()
+        tracked = {f['callsign'] for f in a.flight_data.values()}
+        new_flights = sorted(tracked - known)
+        dropped = sorted(cs for cs in a._trajectory_cache if cs not in tracked)
+
+        # Both queries stream (one after the other) straight into the merge
+        loader = TrajectoryLoader(a.adl, a.adl_conn)
+        queries = []
+        if known & tracked:
+            since = {src: wm - timedelta(seconds=WATERMARK_OVERLAP_SEC)
+                     for src, wm in self.watermarks.items()}
+            queries.append(self._query_new_rows(loader, sorted(known & tracked), since, window_end))
+        if new_flights:
+            window_start, _ = a._get_trajectory_window()
+            queries.append(self._query_new_rows(
+                loader, new_flights, dict.fromkeys(SOURCES, window_start), window_end))
+
+        affected, rows = self._merge_rows(chain.from_iterable(queries), dropped)
+        delta = self._update_mits(affected, dropped)
+        delta.update({
+            'type': 'delta',
+            'new_rows': rows,
+            'new_flights': len(new_flights),
+            'dropped_flights': len(dropped),
+            'flights_updated': len(affected),
+            'seconds': round(time.perf_counter() - started, 3),
+        })
+        logger.info(f"Live cycle {self.cycle}: {rows} rows, {len(affected)} flights updated, "
+                    f"{len(delta['mit'])} MITs changed ({delta['seconds']:.1f}s)")
+        self.emit(delta)
+
+    # --- ADL ---
+
+    def _query_watermarks(self) -> Dict[str, datetime]:
+        a = self.analyzer
+        window_start, window_end = a._get_trajectory_window()
+        window = (_fmt(window_start), _fmt(window_end))
+        cursor = a.adl_conn.cursor()
+        cursor.execute(a.adl.format_query(WATERMARK_SQL), window * 2)
+        watermarks = {src: normalize_datetime(ts) if ts else window_start
+                      for src, ts in cursor.fetchall()}
+        cursor.close()
+        return {src: watermarks.get(src, window_start) for src in SOURCES}
+
+    def _query_new_rows(self, loader: TrajectoryLoader, callsigns: List[str],
+                        since: Dict[str, datetime], until: datetime) -> Iterator[tuple]:
+        """Stream rows of the given flights newer than since (per source)"""
+        return loader.rows(NEW_ROWS_SQL, (
+            _fmt(since['TMI']), _fmt(until), _fmt(since['LIVE']), _fmt(until)
+        ), callsigns, source_index=10)
+
+    def _merge_rows(self, rows: Iterable[tuple], dropped: List[str] = ()) -> Tuple[List[str], int]:
+        """
+        Drop flights that left the featured set, then merge new rows into the
+        trajectory store.
+
+        Returns the callsigns whose trajectory grew and the number of rows read.
+        """
+        a = self.analyzer
+        if dropped:
+            gone = set(dropped)
+            a._trajectory_cache = a._trajectory_cache.subset(
+                [cs for cs in a._trajectory_cache if cs not in gone])
+            a._crossing_engine = None
+            for cs in gone:
+                a._trajectory_metadata.pop(cs, None)
+            a._low_quality_flights -= gone
+        updates = defaultdict(list)
+        count = 0
+        for cs, fuid, ts, lat, lon, gs, alt, dept, dest, tmi_tier, source_table in rows:
+            count += 1
+            ts = normalize_datetime(ts)
+            if ts > self.watermarks[source_table]:
+                self.watermarks[source_table] = ts
+            if cs not in a._trajectory_metadata:
+                a._trajectory_metadata[cs] = {
+                    'flight_uid': fuid,
+                    'dept': dept or 'UNK',
+                    'dest': dest or 'UNK',
+                    'tmi_tier': tmi_tier,
+                    'source': source_table
+                }
+            updates[cs].append((ts, float(lat), float(lon),
+                                float(gs) if gs else 0, float(alt) if alt else 0))
+        if not updates:
+            return [], count
+
+        old = a._trajectory_cache
+        before = {cs: len(old[cs]) if cs in old else 0 for cs in updates}
+        a._trajectory_cache = old.merged(updates)
+        a._crossing_engine = None
+        return [cs for cs in updates if len(a._trajectory_cache[cs]) != before[cs]], count
+
+    # --- Crossings and pairs ---
+
+    def _update_mits(self, callsigns: List[str], dropped: List[str] = ()) -> dict:
+        """Re-detect crossings of the given flights, drop those of dropped flights, re-pair changed MITs"""
+        a = self.analyzer
+        delta = {
+            'cycle': self.cycle,
+            'generated_utc': datetime.utcnow().isoformat(),
+            'watermarks': {src: wm.isoformat() for src, wm in self.watermarks.items()},
+            'mit': {},
+        }
+        if not (callsigns or dropped) or not self._mits:
+            return delta
+
+        # One engine over only the affected flights serves every fix this cycle
+        # (segment indices are per flight, so they match the full store)
+        if HAS_NUMPY and callsigns:
+            a._crossing_engine = FixCrossingEngine(a._trajectory_cache.subset(callsigns))
+        try:
+            affected = set(callsigns)
+            gone = set(dropped)
+            for mit in self._mits:
+                scope = {f['callsign'] for f in a._filter_flights_by_scope(mit.tmi).values()}
+                candidates = [cs for cs in callsigns if cs in scope]
+                if not candidates and not gone.intersection(mit.crossings):
+                    continue
+                found = {c.callsign: c for c in a._detect_crossings(
+                    mit.tmi.fix, mit.fix_lat, mit.fix_lon, candidates, mit.tmi)} if candidates else {}
+
+                crossings = {cs: c for cs, c in mit.crossings.items()
+                             if cs not in gone and (cs not in affected or cs in found)}
+                crossings.update(found)
+                crossing_json = {cs: crossing_to_dict(c) for cs, c in crossings.items()}
+                crossing_delta = _diff(mit.crossing_json, crossing_json)
+                if not any(crossing_delta.values()):
+                    continue
+
+                mit.crossings, mit.crossing_json = crossings, crossing_json
+                pairs = self._pair(mit)
+                delta['mit'][mit.key] = {
+                    'fix': mit.tmi.fix,
+                    'required': mit.tmi.value,
+                    'unit': mit.tmi.unit,
+                    'crossings': crossing_delta,
+                    'pairs': _diff(mit.pairs, pairs),
+                    'summary': self._summary(mit, pairs),
+                }
+                mit.pairs = pairs
+        finally:
+            a._crossing_engine = None
+        return delta
+
+    def _pair(self, mit: _LiveMIT) -> Dict[tuple, dict]:
+        """Spacing pairs of the current crossings, keyed by (prev, curr) callsign"""
+        a = self.analyzer
+        tmi = mit.tmi
+        in_window = sorted((c for c in mit.crossings.values() if tmi.is_active_at(c.crossing_time)),
+                           key=lambda c: c.crossing_time)
+        valid = a._filter_measurable_crossings(tmi, tmi.fix, in_window)
+
+        if tmi.modifier in (MITModifier.AS_ONE, MITModifier.SINGLE_STREAM):
+            stream_groups = {0: valid}
+        elif tmi.modifier == MITModifier.PER_AIRPORT:
+            stream_groups = defaultdict(list)
+            for c in valid:
+                stream_groups[c.dept or 'UNK'].append(c)
+        else:
+            stream_groups = cluster_crossings_by_bearing(valid, gap_threshold_deg=30.0)
+
+        spacing = a._build_spacing_pairs(
+            tmi, [(sid, sc) for sid, sc in stream_groups.items() if sid != -1], False)
+        return {(pair['prev_callsign'], pair['curr_callsign']): pair for pair in spacing.pairs}
+
+    @staticmethod
+    def _summary(mit: _LiveMIT, pairs: Dict[tuple, dict]) -> dict:
+        violations = sum(1 for p in pairs.values()
+                         if p['spacing_category'] == SpacingCategory.UNDER.value)
+        return {
+            'crossings': len(mit.crossings),
+            'pairs': len(pairs),
+            'compliant': len(pairs) - violations,
+            'violations': violations,
+            'compliance_pct': round(100 * (len(pairs) - violations) / len(pairs), 1) if pairs else None,
+        }
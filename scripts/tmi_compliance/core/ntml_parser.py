@@ -22,6 +22,15 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Per-line patterns, compiled once
+_DISCORD_USER_LINE = re.compile(r'^[A-Za-z\s]+\s*\|\s*\w+.*\s*—\s*\d{1,2}:\d{2}')
+_DISCORD_USER_LINE_TODAY = re.compile(
+    r'^[A-Za-z\s]+\s*\|\s*\w+.*\s*—\s*Today at\s*\d{1,2}:\d{2}', re.IGNORECASE)
+_NTML_TIMESTAMP_PREFIX = re.compile(r'^\d{2}/\d{4}\s+')
+_NTML_GS_WORD = re.compile(r'\bGS\b')
+_NTML_REROUTE_WORDS = re.compile(r'\bRE-?ROUTE\b|\bROUTE\s+RQD\b|\bFEA\s+FYI\b')
+_CXLD_TIME = re.compile(r'CXLD?\s*(\d{4})Z?', re.IGNORECASE)
+
 
 @dataclass
 class ParseResult:
@@ -75,9 +84,9 @@ def clean_discord_text(text: str) -> str:
         # - "Daniel G | ZBW I1 — 05:24"
         # - "Cameron P | ZBW EC — 08:49"
         # - "Michael B | VATUSA5 — 11:00"
-        if re.match(r'^[A-Za-z\s]+\s*\|\s*\w+.*\s*—\s*\d{1,2}:\d{2}', line):
+        if _DISCORD_USER_LINE.match(line):
             continue
-        if re.match(r'^[A-Za-z\s]+\s*\|\s*\w+.*\s*—\s*Today at\s*\d{1,2}:\d{2}', line, re.IGNORECASE):
+        if _DISCORD_USER_LINE_TODAY.match(line):
             continue
 
         cleaned_lines.append(line)
@@ -85,6 +94,94 @@ def clean_discord_text(text: str) -> str:
     return '\n'.join(cleaned_lines)
 
 
+# Line classification
+# -------------------
+# Every line is classified with one compiled pattern: each line type is a
+# lookahead tried at the start of the line that sets an empty marker group
+# when the type's pattern is found (types found anywhere in the line are
+# prefixed with a lazy (?s:.*?)). A single match() evaluates all of them; the
+# line type is the first marked group in _LINE_TYPE_ORDER, which is the
+# priority order when a line matches several patterns (a cancelled MIT is a
+# cancel, a STOP line mentioning CFR is a stop, ...).
+_LINE_TYPE_PATTERNS = (
+    # ADVZY header, any org prefix (vATCSCC, CANOC, etc.) - sub-typed below
+    ('advzy_header', r'(?i:\w+\s+ADVZY\s+\d+)'),
+    # Airport configuration: "30/2328    BOS    VMC    ARR:27/32 DEP:33L    AAR:40 ADR:40"
+    ('airport_config', r'(?s:.*?)(?:\b(?:VMC|IMC)\b.*\bARR:|\bAAR:\d+\s+ADR:\d+)'),
+    # E/D (En Route Delays): "31/0127    ZBW E/D for BOS +Holding/0147/2 ACFT"
+    ('ed_delay', r'(?s:.*?)(?i:\bE/D\b)'),
+    # A/D (Arrival Delays): Similar format to E/D
+    ('ad_delay', r'(?s:.*?)(?i:\bA/D\b)'),
+    # D/D (Departure Delays): "31/0153    D/D from BOS +35/0153"
+    ('dd_delay', r'(?s:.*?)(?i:\bD/D\b)'),
+    # CANCEL / CNCL anywhere: "31/0326    BOS via RBV CANCEL RESTR ZNY:ZDC"
+    ('cancel', r'(?s:.*?)(?i:\bCANCEL\b|\bCNCL\b)'),
+    # STOP restriction: "30/2327    BOS via HNK STOP VOLUME:VOLUME 2330-0400 ZBW:ZNY"
+    ('stop', r'(?s:.*?)(?i:\bvia\s+\S+\s+STOP\b)'),
+    # CFR: "JFK via ALL CFR VOLUME:VOLUME 0000-0400 ZDC:PCT" (CFR and via, any order)
+    ('cfr', r'(?=(?s:.*?)(?i:\bCFR\b))(?s:.*?)(?i:\bvia\b)'),
+    # MIT restriction: "30/2100    LGA via BEUTY 25 MIT VOLUME:VOLUME 2330-0400 N90:ZNY"
+    ('mit', r'(?s:.*?)(?i:\b\d+\s*MIT\b)'),
+    # MINIT restriction
+    ('minit', r'(?s:.*?)(?i:\b\d+\s*MINIT\b)'),
+    # TMI ID line: "TMI ID: RRDCC001"
+    ('tmi_id', r'(?i:TMI\s+ID:)'),
+    # Time range line: "302230 - 310300" or "26/01/30 20:24"
+    ('timestamp', r'(?:\d{6}\s*-\s*\d{6}$|\d{2}/\d{2}/\d{2}\s+\d{2}:\d{2})'),
+    # (ADVZY field lines are checked here, see _ADVZY_FIELDS)
+    # Route table header: "ORIG       DEST    ROUTE" or "----       ----    -----"
+    ('route_header', r'(?:(?i:ORIG\s+DEST\s+ROUTE)|-+\s+-+\s+-+)'),
+    # Route table entry: "ORF        BOS     >HPW BBOBO Q22 RBV Q419 JFK< ROBUC3"
+    ('route_entry', r'(?s:.*?)>\S+.*<'),
+)
+
+_LINE_TYPE_ORDER = tuple(name for name, _ in _LINE_TYPE_PATTERNS)
+
+_LINE_CLASSIFIER = re.compile(''.join(
+    f'(?=(?:{pattern})(?P<{name}>)|)' for name, pattern in _LINE_TYPE_PATTERNS
+))
+
+# The markers are the only groups (type patterns use (?:...)), so
+# match.groups() lists them in _LINE_TYPE_ORDER: '' for a found type, None otherwise
+
+# ADVZY field lines: "NAME:", "CONSTRAINED AREA:", "REASON:", etc.
+_ADVZY_FIELDS = ('NAME:', 'CONSTRAINED AREA:', 'REASON:', 'INCLUDE TRAFFIC:',
+                 'FACILITIES INCLUDED:', 'FLIGHT STATUS:', 'VALID:',
+                 'PROBABILITY OF EXTENSION:', 'REMARKS:', 'ASSOCIATED RESTRICTIONS:',
+                 'MODIFICATIONS:', 'ROUTES:', 'EVENT TIME:', 'CTL ELEMENT:',
+                 'ELEMENT TYPE:', 'ADL TIME:', 'GROUND STOP PERIOD:',
+                 'DEP FACILITIES INCLUDED:', 'IMPACTING CONDITION:', 'COMMENTS:',
+                 'NEW TOTAL, MAXIMUM, AVERAGE DELAYS:')
+
+# Line types that rank below the ADVZY field check
+_AFTER_ADVZY_FIELDS = frozenset(('route_header', 'route_entry', 'unknown'))
+
+# Reroute types: ROUTE RQD, ROUTE RMD, FEA FYI, FCA RQD, ICR RQD, etc.
+_ADVZY_REROUTE_TYPE = re.compile(r'\b(ROUTE|FEA|FCA|ICR)\s+(RQD|RMD|PLN|FYI)\b')
+
+
+def _classify_advzy_header(line: str) -> Tuple[str, Optional[dict]]:
+    upper = line.upper()
+    if 'CDM GS CNX' in upper or 'GS CNX' in upper:
+        return ("advzy_gs_cnx", {"line": line})
+    if 'REROUTE CANCELLATION' in upper:
+        return ("advzy_reroute_cnx", {"line": line})
+    if 'GROUND STOP' in upper or 'CDM GROUND STOP' in upper:
+        return ("advzy_gs", {"line": line})
+    if _ADVZY_REROUTE_TYPE.search(upper):
+        return ("advzy_reroute", {"line": line})
+    return ("advzy_header", {"line": line})
+
+
+def _classify_advzy_field(line: str) -> Optional[Tuple[str, Optional[dict]]]:
+    upper = line.upper()
+    if upper.startswith(_ADVZY_FIELDS):
+        for field_name in _ADVZY_FIELDS:
+            if upper.startswith(field_name):
+                return ("advzy_field", {"field": field_name, "line": line})
+    return None
+
+
 def classify_line(line: str) -> Tuple[str, Optional[dict]]:
     """
     Classify a line as a specific type and extract key info.
@@ -113,93 +210,42 @@ def classify_line(line: str) -> Tuple[str, Optional[dict]]:
     if not line:
         return ("empty", None)
 
-    # ADVZY header detection - type-specific
-    # Support any org prefix (vATCSCC, CANOC, etc.)
-    if re.match(r'^\w+\s+ADVZY\s+\d+', line, re.IGNORECASE):
-        upper = line.upper()
-        if 'CDM GS CNX' in upper or 'GS CNX' in upper:
-            return ("advzy_gs_cnx", {"line": line})
-        if 'REROUTE CANCELLATION' in upper:
-            return ("advzy_reroute_cnx", {"line": line})
-        if 'GROUND STOP' in upper or 'CDM GROUND STOP' in upper:
-            return ("advzy_gs", {"line": line})
-        # Reroute types: ROUTE RQD, ROUTE RMD, FEA FYI, FCA RQD, ICR RQD, etc.
-        if re.search(r'\b(ROUTE|FEA|FCA|ICR)\s+(RQD|RMD|PLN|FYI)\b', upper):
-            return ("advzy_reroute", {"line": line})
-        return ("advzy_header", {"line": line})
-
-    # Airport configuration: "30/2328    BOS    VMC    ARR:27/32 DEP:33L    AAR:40 ADR:40"
-    if re.search(r'\b(VMC|IMC)\b.*\bARR:', line) or re.search(r'\bAAR:\d+\s+ADR:\d+', line):
-        return ("airport_config", {"line": line})
-
-    # E/D (En Route Delays): "31/0127    ZBW E/D for BOS +Holding/0147/2 ACFT"
-    # Can have +Holding (start holding), -Holding (stop holding), or delay amounts
-    if re.search(r'\bE/D\b', line, re.IGNORECASE):
-        return ("ed_delay", {"line": line})
-
-    # A/D (Arrival Delays): Similar format to E/D
-    if re.search(r'\bA/D\b', line, re.IGNORECASE):
-        return ("ad_delay", {"line": line})
-
-    # D/D (Departure Delays): "31/0153    D/D from BOS +35/0153"
-    # Typically ground delays, measured in 15-min increments
-    if re.search(r'\bD/D\b', line, re.IGNORECASE):
-        return ("dd_delay", {"line": line})
-
-    # CANCEL patterns - be flexible with variations:
-    # - "31/0326    BOS via RBV CANCEL RESTR ZNY:ZDC"
-    # - "BOS via ALL CANCEL RESTR ZBW:ZNY,ZOB"
-    # - "CANCEL RESTR" anywhere in line
-    # - "CNCL" abbreviation
-    # - Just "CANCEL" followed by facility info
-    if re.search(r'\bCANCEL\b', line, re.IGNORECASE) or re.search(r'\bCNCL\b', line, re.IGNORECASE):
-        return ("cancel", {"line": line})
-
-    # STOP restriction: "BOS via Q133 STOP" or "30/2327    BOS via HNK STOP VOLUME:VOLUME 2330-0400 ZBW:ZNY"
-    if re.search(r'\bvia\s+\S+\s+STOP\b', line, re.IGNORECASE):
-        return ("stop", {"line": line})
-
-    # CFR: "JFK via ALL CFR VOLUME:VOLUME 0000-0400 ZDC:PCT"
-    if re.search(r'\bCFR\b', line, re.IGNORECASE) and re.search(r'\bvia\b', line, re.IGNORECASE):
-        return ("cfr", {"line": line})
-
-    # MIT restriction: "30/2100    LGA via BEUTY 25 MIT VOLUME:VOLUME 2330-0400 N90:ZNY"
-    if re.search(r'\b\d+\s*MIT\b', line, re.IGNORECASE):
-        return ("mit", {"line": line})
-
-    # MINIT restriction
-    if re.search(r'\b\d+\s*MINIT\b', line, re.IGNORECASE):
-        return ("minit", {"line": line})
+    found = _LINE_CLASSIFIER.match(line).groups()
+    line_type = _LINE_TYPE_ORDER[found.index('')] if '' in found else 'unknown'
 
-    # TMI ID line: "TMI ID: RRDCC001"
-    if re.match(r'^TMI\s+ID:', line, re.IGNORECASE):
-        return ("tmi_id", {"line": line})
+    if line_type in _AFTER_ADVZY_FIELDS:
+        advzy_field = _classify_advzy_field(line)
+        if advzy_field:
+            return advzy_field
 
-    # Time range line: "302230 - 310300" or "26/01/30 20:24"
-    if re.match(r'^\d{6}\s*-\s*\d{6}$', line) or re.match(r'^\d{2}/\d{2}/\d{2}\s+\d{2}:\d{2}', line):
-        return ("timestamp", {"line": line})
-
-    # ADVZY field lines: "NAME:", "CONSTRAINED AREA:", "REASON:", etc.
-    advzy_fields = ['NAME:', 'CONSTRAINED AREA:', 'REASON:', 'INCLUDE TRAFFIC:',
-                    'FACILITIES INCLUDED:', 'FLIGHT STATUS:', 'VALID:',
-                    'PROBABILITY OF EXTENSION:', 'REMARKS:', 'ASSOCIATED RESTRICTIONS:',
-                    'MODIFICATIONS:', 'ROUTES:', 'EVENT TIME:', 'CTL ELEMENT:',
-                    'ELEMENT TYPE:', 'ADL TIME:', 'GROUND STOP PERIOD:',
-                    'DEP FACILITIES INCLUDED:', 'IMPACTING CONDITION:', 'COMMENTS:',
-                    'NEW TOTAL, MAXIMUM, AVERAGE DELAYS:']
-    for field in advzy_fields:
-        if line.upper().startswith(field):
-            return ("advzy_field", {"field": field, "line": line})
+    if line_type == 'advzy_header':
+        # Sub-typed by the header text (GS, GS CNX, reroute, ...)
+        return _classify_advzy_header(line)
+    return (line_type, {"line": line})
 
-    # Route table header: "ORIG       DEST    ROUTE" or "----       ----    -----"
-    if re.match(r'^ORIG\s+DEST\s+ROUTE', line, re.IGNORECASE) or re.match(r'^-+\s+-+\s+-+', line):
-        return ("route_header", {"line": line})
 
-    # Route table entry: "ORF        BOS     >HPW BBOBO Q22 RBV Q419 JFK< ROBUC3"
-    if re.search(r'>\S+.*<', line):  # Contains route markers >...<
-        return ("route_entry", {"line": line})
+def _parse_hhmm(time_str: str, base_date, event_start: datetime,
+                exact: bool = False) -> Optional[datetime]:
+    """
+    Parse an HHMM or HH:MMZ time on base_date.
 
-    return ("unknown", {"line": line})
+    Times more than 2 hours before event_start are taken as the next day.
+    exact: the time must be exactly 4 digits (NTML lines); ADVZY fields only
+    need to start with them.
+    """
+    if not time_str:
+        return None
+    time_str = time_str.replace(':', '').replace('Z', '').strip()
+    if len(time_str) < 4 or (exact and len(time_str) != 4):
+        return None
+    try:
+        result = datetime(base_date.year, base_date.month, base_date.day,
+                          int(time_str[:2]), int(time_str[2:4]))
+    except ValueError:
+        return None
+    if result < event_start - timedelta(hours=2):
+        result = result + timedelta(days=1)
+    return result
 
 
 def parse_advzy_ground_stop(lines: List[str], start_idx: int, event_start: datetime, event_end: datetime,
@@ -263,23 +309,6 @@ def parse_advzy_ground_stop(lines: List[str], start_idx: int, event_start: datet
 
     event_date = event_start.date()
 
-    def parse_time(time_str: str) -> Optional[datetime]:
-        """Parse HHMM or HH:MMZ format time"""
-        if not time_str:
-            return None
-        time_str = time_str.replace(':', '').replace('Z', '').strip()
-        if len(time_str) >= 4:
-            try:
-                hour = int(time_str[:2])
-                minute = int(time_str[2:4])
-                result = datetime(event_date.year, event_date.month, event_date.day, hour, minute)
-                if result < event_start - timedelta(hours=2):
-                    result = result + timedelta(days=1)
-                return result
-            except ValueError:
-                return None
-        return None
-
     def parse_delay_triple(text: str) -> Optional[tuple]:
         """Parse 'X, Y, Z' delay format into (total, max, avg) tuple"""
         m = re.search(r'(\d+)\s*,\s*(\d+)\s*,\s*(\d+)', text)
@@ -329,7 +358,7 @@ def parse_advzy_ground_stop(lines: List[str], start_idx: int, event_start: datet
         # ADL TIME: 0244Z (issued time)
         adl_match = re.match(r'^ADL\s+TIME:\s*(\d{4})Z?', line, re.IGNORECASE)
         if adl_match:
-            issued_time = parse_time(adl_match.group(1))
+            issued_time = _parse_hhmm(adl_match.group(1), event_date, event_start)
             continue
 
         # GROUND STOP PERIOD: 18/0230Z - 18/0315Z
@@ -337,16 +366,16 @@ def parse_advzy_ground_stop(lines: List[str], start_idx: int, event_start: datet
         gs_period_match = re.search(r'GROUND\s+STOP\s+PERIOD:\s*\d{2}/(\d{4})Z?\s*[-\u2013\u2014]\s*\d{2}/(\d{4})Z?',
                                     line, re.IGNORECASE)
         if gs_period_match:
-            gs_start = parse_time(gs_period_match.group(1))
-            gs_end = parse_time(gs_period_match.group(2))
+            gs_start = _parse_hhmm(gs_period_match.group(1), event_date, event_start)
+            gs_end = _parse_hhmm(gs_period_match.group(2), event_date, event_start)
             continue
 
         # CUMULATIVE PROGRAM PERIOD: 18/0230Z - 18/0315Z
         cum_match = re.search(r'CUMULATIVE\s+PROGRAM\s+PERIOD:\s*\d{2}/(\d{4})Z?\s*[-\u2013\u2014]\s*\d{2}/(\d{4})Z?',
                               line, re.IGNORECASE)
         if cum_match:
-            cumulative_start = parse_time(cum_match.group(1))
-            cumulative_end = parse_time(cum_match.group(2))
+            cumulative_start = _parse_hhmm(cum_match.group(1), event_date, event_start)
+            cumulative_end = _parse_hhmm(cum_match.group(2), event_date, event_start)
             continue
 
         # DEP FACILITIES INCLUDED: (1stTier) ZAB, ZKC, ZMP
@@ -491,23 +520,6 @@ def parse_advzy_gs_cnx(lines: List[str], start_idx: int, event_start: datetime,
 
     event_date = event_start.date()
 
-    def parse_time(time_str: str) -> Optional[datetime]:
-        """Parse HHMM or HH:MMZ format time"""
-        if not time_str:
-            return None
-        time_str = time_str.replace(':', '').replace('Z', '').strip()
-        if len(time_str) >= 4:
-            try:
-                hour = int(time_str[:2])
-                minute = int(time_str[2:4])
-                result = datetime(event_date.year, event_date.month, event_date.day, hour, minute)
-                if result < event_start - timedelta(hours=2):
-                    result = result + timedelta(days=1)
-                return result
-            except ValueError:
-                return None
-        return None
-
     for i in range(start_idx + 1, min(start_idx + 15, len(lines))):
         line = lines[i].strip()
         if not line:
@@ -545,15 +557,15 @@ def parse_advzy_gs_cnx(lines: List[str], start_idx: int, event_start: datetime,
         # ADL TIME: 0310Z
         adl_match = re.match(r'^ADL\s+TIME:\s*(\d{4})Z?', line, re.IGNORECASE)
         if adl_match:
-            issued_time = parse_time(adl_match.group(1))
+            issued_time = _parse_hhmm(adl_match.group(1), event_date, event_start)
             continue
 
         # GS CNX PERIOD: 07/0310 - 07/0330
         cnx_period_match = re.search(r'GS\s+CNX\s+PERIOD:\s*\d{2}/(\d{4})Z?\s*[-\u2013\u2014]\s*\d{2}/(\d{4})Z?',
                                      line, re.IGNORECASE)
         if cnx_period_match:
-            cnx_start = parse_time(cnx_period_match.group(1))
-            cnx_end = parse_time(cnx_period_match.group(2))
+            cnx_start = _parse_hhmm(cnx_period_match.group(1), event_date, event_start)
+            cnx_end = _parse_hhmm(cnx_period_match.group(2), event_date, event_start)
             continue
 
         # COMMENTS:
@@ -806,23 +818,6 @@ def parse_advzy_reroute(lines: List[str], start_idx: int, event_start: datetime,
 
     event_date = event_start.date()
 
-    def parse_time(time_str: str) -> Optional[datetime]:
-        """Parse HHMM or HH:MMZ format time"""
-        if not time_str:
-            return None
-        time_str = time_str.replace(':', '').replace('Z', '').strip()
-        if len(time_str) >= 4:
-            try:
-                hour = int(time_str[:2])
-                minute = int(time_str[2:4])
-                result = datetime(event_date.year, event_date.month, event_date.day, hour, minute)
-                if result < event_start - timedelta(hours=2):
-                    result = result + timedelta(days=1)
-                return result
-            except ValueError:
-                return None
-        return None
-
     for i in range(start_idx + 1, min(start_idx + 50, len(lines))):  # Reroutes can be long
         line = lines[i].strip()
         if not line:
@@ -949,8 +944,8 @@ def parse_advzy_reroute(lines: List[str], start_idx: int, event_start: datetime,
             # Extract time range HHMM-HHMM
             vtime_match = re.search(r'(\d{4})\s*[-\u2013\u2014]\s*(\d{4})', valid_text)
             if vtime_match:
-                valid_start = parse_time(vtime_match.group(1))
-                valid_end = parse_time(vtime_match.group(2))
+                valid_start = _parse_hhmm(vtime_match.group(1), event_date, event_start)
+                valid_end = _parse_hhmm(vtime_match.group(2), event_date, event_start)
             continue
 
         # TMI ID: RRDCC506
@@ -1298,6 +1293,431 @@ def build_reroute_programs(reroute_tmis: List[TMI], reroute_advisories: List[Rer
     return programs
 
 
+# NTML line fields
+# ----------------
+# Field parsers shared by the MIT/MINIT/STOP/CFR branches of
+# parse_ntml_to_tmis() and the delay/config/cancel branches of
+# parse_ntml_full(); their patterns are compiled once here.
+_NTML_TIME_RANGE = re.compile(r'(\d{4})Z?\s*-\s*(\d{4})Z?')
+_NTML_TIMESTAMP = re.compile(r'^(\d{2})/(\d{4})\s+')
+_FACILITY_MULTIPLE = re.compile(r'\(MULTIPLE\)\s*$', re.IGNORECASE)
+# Trailing TMI ID: "$ DDCDDL" (2 digits + [ABCDEXO] + 2 digits + optional letter)
+_FACILITY_TMI_ID = re.compile(r'\s*\$\s*\d{2}[ABCDEXO]\d{2}[A-Za-z]?\s*$')
+_FACILITY_PAIR = re.compile(r'([A-Z][A-Z0-9,]+):([A-Z][A-Z0-9,]+)')
+# Codes that look like an ATC facility (matched against the whole upper-cased code)
+_FACILITY_CODE = re.compile(r'''
+      Z[A-Z]{2}\d*        # ARTCC (ZNY) or sector (ZNY66)
+    | CZ[A-Z]{2}          # Canadian FIR (CZYZ)
+    | [A-Z]\d{2}[A-Z]?    # TRACON (N90, A80, U90A)
+    | [A-Z]{3}            # 3-letter TRACON/airport (PCT, JFK)
+    | [KCP][A-Z]{3}       # 4-letter airport (KJFK, CYYZ)
+    | [A-Z]{2}            # 2-letter codes could be navaids
+''', re.VERBOSE)
+
+# MIT modifiers, in priority order (the first found wins)
+_MIT_MODIFIERS = tuple((re.compile(pattern, re.IGNORECASE), modifier) for pattern, modifier in (
+    (r'\bAS\s+ONE\b', MITModifier.AS_ONE),
+    (r'\bSINGLE\s+STREAM\b', MITModifier.SINGLE_STREAM),
+    # PER variants (all equivalent for analysis purposes)
+    (r'\bPER\s+STREAM\b', MITModifier.PER_STREAM),
+    (r'\bPER\s+FIX\b', MITModifier.PER_FIX),
+    (r'\bPER\s+ROUTE\b', MITModifier.PER_ROUTE),
+    (r'\bPER\s+STRAT\b', MITModifier.PER_STREAM),  # Per stratum
+    (r'\bPER\s+AIRPORT\b', MITModifier.PER_AIRPORT),
+    (r'\bEACH\b', MITModifier.EACH),
+    # Special modifiers
+    (r'\bNO\s+STACKS?\b', MITModifier.NO_STACKS),
+    (r'\bEVERY\s+OTHER\b', MITModifier.EVERY_OTHER),
+    (r'\bRALT\b', MITModifier.RALT),
+))
+
+_FILTER_TYPE = re.compile(r'\bTYPE:\s*(ALL|JET|PROP|TURBOPROP)\b', re.IGNORECASE)
+# SPD:[op]<value>[KT|KTS]; operators <=, ≤, <, =, >, ≥, >=, S (S = <=)
+_FILTER_SPD = re.compile(r'\bSPD:\s*(<=|≤|<|=|>=|≥|>|S)?(\d+)(?:KTS?)?', re.IGNORECASE)
+_FILTER_ALT = re.compile(r'\bALT:\s*(AT|AOB|AOA|LOA)(\d+)\b', re.IGNORECASE)
+_FILTER_EXCL = re.compile(r'\bEXCL:\s*([A-Z0-9,]+)\b', re.IGNORECASE)
+
+# Traffic direction keywords, in priority order (LTFC/DTFC: landing/departing traffic)
+_TRAFFIC_DIRECTIONS = (
+    (re.compile(r'\b(arrivals?|arvls?|arrs?)\b', re.IGNORECASE), TrafficDirection.ARRIVALS),
+    (re.compile(r'\b(departures?|deps?|depts?)\b', re.IGNORECASE), TrafficDirection.DEPARTURES),
+    (re.compile(r'\bLTFC\b', re.IGNORECASE), TrafficDirection.ARRIVALS),
+    (re.compile(r'\bDTFC\b', re.IGNORECASE), TrafficDirection.DEPARTURES),
+)
+
+_THRU_CLAUSE = re.compile(r'\b(?:thru|through)\s+([A-Z0-9_]+)\b', re.IGNORECASE)
+_SCOPE_OVERFLIGHTS = re.compile(r'\boverflights?\b', re.IGNORECASE)
+_SCOPE_OD_PAIR = re.compile(r'\b[A-Z]{3,4}\s+to\s+[A-Z]{3,4}\b', re.IGNORECASE)
+_SCOPE_VIA_ALL = re.compile(r'\bvia\s+ALL\b', re.IGNORECASE)
+
+# Restriction lines (after the DD/HHMM prefix is removed)
+_CXLD_SUFFIX = re.compile(r'CXLD?\s*\d{4}Z?', re.IGNORECASE)
+_STOP_LINE = re.compile(r'(\w+)\s+via\s+(\S+)\s+STOP\b', re.IGNORECASE)
+# "JFK arrivals via CAMRN 20MIT" or "EWR,LGA departures via BIGGY 15MIT"
+_MIT_LINE = re.compile(
+    r'([A-Z0-9,\s]+?)(?:\s+(arrivals?|departures?|arvls?|deps?|depts?))?\s+via\s+(\S+)\s+(\d+)\s*MIT\b',
+    re.IGNORECASE)
+_MINIT_LINE = re.compile(
+    r'([A-Z0-9,\s]+?)(?:\s+(arrivals?|departures?|arvls?|deps?|depts?))?\s+via\s+(\S+)\s+(\d+)\s*MINIT\b',
+    re.IGNORECASE)
+# "JFK, LGA, BOS via CLT Departures CFR"
+_CFR_LINE = re.compile(r'([A-Z0-9,\s]+)\s+via\s+(.+?)\s+CFR\b', re.IGNORECASE)
+_CFR_DEPARTURES = re.compile(r'([A-Z]{3,4})\s+DEPARTURES', re.IGNORECASE)
+# Old-style "DEST via FIX 20MIT REQ:PROV 2359Z-0400Z" and "DEST via FIX CFR 2359-0400 REQ:PROV"
+_OLD_MIT_LINE = re.compile(r'(\w+)\s+via\s+(\w+)\s+(\d+)\s*(MIT|MINIT)\s*(?:AS\s+ONE\s+)?', re.IGNORECASE)
+_OLD_APREQ_LINE = re.compile(r'(\w+)\s+via\s+(\w+)\s+(APREQ|CFR)\s*(\d{4})Z?\s*-\s*(\d{4})Z?', re.IGNORECASE)
+
+# Delay, airport config and cancel lines
+_ED_LINE = re.compile(r'(\w+)\s+E/D\s+for\s+(\w+)', re.IGNORECASE)
+_AD_LINE = re.compile(r'(\w+)\s+A/D\s+for\s+(\w+)', re.IGNORECASE)
+_DD_LINE = re.compile(r'D/D\s+from\s+(\w+)', re.IGNORECASE)
+_DELAY_HOLDING = re.compile(r'\+Holding\b', re.IGNORECASE)
+_DELAY_NOT_HOLDING = re.compile(r'-Holding\b', re.IGNORECASE)
+_DELAY_HOLDING_FIX = re.compile(r'FIX/NAVAID:(\w+)', re.IGNORECASE)
+_DELAY_AIRCRAFT = re.compile(r'(\d+)\s*ACFT', re.IGNORECASE)
+_DELAY_VALUE_START = re.compile(r'\+(\w+)/(\d{4})')       # +Holding/0147 or +30/0147
+_DELAY_MINUTES_START = re.compile(r'\+(\d+)/(\d{4})')     # +35/0153
+_DELAY_MINUTES = re.compile(r'\+(\d+)\b')
+_CONFIG_AIRPORT = re.compile(r'^\d{2}/\d{4}\s+(\w{3})\s+')
+_CONFIG_AIRPORT_BARE = re.compile(r'^(\w{3})\s+')
+_CONFIG_ARR = re.compile(r'ARR:([^\s]+)', re.IGNORECASE)
+_CONFIG_DEP = re.compile(r'DEP:([^\s]+)', re.IGNORECASE)
+_CONFIG_AAR = re.compile(r'AAR:(\d+)', re.IGNORECASE)
+_CONFIG_ADR = re.compile(r'ADR:(\d+)', re.IGNORECASE)
+_CANCEL_VIA = re.compile(r'(\S+)\s+via\s+(\S+).*CANCEL', re.IGNORECASE)
+_CANCEL_MULTIPLE = re.compile(r'\(MULTIPLE\)\s*$')
+_CANCEL_FACILITIES = re.compile(r'([A-Z0-9,]+):([A-Z0-9,]+)\s*$')
+
+
+def _parse_ntml_time_range(text: str, base_date,
+                           event_start: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Parse time range from NTML format.
+    Handles: "2330-0400", "0000-0400", "2359Z-0400Z"
+    """
+    match = _NTML_TIME_RANGE.search(text)
+    if match:
+        start = _parse_hhmm(match.group(1), base_date, event_start, exact=True)
+        end = _parse_hhmm(match.group(2), base_date, event_start, exact=True)
+        return (start, end)
+    return (None, None)
+
+
+def _parse_ntml_issued_time(line: str, base_date, event_start: datetime) -> Optional[datetime]:
+    """
+    Parse NTML timestamp prefix (DD/HHMM format).
+    Example: "30/2100" = day 30, 21:00Z
+
+    Returns datetime when this NTML entry was issued/posted.
+    Used for tracking MIT amendments (multiple entries updating same restriction).
+    """
+    match = _NTML_TIMESTAMP.match(line)
+    if match:
+        day = int(match.group(1))
+        time_str = match.group(2)
+        try:
+            hour = int(time_str[:2])
+            minute = int(time_str[2:])
+
+            # Start with base date's year and month
+            result = datetime(base_date.year, base_date.month, day, hour, minute)
+
+            # If result is way before event, it might be next month
+            if result < event_start - timedelta(days=7):
+                # Try next month
+                if base_date.month == 12:
+                    result = datetime(base_date.year + 1, 1, day, hour, minute)
+                else:
+                    result = datetime(base_date.year, base_date.month + 1, day, hour, minute)
+
+            return result
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_ntml_entry_time(line: str, base_date, event_start: datetime) -> Optional[datetime]:
+    """Parse the DD/HHMM timestamp from start of NTML line (delays, configs, cancels)"""
+    match = _NTML_TIMESTAMP.match(line)
+    if match:
+        day = int(match.group(1))
+        time_str = match.group(2)
+        try:
+            hour = int(time_str[:2])
+            minute = int(time_str[2:])
+            # Use event date's month/year, adjust day
+            result = datetime(base_date.year, base_date.month, day, hour, minute)
+            # Handle month rollover
+            if result < event_start - timedelta(days=2):
+                # Probably next month
+                if base_date.month == 12:
+                    result = result.replace(year=base_date.year + 1, month=1)
+                else:
+                    result = result.replace(month=base_date.month + 1)
+            return result
+        except ValueError:
+            return None
+    return None
+
+
+def _looks_like_facility(code: str) -> bool:
+    """
+    Check if a code looks like a valid ATC facility (see _FACILITY_CODE).
+
+    Full English words (VOLUME, STAFFING, WEATHER, etc.) never match.
+    """
+    return _FACILITY_CODE.fullmatch(code.upper()) is not None
+
+
+def _parse_facilities(text: str) -> Tuple[str, str, bool]:
+    """
+    Parse requestor:provider facility pair.
+
+    Handles various facility types and formats:
+    - ARTCC: ZNY, ZDC, ZBW (3-letter starting with Z)
+    - TRACON: N90, A90, C90, PCT, SCT (2-4 chars)
+    - Airport: KJFK, KBOS, JFK (3-4 chars)
+
+    Formats supported:
+    - Simple: "N90:ZNY", "ZDC:ZBW"
+    - Multiple facilities: "ZNY,N90:ZBW,ZDC,ZOB"
+    - With (MULTIPLE) suffix: "ZNY:ZDC(MULTIPLE)"
+    - With trailing TMI ID: "ZOA:ZSE $ 05B01E"
+
+    Returns: (requestor, provider, is_multiple)
+    """
+    # Check for and strip (MULTIPLE) suffix
+    is_multiple = False
+    clean_text = text
+    if _FACILITY_MULTIPLE.search(text):
+        is_multiple = True
+        clean_text = _FACILITY_MULTIPLE.sub('', text).strip()
+
+    # Strip trailing TMI ID codes
+    clean_text = _FACILITY_TMI_ID.sub('', clean_text).strip()
+
+    # Find ALL facility pairs in the line (pattern: FACILITY:FACILITY)
+    # We want the LAST one that looks like a real facility pair (not REASON:CONDITION)
+    all_matches = _FACILITY_PAIR.findall(clean_text)
+
+    logger.debug(f"parse_facilities: all_matches={all_matches} from text='{text[:100]}...'")
+
+    for requestor, provider in reversed(all_matches):
+        # Check if BOTH parts look like valid facility codes
+        req_parts = requestor.split(',')
+        prov_parts = provider.split(',')
+
+        # All parts must look like facilities
+        if not all(_looks_like_facility(p) for p in req_parts + prov_parts):
+            logger.debug(f"parse_facilities: skipping {requestor}:{provider} (not facility codes)")
+            continue
+
+        # This looks like a valid facility pair
+        logger.debug(f"parse_facilities: found {requestor}:{provider}")
+        return (requestor, provider, is_multiple)
+
+    logger.debug(f"parse_facilities: no valid facility pair found")
+    return ('', '', False)
+
+
+def _parse_mit_modifier(line: str) -> MITModifier:
+    """
+    Parse MIT modifier from line.
+
+    AS_ONE / SINGLE_STREAM: Provider must provide 1 stream/flow to requestor
+        by handoff point (not multiple streams/handoff points). All traffic
+        merged into single stream regardless of origin.
+    PER_STREAM / PER_FIX / PER_ROUTE / EACH: Each fix/route gets separate MIT
+        e.g., "35MIT PER STREAM" with "AUDIL/MEMMS" = separate MIT per fix
+    PER_AIRPORT: Each origin/destination airport gets its own MIT
+    NO_STACKS: Don't send over planes that overlap each other (no vertical stacking)
+    EVERY_OTHER: TMI applies to alternating flights (A, C, E but not B, D, F)
+    RALT: Regardless of altitude - MIT applies to all altitudes
+    """
+    for pattern, modifier in _MIT_MODIFIERS:
+        if pattern.search(line):
+            return modifier
+    return MITModifier.STANDARD
+
+
+def _parse_traffic_filter(line: str) -> Optional[TrafficFilter]:
+    """
+    Parse traffic filter specifications from NTML line.
+
+    Examples:
+    - TYPE:ALL - All aircraft types
+    - TYPE:JET - Jets only
+    - SPD:S210 or SPD:<=210 - Speed <= 210 knots
+    - SPD:210 or SPD:=210 - Speed AT 210 knots
+    - SPD:>210 - Speed > 210 knots
+    - ALT:AOB090 - At or below FL090
+    - EXCL:PHL - Exclude PHL traffic
+
+    SPD format: SPD:[<=, ≤, <, =, >, ≥, >=, S]<value>[KT|KTS]
+    - If no operator, means AT specified speed
+    - S prefix (e.g., S210) means <= (at or below)
+    """
+    filter_obj = TrafficFilter()
+    has_filter = False
+
+    # Parse TYPE filter (TYPE:ALL, TYPE:JET, TYPE:PROP, TYPE:TURBOPROP)
+    type_match = _FILTER_TYPE.search(line)
+    if type_match:
+        type_str = type_match.group(1).upper()
+        filter_obj.aircraft_type = AircraftType[type_str]
+        has_filter = True
+
+    # Parse SPD filter with full operator support
+    spd_match = _FILTER_SPD.search(line)
+    if spd_match:
+        op_str = spd_match.group(1) or ''
+        speed_val = int(spd_match.group(2))
+
+        # Map operator string to ComparisonOp
+        op_str_upper = op_str.upper() if op_str else ''
+        if op_str_upper in ['<=', '≤', 'S']:
+            filter_obj.speed_op = ComparisonOp.LE
+        elif op_str_upper == '<':
+            filter_obj.speed_op = ComparisonOp.LT
+        elif op_str_upper in ['>=', '≥']:
+            filter_obj.speed_op = ComparisonOp.GE
+        elif op_str_upper == '>':
+            filter_obj.speed_op = ComparisonOp.GT
+        else:
+            # No operator or '=' means AT
+            filter_obj.speed_op = ComparisonOp.AT
+
+        filter_obj.speed_value = speed_val
+        has_filter = True
+
+    # Parse ALT filter (ALT:AOB090, ALT:AOA180, ALT:AT350)
+    alt_match = _FILTER_ALT.search(line)
+    if alt_match:
+        alt_type = alt_match.group(1).upper()
+        # LOA = Level or Above = AOA
+        if alt_type == 'LOA':
+            alt_type = 'AOA'
+        filter_obj.altitude_filter = AltitudeFilter[alt_type]
+        filter_obj.altitude_value = int(alt_match.group(2))
+        has_filter = True
+
+    # Parse EXCL filter (EXCL:PHL, EXCL:EWR,LGA, EXCL:NONE)
+    excl_match = _FILTER_EXCL.search(line)
+    if excl_match:
+        excl_str = excl_match.group(1).upper()
+        if excl_str != 'NONE':
+            filter_obj.exclusions = [e.strip() for e in excl_str.split(',') if e.strip()]
+            has_filter = True
+
+    return filter_obj if has_filter else None
+
+
+def _parse_traffic_direction(line: str) -> TrafficDirection:
+    """
+    Parse traffic direction from NTML line.
+
+    Patterns:
+    - "JFK arrivals via CAMRN" -> ARRIVALS
+    - "EWR,LGA departures via BIGGY" -> DEPARTURES
+    - "JFK via CAMRN" (no direction specified) -> BOTH
+    - Variants: ARVL, ARVLS, ARR, ARRS, DEP, DEPS, DEPT, DEPTS, LTFC, DTFC
+    """
+    for pattern, direction in _TRAFFIC_DIRECTIONS:
+        if pattern.search(line):
+            return direction
+    return TrafficDirection.BOTH
+
+
+def _parse_thru_clause(line: str) -> Optional[ThruFilter]:
+    """
+    Parse thru/through clause from NTML line.
+
+    Patterns:
+    - "JFK to LAX thru ZAU 75MIT" -> ThruFilter(value='ZAU', thru_type=ThruType.ARTCC)
+    - "OAK via ALL through ZLC 20MIT" -> ThruFilter(value='ZLC', thru_type=ThruType.ARTCC)
+    - "ZNY overflights thru ZNY66 20MIT" -> ThruFilter(value='ZNY66', thru_type=ThruType.SECTOR)
+    - "...thru J60 15MIT" -> ThruFilter(value='J60', thru_type=ThruType.AIRWAY)
+
+    Returns:
+        ThruFilter if thru clause found, None otherwise
+    """
+    thru_match = _THRU_CLAUSE.search(line)
+    if thru_match:
+        thru_value = thru_match.group(1).upper()
+        return create_thru_filter(thru_value)
+    return None
+
+
+
+def _determine_scope_logic(
+    line: str,
+    has_origins: bool,
+    has_destinations: bool,
+    has_thru: bool,
+    traffic_direction: TrafficDirection
+) -> ScopeLogic:
+    """
+    Determine the appropriate ScopeLogic based on NTML patterns.
+
+    Logic:
+    - "JFK departures..." → DEPARTURES_ONLY (check origins only)
+    - "arrivals to JFK..." → ARRIVALS_ONLY (check destinations only)
+    - "JFK to LAX..." → OD_PAIR (must match BOTH origin AND destination)
+    - "JFK via ALL" → ANY_TRAFFIC (match either origin OR destination)
+    - "ZNY overflights..." → OVERFLIGHTS (transit but NOT origin/dest)
+    - "...thru ZAU" (no origin/dest) → THRU_ONLY (only check thru facility)
+
+    Args:
+        line: Original NTML line
+        has_origins: Whether origins list is populated
+        has_destinations: Whether destinations list is populated
+        has_thru: Whether thru clause was found
+        traffic_direction: Parsed traffic direction
+
+    Returns:
+        ScopeLogic enum value
+    """
+    # Check for "overflights" keyword
+    if _SCOPE_OVERFLIGHTS.search(line):
+        return ScopeLogic.OVERFLIGHTS
+
+    # Check for explicit OD pair pattern: "XXX to YYY" (not "to" as part of word)
+    # e.g., "JFK to LAX", "BOS to MIA"
+    if _SCOPE_OD_PAIR.search(line):
+        return ScopeLogic.OD_PAIR
+
+    # If only thru is specified (no origins/destinations from airport pattern)
+    if has_thru and not has_origins and not has_destinations:
+        return ScopeLogic.THRU_ONLY
+
+    # Based on explicit traffic direction
+    if traffic_direction == TrafficDirection.DEPARTURES:
+        return ScopeLogic.DEPARTURES_ONLY
+
+    if traffic_direction == TrafficDirection.ARRIVALS:
+        return ScopeLogic.ARRIVALS_ONLY
+
+    # "via ALL" patterns typically mean any traffic to/from the airport
+    # e.g., "JFK via ALL" means all JFK traffic (departures OR arrivals)
+    if _SCOPE_VIA_ALL.search(line):
+        if has_origins or has_destinations:
+            return ScopeLogic.ANY_TRAFFIC
+
+    # Default: if we have destinations but no origins, it's arrivals-focused
+    # If we have origins but no destinations, it's departures-focused
+    if has_destinations and not has_origins:
+        return ScopeLogic.ARRIVALS_ONLY
+    if has_origins and not has_destinations:
+        return ScopeLogic.DEPARTURES_ONLY
+
+    # If we have both, default to ANY_TRAFFIC (OR logic)
+    if has_origins and has_destinations:
+        return ScopeLogic.ANY_TRAFFIC
+
+    # Fallback to ANY_TRAFFIC
+    return ScopeLogic.ANY_TRAFFIC
+
+
 def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetime, destinations: List[str]) -> ParseResult:
     """
     Parse NTML text into TMI objects.
@@ -1331,408 +1751,6 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
     # Get event date for parsing times
     event_date = event_start.date()
 
-    def parse_time(time_str: str, base_date) -> Optional[datetime]:
-        """Parse HHMM or HH:MM format time, adjusting date for overnight"""
-        if not time_str:
-            return None
-        time_str = time_str.replace(':', '').replace('Z', '').strip()
-        if len(time_str) == 4:
-            try:
-                hour = int(time_str[:2])
-                minute = int(time_str[2:])
-                result = datetime(base_date.year, base_date.month, base_date.day, hour, minute)
-                # If time < event start time, it's likely next day
-                if result < event_start - timedelta(hours=2):
-                    result = result + timedelta(days=1)
-                return result
-            except ValueError:
-                return None
-        return None
-
-    def parse_ntml_time_range(text: str, base_date) -> Tuple[Optional[datetime], Optional[datetime]]:
-        """
-        Parse time range from NTML format.
-        Handles: "2330-0400", "0000-0400", "2359Z-0400Z"
-        """
-        match = re.search(r'(\d{4})Z?\s*-\s*(\d{4})Z?', text)
-        if match:
-            start = parse_time(match.group(1), base_date)
-            end = parse_time(match.group(2), base_date)
-            return (start, end)
-        return (None, None)
-
-    def parse_facilities(text: str) -> Tuple[str, str, bool]:
-        """
-        Parse requestor:provider facility pair.
-
-        Handles various facility types and formats:
-        - ARTCC: ZNY, ZDC, ZBW (3-letter starting with Z)
-        - TRACON: N90, A90, C90, PCT, SCT (2-4 chars)
-        - Airport: KJFK, KBOS, JFK (3-4 chars)
-
-        Formats supported:
-        - Simple: "N90:ZNY", "ZDC:ZBW"
-        - Multiple facilities: "ZNY,N90:ZBW,ZDC,ZOB"
-        - With (MULTIPLE) suffix: "ZNY:ZDC(MULTIPLE)"
-        - With trailing TMI ID: "ZOA:ZSE $ 05B01E"
-
-        Returns: (requestor, provider, is_multiple)
-        """
-        # Check for and strip (MULTIPLE) suffix
-        is_multiple = False
-        clean_text = text
-        if re.search(r'\(MULTIPLE\)\s*$', text, re.IGNORECASE):
-            is_multiple = True
-            clean_text = re.sub(r'\(MULTIPLE\)\s*$', '', text, flags=re.IGNORECASE).strip()
-
-        # Strip trailing TMI ID codes (format: "$ DDCDDL" where D=digit, C=[ABCDEXO], L=optional letter)
-        # Pattern: 2 digits + [ABCDEXO] + 2 digits + optional letter
-        clean_text = re.sub(r'\s*\$\s*\d{2}[ABCDEXO]\d{2}[A-Za-z]?\s*$', '', clean_text).strip()
-
-        # Find ALL facility pairs in the line (pattern: FACILITY:FACILITY)
-        # We want the LAST one that looks like a real facility pair (not REASON:CONDITION)
-        all_matches = re.findall(r'([A-Z][A-Z0-9,]+):([A-Z][A-Z0-9,]+)', clean_text)
-
-        def looks_like_facility(code: str) -> bool:
-            """
-            Check if a code looks like a valid ATC facility.
-
-            Valid patterns:
-            - ARTCC: Z + 2 letters (ZNY, ZDC) or CZ + 2 letters (CZYZ, CZUL for Canada)
-            - TRACON: Letter + 2 digits (N90, A80, C90) or 3-4 letter codes (PCT, SCT, NCT)
-            - Sector: ARTCC + digits (ZNY66, ZDC42)
-            - Airport: 3-4 letters optionally starting with K/C/P (JFK, KJFK, LGA)
-
-            Returns False for full English words (VOLUME, STAFFING, WEATHER, etc.)
-            """
-            code = code.upper()
-
-            # ARTCC: Z + 2 letters
-            if re.match(r'^Z[A-Z]{2}$', code):
-                return True
-            # Canadian FIR: CZ + 2 letters
-            if re.match(r'^CZ[A-Z]{2}$', code):
-                return True
-            # TRACON: Letter + 2 digits (N90, A80, C90, D10, etc.)
-            if re.match(r'^[A-Z]\d{2}$', code):
-                return True
-            # Sector: ARTCC + digits (ZNY66, ZDC42)
-            if re.match(r'^Z[A-Z]{2}\d+$', code):
-                return True
-            # 3-letter codes (PCT, SCT, NCT, JFK, LGA, MIA, etc.) - must have at least one digit OR be short
-            if re.match(r'^[A-Z]{3}$', code):
-                return True
-            # 4-letter airport with K/C/P prefix (KJFK, KLAX, CYYZ)
-            if re.match(r'^[KCP][A-Z]{3}$', code):
-                return True
-            # 4-letter TRACON codes that aren't words (U90, etc.)
-            if re.match(r'^[A-Z]\d{2}[A-Z]?$', code):
-                return True
-
-            # If it's 5+ letters with no digits, it's probably a word (VOLUME, STAFFING, etc.)
-            if len(code) >= 5 and code.isalpha():
-                return False
-
-            # 2-letter codes could be navaids - allow them
-            if re.match(r'^[A-Z]{2}$', code):
-                return True
-
-            return False
-
-        logger.debug(f"parse_facilities: all_matches={all_matches} from text='{text[:100]}...'")
-
-        for requestor, provider in reversed(all_matches):
-            # Check if BOTH parts look like valid facility codes
-            req_parts = requestor.split(',')
-            prov_parts = provider.split(',')
-
-            # All parts must look like facilities
-            if not all(looks_like_facility(p) for p in req_parts + prov_parts):
-                logger.debug(f"parse_facilities: skipping {requestor}:{provider} (not facility codes)")
-                continue
-
-            # This looks like a valid facility pair
-            logger.debug(f"parse_facilities: found {requestor}:{provider}")
-            return (requestor, provider, is_multiple)
-
-        logger.debug(f"parse_facilities: no valid facility pair found")
-        return ('', '', False)
-
-    def parse_ntml_timestamp(line: str, base_date) -> Optional[datetime]:
-        """
-        Parse NTML timestamp prefix (DD/HHMM format).
-        Example: "30/2100" = day 30, 21:00Z
-
-        Returns datetime when this NTML entry was issued/posted.
-        Used for tracking MIT amendments (multiple entries updating same restriction).
-        """
-        match = re.match(r'^(\d{2})/(\d{4})\s+', line)
-        if match:
-            day = int(match.group(1))
-            time_str = match.group(2)
-            try:
-                hour = int(time_str[:2])
-                minute = int(time_str[2:])
-
-                # Start with base date's year and month
-                result = datetime(base_date.year, base_date.month, day, hour, minute)
-
-                # If result is way before event, it might be next month
-                if result < event_start - timedelta(days=7):
-                    # Try next month
-                    if base_date.month == 12:
-                        result = datetime(base_date.year + 1, 1, day, hour, minute)
-                    else:
-                        result = datetime(base_date.year, base_date.month + 1, day, hour, minute)
-
-                return result
-            except ValueError:
-                return None
-        return None
-
-    def parse_mit_modifier(line: str) -> MITModifier:
-        """
-        Parse MIT modifier from line.
-
-        AS_ONE / SINGLE_STREAM: Provider must provide 1 stream/flow to requestor
-            by handoff point (not multiple streams/handoff points). All traffic
-            merged into single stream regardless of origin.
-        PER_STREAM / PER_FIX / PER_ROUTE / EACH: Each fix/route gets separate MIT
-            e.g., "35MIT PER STREAM" with "AUDIL/MEMMS" = separate MIT per fix
-        PER_AIRPORT: Each origin/destination airport gets its own MIT
-        NO_STACKS: Don't send over planes that overlap each other (no vertical stacking)
-        EVERY_OTHER: TMI applies to alternating flights (A, C, E but not B, D, F)
-        RALT: Regardless of altitude - MIT applies to all altitudes
-        """
-        # Check for compound modifiers (can have multiple)
-        # Priority: specific modifiers first, then general
-
-        # AS ONE / SINGLE STREAM
-        if re.search(r'\bAS\s+ONE\b', line, re.IGNORECASE):
-            return MITModifier.AS_ONE
-        if re.search(r'\bSINGLE\s+STREAM\b', line, re.IGNORECASE):
-            return MITModifier.SINGLE_STREAM
-
-        # PER variants (all equivalent for analysis purposes)
-        if re.search(r'\bPER\s+STREAM\b', line, re.IGNORECASE):
-            return MITModifier.PER_STREAM
-        if re.search(r'\bPER\s+FIX\b', line, re.IGNORECASE):
-            return MITModifier.PER_FIX
-        if re.search(r'\bPER\s+ROUTE\b', line, re.IGNORECASE):
-            return MITModifier.PER_ROUTE
-        if re.search(r'\bPER\s+STRAT\b', line, re.IGNORECASE):  # Per stratum
-            return MITModifier.PER_STREAM
-        if re.search(r'\bPER\s+AIRPORT\b', line, re.IGNORECASE):
-            return MITModifier.PER_AIRPORT
-        if re.search(r'\bEACH\b', line, re.IGNORECASE):
-            return MITModifier.EACH
-
-        # Special modifiers
-        if re.search(r'\bNO\s+STACKS?\b', line, re.IGNORECASE):
-            return MITModifier.NO_STACKS
-        if re.search(r'\bEVERY\s+OTHER\b', line, re.IGNORECASE):
-            return MITModifier.EVERY_OTHER
-        if re.search(r'\bRALT\b', line, re.IGNORECASE):
-            return MITModifier.RALT
-
-        return MITModifier.STANDARD
-
-    def parse_traffic_filter(line: str) -> Optional[TrafficFilter]:
-        """
-        Parse traffic filter specifications from NTML line.
-
-        Examples:
-        - TYPE:ALL - All aircraft types
-        - TYPE:JET - Jets only
-        - SPD:S210 or SPD:<=210 - Speed <= 210 knots
-        - SPD:210 or SPD:=210 - Speed AT 210 knots
-        - SPD:>210 - Speed > 210 knots
-        - ALT:AOB090 - At or below FL090
-        - EXCL:PHL - Exclude PHL traffic
-
-        SPD format: SPD:[<=, ≤, <, =, >, ≥, >=, S]<value>[KT|KTS]
-        - If no operator, means AT specified speed
-        - S prefix (e.g., S210) means <= (at or below)
-        """
-        filter_obj = TrafficFilter()
-        has_filter = False
-
-        # Parse TYPE filter (TYPE:ALL, TYPE:JET, TYPE:PROP, TYPE:TURBOPROP)
-        type_match = re.search(r'\bTYPE:\s*(ALL|JET|PROP|TURBOPROP)\b', line, re.IGNORECASE)
-        if type_match:
-            type_str = type_match.group(1).upper()
-            filter_obj.aircraft_type = AircraftType[type_str]
-            has_filter = True
-
-        # Parse SPD filter with full operator support
-        # Pattern: SPD:[op]<value>[KT|KTS]
-        # Operators: <=, ≤, <, =, >, ≥, >=, S (S = <=)
-        spd_match = re.search(
-            r'\bSPD:\s*(<=|≤|<|=|>=|≥|>|S)?(\d+)(?:KTS?)?',
-            line, re.IGNORECASE
-        )
-        if spd_match:
-            op_str = spd_match.group(1) or ''
-            speed_val = int(spd_match.group(2))
-
-            # Map operator string to ComparisonOp
-            op_str_upper = op_str.upper() if op_str else ''
-            if op_str_upper in ['<=', '≤', 'S']:
-                filter_obj.speed_op = ComparisonOp.LE
-            elif op_str_upper == '<':
-                filter_obj.speed_op = ComparisonOp.LT
-            elif op_str_upper in ['>=', '≥']:
-                filter_obj.speed_op = ComparisonOp.GE
-            elif op_str_upper == '>':
-                filter_obj.speed_op = ComparisonOp.GT
-            else:
-                # No operator or '=' means AT
-                filter_obj.speed_op = ComparisonOp.AT
-
-            filter_obj.speed_value = speed_val
-            has_filter = True
-
-        # Parse ALT filter (ALT:AOB090, ALT:AOA180, ALT:AT350)
-        alt_match = re.search(r'\bALT:\s*(AT|AOB|AOA|LOA)(\d+)\b', line, re.IGNORECASE)
-        if alt_match:
-            alt_type = alt_match.group(1).upper()
-            # LOA = Level or Above = AOA
-            if alt_type == 'LOA':
-                alt_type = 'AOA'
-            filter_obj.altitude_filter = AltitudeFilter[alt_type]
-            filter_obj.altitude_value = int(alt_match.group(2))
-            has_filter = True
-
-        # Parse EXCL filter (EXCL:PHL, EXCL:EWR,LGA, EXCL:NONE)
-        excl_match = re.search(r'\bEXCL:\s*([A-Z0-9,]+)\b', line, re.IGNORECASE)
-        if excl_match:
-            excl_str = excl_match.group(1).upper()
-            if excl_str != 'NONE':
-                filter_obj.exclusions = [e.strip() for e in excl_str.split(',') if e.strip()]
-                has_filter = True
-
-        return filter_obj if has_filter else None
-
-    def parse_traffic_direction(line: str) -> TrafficDirection:
-        """
-        Parse traffic direction from NTML line.
-
-        Patterns:
-        - "JFK arrivals via CAMRN" -> ARRIVALS
-        - "EWR,LGA departures via BIGGY" -> DEPARTURES
-        - "JFK via CAMRN" (no direction specified) -> BOTH
-        - Variants: ARVL, ARVLS, ARR, ARRS, DEP, DEPS, DEPT, DEPTS
-        """
-        # Check for arrivals keywords
-        if re.search(r'\b(arrivals?|arvls?|arrs?)\b', line, re.IGNORECASE):
-            return TrafficDirection.ARRIVALS
-
-        # Check for departures keywords
-        if re.search(r'\b(departures?|deps?|depts?)\b', line, re.IGNORECASE):
-            return TrafficDirection.DEPARTURES
-
-        # Check for LTFC (Landing Traffic) and DTFC (Departing Traffic)
-        if re.search(r'\bLTFC\b', line, re.IGNORECASE):
-            return TrafficDirection.ARRIVALS
-        if re.search(r'\bDTFC\b', line, re.IGNORECASE):
-            return TrafficDirection.DEPARTURES
-
-        return TrafficDirection.BOTH
-
-    def parse_thru_clause(line: str) -> Optional[ThruFilter]:
-        """
-        Parse thru/through clause from NTML line.
-
-        Patterns:
-        - "JFK to LAX thru ZAU 75MIT" -> ThruFilter(value='ZAU', thru_type=ThruType.ARTCC)
-        - "OAK via ALL through ZLC 20MIT" -> ThruFilter(value='ZLC', thru_type=ThruType.ARTCC)
-        - "ZNY overflights thru ZNY66 20MIT" -> ThruFilter(value='ZNY66', thru_type=ThruType.SECTOR)
-        - "...thru J60 15MIT" -> ThruFilter(value='J60', thru_type=ThruType.AIRWAY)
-
-        Returns:
-            ThruFilter if thru clause found, None otherwise
-        """
-        # Match "thru" or "through" followed by facility code
-        # The facility code is typically followed by MIT value, time range, or end of relevant portion
-        thru_match = re.search(
-            r'\b(?:thru|through)\s+([A-Z0-9_]+)\b',
-            line, re.IGNORECASE
-        )
-        if thru_match:
-            thru_value = thru_match.group(1).upper()
-            return create_thru_filter(thru_value)
-        return None
-
-    def determine_scope_logic(
-        line: str,
-        has_origins: bool,
-        has_destinations: bool,
-        has_thru: bool,
-        traffic_direction: TrafficDirection
-    ) -> ScopeLogic:
-        """
-        Determine the appropriate ScopeLogic based on NTML patterns.
-
-        Logic:
-        - "JFK departures..." → DEPARTURES_ONLY (check origins only)
-        - "arrivals to JFK..." → ARRIVALS_ONLY (check destinations only)
-        - "JFK to LAX..." → OD_PAIR (must match BOTH origin AND destination)
-        - "JFK via ALL" → ANY_TRAFFIC (match either origin OR destination)
-        - "ZNY overflights..." → OVERFLIGHTS (transit but NOT origin/dest)
-        - "...thru ZAU" (no origin/dest) → THRU_ONLY (only check thru facility)
-
-        Args:
-            line: Original NTML line
-            has_origins: Whether origins list is populated
-            has_destinations: Whether destinations list is populated
-            has_thru: Whether thru clause was found
-            traffic_direction: Parsed traffic direction
-
-        Returns:
-            ScopeLogic enum value
-        """
-        line_upper = line.upper()
-
-        # Check for "overflights" keyword
-        if re.search(r'\boverflights?\b', line, re.IGNORECASE):
-            return ScopeLogic.OVERFLIGHTS
-
-        # Check for explicit OD pair pattern: "XXX to YYY" (not "to" as part of word)
-        # e.g., "JFK to LAX", "BOS to MIA"
-        if re.search(r'\b[A-Z]{3,4}\s+to\s+[A-Z]{3,4}\b', line, re.IGNORECASE):
-            return ScopeLogic.OD_PAIR
-
-        # If only thru is specified (no origins/destinations from airport pattern)
-        if has_thru and not has_origins and not has_destinations:
-            return ScopeLogic.THRU_ONLY
-
-        # Based on explicit traffic direction
-        if traffic_direction == TrafficDirection.DEPARTURES:
-            return ScopeLogic.DEPARTURES_ONLY
-
-        if traffic_direction == TrafficDirection.ARRIVALS:
-            return ScopeLogic.ARRIVALS_ONLY
-
-        # "via ALL" patterns typically mean any traffic to/from the airport
-        # e.g., "JFK via ALL" means all JFK traffic (departures OR arrivals)
-        if re.search(r'\bvia\s+ALL\b', line, re.IGNORECASE):
-            if has_origins or has_destinations:
-                return ScopeLogic.ANY_TRAFFIC
-
-        # Default: if we have destinations but no origins, it's arrivals-focused
-        # If we have origins but no destinations, it's departures-focused
-        if has_destinations and not has_origins:
-            return ScopeLogic.ARRIVALS_ONLY
-        if has_origins and not has_destinations:
-            return ScopeLogic.DEPARTURES_ONLY
-
-        # If we have both, default to ANY_TRAFFIC (OR logic)
-        if has_origins and has_destinations:
-            return ScopeLogic.ANY_TRAFFIC
-
-        # Fallback to ANY_TRAFFIC
-        return ScopeLogic.ANY_TRAFFIC
-
     skipped_lines = []
     gs_advisories = []
     gs_cnx_advisories = []
@@ -1792,11 +1810,11 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
         # === ADVZY-ONLY RULE: Skip NTML single-line GS and reroute entries ===
         if line_type in ('mit', 'stop', 'cfr', 'minit', 'unknown'):
             upper_line = line.upper()
-            if re.search(r'\bGS\b', upper_line) and 'GROUND STOP' not in upper_line:
+            if _NTML_GS_WORD.search(upper_line) and 'GROUND STOP' not in upper_line:
                 logger.debug(f"Skipping NTML GS line (ADVZY-only): {line[:60]}...")
                 i += 1
                 continue
-            if re.search(r'\bRE-?ROUTE\b|\bROUTE\s+RQD\b|\bFEA\s+FYI\b', upper_line):
+            if _NTML_REROUTE_WORDS.search(upper_line):
                 logger.debug(f"Skipping NTML reroute line (ADVZY-only): {line[:60]}...")
                 i += 1
                 continue
@@ -1829,27 +1847,24 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
         cancelled_utc = None
 
         # Check for old-style cancellation at end of line
-        cxld_match = re.search(r'CXLD?\s*(\d{4})Z?', line, re.IGNORECASE)
+        cxld_match = _CXLD_TIME.search(line)
         if cxld_match:
-            cancelled_utc = parse_time(cxld_match.group(1), event_date)
-            line = re.sub(r'CXLD?\s*\d{4}Z?', '', line, flags=re.IGNORECASE).strip()
+            cancelled_utc = _parse_hhmm(cxld_match.group(1), event_date, event_start, exact=True)
+            line = _CXLD_SUFFIX.sub('', line).strip()
 
         # Parse STOP restriction
         # Format: "30/2327    BOS via HNK STOP VOLUME:VOLUME 2330-0400 ZBW:ZNY"
         # Also: "BOS via Q133 STOP TYPE:JET EXCL:NONE VOLUME:VOLUME 2330-0400 ZNY:ZDC"
         if line_type == 'stop':
             # Remove leading timestamp if present (DD/HHMM)
-            clean_line = re.sub(r'^\d{2}/\d{4}\s+', '', line).strip()
+            clean_line = _NTML_TIMESTAMP_PREFIX.sub('', line).strip()
 
-            stop_match = re.match(
-                r'(\w+)\s+via\s+(\S+)\s+STOP\b',
-                clean_line, re.IGNORECASE
-            )
+            stop_match = _STOP_LINE.match(clean_line)
             if stop_match:
                 dest = stop_match.group(1).upper()
                 fix = stop_match.group(2).upper()
-                start_time, end_time = parse_ntml_time_range(line, event_date)
-                requestor, provider, is_multiple = parse_facilities(line)
+                start_time, end_time = _parse_ntml_time_range(line, event_date, event_start)
+                requestor, provider, is_multiple = _parse_facilities(line)
 
                 tmi = TMI(
                     tmi_id=f'STOP_{fix}_{dest}',
@@ -1876,36 +1891,32 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
         # Also handles: "EWR,LGA departures via BIGGY 15MIT PER AIRPORT TYPE:JET"
         elif line_type == 'mit':
             # Parse NTML timestamp prefix as issued_utc
-            issued_utc = parse_ntml_timestamp(line, event_date)
+            issued_utc = _parse_ntml_issued_time(line, event_date, event_start)
 
             # Remove leading timestamp if present
-            clean_line = re.sub(r'^\d{2}/\d{4}\s+', '', line).strip()
+            clean_line = _NTML_TIMESTAMP_PREFIX.sub('', line).strip()
 
             # Enhanced pattern to capture arrivals/departures and multi-airport specs
-            # Pattern: "JFK arrivals via CAMRN 20MIT" or "EWR,LGA departures via BIGGY 15MIT"
-            mit_match = re.match(
-                r'([A-Z0-9,\s]+?)(?:\s+(arrivals?|departures?|arvls?|deps?|depts?))?\s+via\s+(\S+)\s+(\d+)\s*MIT\b',
-                clean_line, re.IGNORECASE
-            )
+            mit_match = _MIT_LINE.match(clean_line)
             if mit_match:
                 airport_str = mit_match.group(1).strip().upper()
                 direction_word = mit_match.group(2)  # May be None
                 fix_str = mit_match.group(3).upper()
                 value = int(mit_match.group(4))
-                start_time, end_time = parse_ntml_time_range(line, event_date)
-                requestor, provider, is_multiple = parse_facilities(line)
+                start_time, end_time = _parse_ntml_time_range(line, event_date, event_start)
+                requestor, provider, is_multiple = _parse_facilities(line)
 
                 # Parse modifier (AS ONE, PER STREAM, PER ROUTE, etc.)
-                modifier = parse_mit_modifier(line)
+                modifier = _parse_mit_modifier(line)
 
                 # Parse traffic filter (TYPE, SPD, ALT, EXCL)
-                traffic_filter = parse_traffic_filter(line)
+                traffic_filter = _parse_traffic_filter(line)
 
                 # Parse traffic direction from the full line
-                traffic_direction = parse_traffic_direction(line)
+                traffic_direction = _parse_traffic_direction(line)
 
                 # Parse thru clause (e.g., "thru ZAU", "through ZLC")
-                thru_filter = parse_thru_clause(line)
+                thru_filter = _parse_thru_clause(line)
 
                 # Parse destinations/origins from airport_str
                 # May be comma-separated: "EWR,LGA" or single: "JFK"
@@ -1923,7 +1934,7 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
                     origin_list = []
 
                 # Determine scope logic based on pattern analysis
-                scope_logic = determine_scope_logic(
+                scope_logic = _determine_scope_logic(
                     line,
                     has_origins=bool(origin_list),
                     has_destinations=bool(dest_list),
@@ -1995,34 +2006,31 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
         # Similar patterns to MIT but with time-based spacing
         elif line_type == 'minit':
             # Parse NTML timestamp prefix as issued_utc
-            issued_utc = parse_ntml_timestamp(line, event_date)
+            issued_utc = _parse_ntml_issued_time(line, event_date, event_start)
 
-            clean_line = re.sub(r'^\d{2}/\d{4}\s+', '', line).strip()
+            clean_line = _NTML_TIMESTAMP_PREFIX.sub('', line).strip()
 
             # Enhanced pattern to capture arrivals/departures and multi-airport specs
-            minit_match = re.match(
-                r'([A-Z0-9,\s]+?)(?:\s+(arrivals?|departures?|arvls?|deps?|depts?))?\s+via\s+(\S+)\s+(\d+)\s*MINIT\b',
-                clean_line, re.IGNORECASE
-            )
+            minit_match = _MINIT_LINE.match(clean_line)
             if minit_match:
                 airport_str = minit_match.group(1).strip().upper()
                 direction_word = minit_match.group(2)  # May be None
                 fix_str = minit_match.group(3).upper()
                 value = int(minit_match.group(4))
-                start_time, end_time = parse_ntml_time_range(line, event_date)
-                requestor, provider, is_multiple = parse_facilities(line)
+                start_time, end_time = _parse_ntml_time_range(line, event_date, event_start)
+                requestor, provider, is_multiple = _parse_facilities(line)
 
                 # Parse modifier
-                modifier = parse_mit_modifier(line)
+                modifier = _parse_mit_modifier(line)
 
                 # Parse traffic filter (TYPE, SPD, ALT, EXCL)
-                traffic_filter = parse_traffic_filter(line)
+                traffic_filter = _parse_traffic_filter(line)
 
                 # Parse traffic direction
-                traffic_direction = parse_traffic_direction(line)
+                traffic_direction = _parse_traffic_direction(line)
 
                 # Parse thru clause
-                thru_filter = parse_thru_clause(line)
+                thru_filter = _parse_thru_clause(line)
 
                 # Parse destinations/origins from airport_str
                 if ',' in airport_str:
@@ -2039,7 +2047,7 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
                     origin_list = []
 
                 # Determine scope logic
-                scope_logic = determine_scope_logic(
+                scope_logic = _determine_scope_logic(
                     line,
                     has_origins=bool(origin_list),
                     has_destinations=bool(dest_list),
@@ -2108,20 +2116,17 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
         # - "30/2353 JFK, LGA, BOS via CLT Departures CFR VOLUME:VOLUME 0000-0400 ZDC:ZTL"
         # - "BOS via ALL CFR VOLUME:VOLUME 0000-0400 ZDC:PCT"
         elif line_type == 'cfr':
-            clean_line = re.sub(r'^\d{2}/\d{4}\s+', '', line).strip()
+            clean_line = _NTML_TIMESTAMP_PREFIX.sub('', line).strip()
 
             # Try enhanced pattern first: "JFK, LGA, BOS via CLT Departures CFR"
             # This captures comma-separated destinations and optional "X Departures" origin
-            cfr_match = re.match(
-                r'([A-Z0-9,\s]+)\s+via\s+(.+?)\s+CFR\b',
-                clean_line, re.IGNORECASE
-            )
+            cfr_match = _CFR_LINE.match(clean_line)
             if cfr_match:
                 dest_str = cfr_match.group(1).strip().upper()
                 via_part = cfr_match.group(2).strip().upper()
 
-                start_time, end_time = parse_ntml_time_range(line, event_date)
-                requestor, provider, is_multiple = parse_facilities(line)
+                start_time, end_time = _parse_ntml_time_range(line, event_date, event_start)
+                requestor, provider, is_multiple = _parse_facilities(line)
 
                 # Parse destinations (may be comma-separated)
                 if ',' in dest_str:
@@ -2133,7 +2138,7 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
                 # Check for "X Departures" format (indicates origin)
                 fix = None
                 origins = []
-                departures_match = re.match(r'([A-Z]{3,4})\s+DEPARTURES', via_part, re.IGNORECASE)
+                departures_match = _CFR_DEPARTURES.match(via_part)
                 if departures_match:
                     # "CLT Departures" means origin is CLT
                     origin_code = departures_match.group(1)
@@ -2165,17 +2170,14 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
 
             # Old MIT/MINIT pattern: "DEST via FIX 20MIT REQ:PROV 2359Z-0400Z"
             if not tmi:
-                mit_match = re.match(
-                    r'(\w+)\s+via\s+(\w+)\s+(\d+)\s*(MIT|MINIT)\s*(?:AS\s+ONE\s+)?',
-                    line, re.IGNORECASE
-                )
+                mit_match = _OLD_MIT_LINE.match(line)
                 if mit_match:
                     dest = mit_match.group(1).upper()
                     fix = mit_match.group(2).upper()
                     value = int(mit_match.group(3))
                     tmi_type = TMIType.MIT if mit_match.group(4).upper() == 'MIT' else TMIType.MINIT
-                    start_time, end_time = parse_ntml_time_range(line, event_date)
-                    requestor, provider, is_multiple = parse_facilities(line)
+                    start_time, end_time = _parse_ntml_time_range(line, event_date, event_start)
+                    requestor, provider, is_multiple = _parse_facilities(line)
 
                     tmi = TMI(
                         tmi_id=f'{tmi_type.value}_{fix}_{fix}',
@@ -2194,17 +2196,14 @@ def parse_ntml_to_tmis(ntml_text: str, event_start: datetime, event_end: datetim
 
             # Old APREQ/CFR pattern: "DEST via FIX CFR 2359-0400 REQ:PROV"
             if not tmi:
-                apreq_match = re.match(
-                    r'(\w+)\s+via\s+(\w+)\s+(APREQ|CFR)\s*(\d{4})Z?\s*-\s*(\d{4})Z?',
-                    line, re.IGNORECASE
-                )
+                apreq_match = _OLD_APREQ_LINE.match(line)
                 if apreq_match:
                     dest = apreq_match.group(1).upper()
                     fix = apreq_match.group(2).upper()
                     tmi_type = TMIType.APREQ if apreq_match.group(3).upper() == 'APREQ' else TMIType.CFR
-                    start_time = parse_time(apreq_match.group(4), event_date)
-                    end_time = parse_time(apreq_match.group(5), event_date)
-                    requestor, provider, is_multiple = parse_facilities(line)
+                    start_time = _parse_hhmm(apreq_match.group(4), event_date, event_start, exact=True)
+                    end_time = _parse_hhmm(apreq_match.group(5), event_date, event_start, exact=True)
+                    requestor, provider, is_multiple = _parse_facilities(line)
 
                     tmi = TMI(
                         tmi_id=f'{tmi_type.value}_{fix}',
@@ -2382,6 +2381,7 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
     tmis = parse_result.tmis
     # Start with skipped lines from TMI parser (these are unparsed TMI-like lines)
     skipped_lines = list(parse_result.skipped_lines)
+    skipped_texts = {sl.line for sl in skipped_lines}
 
     delays = []
     airport_configs = []
@@ -2392,80 +2392,40 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
     lines = cleaned_text.strip().split('\n')
     event_date = event_start.date()
 
-    def parse_time_from_ntml(time_str: str, base_date) -> Optional[datetime]:
-        """Parse HHMM time string"""
-        if not time_str:
-            return None
-        time_str = time_str.replace(':', '').replace('Z', '').strip()
-        if len(time_str) == 4:
-            try:
-                hour = int(time_str[:2])
-                minute = int(time_str[2:])
-                result = datetime(base_date.year, base_date.month, base_date.day, hour, minute)
-                if result < event_start - timedelta(hours=2):
-                    result = result + timedelta(days=1)
-                return result
-            except ValueError:
-                return None
-        return None
-
-    def parse_ntml_timestamp(line: str, base_date) -> Optional[datetime]:
-        """Parse the DD/HHMM timestamp from start of NTML line"""
-        match = re.match(r'^(\d{2})/(\d{4})\s+', line)
-        if match:
-            day = int(match.group(1))
-            time_str = match.group(2)
-            try:
-                hour = int(time_str[:2])
-                minute = int(time_str[2:])
-                # Use event date's month/year, adjust day
-                result = datetime(base_date.year, base_date.month, day, hour, minute)
-                # Handle month rollover
-                if result < event_start - timedelta(days=2):
-                    # Probably next month
-                    if base_date.month == 12:
-                        result = result.replace(year=base_date.year + 1, month=1)
-                    else:
-                        result = result.replace(month=base_date.month + 1)
-                return result
-            except ValueError:
-                return None
-        return None
-
     for line in lines:
         line = line.strip()
         if not line:
             continue
 
         line_type, _ = classify_line(line)
-        timestamp = parse_ntml_timestamp(line, event_date)
+        timestamp = _parse_ntml_entry_time(line, event_date, event_start)
 
         # Parse E/D (En Route Delays)
         # Format: "31/0127    ZBW E/D for BOS +Holding/0147/2 ACFT  FIX/NAVAID:AJJAY VOLUME:VOLUME"
         # Can also be: "ZBW E/D for BOS +30/0147" (30 min delay starting at 0147)
         # Or: "ZBW E/D for BOS -Holding" (no longer holding)
         if line_type == 'ed_delay':
-            ed_match = re.search(r'(\w+)\s+E/D\s+for\s+(\w+)', line, re.IGNORECASE)
+            ed_match = _ED_LINE.search(line)
             if ed_match:
                 facility = ed_match.group(1).upper()
                 airport = ed_match.group(2).upper()
 
                 # Determine holding status
                 holding_status = HoldingStatus.NONE
-                if re.search(r'\+Holding\b', line, re.IGNORECASE):
+                if _DELAY_HOLDING.search(line):
                     holding_status = HoldingStatus.HOLDING
-                elif re.search(r'-Holding\b', line, re.IGNORECASE):
+                elif _DELAY_NOT_HOLDING.search(line):
                     holding_status = HoldingStatus.NOT_HOLDING
 
                 # Extract holding fix from "FIX/NAVAID:AJJAY"
                 holding_fix = ''
-                fix_match = re.search(r'FIX/NAVAID:(\w+)', line, re.IGNORECASE)
+                fix_match = _DELAY_HOLDING_FIX.search(line)
                 if fix_match:
                     holding_fix = fix_match.group(1).upper()
 
                 # Extract aircraft count from "2 ACFT"
                 aircraft_holding = 0
-                acft_match = re.search(r'(\d+)\s*ACFT', line, re.IGNORECASE)
+                acft_match = _DELAY_AIRCRAFT.search(line)
                 if acft_match:
                     aircraft_holding = int(acft_match.group(1))
 
@@ -2473,12 +2433,12 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
                 # Format: +Holding/0147 or +30/0147
                 delay_minutes = 0
                 delay_start = None
-                delay_match = re.search(r'\+(\w+)/(\d{4})', line)
+                delay_match = _DELAY_VALUE_START.search(line)
                 if delay_match:
                     value = delay_match.group(1)
                     if value.isdigit():
                         delay_minutes = int(value)
-                    delay_start = parse_time_from_ntml(delay_match.group(2), event_date)
+                    delay_start = _parse_hhmm(delay_match.group(2), event_date, event_start, exact=True)
 
                 # Determine delay trend (would need previous entries to be accurate)
                 delay_trend = DelayTrend.UNKNOWN
@@ -2500,42 +2460,42 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
 
         # Parse A/D (Arrival Delays) - same structure as E/D
         elif line_type == 'ad_delay':
-            ad_match = re.search(r'(\w+)\s+A/D\s+for\s+(\w+)', line, re.IGNORECASE)
+            ad_match = _AD_LINE.search(line)
             if ad_match:
                 facility = ad_match.group(1).upper()
                 airport = ad_match.group(2).upper()
 
                 # Holding status
                 holding_status = HoldingStatus.NONE
-                if re.search(r'\+Holding\b', line, re.IGNORECASE):
+                if _DELAY_HOLDING.search(line):
                     holding_status = HoldingStatus.HOLDING
-                elif re.search(r'-Holding\b', line, re.IGNORECASE):
+                elif _DELAY_NOT_HOLDING.search(line):
                     holding_status = HoldingStatus.NOT_HOLDING
 
                 # Holding fix
                 holding_fix = ''
-                fix_match = re.search(r'FIX/NAVAID:(\w+)', line, re.IGNORECASE)
+                fix_match = _DELAY_HOLDING_FIX.search(line)
                 if fix_match:
                     holding_fix = fix_match.group(1).upper()
 
                 # Aircraft count
                 aircraft_holding = 0
-                acft_match = re.search(r'(\d+)\s*ACFT', line, re.IGNORECASE)
+                acft_match = _DELAY_AIRCRAFT.search(line)
                 if acft_match:
                     aircraft_holding = int(acft_match.group(1))
 
                 # Delay amount and start
                 delay_minutes = 0
                 delay_start = None
-                delay_match = re.search(r'\+(\w+)/(\d{4})', line)
+                delay_match = _DELAY_VALUE_START.search(line)
                 if delay_match:
                     value = delay_match.group(1)
                     if value.isdigit():
                         delay_minutes = int(value)
-                    delay_start = parse_time_from_ntml(delay_match.group(2), event_date)
+                    delay_start = _parse_hhmm(delay_match.group(2), event_date, event_start, exact=True)
                 else:
                     # Try simple +NN format
-                    simple_match = re.search(r'\+(\d+)\b', line)
+                    simple_match = _DELAY_MINUTES.search(line)
                     if simple_match:
                         delay_minutes = int(simple_match.group(1))
 
@@ -2558,7 +2518,7 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
         # Format: "31/0153    D/D from BOS +35/0153  VOLUME:VOLUME"
         # +35 means 35-minute delays, /0153 is when delays started
         elif line_type == 'dd_delay':
-            dd_match = re.search(r'D/D\s+from\s+(\w+)', line, re.IGNORECASE)
+            dd_match = _DD_LINE.search(line)
             if dd_match:
                 airport = dd_match.group(1).upper()
 
@@ -2566,21 +2526,21 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
                 # Format: +35/0153 (35 min delay starting at 0153)
                 delay_minutes = 0
                 delay_start = None
-                delay_match = re.search(r'\+(\d+)/(\d{4})', line)
+                delay_match = _DELAY_MINUTES_START.search(line)
                 if delay_match:
                     delay_minutes = int(delay_match.group(1))
-                    delay_start = parse_time_from_ntml(delay_match.group(2), event_date)
+                    delay_start = _parse_hhmm(delay_match.group(2), event_date, event_start, exact=True)
                 else:
                     # Try simple +NN format
-                    simple_match = re.search(r'\+(\d+)\b', line)
+                    simple_match = _DELAY_MINUTES.search(line)
                     if simple_match:
                         delay_minutes = int(simple_match.group(1))
 
                 # D/D can rarely have holding (plane departs then holds)
                 holding_status = HoldingStatus.NONE
-                if re.search(r'\+Holding\b', line, re.IGNORECASE):
+                if _DELAY_HOLDING.search(line):
                     holding_status = HoldingStatus.HOLDING
-                elif re.search(r'-Holding\b', line, re.IGNORECASE):
+                elif _DELAY_NOT_HOLDING.search(line):
                     holding_status = HoldingStatus.NOT_HOLDING
 
                 delays.append(DelayEntry(
@@ -2602,10 +2562,10 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
         # Format: "30/2328    BOS    VMC    ARR:27/32 DEP:33L    AAR:40 ADR:40"
         elif line_type == 'airport_config':
             # Extract airport code (3-letter code following timestamp)
-            airport_match = re.search(r'^\d{2}/\d{4}\s+(\w{3})\s+', line)
+            airport_match = _CONFIG_AIRPORT.search(line)
             if not airport_match:
                 # Try without timestamp
-                airport_match = re.match(r'^(\w{3})\s+', line)
+                airport_match = _CONFIG_AIRPORT_BARE.match(line)
 
             if airport_match:
                 airport = airport_match.group(1).upper()
@@ -2615,23 +2575,23 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
 
                 # Extract arrival runways (ARR:27/32)
                 arr_runways = []
-                arr_match = re.search(r'ARR:([^\s]+)', line, re.IGNORECASE)
+                arr_match = _CONFIG_ARR.search(line)
                 if arr_match:
                     arr_runways = [r.strip() for r in arr_match.group(1).split('/')]
 
                 # Extract departure runways (DEP:33L)
                 dep_runways = []
-                dep_match = re.search(r'DEP:([^\s]+)', line, re.IGNORECASE)
+                dep_match = _CONFIG_DEP.search(line)
                 if dep_match:
                     dep_runways = [r.strip() for r in dep_match.group(1).split('/')]
 
                 # Extract AAR and ADR
                 aar = 0
                 adr = 0
-                aar_match = re.search(r'AAR:(\d+)', line, re.IGNORECASE)
+                aar_match = _CONFIG_AAR.search(line)
                 if aar_match:
                     aar = int(aar_match.group(1))
-                adr_match = re.search(r'ADR:(\d+)', line, re.IGNORECASE)
+                adr_match = _CONFIG_ADR.search(line)
                 if adr_match:
                     adr = int(adr_match.group(1))
 
@@ -2652,14 +2612,14 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
         # - "JFK, LGA, BOS via CLT Departures CFR VOLUME:VOLUME CANCEL RESTR ZDC:ZTL"
         elif line_type == 'cancel':
             # Remove timestamp prefix if present
-            clean_line = re.sub(r'^\d{2}/\d{4}\s+', '', line).strip()
+            clean_line = _NTML_TIMESTAMP_PREFIX.sub('', line).strip()
 
             # Try to extract destination and fix
             dest = ''
             fix = ''
 
             # Pattern 1: "DEST via FIX CANCEL"
-            via_match = re.search(r'(\S+)\s+via\s+(\S+).*CANCEL', clean_line, re.IGNORECASE)
+            via_match = _CANCEL_VIA.search(clean_line)
             if via_match:
                 dest = via_match.group(1).upper()
                 fix = via_match.group(2).upper()
@@ -2670,13 +2630,13 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
             is_multiple = False
 
             # Check for (MULTIPLE) suffix
-            if re.search(r'\(MULTIPLE\)\s*$', line.upper()):
+            if _CANCEL_MULTIPLE.search(line.upper()):
                 is_multiple = True
-                clean_fac_line = re.sub(r'\(MULTIPLE\)\s*$', '', line.upper()).strip()
+                clean_fac_line = _CANCEL_MULTIPLE.sub('', line.upper()).strip()
             else:
                 clean_fac_line = line.upper()
 
-            facilities_match = re.search(r'([A-Z0-9,]+):([A-Z0-9,]+)\s*$', clean_fac_line)
+            facilities_match = _CANCEL_FACILITIES.search(clean_fac_line)
             if facilities_match:
                 requestor = facilities_match.group(1)
                 provider = facilities_match.group(2)
@@ -2694,7 +2654,8 @@ def parse_ntml_full(ntml_text: str, event_start: datetime, event_end: datetime,
         # Note: TMI-like unparsed lines are already captured from parse_ntml_to_tmis
         elif line_type == 'unknown':
             # Check if already in skipped_lines from TMI parser
-            if not any(sl.line == line for sl in skipped_lines):
+            if line not in skipped_texts:
+                skipped_texts.add(line)
                 skipped_lines.append(SkippedLine(
                     line=line,
                     line_number=0,  # We don't track line numbers in this pass
@@ -0,0 +1,129 @@
+"""
+TMI Compliance Analyzer - Parallel TMI Analysis
+===============================================
+
+Runs independent TMI analyses in a pool of worker processes.
+
+Workers are forked after preloading, so the trajectory store, crossing cache,
+crossing engine, and reference lookups are shared copy-on-write instead of
+being pickled. Each worker opens its own ADL/GIS connections for the few
+on-demand queries an analysis may still make; the parent's connection objects
+are kept referenced (never closed) inside the workers so the parent's
+sessions are not torn down.
+
+Task results come back in submission order, so the merged result JSON is
+identical to a sequential run. When the run is profiled, each task also
+returns the profiler phases and database counts it recorded in the worker,
+which are merged into the parent's profiler. Platforms without the fork start method
+(Windows) fall back to running tasks in-process.
+"""
+
+import logging
+import multiprocessing
+from multiprocessing import util as mp_util
+from typing import List
+
+from .database import ADLConnection, GISConnection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 1
+
+# Set in the parent right before forking; read by the workers
+_worker_analyzer = None
+# Parent connection objects inherited by a worker (kept alive, see module docstring)
+_inherited_connections = []
+
+
+def _init_worker():
+    analyzer = _worker_analyzer
+    _inherited_connections.extend([analyzer.adl, analyzer.adl_conn, analyzer.gis_conn])
+
+    adl = ADLConnection()
+    adl.connect()
+    analyzer.adl = adl
+    analyzer.adl_conn = analyzer._profiled_connection(adl.conn, 'adl')
+    mp_util.Finalize(None, adl.close, exitpriority=10)
+
+    if analyzer.gis_conn:
+        try:
+            gis = GISConnection()
+            gis.connect()
+            analyzer.gis_conn = analyzer._profiled_connection(gis.conn, 'gis')
+            mp_util.Finalize(None, gis.close, exitpriority=10)
+        except Exception as e:
+            logger.warning(f"Worker GIS connection unavailable: {e}")
+            analyzer.gis_conn = None
+        if analyzer.route_cache:
+            analyzer.route_cache.gis_conn = analyzer.gis_conn
+
+    if analyzer.profiler:
+        # Phases completed in the parent before the fork were already recorded there
+        analyzer.profiler.take_phases()
+
+
+def _run_task(task: tuple):
+    profiler = _worker_analyzer.profiler
+    if not profiler:
+        return _worker_analyzer._run_analysis_task(task)
+    db_before = profiler.db_counts()
+    output = _worker_analyzer._run_analysis_task(task)
+    return output, profiler.take_phases(), profiler.db_counts_since(db_before)
+
+
+class AnalysisTaskRunner:
+    """
+    Context manager that maps analysis tasks over a fork-based process pool.
+
+    With workers <= 1 (or no fork support) tasks run in the calling process.
+    """
+
+    def __init__(self, analyzer, workers: int = DEFAULT_WORKERS):
+        self.analyzer = analyzer
+        self.workers = max(1, workers or 1)
+        self._pool = None
+
+    def __enter__(self):
+        global _worker_analyzer
+        if self.workers <= 1:
+            return self
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("Parallel TMI analysis needs the fork start method - running sequentially")
+            return self
+
+        # Build shared lazily-initialized state before forking so workers inherit it
+        self.analyzer._prepare_for_workers()
+
+        _worker_analyzer = self.analyzer
+        self._pool = multiprocessing.get_context('fork').Pool(
+            processes=self.workers, initializer=_init_worker)
+        logger.info(f"Parallel TMI analysis: {self.workers} worker processes")
+        return self
+
+    def map(self, tasks: List[tuple]) -> list:
+        """Run tasks and return their results in task order"""
+        if not tasks:
+            return []
+        if self._pool is None or len(tasks) == 1:
+            return [self.analyzer._run_analysis_task(task) for task in tasks]
+        outputs = self._pool.map(_run_task, tasks, chunksize=1)
+        profiler = self.analyzer.profiler
+        if not profiler:
+            return outputs
+        results = []
+        for output, phases, db in outputs:
+            profiler.merge(phases, db)
+            results.append(output)
+        return results
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _worker_analyzer
+        if self._pool is not None:
+            if exc_type is None:
+                # close + join lets workers run their finalizers (DB connection close)
+                self._pool.close()
+            else:
+                self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        _worker_analyzer = None
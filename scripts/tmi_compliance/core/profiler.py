@@ -0,0 +1,295 @@
+"""
+TMI Compliance Analyzer - Run Profiler
+======================================
+
+Per-phase instrumentation for TMIComplianceAnalyzer (run.py --profile).
+
+AnalysisProfiler.phase() brackets one phase of a run (preload, boundary
+crossings, holding, each TMI analysis, summary, ...) and records for it:
+- wall and CPU seconds
+- database round trips (statements executed) and rows fetched, per database,
+  counted by wrapping the ADL/GIS connections (wrap_connection)
+- cache counter deltas (input cache, route expansion cache)
+- peak RSS of the process at the end of the phase
+
+Phases nest; a nested phase is reported under its path ('inputs/preload')
+and its numbers are included in its parents'. Phases that run more than once
+under the same path (none today) are summed.
+
+report() is stored under results['_perf']. Phases that ran in worker
+processes (run.py --workers) are collected by the worker and merged back
+with merge(). Optionally the whole run is also profiled with cProfile (or
+pyinstrument for an .html dump) and written to dump_path.
+"""
+
+import cProfile
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import pyinstrument
+    HAS_PYINSTRUMENT = True
+except ImportError:
+    pyinstrument = None
+    HAS_PYINSTRUMENT = False
+
+logger = logging.getLogger(__name__)
+
+PERF_FORMAT_VERSION = 1
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far (None where unsupported)"""
+    if resource is None:
+        return None
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak_kb / (1048576 if sys.platform == 'darwin' else 1024), 1)
+
+
+class _CountingCursor:
+    """Cursor proxy counting statements and fetched rows"""
+
+    def __init__(self, cursor, counters: Counter, db: str, lock: threading.Lock):
+        self._cursor = cursor
+        self._counters = counters
+        self._db = db
+        self._lock = lock
+
+    def _count(self, key: str, n: int):
+        with self._lock:
+            self._counters[f"{self._db}.{key}"] += n
+
+    def execute(self, *args, **kwargs):
+        self._count('round_trips', 1)
+        return self._cursor.execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        self._count('round_trips', 1)
+        return self._cursor.executemany(*args, **kwargs)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count('rows', 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count('rows', len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count('rows', len(rows))
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count('rows', 1)
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _CountingConnection:
+    """Connection proxy whose cursors count statements and fetched rows"""
+
+    def __init__(self, conn, counters: Counter, db: str, lock: threading.Lock):
+        self._conn = conn
+        self._counters = counters
+        self._db = db
+        self._lock = lock
+
+    def cursor(self, *args, **kwargs):
+        return _CountingCursor(self._conn.cursor(*args, **kwargs), self._counters, self._db, self._lock)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+class AnalysisProfiler:
+    """
+    Collects per-phase timings and counters for one analysis run.
+
+    Usage:
+        profiler = AnalysisProfiler(dump_path='run.prof')
+        conn = profiler.wrap_connection(conn, 'adl')
+        profiler.start()
+        with profiler.phase('preload'):
+            ...
+        results['_perf'] = profiler.report()
+    """
+
+    def __init__(self, dump_path: Optional[str] = None,
+                 cache_counters: Optional[Callable[[], Dict[str, int]]] = None):
+        self.dump_path = dump_path
+        self.cache_counters = cache_counters  # () -> {counter: value}, sampled per phase
+        self._db_counters = Counter()
+        self._db_lock = threading.Lock()
+        self._stack: List[str] = []
+        self._phases: Dict[str, dict] = {}   # path -> totals, in first-start order
+        self._started = None
+        self._cpu_started = None
+        self._dump_profiler = None
+
+    # --- Connections ---
+
+    def wrap_connection(self, conn, db: str):
+        """conn with statement/row counting under db ('adl', 'gis'); None stays None"""
+        if conn is None or isinstance(conn, _CountingConnection):
+            return conn
+        return _CountingConnection(conn, self._db_counters, db, self._db_lock)
+
+    # --- Phases ---
+
+    def _sample(self) -> dict:
+        with self._db_lock:
+            db = dict(self._db_counters)
+        return {
+            'wall': time.perf_counter(),
+            'cpu': time.process_time(),
+            'db': db,
+            'cache': dict(self.cache_counters()) if self.cache_counters else {},
+        }
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record the enclosed block as phase name (nested under the active phase)"""
+        self._stack.append(name)
+        path = '/'.join(self._stack)
+        before = self._sample()
+        try:
+            yield
+        finally:
+            after = self._sample()
+            self._stack.pop()
+            self._add(path, {
+                'calls': 1,
+                'wall_sec': after['wall'] - before['wall'],
+                'cpu_sec': after['cpu'] - before['cpu'],
+                'db': _delta(before['db'], after['db']),
+                'cache': _delta(before['cache'], after['cache']),
+                'peak_rss_mb': peak_rss_mb(),
+            })
+
+    def _add(self, path: str, record: dict):
+        totals = self._phases.get(path)
+        if totals is None:
+            self._phases[path] = record
+            return
+        totals['calls'] += record['calls']
+        totals['wall_sec'] += record['wall_sec']
+        totals['cpu_sec'] += record['cpu_sec']
+        for key in ('db', 'cache'):
+            merged = Counter(totals[key])
+            merged.update(record[key])
+            totals[key] = dict(merged)
+        if record['peak_rss_mb'] is not None:
+            totals['peak_rss_mb'] = max(totals['peak_rss_mb'] or 0, record['peak_rss_mb'])
+
+    def db_counts(self) -> Dict[str, int]:
+        """Current database counters"""
+        with self._db_lock:
+            return dict(self._db_counters)
+
+    def db_counts_since(self, before: Dict[str, int]) -> Dict[str, int]:
+        """Database counter increase since a db_counts() snapshot"""
+        return _delta(before, self.db_counts())
+
+    def take_phases(self) -> Dict[str, dict]:
+        """Remove and return the recorded phases (worker -> parent hand-off)"""
+        phases, self._phases = self._phases, {}
+        return phases
+
+    def merge(self, phases: Dict[str, dict], db: Optional[Dict[str, int]] = None,
+              parent: Optional[str] = None):
+        """
+        Add phases recorded elsewhere (a worker process), nested under parent.
+
+        db is the worker's database counter delta for the same work; it is
+        added to the run totals (the phases already carry their own).
+        """
+        for path, record in phases.items():
+            self._add(f"{parent}/{path}" if parent else path, record)
+        if db:
+            with self._db_lock:
+                self._db_counters.update(db)
+
+    # --- Whole run ---
+
+    def start(self):
+        """Start the run clock (and the cProfile/pyinstrument dump profiler)"""
+        self._started = time.perf_counter()
+        self._cpu_started = time.process_time()
+        if not self.dump_path:
+            return
+        if self.dump_path.endswith('.html') and HAS_PYINSTRUMENT:
+            self._dump_profiler = pyinstrument.Profiler()
+            self._dump_profiler.start()
+            return
+        if self.dump_path.endswith('.html'):
+            logger.warning("pyinstrument is not installed - writing a cProfile dump instead")
+        self._dump_profiler = cProfile.Profile()
+        self._dump_profiler.enable()
+
+    def stop(self):
+        """Stop the dump profiler and write dump_path"""
+        profiler, self._dump_profiler = self._dump_profiler, None
+        if profiler is None:
+            return
+        if isinstance(profiler, cProfile.Profile):
+            profiler.disable()
+            profiler.dump_stats(self.dump_path)
+        else:
+            profiler.stop()
+            with open(self.dump_path, 'w') as f:
+                f.write(profiler.output_html())
+        logger.info(f"Profile written to {self.dump_path}")
+
+    def report(self) -> Dict[str, Any]:
+        """The _perf results section"""
+        total_wall = time.perf_counter() - self._started if self._started is not None else None
+        total_cpu = time.process_time() - self._cpu_started if self._cpu_started is not None else None
+        with self._db_lock:
+            db = dict(sorted(self._db_counters.items()))
+        return {
+            'format_version': PERF_FORMAT_VERSION,
+            'wall_sec': round(total_wall, 4) if total_wall is not None else None,
+            'cpu_sec': round(total_cpu, 4) if total_cpu is not None else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'db': db,
+            'cache': dict(self.cache_counters()) if self.cache_counters else {},
+            'phases': {
+                path: {
+                    'calls': record['calls'],
+                    'wall_sec': round(record['wall_sec'], 4),
+                    'cpu_sec': round(record['cpu_sec'], 4),
+                    'db': dict(sorted(record['db'].items())),
+                    'cache': dict(sorted(record['cache'].items())),
+                    'peak_rss_mb': record['peak_rss_mb'],
+                }
+                for path, record in self._phases.items()
+            },
+            'dump': self.dump_path,
+        }
+
+
+def _delta(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    """Non-zero after - before per counter"""
+    delta = {}
+    for key, value in after.items():
+        diff = value - before.get(key, 0)
+        if diff:
+            delta[key] = diff
+    return delta
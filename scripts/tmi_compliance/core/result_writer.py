@@ -0,0 +1,270 @@
+"""
+TMI Compliance Analyzer - Result and Trajectory Writer
+======================================================
+
+Streams the results JSON and the split trajectory file to disk (or stdout)
+chunk by chunk instead of building each document as one string first.
+
+Trajectory file formats (run.py --trajectory_format):
+- json:    {mit_key: {callsign: {type: LineString, coordinates:
+           [[lon, lat, epoch], ...], properties}}} - the original layout
+- compact: the same keys, but each flight's coordinates are one polyline
+           string (Google encoded-polyline algorithm over three dimensions):
+           zigzag/varint deltas of lat and lon in 1e-4 degrees (the precision
+           of the json format) and of the timestamp in seconds from t0.
+           About 4-5x smaller than json before compression.
+
+      {"format": "polyline3", "version": 1, "precision": 4,
+       "trajectories": {mit_key: {callsign: {"t0": epoch, "line": "...",
+                                            "properties": {...}}}}}
+
+decode_compact() turns a compact document back into the json layout (the
+results viewer does the same in tmi_compliance.js).
+
+Either file can get a compressed sidecar next to it (path.gz or path.zst,
+--trajectory_compress), written in the same pass. Files are written to
+path.tmp and renamed into place so readers never see a partial file.
+
+zstd needs the optional zstandard package; without it HAS_ZSTD is False
+and requesting zstd raises ImportError.
+"""
+
+import gzip
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    zstandard = None
+    HAS_ZSTD = False
+
+logger = logging.getLogger(__name__)
+
+TRAJECTORY_FORMATS = ('json', 'compact')
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+SIDECAR_SUFFIX = {'gzip': '.gz', 'zstd': '.zst'}
+
+COMPACT_FORMAT = 'polyline3'
+COMPACT_VERSION = 1
+COORD_PRECISION = 4                  # Decimal places of lat/lon (matches the json format)
+_COORD_SCALE = 10 ** COORD_PRECISION
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+WRITE_CHUNK_CHARS = 1 << 16          # Buffer encoder output into writes of this size
+
+
+# =============================================================================
+# Polyline encoding
+# =============================================================================
+
+def _encode_value(value: int, out: List[str]):
+    """Append one signed integer in encoded-polyline form"""
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        out.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    out.append(chr(value + 63))
+
+
+def encode_polyline(coordinates: Iterable) -> tuple:
+    """
+    [[lon, lat, epoch], ...] as (t0, polyline) - interleaved lat, lon and
+    time deltas; lat/lon rounded to COORD_PRECISION decimals.
+    """
+    out = []
+    t0 = None
+    prev_lat = prev_lon = prev_t = 0
+    for lon, lat, epoch in coordinates:
+        if t0 is None:
+            t0 = prev_t = int(epoch)
+        lat_i = int(round(round(lat, COORD_PRECISION) * _COORD_SCALE))
+        lon_i = int(round(round(lon, COORD_PRECISION) * _COORD_SCALE))
+        t = int(epoch)
+        _encode_value(lat_i - prev_lat, out)
+        _encode_value(lon_i - prev_lon, out)
+        _encode_value(t - prev_t, out)
+        prev_lat, prev_lon, prev_t = lat_i, lon_i, t
+    return t0, ''.join(out)
+
+
+def decode_polyline(t0: int, line: str) -> List[list]:
+    """Inverse of encode_polyline: [[lon, lat, epoch], ...]"""
+    values = []
+    value = shift = 0
+    for ch in line:
+        b = ord(ch) - 63
+        value |= (b & 0x1f) << shift
+        shift += 5
+        if b < 0x20:
+            values.append(~(value >> 1) if value & 1 else value >> 1)
+            value = shift = 0
+    coordinates = []
+    lat_i = lon_i = 0
+    t = t0
+    for i in range(0, len(values) - 2, 3):
+        lat_i += values[i]
+        lon_i += values[i + 1]
+        t += values[i + 2]
+        coordinates.append([lon_i / _COORD_SCALE, lat_i / _COORD_SCALE, t])
+    return coordinates
+
+
+def decode_compact(document: dict) -> dict:
+    """A compact trajectory document in the json layout"""
+    if document.get('format') != COMPACT_FORMAT:
+        raise ValueError(f"Not a {COMPACT_FORMAT} trajectory document")
+    return {
+        key: {
+            callsign: {
+                'type': 'LineString',
+                'coordinates': decode_polyline(flight['t0'], flight['line']),
+                'properties': flight['properties'],
+            }
+            for callsign, flight in flights.items()
+        }
+        for key, flights in document['trajectories'].items()
+    }
+
+
+# =============================================================================
+# Streaming encoders
+# =============================================================================
+
+def iter_json(obj: Any, depth: int = 2) -> Iterator[str]:
+    """
+    JSON text of obj in chunks; joined, identical to json.dumps(obj, default=str).
+
+    Dicts are split entry by entry down to depth levels and everything below
+    is encoded with json.dumps, which keeps the C encoder (JSONEncoder's
+    iterencode falls back to the much slower pure-Python one).
+    """
+    if depth <= 0 or not isinstance(obj, dict) or not all(isinstance(k, str) for k in obj):
+        yield json.dumps(obj, default=str)
+        return
+    yield '{'
+    for i, (key, value) in enumerate(obj.items()):
+        yield f"{', ' if i else ''}{json.dumps(key)}: "
+        yield from iter_json(value, depth - 1)
+    yield '}'
+
+
+def iter_trajectories_json(trajectories: Dict[str, dict], fmt: str = 'json') -> Iterator[str]:
+    """Trajectory file text in chunks, one flight at a time"""
+    if fmt not in TRAJECTORY_FORMATS:
+        raise ValueError(f"Unknown trajectory format: {fmt}")
+    if fmt == 'compact':
+        yield (f'{{"format": "{COMPACT_FORMAT}", "version": {COMPACT_VERSION}, '
+               f'"precision": {COORD_PRECISION}, "trajectories": ')
+    yield '{'
+    for i, (key, flights) in enumerate(trajectories.items()):
+        yield f"{', ' if i else ''}{json.dumps(key)}: {{"
+        for j, (callsign, traj) in enumerate(flights.items()):
+            if fmt == 'compact':
+                t0, line = encode_polyline(traj.get('coordinates', []))
+                traj = {'t0': t0, 'line': line, 'properties': traj.get('properties', {})}
+            yield f"{', ' if j else ''}{json.dumps(callsign)}: "
+            yield json.dumps(traj, default=str)
+        yield '}'
+    yield '}'
+    if fmt == 'compact':
+        yield '}'
+
+
+# =============================================================================
+# Writers
+# =============================================================================
+
+class _Sidecar:
+    """Compressed copy of a file, written alongside it"""
+
+    def __init__(self, path: str, compression: str):
+        self.path = path + SIDECAR_SUFFIX[compression]
+        self.tmp_path = self.path + '.tmp'
+        self._raw = open(self.tmp_path, 'wb')
+        if compression == 'gzip':
+            # mtime=0 keeps the sidecar byte-identical across runs of the same data
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode='wb', compresslevel=GZIP_LEVEL, mtime=0)
+        else:
+            self._stream = zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(self._raw)
+
+    def write(self, data: bytes):
+        self._stream.write(data)
+
+    def close(self, commit: bool):
+        self._stream.close()
+        if not self._raw.closed:
+            self._raw.close()
+        if commit:
+            os.replace(self.tmp_path, self.path)
+        elif os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def _buffered(chunks: Iterable[str]) -> Iterator[str]:
+    """Coalesce many small encoder chunks into WRITE_CHUNK_CHARS-sized ones"""
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= WRITE_CHUNK_CHARS:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def write_stream(path: str, chunks: Iterable[str], compression: str = 'none') -> int:
+    """
+    Write text chunks to path atomically (plus a compressed sidecar unless
+    compression is 'none'). Returns the size of path in bytes.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == 'zstd' and not HAS_ZSTD:
+        raise ImportError("zstandard is required for zstd trajectory sidecars")
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    sidecar = _Sidecar(path, compression) if compression != 'none' else None
+    size = 0
+    ok = False
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in _buffered(chunks):
+                data = chunk.encode('utf-8')
+                f.write(data)
+                if sidecar:
+                    sidecar.write(data)
+                size += len(data)
+        ok = True
+    finally:
+        if sidecar:
+            sidecar.close(commit=ok)
+        if not ok and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    os.replace(tmp_path, path)
+    if sidecar:
+        logger.info(f"  Compressed copy: {sidecar.path} ({os.path.getsize(sidecar.path)} bytes)")
+    return size
+
+
+def print_stream(chunks: Iterable[str], stream: Optional[TextIO] = None) -> int:
+    """Write text chunks to stream (default stdout) plus a newline; returns chars written"""
+    stream = stream or sys.stdout
+    size = 0
+    for chunk in _buffered(chunks):
+        stream.write(chunk)
+        size += len(chunk)
+    stream.write('\n')
+    stream.flush()
+    return size
@@ -0,0 +1,311 @@
+"""
+TMI Compliance Analyzer - Route Expansion Cache
+===============================================
+
+Memo layer for the PostGIS route expansion functions used by reroute
+analysis (expand_route, expand_route_with_artccs).
+
+Reroute programs apply the same few required routes to hundreds of flights,
+so every expansion is memoized:
+- in memory: LRU keyed by the normalized route string (upper case, single
+  spaces). The key only decides what is shared; PostGIS is always given
+  the route string as written, exactly as before the cache existed
+- on disk: one AnalyzerInputCache entry per function and AIRAC cycle, so
+  later runs in the same cycle skip PostGIS entirely. The cycle is the one
+  in effect now (the nav data PostGIS currently holds), not the event date.
+
+prefetch() expands all distinct route strings with one statement per batch
+(unnest + LATERAL) before reroute analysis starts; a failing batch falls
+back to per-route queries. stats() reports hits/misses for the results JSON.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROUTE_CACHE_SIZE = 4096
+PREFETCH_BATCH_SIZE = 200
+
+# AIRAC cycles follow a fixed 28-day schedule (same epoch as the SWIM
+# reference API): AIRAC 2301 effective 2023-01-26
+AIRAC_EPOCH = date(2023, 1, 26)
+AIRAC_CYCLE_DAYS = 28
+
+# Expansion functions: name -> (per-route SQL, batched SQL)
+EXPAND_ROUTE = 'expand_route'
+ROUTE_ARTCCS = 'expand_route_with_artccs'
+
+_SQL = {
+    EXPAND_ROUTE: (
+        "SELECT waypoint_seq, waypoint_id, lat, lon, waypoint_type "
+        "FROM expand_route(%s)",
+        '''
+        SELECT r.route, e.waypoint_seq, e.waypoint_id, e.lat, e.lon, e.waypoint_type
+        FROM unnest(%s::text[]) WITH ORDINALITY AS r(route, ord)
+        CROSS JOIN LATERAL expand_route(r.route) WITH ORDINALITY AS e
+        ORDER BY r.ord, e.ordinality
+        '''
+    ),
+    ROUTE_ARTCCS: (
+        "SELECT artccs_traversed FROM expand_route_with_artccs(%s)",
+        '''
+        SELECT r.route, a.artccs_traversed
+        FROM unnest(%s::text[]) WITH ORDINALITY AS r(route, ord)
+        LEFT JOIN LATERAL (
+            SELECT artccs_traversed FROM expand_route_with_artccs(r.route) LIMIT 1
+        ) AS a ON true
+        ORDER BY r.ord
+        '''
+    ),
+}
+
+
+def airac_cycle(day: Optional[date] = None) -> str:
+    """AIRAC cycle code (YYNN) in effect on day (default: today, UTC)"""
+    day = day or datetime.utcnow().date()
+    cycles = (day - AIRAC_EPOCH).days // AIRAC_CYCLE_DAYS
+    start = AIRAC_EPOCH + timedelta(days=cycles * AIRAC_CYCLE_DAYS)
+    cycle_in_year = (start - date(start.year, 1, 1)).days // AIRAC_CYCLE_DAYS + 1
+    return f"{start.year % 100:02d}{cycle_in_year:02d}"
+
+
+def normalize_route(route_string: str) -> str:
+    """Cache key form of a route string: upper case, single-spaced"""
+    return ' '.join(route_string.upper().split()) if route_string else ''
+
+
+def waypoints_from_rows(rows) -> List[dict]:
+    """expand_route() rows -> [{seq, id, lat, lon, type}, ...]"""
+    return [
+        {
+            'seq': row[0],
+            'id': row[1],
+            'lat': float(row[2]) if row[2] else None,
+            'lon': float(row[3]) if row[3] else None,
+            'type': row[4]  # e.g., 'nav_fix', 'airway_J79', 'airport', 'fbd'
+        }
+        for row in rows
+    ]
+
+
+def artccs_from_value(value) -> Optional[List[str]]:
+    """artccs_traversed value -> list of ARTCC codes, or None"""
+    if not value:
+        return None
+    return list(value) if isinstance(value, (list, tuple)) else value.split()
+
+
+class RouteExpansionCache:
+    """
+    Memoized expand_route / expand_route_with_artccs results.
+
+    get() returns a fresh copy of the cached value, so callers may modify it.
+    Failed expansions are not memoized on disk (they may be transient) but
+    are remembered for the rest of the run, matching the old per-run cache.
+    """
+
+    def __init__(self, gis_conn, input_cache=None, max_entries: int = DEFAULT_ROUTE_CACHE_SIZE,
+                 airac: Optional[str] = None):
+        self.gis_conn = gis_conn
+        self.input_cache = input_cache if input_cache and input_cache.enabled else None
+        self.max_entries = max(1, max_entries)
+        self.airac = airac or airac_cycle()
+        self._lru = {fn: OrderedDict() for fn in _SQL}
+        self._disk = {}            # fn -> {route: json} loaded from the input cache
+        self._dirty = {fn: {} for fn in _SQL}  # fn -> new entries to persist
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'prefetched': 0,
+                         'prefetch_queries': 0, 'failures': 0}
+
+    # --- Lookup ---
+
+    def expand_route(self, route_string: str) -> List[dict]:
+        """expand_route() waypoints for a route string ([] on failure)"""
+        return self.get(EXPAND_ROUTE, route_string) or []
+
+    def route_artccs(self, route_string: str) -> Optional[List[str]]:
+        """expand_route_with_artccs() ARTCC traversal for a route string, or None"""
+        return self.get(ROUTE_ARTCCS, route_string)
+
+    def get(self, fn: str, route_string: str):
+        route = normalize_route(route_string)
+        if not route:
+            return None
+        lru = self._lru[fn]
+        if route in lru:
+            lru.move_to_end(route)
+            self.counters['hits'] += 1
+            return self._copy(lru[route])
+
+        disk = self._load_disk(fn)
+        if route in disk:
+            self.counters['disk_hits'] += 1
+            value = json.loads(disk[route])
+        else:
+            self.counters['misses'] += 1
+            value, ok = self._query_one(fn, route, route_string)
+            self._remember(fn, route, value, persist=ok)
+            return self._copy(value)
+        self._remember(fn, route, value, persist=False)
+        return self._copy(value)
+
+    @staticmethod
+    def _copy(value):
+        if isinstance(value, list):
+            return [dict(v) if isinstance(v, dict) else v for v in value]
+        return value
+
+    def _remember(self, fn: str, route: str, value, persist: bool = True):
+        lru = self._lru[fn]
+        lru[route] = value
+        lru.move_to_end(route)
+        while len(lru) > self.max_entries:
+            lru.popitem(last=False)
+        if persist and self.input_cache and route not in self._load_disk(fn):
+            self._dirty[fn][route] = json.dumps(value)
+
+    # --- PostGIS ---
+
+    def _query_one(self, fn: str, route: str, route_string: str) -> tuple:
+        """
+        (value, ok) for one route; failures give the function's empty value.
+        route is the cache key, route_string the text passed to PostGIS.
+        """
+        empty = [] if fn == EXPAND_ROUTE else None
+        if not self.gis_conn:
+            return empty, False
+        try:
+            cursor = self.gis_conn.cursor()
+            cursor.execute(_SQL[fn][0], (route_string,))
+            if fn == EXPAND_ROUTE:
+                value = waypoints_from_rows(cursor.fetchall())
+            else:
+                row = cursor.fetchone()
+                value = artccs_from_value(row[0]) if row else None
+            cursor.close()
+            return value, True
+        except Exception as e:
+            logger.warning(f"  PostGIS {fn} failed for '{route[:50]}': {e}")
+            self.counters['failures'] += 1
+            self._rollback()
+            return empty, False
+
+    def _rollback(self):
+        try:
+            self.gis_conn.rollback()
+        except Exception:
+            pass
+
+    def prefetch(self, route_strings: Iterable[str], functions: Iterable[str] = tuple(_SQL)):
+        """Expand every distinct, not yet cached route string in batched statements"""
+        originals = {}  # cache key -> first route string seen for it
+        for route_string in route_strings:
+            route = normalize_route(route_string)
+            if route:
+                originals.setdefault(route, route_string)
+        routes = list(originals)
+        if not routes:
+            return
+        for fn in functions:
+            disk = self._load_disk(fn)
+            todo = [r for r in routes if r not in self._lru[fn] and r not in disk]
+            for r in routes:
+                if r not in self._lru[fn] and r in disk:
+                    self._remember(fn, r, json.loads(disk[r]), persist=False)
+            if not todo or not self.gis_conn:
+                continue
+            for i in range(0, len(todo), PREFETCH_BATCH_SIZE):
+                self._prefetch_batch(fn, todo[i:i + PREFETCH_BATCH_SIZE], originals)
+            logger.info(f"  Route cache: prefetched {len(todo)} {fn} expansions "
+                        f"({len(routes) - len(todo)} already cached, AIRAC {self.airac})")
+        self.save()
+
+    def _prefetch_batch(self, fn: str, routes: List[str], originals: Dict[str, str]):
+        route_strings = [originals[route] for route in routes]
+        try:
+            cursor = self.gis_conn.cursor()
+            cursor.execute(_SQL[fn][1], (route_strings,))
+            rows = cursor.fetchall()
+            cursor.close()
+        except Exception as e:
+            logger.debug(f"Batched {fn} failed ({e}), falling back to per-route queries")
+            self._rollback()
+            for route, route_string in zip(routes, route_strings):
+                value, ok = self._query_one(fn, route, route_string)
+                self._remember(fn, route, value, persist=ok)
+            self.counters['prefetched'] += len(routes)
+            return
+
+        self.counters['prefetch_queries'] += 1
+        self.counters['prefetched'] += len(routes)
+        # Rows carry the route string as sent; map them back to cache keys
+        keys = dict(zip(route_strings, routes))
+        if fn == EXPAND_ROUTE:
+            grouped = {r: [] for r in routes}
+            for row in rows:
+                grouped[keys[row[0]]].append(row[1:])
+            for route, route_rows in grouped.items():
+                self._remember(fn, route, waypoints_from_rows(route_rows))
+        else:
+            values = {keys[row[0]]: artccs_from_value(row[1]) for row in rows}
+            for route in routes:
+                self._remember(fn, route, values.get(route))
+
+    # --- Persistence ---
+
+    def _disk_key(self, fn: str) -> str:
+        return self.input_cache.key('routes', function=fn, airac=self.airac)
+
+    def _load_disk(self, fn: str) -> Dict[str, str]:
+        if fn not in self._disk:
+            rows = None
+            if self.input_cache:
+                rows = self.input_cache.load_rows('routes', self._disk_key(fn))
+            self._disk[fn] = dict(rows) if rows else {}
+        return self._disk[fn]
+
+    def save(self):
+        """Write new expansions to the on-disk entry of their function/AIRAC"""
+        if not self.input_cache:
+            return
+        for fn, new in self._dirty.items():
+            if not new:
+                continue
+            disk = self._load_disk(fn)
+            disk.update(new)
+            self.input_cache.save_rows('routes', self._disk_key(fn), list(disk.items()))
+            self._dirty[fn] = {}
+
+    # --- Worker processes ---
+
+    def export_state(self) -> Dict[str, Any]:
+        """Counters and unsaved entries, for handing back from a forked worker"""
+        return {'counters': dict(self.counters),
+                'new': {fn: dict(new) for fn, new in self._dirty.items()}}
+
+    def absorb_state(self, state: Dict[str, Any]):
+        """
+        Adopt the state exported by the (only) task that used the cache after
+        prefetch. Workers are forked with the parent's counters, so the
+        exported counters already include the parent's lookups.
+        """
+        self.counters = dict(state['counters'])
+        for fn, new in state['new'].items():
+            self._dirty[fn].update(new)
+
+    def reset_counters(self):
+        """Zero the counters (a shared cache reports per analysis, see AnalysisSession)"""
+        self.counters = dict.fromkeys(self.counters, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters['hits'] + self.counters['disk_hits'] + self.counters['misses']
+        return {
+            **self.counters,
+            'lookups': lookups,
+            'hit_pct': round(100 * (lookups - self.counters['misses']) / lookups, 1) if lookups else None,
+            'entries': sum(len(lru) for lru in self._lru.values()),
+            'airac': self.airac,
+        }
@@ -0,0 +1,132 @@
+"""
+TMI Compliance Analyzer - Shared Analysis Session
+=================================================
+
+State that consecutive analyses of different plans can share (run_batch.py).
+
+A single run.py invocation opens ADL and GIS, loads the airport taxi and
+connect-to-push references, the airport->ARTCC map and the known airway
+names, and (with --boundary_engine local) builds the boundary polygons, then
+throws all of it away. An AnalysisSession passed to TMIComplianceAnalyzer
+(session=...) keeps the connections open and the reference data in memory
+between plans:
+
+- connections are opened on first use and reused; a connection that no
+  longer answers a ping is reopened before the next plan
+- reference data is loaded by the first analysis (or prepare_session()) and
+  handed to every later one
+- the route expansion cache (RouteExpansionCache) is shared, so routes
+  common to many plans are expanded once; its counters restart per plan
+
+Event data (flights, trajectories, crossings) is never shared.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from .database import ADLConnection, GISConnection
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisSession:
+    """ADL/GIS connections and reference data reused across analyses"""
+
+    def __init__(self, use_gis: bool = True):
+        self.use_gis = use_gis
+        self.adl: Optional[ADLConnection] = None
+        self.gis: Optional[GISConnection] = None
+        self.references: Dict[str, Any] = {}   # reference name -> data (see TMIComplianceAnalyzer)
+        self.boundary_engine = None             # LocalBoundaryEngine shared by --boundary_engine local
+        self.route_cache = None                 # RouteExpansionCache shared across plans
+        self.analyses = 0
+        self.reconnects = 0
+        self._retained = []                     # Connections inherited from a parent process
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def gis_conn(self):
+        return self.gis.conn if self.gis else None
+
+    # --- Connections ---
+
+    def connect(self):
+        """Open (or reopen dead) connections; ADL failures raise, GIS is optional"""
+        if self.adl is None or not _alive(self.adl.conn):
+            if self.adl is not None:
+                logger.warning("ADL connection lost - reconnecting")
+                self.reconnects += 1
+                _close_quietly(self.adl)
+            self.adl = None
+            adl = ADLConnection()
+            adl.connect()
+            self.adl = adl
+        if not self.use_gis:
+            return
+        if self.gis is None or not _alive(self.gis.conn):
+            if self.gis is not None:
+                logger.warning("GIS connection lost - reconnecting")
+                self.reconnects += 1
+                _close_quietly(self.gis)
+            self.gis = None
+            try:
+                gis = GISConnection()
+                gis.connect()
+                self.gis = gis
+            except Exception as e:
+                logger.warning(f"GIS connection unavailable (not required): {e}")
+        if self.route_cache is not None:
+            self.route_cache.gis_conn = self.gis_conn
+
+    def detach(self):
+        """
+        Forget the connections without closing them (forked worker: the parent
+        still owns the sessions behind them); the next connect() opens new ones.
+        """
+        self._retained.extend([self.adl, self.gis])
+        self.adl = None
+        self.gis = None
+
+    def close(self):
+        for wrapper in (self.adl, self.gis):
+            if wrapper is not None:
+                _close_quietly(wrapper)
+        self.adl = None
+        self.gis = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'analyses': self.analyses,
+            'reconnects': self.reconnects,
+            'references': sorted(self.references),
+            'boundary_engine': self.boundary_engine is not None,
+            'route_cache_entries': self.route_cache.stats()['entries'] if self.route_cache else 0,
+        }
+
+
+def _alive(conn) -> bool:
+    """True if conn answers a trivial query"""
+    if conn is None:
+        return False
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+def _close_quietly(wrapper):
+    try:
+        wrapper.close()
+    except Exception as e:
+        logger.debug(f"Closing stale connection failed: {e}")
@@ -0,0 +1,218 @@
+"""
+TMI Compliance Analyzer - Vectorized MIT Spacing Engine
+=======================================================
+
+Consecutive-crossing spacing pairs for all traffic streams of an MIT/MINIT
+in one NumPy pass.
+
+The scalar path (TMIComplianceAnalyzer._build_stream_pairs) sorts each
+stream, walks its consecutive crossings and categorizes one pair at a time
+with categorize_spacing()/calculate_shortfall_pct(), once per stream. This
+engine takes the crossing times, groundspeeds and stream labels of every
+stream as arrays, sorts them by (stream, time) once and computes time
+deltas, in-trail distance or time spacing, spacing categories, shortfall
+and margin percentages, per-stream violation counts and the category
+distribution for every pair at once.
+
+The pair dicts are the ones the scalar path builds, key for key and value
+for value: times are compared as integer microseconds, the float arithmetic
+runs in the same order, rounding uses Python's round(), and the crossing
+separation is measured with the scalar haversine passed in by the caller
+(NumPy's trig functions may differ from libm in the last bit).
+
+NumPy is optional: when it is not installed HAS_NUMPY is False and the
+analyzer keeps using the scalar path.
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from .models import (
+    Compliance, CrossingResult, SpacingCategory, SPACING_OVER_THRESHOLD,
+    SPACING_UNDER_THRESHOLD, SPACING_WITHIN_THRESHOLD
+)
+
+logger = logging.getLogger(__name__)
+
+# Category codes used in the arrays, in SpacingCategory order
+_CATEGORIES = (SpacingCategory.UNDER, SpacingCategory.WITHIN,
+               SpacingCategory.OVER, SpacingCategory.GAP)
+_UNDER, _WITHIN, _OVER, _GAP = range(4)
+_CATEGORY_VALUES = tuple(category.value for category in _CATEGORIES)
+_COMPLIANT = Compliance.COMPLIANT.value
+_NON_COMPLIANT = Compliance.NON_COMPLIANT.value
+
+_ONE_US = timedelta(microseconds=1)
+
+
+@dataclass
+class SpacingPairs:
+    """Spacing pairs of every stream of one MIT/MINIT"""
+    by_stream: Dict[Any, List[dict]]                  # stream_id -> pairs, in time order
+    skipped: List[dict] = field(default_factory=list)  # Pairs rejected by the separation check
+    violations: Dict[Any, int] = field(default_factory=dict)  # stream_id -> UNDER pairs
+    distribution: Dict[str, int] = field(default_factory=dict)  # under/within/over/gap counts
+
+    @property
+    def pairs(self) -> List[dict]:
+        """All pairs, stream by stream"""
+        return [p for stream_pairs in self.by_stream.values() for p in stream_pairs]
+
+
+def empty_distribution() -> Dict[str, int]:
+    return {category.value.lower(): 0 for category in _CATEGORIES}
+
+
+def build_spacing_pairs(streams: Sequence[Tuple[Any, List[CrossingResult]]], required: float,
+                        time_based: bool, distance_nm: Callable[[float, float, float, float], float],
+                        max_separation_nm: Optional[float] = None) -> SpacingPairs:
+    """
+    Spacing pairs of consecutive crossings within each stream.
+
+    Args:
+        streams: (stream_id, crossings) per traffic stream
+        required: Required spacing (nm for MIT, minutes for MINIT)
+        time_based: True for MINIT (spacing = minutes between crossings),
+                    False for MIT (minutes x average groundspeed)
+        distance_nm: Scalar great-circle distance (haversine_nm)
+        max_separation_nm: Pairs whose crossing points are farther apart are
+                           skipped (fix-based measurement); None = no check
+
+    Returns:
+        SpacingPairs with every stream_id of streams in by_stream
+    """
+    streams = list(streams)
+    result = SpacingPairs(by_stream={sid: [] for sid, _ in streams},
+                          violations={sid: 0 for sid, _ in streams},
+                          distribution=empty_distribution())
+    crossings = [c for _, stream_crossings in streams for c in stream_crossings]
+    n = len(crossings)
+    if n < 2:
+        return result
+
+    # Stream code of every crossing, and its time as integer microseconds
+    # (exact, like timedelta arithmetic)
+    code = np.repeat(np.arange(len(streams), dtype=np.int64),
+                     [len(stream_crossings) for _, stream_crossings in streams])
+    ref = crossings[0].crossing_time
+    us = np.fromiter(((c.crossing_time - ref) // _ONE_US for c in crossings),
+                     dtype=np.int64, count=n)
+
+    # Stable sort by (stream, time): the order sorted() gives each stream
+    order = np.lexsort((us, code))
+    prev, curr = order[:-1], order[1:]
+    dt_us = us[curr] - us[prev]
+    keep = (code[prev] == code[curr]) & (dt_us > 0)
+    prev, curr, dt_us = prev[keep], curr[keep], dt_us[keep]
+    if prev.size == 0:
+        return result
+
+    time_diff_min = dt_us / 1e6 / 60
+    prev_l, curr_l = prev.tolist(), curr.tolist()
+    separation = np.array([
+        distance_nm(crossings[p].lat, crossings[p].lon, crossings[q].lat, crossings[q].lon)
+        for p, q in zip(prev_l, curr_l)
+    ], dtype=np.float64)
+
+    if max_separation_nm is not None:
+        too_far = separation > max_separation_nm
+        if too_far.any():
+            for p, q, sep in zip(prev[too_far].tolist(), curr[too_far].tolist(),
+                                 separation[too_far].tolist()):
+                result.skipped.append({
+                    'prev': crossings[p].callsign,
+                    'curr': crossings[q].callsign,
+                    'reason': f'crossing separation {sep:.1f}nm > {max_separation_nm}nm'
+                })
+            near = ~too_far
+            prev, curr, time_diff_min, separation = (
+                prev[near], curr[near], time_diff_min[near], separation[near])
+            if prev.size == 0:
+                return result
+
+    if time_based:
+        actual = time_diff_min
+    else:
+        gs = np.fromiter((c.groundspeed for c in crossings), dtype=np.float64, count=n)
+        gs_prev, gs_curr = gs[prev], gs[curr]
+        avg_gs = np.where(gs_prev > 0, (gs_prev + gs_curr) / 2, gs_curr)
+        actual = (time_diff_min * avg_gs) / 60
+
+    # categorize_spacing(), then the physical separation safeguard
+    if required <= 0:
+        category = np.full(actual.size, _GAP, dtype=np.int64)
+    else:
+        ratio = actual / required
+        category = np.select(
+            [ratio < SPACING_UNDER_THRESHOLD, ratio <= SPACING_WITHIN_THRESHOLD,
+             ratio <= SPACING_OVER_THRESHOLD],
+            [_UNDER, _WITHIN, _OVER], default=_GAP)
+        category[(category == _UNDER) & (separation > required)] = _OVER
+    under = category == _UNDER
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        shortfall = ((required - actual) / required) * 100
+        margin = (actual - required) / required * 100
+
+    pair_code = code[prev]
+    for sid, count in zip(result.by_stream, np.bincount(pair_code[under], minlength=len(streams)).tolist()):
+        result.violations[sid] = count
+    for cat, count in zip(_CATEGORIES, np.bincount(category, minlength=len(_CATEGORIES)).tolist()):
+        result.distribution[cat.value.lower()] = count
+
+    # Per-crossing fields are formatted once (most crossings are in two pairs)
+    times, lats, lons, bearings = {}, {}, {}, {}
+    for k in set(prev_l) | set(curr_l):
+        c = crossings[k]
+        times[k] = c.crossing_time.strftime('%H:%M:%SZ')
+        lats[k] = round(c.lat, 4)
+        lons[k] = round(c.lon, 4)
+        bearings[k] = round(c.bearing, 1) if c.bearing is not None else None
+
+    stream_ids = [sid for sid, _ in streams]
+    margin_ok = required > 0
+    for p, q, sc, t_min, act, sep, cat, short, marg in zip(
+            prev.tolist(), curr.tolist(), pair_code.tolist(), time_diff_min.tolist(),
+            actual.tolist(), separation.tolist(), category.tolist(),
+            shortfall.tolist(), margin.tolist()):
+        prev_c, curr_c = crossings[p], crossings[q]
+        stream_id = stream_ids[sc]
+        if cat == _UNDER:
+            compliance = _NON_COMPLIANT
+            shortfall_pct = round(short, 1)
+        else:
+            compliance = _COMPLIANT
+            shortfall_pct = 0
+        result.by_stream[stream_id].append({
+            'prev_callsign': prev_c.callsign,
+            'curr_callsign': curr_c.callsign,
+            'prev_time': times[p],
+            'curr_time': times[q],
+            'time_min': round(t_min, 1),
+            'spacing': round(act, 1),
+            'required': required,
+            'margin_pct': round(marg if margin_ok else 0, 1),
+            'spacing_category': _CATEGORY_VALUES[cat],
+            'compliance': compliance,
+            'shortfall_pct': shortfall_pct,
+            'gs': curr_c.groundspeed,
+            'prev_crossing_lat': lats[p],
+            'prev_crossing_lon': lons[p],
+            'curr_crossing_lat': lats[q],
+            'curr_crossing_lon': lons[q],
+            'crossing_separation_nm': round(sep, 1),
+            'stream_id': stream_id,
+            'prev_bearing': bearings[p],
+            'curr_bearing': bearings[q],
+        })
+
+    return result
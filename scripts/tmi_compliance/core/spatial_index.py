@@ -0,0 +1,175 @@
+"""
+TMI Compliance Analyzer - Spatial Indexes
+=========================================
+
+Uniform lat/lon grids used to prune geometric searches:
+
+- SegmentGridIndex: trajectory segments of the columnar store, bucketed by
+  the grid cells their bounding box overlaps. A fix lookup only touches the
+  segments in the cells around the fix. The closest-approach point of a
+  segment lies inside the segment's lat/lon bounding box, so any segment
+  that can come within the search radius is always returned (pruning never
+  changes which segment wins). The search box wraps at the antimeridian;
+  segments that cross it span the whole longitude range and are kept in the
+  oversized list. Requires NumPy.
+
+- PointGridIndex: named points (nav fixes) for bounding-box lookups, with a
+  known coverage area so callers can tell whether a query can be answered
+  locally or must go to the database. Pure Python.
+"""
+
+import logging
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+logger = logging.getLogger(__name__)
+
+NM_PER_DEG_LAT = 60.0
+
+# Segments whose bounding box covers more cells than this (long oceanic
+# legs, antimeridian wraps) are kept in a short list checked on every query
+# instead of being written into hundreds of cells.
+MAX_CELLS_PER_SEGMENT = 64
+
+
+def radius_to_degrees(lat: float, radius_nm: float) -> Tuple[float, float]:
+    """
+    Conservative (lat, lon) degree margins covering radius_nm around lat.
+
+    Uses 60 nm/deg (slightly less than the haversine 60.04) and the cosine
+    at the poleward edge of the margin, so the box always contains the
+    haversine circle.
+    """
+    dlat = radius_nm / NM_PER_DEG_LAT
+    edge = min(abs(lat) + dlat, 89.0)
+    return dlat, dlat / math.cos(math.radians(edge))
+
+
+class SegmentGridIndex:
+    """
+    Grid over trajectory segments (point i -> i+1 within one flight).
+
+    Args:
+        lat, lon: float64 arrays of all store points
+        seg_start: global index of the first point of every segment
+        cell_deg: grid cell size in degrees
+    """
+
+    def __init__(self, lat, lon, seg_start, cell_deg: float = 1.0):
+        self.cell_deg = cell_deg
+        self.segment_count = len(seg_start)
+
+        lat1, lat2 = lat[seg_start], lat[seg_start + 1]
+        lon1, lon2 = lon[seg_start], lon[seg_start + 1]
+        r0 = self._cell(np.minimum(lat1, lat2))
+        r1 = self._cell(np.maximum(lat1, lat2))
+        c0 = self._cell(np.minimum(lon1, lon2))
+        c1 = self._cell(np.maximum(lon1, lon2))
+        nrows = r1 - r0 + 1
+        ncols = c1 - c0 + 1
+        ncells = nrows * ncols
+
+        oversized = (ncells > MAX_CELLS_PER_SEGMENT) | (np.abs(lon2 - lon1) > 180.0)
+        self.oversized = np.flatnonzero(oversized)
+
+        # Expand every (segment, covered cell) pair, then sort by cell id
+        seg_ids = np.flatnonzero(~oversized)
+        counts = ncells[seg_ids]
+        owner = np.repeat(seg_ids, counts)
+        local = np.arange(int(counts.sum()), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        rows = r0[owner] + local // ncols[owner]
+        cols = c0[owner] + local % ncols[owner]
+        keys = self._key(rows, cols)
+
+        order = np.argsort(keys, kind='stable')
+        self._keys, first = np.unique(keys[order], return_index=True)
+        self._offsets = np.append(first, keys.size)
+        self._segments = owner[order]
+
+        logger.info(f"  Segment grid: {self.segment_count} segments in {self._keys.size} cells "
+                    f"({cell_deg}deg), {self.oversized.size} oversized")
+
+    def _cell(self, deg):
+        return np.floor(np.asarray(deg) / self.cell_deg).astype(np.int64)
+
+    @staticmethod
+    def _key(rows, cols):
+        # Rows/cols are small signed ints (|lat| <= 90, |lon| <= 180 at >= 0.01 deg cells)
+        return (rows + (1 << 20)) << 32 | (cols + (1 << 20))
+
+    def query(self, fix_lat: float, fix_lon: float, radius_nm: float):
+        """Positions (into seg_start) of segments whose bbox may lie within radius_nm"""
+        dlat, dlon = radius_to_degrees(fix_lat, radius_nm)
+        r0, r1 = self._cell(fix_lat - dlat), self._cell(fix_lat + dlat)
+
+        # Longitude ranges of the search box, wrapped at the antimeridian
+        lon_lo, lon_hi = fix_lon - dlon, fix_lon + dlon
+        if dlon >= 180.0:
+            lon_ranges = [(-180.0, 180.0)]
+        else:
+            lon_ranges = [(max(lon_lo, -180.0), min(lon_hi, 180.0))]
+            if lon_hi > 180.0:
+                lon_ranges.append((-180.0, lon_hi - 360.0))
+            if lon_lo < -180.0:
+                lon_ranges.append((lon_lo + 360.0, 180.0))
+        cols = np.concatenate([np.arange(self._cell(lo), self._cell(hi) + 1) for lo, hi in lon_ranges])
+
+        rows, cols = np.meshgrid(np.arange(r0, r1 + 1), cols, indexing='ij')
+        keys = self._key(rows.ravel(), cols.ravel())
+        pos = np.searchsorted(self._keys, keys)
+        hit = (pos < self._keys.size) & (self._keys[np.minimum(pos, self._keys.size - 1)] == keys)
+
+        parts = [self._segments[self._offsets[p]:self._offsets[p + 1]] for p in pos[hit]]
+        parts.append(self.oversized)
+        # A segment spanning several query cells appears once per cell
+        return np.unique(np.concatenate(parts))
+
+
+class PointGridIndex:
+    """
+    Grid over named points loaded for a known coverage box.
+
+    Points are dicts with at least 'lat' and 'lon'; lookups return them in
+    load order so first-match tie-breaking matches a sequential scan.
+    """
+
+    def __init__(self, points: Iterable[dict], coverage: Tuple[float, float, float, float],
+                 cell_deg: float = 0.5):
+        self.cell_deg = cell_deg
+        self.coverage = coverage  # (lat_min, lat_max, lon_min, lon_max)
+        self._cells: Dict[Tuple[int, int], List[Tuple[int, dict]]] = {}
+        self.size = 0
+        for seq, pt in enumerate(points):
+            self._cells.setdefault(self._cell(pt['lat'], pt['lon']), []).append((seq, pt))
+            self.size += 1
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def covers(self, lat_min: float, lat_max: float, lon_min: float, lon_max: float) -> bool:
+        c_lat_min, c_lat_max, c_lon_min, c_lon_max = self.coverage
+        return (c_lat_min <= lat_min and lat_max <= c_lat_max and
+                c_lon_min <= lon_min and lon_max <= c_lon_max)
+
+    def within_bbox(self, lat_min: float, lat_max: float,
+                    lon_min: float, lon_max: float) -> Optional[List[dict]]:
+        """Points inside the box (inclusive), or None if the box is not fully covered"""
+        if not self.covers(lat_min, lat_max, lon_min, lon_max):
+            return None
+        r0, c0 = self._cell(lat_min, lon_min)
+        r1, c1 = self._cell(lat_max, lon_max)
+        found = []
+        for r in range(r0, r1 + 1):
+            for c in range(c0, c1 + 1):
+                for seq, pt in self._cells.get((r, c), ()):
+                    if lat_min <= pt['lat'] <= lat_max and lon_min <= pt['lon'] <= lon_max:
+                        found.append((seq, pt))
+        found.sort(key=lambda item: item[0])
+        return [pt for _, pt in found]
@@ -0,0 +1,237 @@
+"""
+TMI Compliance Analyzer - Local Stream Clustering
+=================================================
+
+In-process replacement for the PostGIS ST_ClusterDBSCAN passes that split
+the crossings at an MIT fix into traffic streams (--stream_clustering local).
+
+The PostGIS path inserts a midpoint for every trajectory segment of every
+crossing flight into a temp table, clusters the segments inside a distance
+band around the fix, and majority-votes each flight into a cluster: several
+round trips and thousands of rows per fix. Here each flight is reduced to a
+fixed-length feature vector instead: its approach path (the trajectory
+before the crossing, walked back from the fix) sampled where it first
+reaches each of `samples` evenly spaced distance rings between min_dist_nm
+and max_dist_nm, as local x/y offsets in nm from the fix. Flights are then
+clustered with DBSCAN over those vectors:
+
+- the distance between two flights is the mean gap between their samples
+  on the rings both reach; flights sharing fewer than half the rings are
+  never neighbours
+- range queries are pruned with a uniform grid (cell = eps) per ring: a
+  mean gap <= eps implies a gap <= eps on at least one shared ring, so the
+  flights in the 3x3 cells around each sample are the only candidates
+
+Crossing positions (boundary clustering) are the one-ring special case.
+
+The result is a callsign -> cluster label assignment, the same shape the
+PostGIS majority vote produces; the analyzer builds streams, places
+unassigned flights and validates bearing coherence the same way for both.
+
+Requires NumPy (the analyzer falls back to the PostGIS path without it).
+"""
+
+import logging
+import math
+from collections import deque
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    np = None
+    HAS_NUMPY = False
+
+from .crossing_engine import haversine_nm_array
+from .trajectory_store import as_trajectory_view, to_epoch_seconds
+
+logger = logging.getLogger(__name__)
+
+NM_PER_DEG = 60.0
+
+# Distance rings sampled along each approach path
+DEFAULT_APPROACH_SAMPLES = 8
+
+# Share of the rings two flights must both reach to be compared
+MIN_SHARED_RING_FRACTION = 0.5
+
+# Flights (not trajectory segments, as in the PostGIS DBSCAN) forming a
+# stream around the fix and a route branch within a stream
+APPROACH_MIN_FLIGHTS = 3
+BRANCH_MIN_FLIGHTS = 2
+
+
+def local_xy(lat, lon, ref_lat: float, ref_lon: float):
+    """Equirectangular x/y offsets in nm from (ref_lat, ref_lon)"""
+    x = (np.asarray(lon, dtype=np.float64) - ref_lon) * NM_PER_DEG * math.cos(math.radians(ref_lat))
+    y = (np.asarray(lat, dtype=np.float64) - ref_lat) * NM_PER_DEG
+    return x, y
+
+
+def approach_features(crossings: List, trajectory_cache, fix_lat: float, fix_lon: float,
+                      min_dist_nm: float, max_dist_nm: float,
+                      samples: int = DEFAULT_APPROACH_SAMPLES):
+    """
+    Approach-path feature vectors, one per crossing.
+
+    Returns a (len(crossings), samples, 2) float64 array of x/y nm offsets
+    from the fix where the flight's path, walked back from its crossing,
+    first reaches each ring distance; NaN for rings it never reaches (short
+    trajectories, flights that popped up inside the band).
+    """
+    rings = np.linspace(min_dist_nm, max_dist_nm, samples)
+    features = np.full((len(crossings), samples, 2), np.nan)
+
+    for row, crossing in enumerate(crossings):
+        view = as_trajectory_view(trajectory_cache.get(crossing.callsign, []))
+        if len(view) < 2:
+            continue
+        epoch = np.asarray(view.epoch)
+        end = int(np.searchsorted(epoch, to_epoch_seconds(crossing.crossing_time), side='right'))
+        if end < 1:
+            continue
+        # Approach path from the crossing backwards
+        lat = np.asarray(view.lat[:end], dtype=np.float64)[::-1]
+        lon = np.asarray(view.lon[:end], dtype=np.float64)[::-1]
+        dist = haversine_nm_array(lat, lon, fix_lat, fix_lon)
+        reach = np.maximum.accumulate(dist)
+
+        k = np.searchsorted(reach, rings, side='left')
+        covered = k < len(dist)
+        if not covered.any():
+            continue
+        k = k[covered]
+        x, y = local_xy(lat, lon, fix_lat, fix_lon)
+        # Interpolate between the last point inside the ring and the first
+        # one on or beyond it (the first point already beyond: take it as is)
+        inner = np.maximum(k - 1, 0)
+        d_in, d_out = reach[inner], dist[k]
+        span = d_out - d_in
+        with np.errstate(divide='ignore', invalid='ignore'):
+            frac = np.where((k > 0) & (span > 0), (rings[covered] - d_in) / span, 1.0)
+        frac = np.clip(frac, 0.0, 1.0)
+        features[row, covered, 0] = x[inner] + frac * (x[k] - x[inner])
+        features[row, covered, 1] = y[inner] + frac * (y[k] - y[inner])
+
+    return features
+
+
+def position_features(crossings: List, ref_lat: float, ref_lon: float):
+    """Crossing positions as one-ring features (NaN for crossings without a position)"""
+    features = np.full((len(crossings), 1, 2), np.nan)
+    for row, c in enumerate(crossings):
+        if c.lat and c.lon:
+            x, y = local_xy(c.lat, c.lon, ref_lat, ref_lon)
+            features[row, 0] = (x, y)
+    return features
+
+
+def density_clusters(features, eps_nm: float, min_points: int,
+                     min_shared: Optional[int] = None):
+    """
+    DBSCAN over feature vectors (see module docstring for the metric).
+
+    Args:
+        features: (n, rings, 2) array, NaN where a ring is not reached
+        eps_nm: Neighbourhood radius (mean gap over shared rings, nm)
+        min_points: Neighbours (including the flight itself) of a core flight
+        min_shared: Rings two flights must share (default: half the rings)
+
+    Returns:
+        int array of cluster labels (0-based, in discovery order), -1 for
+        noise and for flights reaching fewer than min_shared rings
+    """
+    n, rings = features.shape[0], features.shape[1]
+    if min_shared is None:
+        min_shared = max(1, math.ceil(rings * MIN_SHARED_RING_FRACTION))
+    labels = np.full(n, -1, dtype=np.int64)
+    valid = ~np.isnan(features[:, :, 0])
+    usable = np.flatnonzero(valid.sum(axis=1) >= min_shared)
+    if usable.size == 0:
+        return labels
+
+    # Grid of every reached ring sample: (ring, cell row, cell col) -> flights
+    cells = np.floor(features / eps_nm)
+    grid = {}
+    for i in usable.tolist():
+        for r in np.flatnonzero(valid[i]).tolist():
+            grid.setdefault((r, int(cells[i, r, 0]), int(cells[i, r, 1])), []).append(i)
+
+    def neighbours(i):
+        candidates = set()
+        for r in np.flatnonzero(valid[i]).tolist():
+            cx, cy = int(cells[i, r, 0]), int(cells[i, r, 1])
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    candidates.update(grid.get((r, cx + dx, cy + dy), ()))
+        cand = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        shared = valid[cand] & valid[i]
+        gap = np.linalg.norm(features[cand] - features[i], axis=2)
+        count = shared.sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            mean_gap = np.where(shared, gap, 0.0).sum(axis=1) / np.maximum(count, 1)
+        return cand[(count >= min_shared) & (mean_gap <= eps_nm)]
+
+    cluster = 0
+    visited = np.zeros(n, dtype=bool)
+    for i in usable.tolist():
+        if visited[i]:
+            continue
+        visited[i] = True
+        seeds = neighbours(i)
+        if seeds.size < min_points:
+            continue
+        labels[i] = cluster
+        queue = deque(seeds.tolist())
+        while queue:
+            j = queue.popleft()
+            if labels[j] == -1:
+                labels[j] = cluster      # border or core, first cluster to reach it
+            if visited[j]:
+                continue
+            visited[j] = True
+            more = neighbours(j)
+            if more.size >= min_points:
+                queue.extend(more.tolist())
+        cluster += 1
+    return labels
+
+
+def approach_clusters(crossings: List, trajectory_cache, fix_lat: float, fix_lon: float,
+                      min_dist_nm: float, max_dist_nm: float, eps_nm: float,
+                      min_points: int, samples: int = DEFAULT_APPROACH_SAMPLES) -> Dict[str, int]:
+    """
+    callsign -> cluster label of the flights whose approach path clusters
+    (noise and flights that do not reach the band are left out), like the
+    PostGIS segment majority vote.
+    """
+    features = approach_features(crossings, trajectory_cache, fix_lat, fix_lon,
+                                 min_dist_nm, max_dist_nm, samples)
+    labels = density_clusters(features, eps_nm, min_points)
+    reached = int((~np.isnan(features[:, :, 0])).any(axis=1).sum())
+    logger.info(f"    Local clustering: {reached}/{len(crossings)} flights reach "
+                f"{min_dist_nm:.0f}-{max_dist_nm:.0f}nm, eps={eps_nm}nm, min_pts={min_points}, "
+                f"{int(labels.max()) + 1 if labels.size else 0} clusters")
+    assignment = {}
+    for crossing, label in zip(crossings, labels.tolist()):
+        if label >= 0:
+            assignment.setdefault(crossing.callsign, label)
+    return assignment
+
+
+def position_clusters(crossings: List, eps_nm: float, min_points: int) -> Dict[int, List]:
+    """
+    Crossings clustered by crossing position (the local form of the PostGIS
+    position DBSCAN): cluster label -> crossings, -1 for noise and crossings
+    without a position.
+    """
+    located = [c for c in crossings if c.lat and c.lon]
+    ref_lat = sum(c.lat for c in located) / len(located)
+    ref_lon = sum(c.lon for c in located) / len(located)
+    labels = density_clusters(position_features(crossings, ref_lat, ref_lon),
+                              eps_nm, min_points, min_shared=1)
+    clusters = {}
+    for crossing, label in zip(crossings, labels.tolist()):
+        clusters.setdefault(label, []).append(crossing)
+    return clusters
@@ -0,0 +1,121 @@
+"""
+TMI Compliance Analyzer - Streaming Trajectory Loader
+=====================================================
+
+Reads trajectory rows for a large callsign set from ADL.
+
+The callsign set is bulk-inserted into a session temp table
+(CALLSIGN_TABLE) and the per-source selects join against it, instead of
+inlining a callsign IN ('A','B',...) list once per UNION ALL branch. The
+statement text no longer grows with the flight count, so SQL Server compiles
+one small plan however many flights are featured.
+
+Rows are read with fetchmany() and handed to the caller chunk by chunk, so
+the full result set is never materialized; the analyzer appends them
+straight into a TrajectoryStoreBuilder. stats() reports per-source row
+counts and stage/query/stream timings.
+"""
+
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Session temp table holding the callsigns of the current load (#: per connection)
+CALLSIGN_TABLE = '#tmi_callsigns'
+
+# SQL Server accepts at most 1000 rows per INSERT ... VALUES statement
+INSERT_BATCH_ROWS = 1000
+
+DEFAULT_FETCH_CHUNK = 10000
+
+
+class TrajectoryLoader:
+    """
+    Streams the rows of one query that joins CALLSIGN_TABLE.
+
+    Usage:
+        loader = TrajectoryLoader(adl, adl_conn)
+        for row in loader.rows(query, params, callsigns, source_index=10):
+            ...
+        loader.stats()
+    """
+
+    def __init__(self, adl, conn, chunk_size: int = DEFAULT_FETCH_CHUNK):
+        self.adl = adl          # ADLConnection wrapper (for format_query)
+        self.conn = conn
+        self.chunk_size = max(1, chunk_size)
+        self.callsigns = 0
+        self.chunks = 0
+        self.source_rows = Counter()
+        self.timings = {'stage_sec': 0.0, 'query_sec': 0.0, 'stream_sec': 0.0}
+
+    def rows(self, query: str, params: tuple, callsigns: Iterable[str],
+             source_index: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Stage callsigns, run query, and yield its rows as they are fetched.
+
+        query is written with %s placeholders and joins CALLSIGN_TABLE on
+        callsign. source_index is the column counted per source in stats();
+        without it rows are counted under 'ALL'. The temp table is dropped
+        when the generator finishes or is closed.
+        """
+        cursor = self.conn.cursor()
+        try:
+            started = time.perf_counter()
+            self._stage(cursor, callsigns)
+            staged = time.perf_counter()
+            self.timings['stage_sec'] += staged - started
+
+            cursor.execute(self.adl.format_query(query), params)
+            executed = time.perf_counter()
+            self.timings['query_sec'] += executed - staged
+
+            try:
+                while True:
+                    chunk = cursor.fetchmany(self.chunk_size)
+                    if not chunk:
+                        break
+                    self.chunks += 1
+                    if source_index is None:
+                        self.source_rows['ALL'] += len(chunk)
+                    else:
+                        self.source_rows.update(row[source_index] for row in chunk)
+                    yield from chunk
+            finally:
+                # Includes the time the caller spends consuming the rows
+                self.timings['stream_sec'] += time.perf_counter() - executed
+        finally:
+            self._drop(cursor)
+            cursor.close()
+
+    def _stage(self, cursor, callsigns: Iterable[str]):
+        """(Re)create CALLSIGN_TABLE holding the distinct callsigns"""
+        unique = sorted(set(cs for cs in callsigns if cs))
+        self.callsigns = len(unique)
+        cursor.execute(f"IF OBJECT_ID('tempdb..{CALLSIGN_TABLE}') IS NOT NULL DROP TABLE {CALLSIGN_TABLE}")
+        # COLLATE DATABASE_DEFAULT: tempdb may use a different collation than ADL
+        cursor.execute(f"CREATE TABLE {CALLSIGN_TABLE} "
+                       f"(callsign NVARCHAR(32) COLLATE DATABASE_DEFAULT NOT NULL PRIMARY KEY)")
+        for i in range(0, len(unique), INSERT_BATCH_ROWS):
+            batch = unique[i:i + INSERT_BATCH_ROWS]
+            values = ",".join(["(%s)"] * len(batch))
+            cursor.execute(self.adl.format_query(
+                f"INSERT INTO {CALLSIGN_TABLE} (callsign) VALUES {values}"), tuple(batch))
+
+    def _drop(self, cursor):
+        try:
+            cursor.execute(f"IF OBJECT_ID('tempdb..{CALLSIGN_TABLE}') IS NOT NULL DROP TABLE {CALLSIGN_TABLE}")
+        except Exception as e:
+            logger.debug(f"Dropping {CALLSIGN_TABLE} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'callsigns': self.callsigns,
+            'rows': sum(self.source_rows.values()),
+            'rows_by_source': dict(sorted(self.source_rows.items())),
+            'chunks': self.chunks,
+            **{k: round(v, 3) for k, v in self.timings.items()},
+        }
@@ -0,0 +1,332 @@
+"""
+TMI Compliance Analyzer - Columnar Trajectory Store
+===================================================
+
+Compact trajectory cache: every flight is a [start, end) slice over shared
+typed buffers (float32 lat/lon/gs/alt, int64 epoch seconds) instead of a
+list of per-point dicts with a datetime each.
+
+TrajectoryStore behaves like the old {callsign: [point dict, ...]} cache
+(Mapping of callsign -> TrajectoryView, and a view indexes/iterates as point
+dicts) so existing consumers keep working unchanged. Consumers that have been
+moved to the column accessors (lat, lon, epoch, gs, alt) read the buffers
+directly without materializing any dicts.
+
+Buffers use the stdlib array module, so NumPy is not required; when it is
+installed, TrajectoryStore.numpy_columns() exposes zero-copy ndarray views.
+"""
+
+import logging
+from array import array
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Groundspeed band treated as a trustworthy reading (see _preload_trajectories)
+GS_VALID_MIN_KTS = 100
+GS_VALID_MAX_KTS = 600
+
+# Column order of the shared buffers (and of TrajectoryStore.__init__)
+COLUMNS = ('lat', 'lon', 'gs', 'alt', 'epoch')
+COLUMN_TYPECODES = {'lat': 'f', 'lon': 'f', 'gs': 'f', 'alt': 'f', 'epoch': 'q'}
+
+# Dead-row share of the buffers above which TrajectoryStore.merged() compacts
+MERGE_COMPACT_RATIO = 0.5
+
+
+def to_epoch_seconds(ts: datetime) -> float:
+    """Naive-UTC datetime -> epoch seconds (independent of the host timezone)"""
+    return (ts - EPOCH).total_seconds()
+
+
+def from_epoch_seconds(epoch: int) -> datetime:
+    """Epoch seconds -> naive-UTC datetime"""
+    return EPOCH + timedelta(seconds=epoch)
+
+
+def is_gs_valid(gs: float) -> bool:
+    """Whether a raw groundspeed reading is usable (100-600 kts exclusive)"""
+    return GS_VALID_MIN_KTS < gs < GS_VALID_MAX_KTS
+
+
+class TrajectoryStoreBuilder:
+    """
+    Append-only builder for a TrajectoryStore.
+
+    Rows should arrive grouped by callsign and time-ordered within a callsign
+    (the trajectory queries ORDER BY callsign, timestamp_utc). A callsign
+    that reappears later (e.g. case-insensitive collation interleaving) is
+    kept as an extra fragment and compacted into one slice by build().
+    """
+
+    def __init__(self):
+        self._lat = array('f')
+        self._lon = array('f')
+        self._gs = array('f')
+        self._alt = array('f')
+        self._epoch = array('q')
+        self._fragments = {}  # callsign -> [(start, end), ...]
+        self._current = None
+        self._current_start = 0
+
+    def append(self, callsign: str, timestamp: datetime, lat: float, lon: float,
+               gs: float, alt: float):
+        """Append one trajectory point (raw DB values; None gs/alt stored as 0)"""
+        if callsign != self._current:
+            self._close_current()
+            self._current = callsign
+            self._current_start = len(self._epoch)
+
+        self._epoch.append(int(to_epoch_seconds(timestamp)))
+        self._lat.append(lat)
+        self._lon.append(lon)
+        self._gs.append(gs or 0)
+        self._alt.append(alt or 0)
+
+    def extend_points(self, callsign: str, points: List[dict]):
+        """Append a whole legacy point-dict trajectory for one callsign"""
+        for pt in points:
+            self.append(callsign, pt['timestamp'], pt['lat'], pt['lon'], pt['gs'], pt['alt'])
+
+    def _close_current(self):
+        if self._current is not None:
+            self._fragments.setdefault(self._current, []).append(
+                (self._current_start, len(self._epoch)))
+            self._current = None
+
+    def build(self) -> 'TrajectoryStore':
+        self._close_current()
+        columns = (self._lat, self._lon, self._gs, self._alt, self._epoch)
+
+        if all(len(frags) == 1 for frags in self._fragments.values()):
+            slices = {cs: frags[0] for cs, frags in self._fragments.items()}
+            return TrajectoryStore(*columns, slices)
+
+        # Compact fragmented callsigns into contiguous, time-ordered slices
+        compacted = tuple(array(c.typecode) for c in columns)
+        slices = {}
+        for cs, frags in self._fragments.items():
+            rows = [k for start, end in frags for k in range(start, end)]
+            if len(frags) > 1:
+                rows.sort(key=self._epoch.__getitem__)
+            start = len(compacted[-1])
+            for src, dst in zip(columns, compacted):
+                dst.extend(src[k] for k in rows)
+            slices[cs] = (start, len(compacted[-1]))
+        return TrajectoryStore(*compacted, slices)
+
+
+class TrajectoryStore(Mapping):
+    """Immutable columnar trajectory cache: callsign -> TrajectoryView"""
+
+    def __init__(self, lat: array, lon: array, gs: array, alt: array,
+                 epoch: array, slices: Dict[str, tuple]):
+        self._buffers = (lat, lon, gs, alt, epoch)
+        self.lat = memoryview(lat)
+        self.lon = memoryview(lon)
+        self.gs = memoryview(gs)
+        self.alt = memoryview(alt)
+        self.epoch = memoryview(epoch)
+        self._slices = slices
+
+    @classmethod
+    def empty(cls) -> 'TrajectoryStore':
+        return TrajectoryStoreBuilder().build()
+
+    @classmethod
+    def from_point_dicts(cls, trajectories: Dict[str, List[dict]]) -> 'TrajectoryStore':
+        """Build a store from the legacy {callsign: [point dict, ...]} layout"""
+        builder = TrajectoryStoreBuilder()
+        for callsign, points in trajectories.items():
+            builder.extend_points(callsign, points)
+        return builder.build()
+
+    def subset(self, callsigns) -> 'TrajectoryStore':
+        """New compact store holding only the given flights (unknown callsigns are skipped)"""
+        columns = tuple(array(b.typecode) for b in self._buffers)
+        slices = {}
+        for cs in callsigns:
+            se = self._slices.get(cs)
+            if se is None or cs in slices:
+                continue
+            start = len(columns[-1])
+            for src, dst in zip(self._buffers, columns):
+                dst.extend(src[se[0]:se[1]])
+            slices[cs] = (start, len(columns[-1]))
+        return TrajectoryStore(*columns, slices)
+
+    def merged(self, updates: Dict[str, List[tuple]],
+               compact_ratio: float = MERGE_COMPACT_RATIO) -> 'TrajectoryStore':
+        """
+        New store with points added to some flights (incremental/live loads).
+
+        updates maps callsign -> [(timestamp, lat, lon, gs, alt), ...] in any
+        order. Points are merged into the flight by time; a point at an epoch
+        second the flight already has is ignored, so overlapping reloads are
+        harmless. Unchanged flights keep their rows. Changed flights are
+        rewritten at the end of the buffers and their old rows become dead
+        space, which is compacted away once it exceeds compact_ratio of the
+        buffers.
+        """
+        columns = tuple(b[:] for b in self._buffers)
+        lat, lon, gs, alt, epoch = columns
+        slices = dict(self._slices)
+
+        for cs, points in updates.items():
+            rows = {}
+            for ts, p_lat, p_lon, p_gs, p_alt in points:
+                rows.setdefault(int(to_epoch_seconds(ts)), (p_lat, p_lon, p_gs or 0, p_alt or 0))
+            old = slices.get(cs)
+            if old is not None:
+                for k in range(*old):
+                    rows[epoch[k]] = (lat[k], lon[k], gs[k], alt[k])
+
+            start = len(epoch)
+            for ep in sorted(rows):
+                p_lat, p_lon, p_gs, p_alt = rows[ep]
+                epoch.append(ep)
+                lat.append(p_lat)
+                lon.append(p_lon)
+                gs.append(p_gs)
+                alt.append(p_alt)
+            slices[cs] = (start, len(epoch))
+
+        store = TrajectoryStore(*columns, slices)
+        live = sum(end - start for start, end in slices.values())
+        if len(epoch) - live > compact_ratio * len(epoch):
+            store = store.subset(list(slices))
+        return store
+
+    # --- Mapping interface (drop-in for the old dict cache) ---
+
+    def __getitem__(self, callsign: str) -> 'TrajectoryView':
+        start, end = self._slices[callsign]
+        return TrajectoryView(self, start, end)
+
+    def __contains__(self, callsign) -> bool:
+        return callsign in self._slices
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._slices)
+
+    def __len__(self) -> int:
+        return len(self._slices)
+
+    # --- Columnar accessors ---
+
+    def slice_of(self, callsign: str) -> Optional[tuple]:
+        """(start, end) offsets of a flight in the shared buffers, or None"""
+        return self._slices.get(callsign)
+
+    @property
+    def slices(self) -> Dict[str, tuple]:
+        """callsign -> (start, end) for every flight, in load order"""
+        return dict(self._slices)
+
+    def column_arrays(self) -> Dict[str, array]:
+        """The shared column buffers by name (see COLUMNS)"""
+        return dict(zip(COLUMNS, self._buffers))
+
+    @property
+    def point_count(self) -> int:
+        return len(self.epoch)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the shared column buffers"""
+        return sum(b.itemsize * len(b) for b in self._buffers)
+
+    def numpy_columns(self) -> dict:
+        """Zero-copy NumPy views of the shared buffers (requires NumPy)"""
+        import numpy as np
+        return {
+            name: np.frombuffer(buf, dtype=np.int64 if buf.typecode == 'q' else np.float32)
+            for name, buf in self.column_arrays().items()
+        }
+
+
+class TrajectoryView(Sequence):
+    """
+    One flight's trajectory as a slice of a TrajectoryStore.
+
+    Column accessors (lat, lon, gs, alt, epoch) are zero-copy memoryview
+    slices. Indexing and iteration still yield legacy point dicts
+    ({timestamp, lat, lon, gs, gs_valid, alt}) for unmigrated consumers.
+    """
+
+    __slots__ = ('_store', 'start', 'end')
+
+    def __init__(self, store: TrajectoryStore, start: int, end: int):
+        self._store = store
+        self.start = start
+        self.end = end
+
+    @property
+    def lat(self) -> memoryview:
+        return self._store.lat[self.start:self.end]
+
+    @property
+    def lon(self) -> memoryview:
+        return self._store.lon[self.start:self.end]
+
+    @property
+    def gs(self) -> memoryview:
+        return self._store.gs[self.start:self.end]
+
+    @property
+    def alt(self) -> memoryview:
+        return self._store.alt[self.start:self.end]
+
+    @property
+    def epoch(self) -> memoryview:
+        return self._store.epoch[self.start:self.end]
+
+    def timestamp(self, i: int) -> datetime:
+        """Point timestamp as naive-UTC datetime"""
+        return from_epoch_seconds(self._store.epoch[self._offset(i)])
+
+    def gs_valid(self, i: int) -> bool:
+        return is_gs_valid(self._store.gs[self._offset(i)])
+
+    def _offset(self, i: int) -> int:
+        n = self.end - self.start
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('trajectory index out of range')
+        return self.start + i
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        s = self._store
+        k = self._offset(i)
+        gs = s.gs[k]
+        return {
+            'timestamp': from_epoch_seconds(s.epoch[k]),
+            'lat': s.lat[k],
+            'lon': s.lon[k],
+            'gs': gs,
+            'gs_valid': is_gs_valid(gs),
+            'alt': s.alt[k],
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def as_trajectory_view(trajectory) -> TrajectoryView:
+    """Return a TrajectoryView for either a view or a legacy point-dict list"""
+    if isinstance(trajectory, TrajectoryView):
+        return trajectory
+    if not trajectory:
+        return TrajectoryView(TrajectoryStore.empty(), 0, 0)
+    return TrajectoryStore.from_point_dicts({'': list(trajectory)})['']
@@ -9,12 +9,27 @@ Called from PHP via shell_exec() or directly from command line.
 Usage:
     python run.py --plan_id 123
     python run.py --plan_id 123 --api_url https://perti.vatcscc.org/api
+    python run.py --plan_id 123 --gis_batch_size 200 --gis_workers 4
+    python run.py --plan_id 123 --no_cache
+    python run.py --plan_id 123 --workers 4
+    python run.py --plan_id 123 --trajectory_parquet /data/adl-raw-archive
+    python run.py --plan_id 123 --boundary_engine local
+    python run.py --plan_id 123 --no_gis --boundary_geojson ../../assets/geojson
+    python run.py --plan_id 123 --stream_clustering local
+    python run.py --plan_id 123 --live --live_interval 60
+    python run.py --plan_id 123 --profile --profile_dump run.prof
+    python run.py --plan_id 123 --output out/tmi_compliance_results_123.json --trajectory_format compact --trajectory_compress gzip
 
 Output:
     JSON results to stdout (errors to stderr)
+    --live: one JSON object per line (snapshot, then a delta per cycle)
+    --profile: per-phase timings and counters under the results' _perf key
+    --output: results file plus a split trajectory file (*_trajectories_*),
+              json or compact polyline layout, optionally with a .gz/.zst copy
 """
 
 import argparse
+import functools
 import json
 import logging
 import os
@@ -32,6 +47,15 @@ from core.models import (
 )
 from core.ntml_parser import parse_ntml_to_tmis, parse_ntml_full, extract_programs_from_ntml
 from core.analyzer import TMIComplianceAnalyzer
+from core.gis_crossings import DEFAULT_GIS_BATCH_SIZE, DEFAULT_GIS_WORKERS
+from core.input_cache import AnalyzerInputCache, DEFAULT_CACHE_DIR
+from core.live import DEFAULT_LIVE_INTERVAL_SEC, LiveComplianceMonitor
+from core.parquet_source import ParquetTrajectorySource
+from core.parallel import DEFAULT_WORKERS
+from core.profiler import AnalysisProfiler
+from core.result_writer import (
+    COMPRESSIONS, HAS_ZSTD, TRAJECTORY_FORMATS, iter_json, iter_trajectories_json, print_stream, write_stream
+)
 
 # Configure logging to stderr (so stdout is clean JSON)
 logging.basicConfig(
@@ -583,10 +607,11 @@ def build_event_config(config: dict, plan_id: int) -> EventConfig:
     return event
 
 
-def run_analysis(plan_id: int, api_url: str, config_path: str = None) -> dict:
-    """Run TMI compliance analysis for a plan"""
-    logger.info(f"Starting TMI compliance analysis for plan_id: {plan_id}")
+def load_event(plan_id: int, api_url: str, config_path: str = None) -> tuple:
+    """Load the plan's TMI config and build its EventConfig
 
+    Returns (event, None), or (None, error result dict).
+    """
     # Load configuration: prefer direct file read (avoids HTTP auth issues),
     # fall back to API fetch for backwards compatibility / CLI usage
     config = None
@@ -595,94 +620,262 @@ def run_analysis(plan_id: int, api_url: str, config_path: str = None) -> dict:
     if not config:
         config = load_config_from_api(plan_id, api_url)
     if not config:
-        return {"error": f"No TMI config found for plan {plan_id}. Save configuration in PERTI first."}
+        return None, {"error": f"No TMI config found for plan {plan_id}. Save configuration in PERTI first."}
 
     # Build event config
     event = build_event_config(config, plan_id)
 
     if not event.tmis and not event.gs_programs and not event.reroute_programs:
-        return {"error": "No TMIs defined in configuration. Add NTML entries and save."}
+        return None, {"error": "No TMIs defined in configuration. Add NTML entries and save."}
 
     logger.info(f"Event: {event.name}, TMIs: {len(event.tmis)}, "
                 f"GS programs: {len(event.gs_programs)}, "
                 f"Reroute programs: {len(event.reroute_programs)}")
 
+    return event, None
+
+
+def run_analysis(plan_id: int, api_url: str, config_path: str = None,
+                 **analyzer_options) -> dict:
+    """Run TMI compliance analysis for a plan
+
+    analyzer_options are passed through to TMIComplianceAnalyzer
+    (e.g. gis_batch_size, gis_workers, input_cache, workers, trajectory_source,
+    boundary_engine, boundary_geojson, use_gis, profiler, session, stream_clustering).
+    """
+    logger.info(f"Starting TMI compliance analysis for plan_id: {plan_id}")
+
+    event, error = load_event(plan_id, api_url, config_path)
+    if error:
+        return error
+
     # Run analysis
-    analyzer = TMIComplianceAnalyzer(event)
+    analyzer = TMIComplianceAnalyzer(event, **analyzer_options)
     results = analyzer.analyze()
 
     # Add plan_id to results
     results['plan_id'] = plan_id
 
+    input_cache = analyzer_options.get('input_cache')
+    if input_cache and input_cache.enabled:
+        logger.info(f"Input cache: {input_cache.hits} hits, {input_cache.misses} misses "
+                    f"({input_cache.cache_dir})")
+
     logger.info("Analysis complete")
     return results
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Run TMI Compliance Analysis')
-    parser.add_argument('--plan_id', type=int, required=True, help='PERTI plan ID to analyze')
+def _append_delta(output: str, delta: dict):
+    """Append one live delta to output as a JSON line"""
+    with open(output, 'a') as f:
+        f.write(json.dumps(delta, default=str) + '\n')
+
+
+def run_live(plan_id: int, api_url: str, config_path: str = None, output: str = None,
+             interval_sec: float = DEFAULT_LIVE_INTERVAL_SEC, cycles: int = 0,
+             **analyzer_options) -> dict:
+    """Rolling MIT compliance: a snapshot, then one delta per cycle as JSON lines
+
+    Deltas go to stdout, or are appended to output (one JSON object per line).
+    Returns an error result dict, or None when the run ended normally.
+    """
+    logger.info(f"Starting live TMI compliance for plan_id: {plan_id} "
+                f"(every {interval_sec}s{f', {cycles} cycles' if cycles else ''})")
+
+    event, error = load_event(plan_id, api_url, config_path)
+    if error:
+        return error
+
+    if output:
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    emit = functools.partial(_append_delta, output) if output else None
+
+    analyzer = TMIComplianceAnalyzer(event, **analyzer_options)
+    LiveComplianceMonitor(analyzer, interval_sec=interval_sec, emit=emit).run(max_cycles=cycles)
+    logger.info("Live mode stopped")
+    return None
+
+
+def add_analysis_arguments(parser: argparse.ArgumentParser):
+    """Options shared by run.py and run_batch.py (see analyzer_options_from_args)"""
     parser.add_argument('--api_url', type=str,
                         default=os.environ.get('PERTI_API_URL', 'https://perti.vatcscc.org/api'),
                         help='PERTI API base URL')
+    parser.add_argument('--gis_batch_size', type=int, default=DEFAULT_GIS_BATCH_SIZE,
+                        help='Flights per PostGIS boundary-crossing query (1 = one query per flight)')
+    parser.add_argument('--gis_workers', type=int, default=DEFAULT_GIS_WORKERS,
+                        help='GIS connections used for the boundary-crossing precompute')
+    parser.add_argument('--boundary_engine', choices=('postgis', 'local'), default='postgis',
+                        help='Boundary crossings from the PostGIS functions, or computed in process '
+                             'from the boundary polygons (local)')
+    parser.add_argument('--boundary_geojson', type=str, default=None, metavar='GEOJSON_DIR',
+                        help='Boundary polygons for --boundary_engine local from GeoJSON files '
+                             '(default: the GIS boundary tables, or assets/geojson without GIS)')
+    parser.add_argument('--no_gis', action='store_true',
+                        help='Do not connect to PostGIS (implies --boundary_engine local '
+                             'and --stream_clustering local)')
+    parser.add_argument('--stream_clustering', choices=('postgis', 'local'), default='postgis',
+                        help='Split MIT crossings into traffic streams with PostGIS DBSCAN, or in '
+                             'process from the sampled approach paths (local, needs NumPy)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help='Worker processes for independent TMI analyses (1 = sequential)')
+    parser.add_argument('--cache_dir', type=str, default=DEFAULT_CACHE_DIR,
+                        help='Directory for the on-disk input cache (env TMI_CACHE_DIR)')
+    parser.add_argument('--no_cache', '--no-cache', action='store_true',
+                        help='Always query ADL/GIS; do not read or write the input cache')
+    parser.add_argument('--clear_cache', action='store_true',
+                        help='Delete every cached input before running')
+    parser.add_argument('--trajectory_parquet', type=str, default=None, metavar='ARCHIVE_DIR',
+                        help='Read trajectories from a local copy of the ADL Parquet archive '
+                             '(trajectory/year=/month=/day=) instead of ADL SQL')
+    parser.add_argument('--trajectory_format', choices=TRAJECTORY_FORMATS, default='json',
+                        help='Split trajectory file layout: GeoJSON-style coordinate lists (json) '
+                             'or one delta-encoded polyline per flight (compact)')
+    parser.add_argument('--trajectory_compress', choices=COMPRESSIONS, default='none',
+                        help='Also write a gzip (.gz) or zstd (.zst) copy of the trajectory file')
+
+
+def check_analysis_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """Validate and normalize the add_analysis_arguments options"""
+    if args.trajectory_compress == 'zstd' and not HAS_ZSTD:
+        parser.error('--trajectory_compress zstd needs the zstandard package')
+    if args.no_gis or args.boundary_geojson:
+        args.boundary_engine = 'local'
+    if args.no_gis:
+        args.stream_clustering = 'local'
+
+
+def check_live_arguments(parser: argparse.ArgumentParser, args: argparse.Namespace):
+    """
+    Reject analysis options that live mode cannot apply: live cycles are
+    fix-based and sequential, with no boundary crossings and bearing-split
+    streams (see core/live.py). --no_gis is accepted (live mode never uses GIS).
+    """
+    if args.trajectory_parquet:
+        parser.error('--trajectory_parquet cannot be combined with --live')
+    if args.workers != DEFAULT_WORKERS:
+        parser.error('--workers cannot be combined with --live (live cycles run sequentially)')
+    if args.boundary_engine == 'local' or args.boundary_geojson:
+        parser.error('--boundary_engine local / --boundary_geojson cannot be combined with --live '
+                     '(live mode does not compute boundary crossings)')
+    if args.stream_clustering == 'local':
+        parser.error('--stream_clustering local cannot be combined with --live '
+                     '(live mode splits streams by approach bearing)')
+
+
+def analyzer_options_from_args(args: argparse.Namespace, input_cache) -> dict:
+    """TMIComplianceAnalyzer keyword arguments for the add_analysis_arguments options"""
+    trajectory_source = None
+    if args.trajectory_parquet:
+        trajectory_source = ParquetTrajectorySource(args.trajectory_parquet)
+    return {
+        'gis_batch_size': args.gis_batch_size,
+        'gis_workers': args.gis_workers,
+        'input_cache': input_cache,
+        'workers': args.workers,
+        'trajectory_source': trajectory_source,
+        'boundary_engine': args.boundary_engine,
+        'boundary_geojson': args.boundary_geojson,
+        'use_gis': not args.no_gis,
+        'stream_clustering': args.stream_clustering,
+    }
+
+
+def write_result_files(results: dict, output: str, trajectory_format: str = 'json',
+                       trajectory_compress: str = 'none') -> int:
+    """Write results to output and its trajectories to the split *_trajectories_* file
+
+    Pops results['_trajectories']. Returns the results file size in bytes.
+    """
+    # Split trajectory data into separate file for memory efficiency
+    # PHP serves trajectories via readfile() (zero json_decode overhead)
+    trajectories = results.pop('_trajectories', {})
+
+    # Write to file (avoids PHP memory issues with large stdout capture)
+    # Streamed and atomic (temp file + rename) to prevent partial reads
+    size = write_stream(output, iter_json(results))
+    logger.info(f"Results written to {output} ({size} bytes)")
+
+    # Write trajectory file alongside results
+    if trajectories:
+        traj_path = output.replace('_results_', '_trajectories_')
+        traj_size = write_stream(traj_path, iter_trajectories_json(trajectories, trajectory_format),
+                                 compression=trajectory_compress)
+        logger.info(f"Trajectories written to {traj_path} ({traj_size} bytes, {trajectory_format})")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run TMI Compliance Analysis')
+    parser.add_argument('--plan_id', type=int, required=True, help='PERTI plan ID to analyze')
     parser.add_argument('--output', type=str, default=None,
                         help='Write JSON results to file instead of stdout')
     parser.add_argument('--config_path', type=str, default=None,
                         help='Path to config JSON file (reads directly, bypasses HTTP auth)')
-
+    add_analysis_arguments(parser)
+    parser.add_argument('--live', action='store_true',
+                        help='Rolling MIT compliance: emit a JSON-lines delta every cycle')
+    parser.add_argument('--live_interval', type=float, default=DEFAULT_LIVE_INTERVAL_SEC,
+                        help='Seconds between live cycles')
+    parser.add_argument('--live_cycles', type=int, default=0,
+                        help='Stop live mode after this many cycles (0 = until interrupted)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record per-phase wall/CPU time, DB round trips, rows, cache hits '
+                             'and peak memory under _perf in the results')
+    parser.add_argument('--profile_dump', type=str, default=None, metavar='PATH',
+                        help='Also profile the whole run with cProfile (.prof) or pyinstrument '
+                             '(.html) and write it to PATH (implies --profile)')
     args = parser.parse_args()
+    if args.live:
+        check_live_arguments(parser, args)
+    check_analysis_arguments(parser, args)
 
     try:
-        results = run_analysis(args.plan_id, args.api_url, args.config_path)
+        input_cache = AnalyzerInputCache(args.cache_dir, enabled=not args.no_cache)
+        if args.clear_cache:
+            input_cache.clear()
+
+        if args.live:
+            error = run_live(args.plan_id, args.api_url, args.config_path, args.output,
+                             interval_sec=args.live_interval,
+                             cycles=args.live_cycles,
+                             **analyzer_options_from_args(args, input_cache))
+            if error:
+                logger.error(f"Analysis error: {error['error']}")
+                print(json.dumps(error, default=str))
+                sys.exit(1)
+            sys.exit(0)
+
+        profiler = None
+        if args.profile or args.profile_dump:
+            profiler = AnalysisProfiler(dump_path=args.profile_dump)
+
+        results = run_analysis(args.plan_id, args.api_url, args.config_path,
+                               profiler=profiler,
+                               **analyzer_options_from_args(args, input_cache))
 
         # If analysis returned an error, write it to the output file so the
         # PHP status poller can detect it, but exit with code 1
         if 'error' in results:
             logger.error(f"Analysis error: {results['error']}")
             if args.output:
-                os.makedirs(os.path.dirname(args.output), exist_ok=True)
-                tmp_path = args.output + '.tmp'
-                with open(tmp_path, 'w') as f:
-                    f.write(json.dumps(results, default=str))
-                os.replace(tmp_path, args.output)
+                write_stream(args.output, iter_json(results))
             else:
-                print(json.dumps(results, default=str))
+                print_stream(iter_json(results))
             sys.exit(1)
 
-        # Split trajectory data into separate file for memory efficiency
-        # PHP serves trajectories via readfile() (zero json_decode overhead)
-        trajectories = results.pop('_trajectories', {})
-
-        json_str = json.dumps(results, default=str)
-
         if args.output:
-            # Write to file (avoids PHP memory issues with large stdout capture)
-            os.makedirs(os.path.dirname(args.output), exist_ok=True)
-
-            # Atomic write: temp file + rename to prevent partial reads
-            tmp_path = args.output + '.tmp'
-            with open(tmp_path, 'w') as f:
-                f.write(json_str)
-            os.replace(tmp_path, args.output)
-            logger.info(f"Results written to {args.output} ({len(json_str)} bytes)")
-
-            # Write trajectory file alongside results
-            if trajectories:
-                traj_path = args.output.replace('_results_', '_trajectories_')
-                traj_str = json.dumps(trajectories, default=str)
-                tmp_traj = traj_path + '.tmp'
-                with open(tmp_traj, 'w') as f:
-                    f.write(traj_str)
-                os.replace(tmp_traj, traj_path)
-                logger.info(f"Trajectories written to {traj_path} ({len(traj_str)} bytes)")
-
-            print(json.dumps({"output_file": args.output, "size": len(json_str)}))
+            size = write_result_files(results, args.output, args.trajectory_format,
+                                      args.trajectory_compress)
+            print(json.dumps({"output_file": args.output, "size": size}))
         else:
             # Output JSON to stdout (trajectories included inline for backwards compat)
             # Re-embed trajectories for stdout mode
+            trajectories = results.pop('_trajectories', {})
             for key, traj in trajectories.items():
                 if key in results.get('mit_results', {}):
                     results['mit_results'][key]['trajectories'] = traj
-            print(json.dumps(results, default=str))
+            print_stream(iter_json(results))
 
         sys.exit(0)
     except Exception as e:
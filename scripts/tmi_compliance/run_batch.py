@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+TMI Compliance Batch CLI
+========================
+
+Analyzes many PERTI plans in one process (season-wide compliance reports).
+
+ADL/GIS connections, the airport taxi/connect references, the airport→ARTCC
+map, the known airway names, the local boundary polygons and the route
+expansion cache are loaded once and shared by every plan (AnalysisSession).
+Each plan gets the same result files run.py --output writes, and the batch
+writes an aggregate summary.
+
+Usage:
+    python run_batch.py --plan_ids 101 102 103
+    python run_batch.py --from_date 2026-06-01 --to_date 2026-08-31 --plan_workers 4
+    python run_batch.py --plan_ids 101 102 --output_dir /tmp/season --boundary_engine local
+
+Plans are selected by ID, or by the event_start date of the saved configs
+(tmi_config_<plan_id>.json) in --config_dir. Configs are read from
+--config_dir when present, else fetched from the PERTI API.
+
+Output:
+    <output_dir>/tmi_compliance_results_<plan_id>.json (+ _trajectories_)
+    <summary> (default <output_dir>/tmi_compliance_batch_<UTC timestamp>.json)
+    The summary path and counts as JSON to stdout
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run import (
+    add_analysis_arguments, analyzer_options_from_args, check_analysis_arguments,
+    run_analysis, write_result_files
+)
+from core.analyzer import TMIComplianceAnalyzer
+from core.batch import DEFAULT_PLAN_WORKERS, PlanBatch, aggregate_summary, plan_entry
+from core.input_cache import AnalyzerInputCache
+from core.models import EventConfig
+from core.result_writer import iter_json, write_stream
+from core.session import AnalysisSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_DIR = os.path.normpath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'tmi_compliance'))
+
+_CONFIG_FILE = re.compile(r'tmi_config_(\d+)\.json$')
+
+
+def config_path_for(config_dir: str, plan_id: int) -> str:
+    path = os.path.join(config_dir, f"tmi_config_{plan_id}.json")
+    return path if os.path.exists(path) else None
+
+
+def plans_in_date_range(config_dir: str, from_date, to_date) -> list:
+    """Plan IDs of saved configs whose event_start date is within [from_date, to_date]"""
+    plan_ids = []
+    for path in glob.glob(os.path.join(config_dir, 'tmi_config_*.json')):
+        match = _CONFIG_FILE.search(os.path.basename(path))
+        if not match:
+            continue
+        try:
+            with open(path, 'r') as f:
+                event_start = (json.load(f) or {}).get('event_start', '')
+            day = datetime.strptime(event_start.strip()[:10], '%Y-%m-%d').date()
+        except (IOError, ValueError, AttributeError) as e:
+            logger.warning(f"Skipping {path}: no usable event_start ({e})")
+            continue
+        if from_date <= day <= to_date:
+            plan_ids.append(int(match.group(1)))
+    return sorted(plan_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run TMI Compliance Analysis for many plans')
+    parser.add_argument('--plan_ids', type=int, nargs='+', default=None, metavar='PLAN_ID',
+                        help='PERTI plan IDs to analyze')
+    parser.add_argument('--from_date', type=str, default=None, metavar='YYYY-MM-DD',
+                        help='Analyze every saved plan whose event starts on or after this date')
+    parser.add_argument('--to_date', type=str, default=None, metavar='YYYY-MM-DD',
+                        help='... and on or before this date (default: --from_date)')
+    parser.add_argument('--config_dir', type=str, default=DEFAULT_DATA_DIR,
+                        help='Directory of saved tmi_config_<plan_id>.json files')
+    parser.add_argument('--output_dir', type=str, default=None,
+                        help='Directory for the per-plan result files (default: --config_dir)')
+    parser.add_argument('--summary', type=str, default=None, metavar='PATH',
+                        help='Aggregate summary file (default: in --output_dir)')
+    parser.add_argument('--plan_workers', type=int, default=DEFAULT_PLAN_WORKERS,
+                        help='Plans analyzed in parallel (worker processes; 1 = one after another)')
+    add_analysis_arguments(parser)
+    args = parser.parse_args()
+    check_analysis_arguments(parser, args)
+
+    if args.plan_ids and args.from_date:
+        parser.error('Use either --plan_ids or --from_date/--to_date')
+    if args.plan_ids:
+        plan_ids = list(dict.fromkeys(args.plan_ids))
+    elif args.from_date:
+        try:
+            from_date = datetime.strptime(args.from_date, '%Y-%m-%d').date()
+            to_date = datetime.strptime(args.to_date or args.from_date, '%Y-%m-%d').date()
+        except ValueError as e:
+            parser.error(f"Invalid date: {e}")
+        plan_ids = plans_in_date_range(args.config_dir, from_date, to_date)
+        logger.info(f"{len(plan_ids)} saved plans with events from {from_date} to {to_date}")
+    else:
+        parser.error('--plan_ids or --from_date is required')
+
+    if args.plan_workers > 1 and args.workers > 1:
+        # Pool workers are daemonic and cannot fork the per-plan TMI workers
+        logger.warning("--workers is ignored with --plan_workers > 1")
+        args.workers = 1
+
+    output_dir = args.output_dir or args.config_dir
+    started = datetime.utcnow()
+    summary_path = args.summary or os.path.join(
+        output_dir, f"tmi_compliance_batch_{started:%Y%m%dT%H%M%SZ}.json")
+
+    input_cache = AnalyzerInputCache(args.cache_dir, enabled=not args.no_cache)
+    if args.clear_cache:
+        input_cache.clear()
+    analyzer_options = analyzer_options_from_args(args, input_cache)
+
+    def analyze_plan(plan_id: int, session: AnalysisSession) -> dict:
+        output = os.path.join(output_dir, f"tmi_compliance_results_{plan_id}.json")
+        results = run_analysis(plan_id, args.api_url, config_path_for(args.config_dir, plan_id),
+                               session=session, **analyzer_options)
+        if 'error' in results:
+            # Same as run.py: the error goes into the result file for the PHP status poller
+            write_stream(output, iter_json(results))
+        else:
+            write_result_files(results, output, args.trajectory_format, args.trajectory_compress)
+        return plan_entry(plan_id, results, output)
+
+    with AnalysisSession(use_gis=not args.no_gis) as session:
+        if plan_ids:
+            # Shared reference data, loaded before any plan worker is forked
+            placeholder = EventConfig(name='batch session', start_utc=started, end_utc=started)
+            TMIComplianceAnalyzer(placeholder, session=session, **analyzer_options).prepare_session()
+        entries = PlanBatch(analyze_plan, session, workers=args.plan_workers).run(plan_ids)
+        session_stats = session.stats()
+
+    report = {
+        'generated_utc': datetime.utcnow().isoformat(),
+        'started_utc': started.isoformat(),
+        'plan_ids': plan_ids,
+        'totals': aggregate_summary(entries),
+        'plans': entries,
+        'session': session_stats,
+    }
+    write_stream(summary_path, iter_json(report))
+    logger.info(f"Batch summary written to {summary_path}")
+
+    totals = report['totals']
+    print(json.dumps({"summary_file": summary_path, "plans": totals['plans'],
+                      "analyzed": totals['analyzed'], "failed": totals['failed']}))
+    sys.exit(1 if totals['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()